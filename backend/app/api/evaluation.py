@@ -14,6 +14,7 @@ from app.models.evaluation import Evaluation
 from app.models.song import Song
 from app.models.user import User
 from app.schemas.evaluation import EvaluationCreate, EvaluationResponse, EvaluationUpdate
+from app.services.pipeline import advance_pipeline
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -241,6 +242,9 @@ async def approve_evaluation(
 
     await db.commit()
 
+    # Approved songs continue to video rendering and YouTube upload
+    await advance_pipeline(db, evaluation.song_id)
+
     logger.info(f"User {current_user.username} approved evaluation {evaluation_id}")
 
     return {"message": "Evaluation approved", "evaluation_id": evaluation_id}
@@ -1,24 +1,34 @@
 """Task queue management API endpoints."""
 
+import json
 import logging
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.auth import get_current_user
 from app.database import get_db
+from app.models.song import Song
 from app.models.task_queue import TaskQueue
 from app.models.user import User
 from app.schemas.queue import (
     QueueStats,
+    RenderBatchCreate,
+    RenderBatchResponse,
+    TaskMetricsReport,
+    TaskMetricsSummary,
     TaskQueueCreate,
     TaskQueueList,
     TaskQueueListMeta,
     TaskQueueResponse,
 )
+from app.services.pipeline import on_task_completed
+from app.services.render_farm import RENDER_TASK_TYPE, get_render_farm
+from app.services.scheduler import get_task_timer, is_due
+from app.services.task_metrics import merge_metrics, summarize_metrics
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -28,6 +38,7 @@ router = APIRouter()
 async def list_tasks(
     status_filter: Optional[str] = None,
     task_type: Optional[str] = None,
+    due_only: bool = False,
     skip: int = 0,
     limit: int = 50,
     db: AsyncSession = Depends(get_db),
@@ -37,7 +48,8 @@ async def list_tasks(
     List all tasks with filtering and pagination.
 
     - **status_filter**: Filter by task status (pending, running, completed, failed)
-    - **task_type**: Filter by task type (suno_upload, suno_download, youtube_upload, evaluate)
+    - **task_type**: Filter by task type (suno_upload, suno_download, youtube_upload, evaluate, rank_variations, video_generate)
+    - **due_only**: Skip tasks whose run_at is still in the future (for workers)
     - **skip**: Number of records to skip (for pagination)
     - **limit**: Maximum number of records to return (max 200)
     """
@@ -52,6 +64,8 @@ async def list_tasks(
         query = query.where(TaskQueue.status == status_filter)
     if task_type:
         query = query.where(TaskQueue.task_type == task_type)
+    if due_only:
+        query = query.where(is_due())
 
     # Get total count
     count_query = select(func.count()).select_from(query.subquery())
@@ -149,6 +163,7 @@ async def queue_stats(
         suno_download_count=type_dict.get("suno_download", 0),
         youtube_upload_count=type_dict.get("youtube_upload", 0),
         evaluate_count=type_dict.get("evaluate", 0),
+        video_generate_count=type_dict.get(RENDER_TASK_TYPE, 0),
         avg_completion_time_seconds=avg_completion_time,
         oldest_pending_task_age_seconds=int(oldest_pending_age) if oldest_pending_age else None,
     )
@@ -163,10 +178,14 @@ async def enqueue_task(
     """
     Add task to queue manually.
 
-    - **task_data**: Task details including type, song_id, payload, and priority
+    - **task_data**: Task details including type, song_id, payload, priority and an
+      optional run_at; the task is not picked up before run_at
     """
     # Validate task type
-    valid_task_types = ["suno_upload", "suno_download", "youtube_upload", "evaluate"]
+    valid_task_types = [
+        "suno_upload", "suno_download", "youtube_upload", "evaluate", "rank_variations",
+        "cover_generate", "lyric_timing", RENDER_TASK_TYPE,
+    ]
     if task_data.task_type not in valid_task_types:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -180,6 +199,8 @@ async def enqueue_task(
         payload_json=task_data.payload,
         priority=task_data.priority,
         status="pending",
+        run_at=task_data.run_at,
+        scheduled_at=task_data.run_at,
     )
 
     db.add(task)
@@ -190,9 +211,70 @@ async def enqueue_task(
         f"User {current_user.username} created task {task.id} (type: {task_data.task_type}, song: {task_data.song_id})"
     )
 
+    if task.task_type == RENDER_TASK_TYPE:
+        get_render_farm().wake()
+    get_task_timer().schedule(task.run_at)
+
     return TaskQueueResponse.model_validate(task)
 
 
+@router.post(
+    "/queue/render-batch",
+    status_code=status.HTTP_201_CREATED,
+    response_model=RenderBatchResponse,
+)
+async def enqueue_render_batch(
+    batch: RenderBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> RenderBatchResponse:
+    """
+    Queue video renders for a batch of songs.
+
+    Renders are picked up by the render farm, which runs several FFmpeg jobs
+    in parallel with a fixed thread cap per job.
+
+    - **song_ids**: Songs to render
+    - **priority**: Task priority for all renders
+    - **thumbnail**: Optional image used as the static video frame
+    """
+    result = await db.execute(select(Song.id).where(Song.id.in_(batch.song_ids)))
+    existing_ids = set(result.scalars().all())
+    missing_ids = [song_id for song_id in batch.song_ids if song_id not in existing_ids]
+
+    payload = json.dumps({"thumbnail": batch.thumbnail}) if batch.thumbnail else None
+    tasks = [
+        TaskQueue(
+            task_type=RENDER_TASK_TYPE,
+            song_id=song_id,
+            payload_json=payload,
+            priority=batch.priority,
+            status="pending",
+        )
+        for song_id in dict.fromkeys(batch.song_ids)
+        if song_id in existing_ids
+    ]
+
+    db.add_all(tasks)
+    await db.commit()
+
+    render_farm = get_render_farm()
+    render_farm.wake()
+
+    logger.info(
+        f"User {current_user.username} queued {len(tasks)} renders "
+        f"({len(missing_ids)} songs not found)"
+    )
+
+    return RenderBatchResponse(
+        queued=len(tasks),
+        task_ids=[task.id for task in tasks],
+        missing_song_ids=missing_ids,
+        max_jobs=render_farm.max_jobs,
+        threads_per_job=render_farm.threads_per_job,
+    )
+
+
 @router.delete("/queue/tasks/{task_id}")
 async def cancel_task(
     task_id: int,
@@ -270,10 +352,17 @@ async def retry_task(
     task.error_message = None
     task.started_at = None
     task.completed_at = None
+    # Drop any retry backoff but keep a requested time that is still ahead
+    task.run_at = (
+        task.scheduled_at
+        if task.scheduled_at and task.scheduled_at > datetime.utcnow()
+        else None
+    )
     # Don't reset retry_count - it tracks total retry attempts
 
     await db.commit()
     await db.refresh(task)
+    get_task_timer().schedule(task.run_at)
 
     logger.info(
         f"User {current_user.username} retried task {task_id} (type: {task.task_type}, retry count: {task.retry_count})"
@@ -369,6 +458,9 @@ async def complete_task(
         f"User {current_user.username} marked task {task_id} as completed (type: {task.task_type})"
     )
 
+    # Queue the song's next pipeline stages
+    await on_task_completed(db, task)
+
     return TaskQueueResponse.model_validate(task)
 
 
@@ -441,6 +533,12 @@ async def start_task(
             detail=f"Cannot start task with status '{task.status}'. Only 'pending' tasks can be started.",
         )
 
+    if task.run_at and task.run_at > datetime.utcnow():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Task is scheduled to run at {task.run_at.isoformat()}",
+        )
+
     # Mark as running
     task.status = "running"
     task.started_at = datetime.utcnow()
@@ -453,3 +551,62 @@ async def start_task(
     )
 
     return TaskQueueResponse.model_validate(task)
+
+
+@router.post("/queue/tasks/{task_id}/metrics", response_model=TaskQueueResponse)
+async def report_task_metrics(
+    task_id: int,
+    report: TaskMetricsReport,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> TaskQueueResponse:
+    """
+    Record per-stage timings for a task.
+
+    Used by external workers to report how long each stage took. Reports
+    are merged, so stages can be sent as they finish.
+
+    - **task_id**: Task ID
+    - **stages**: Seconds per stage (e.g. submit, first_seen, complete, download)
+    - **counters**: Other measurements (e.g. download_bytes)
+    - **failure_reason**: Why the task failed, if it did
+    """
+    result = await db.execute(select(TaskQueue).where(TaskQueue.id == task_id))
+    task = result.scalar_one_or_none()
+
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task with ID {task_id} not found",
+        )
+
+    task.metrics_json = merge_metrics(task.metrics_json, report.model_dump())
+
+    await db.commit()
+    await db.refresh(task)
+
+    return TaskQueueResponse.model_validate(task)
+
+
+@router.get("/queue/metrics", response_model=TaskMetricsSummary)
+async def task_metrics_summary(
+    task_type: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> TaskMetricsSummary:
+    """
+    Summarize reported stage timings of recent tasks.
+
+    - **task_type**: Only include tasks of this type
+    - **limit**: Number of most recent tasks with metrics to include
+    """
+    query = select(TaskQueue.metrics_json).where(TaskQueue.metrics_json.isnot(None))
+    if task_type:
+        query = query.where(TaskQueue.task_type == task_type)
+    query = query.order_by(TaskQueue.created_at.desc(), TaskQueue.id.desc()).limit(limit)
+
+    result = await db.execute(query)
+    summary = summarize_metrics(result.scalars().all())
+
+    return TaskMetricsSummary(task_type=task_type, **summary)
@@ -1,36 +1,67 @@
 """Song management API endpoints."""
 
+import asyncio
 import logging
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import FileResponse
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.api.auth import get_current_user
+from app.config import get_settings
 from app.database import get_db
 from app.models.song import Song
 from app.models.task_queue import TaskQueue
 from app.models.user import User
 from app.models.video_project import VideoProject
 from app.schemas.song import (
+    LyricMatchResponse,
+    LyricSimilarityList,
+    LyricSimilarityQuery,
+    SongBulkItem,
+    SongBulkResult,
+    SongBulkUpsert,
     SongCreate,
+    SongDuplicate,
+    SongDuplicateList,
     SongList,
     SongListMeta,
     SongResponse,
+    SongSearchHit,
+    SongSearchResults,
     SongStatus,
     SongUpdate,
 )
+from app.services.audio_fingerprint import get_fingerprint_service
+from app.services.lyric_index import get_lyric_index, song_key
+from app.services.pipeline import advance_pipeline, start_tasks
+from app.services.search import search_songs
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 router = APIRouter()
 
 
+BULK_FIELDS = ("title", "genre", "style_prompt", "lyrics", "metadata_json")
+
+
+async def _index_lyrics(songs: list[Song]) -> None:
+    """Add songs to the lyric duplicate index and save it once."""
+    lyric_index = get_lyric_index()
+    for song in songs:
+        lyric_index.add(song_key(Path(song.file_path)), song.title, song.lyrics)
+    try:
+        await asyncio.to_thread(lyric_index.save, Path(settings.LYRIC_INDEX_PATH))
+    except OSError as e:
+        logger.warning(f"Could not save lyric index: {e}")
+
+
 async def compute_song_effective_status(
     song: Song, db: AsyncSession
 ) -> tuple[str, Optional[str]]:
@@ -62,6 +93,7 @@ async def compute_song_effective_status(
 async def list_songs(
     status_filter: Optional[str] = None,
     genre: Optional[str] = None,
+    file_path: Optional[str] = None,
     skip: int = 0,
     limit: int = 50,
     db: AsyncSession = Depends(get_db),
@@ -76,6 +108,8 @@ async def list_songs(
         query = query.where(Song.status == status_filter)
     if genre:
         query = query.where(Song.genre == genre)
+    if file_path:
+        query = query.where(Song.file_path == file_path)
 
     count_query = select(func.count()).select_from(query.subquery())
     total_result = await db.execute(count_query)
@@ -119,6 +153,96 @@ async def list_songs(
     )
 
 
+@router.get("/songs/search", response_model=SongSearchResults)
+async def search_songs_endpoint(
+    q: str = Query(..., min_length=1, max_length=200, description="Search text"),
+    genre: Optional[str] = None,
+    status_filter: Optional[str] = None,
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> SongSearchResults:
+    """Search songs by title, lyrics, style prompt and genre.
+
+    Results come from the FTS5 index, ordered by relevance (title matches
+    weigh most) with matched terms highlighted. The last word also matches
+    as a prefix, for search-as-you-type.
+    """
+    total, hits = await search_songs(db, q, genre=genre, status=status_filter, skip=skip, limit=limit)
+
+    songs = {}
+    if hits:
+        result = await db.execute(select(Song).where(Song.id.in_([hit.id for hit in hits])))
+        songs = {song.id: song for song in result.scalars().all()}
+
+    items = [
+        SongSearchHit(
+            id=hit.id,
+            title=songs[hit.id].title,
+            genre=songs[hit.id].genre,
+            status=songs[hit.id].status,
+            rank=hit.rank,
+            highlights=hit.highlights,
+        )
+        for hit in hits
+        if hit.id in songs
+    ]
+
+    logger.info(f"User {current_user.username} searched songs for '{q}': {total} found")
+
+    return SongSearchResults(
+        query=q,
+        items=items,
+        meta=SongListMeta(
+            total=total,
+            skip=skip,
+            limit=limit,
+            has_more=(skip + len(hits)) < total,
+        ),
+    )
+
+
+@router.post("/songs/similar-lyrics", response_model=LyricSimilarityList)
+async def find_similar_lyrics(
+    query: LyricSimilarityQuery,
+    current_user: User = Depends(get_current_user),
+) -> LyricSimilarityList:
+    """Find generated songs whose title or lyrics are near-duplicates.
+
+    Uses the MinHash/LSH lyric index, so the cost does not grow with the
+    size of the catalog. Exact title matches are always returned.
+    """
+    min_similarity = (
+        settings.LYRIC_MATCH_THRESHOLD if query.min_similarity is None else query.min_similarity
+    )
+    lyric_index = get_lyric_index()
+    matches = lyric_index.query(
+        query.title,
+        query.lyrics,
+        top_k=query.limit,
+        min_similarity=min_similarity,
+        exclude=song_key(Path(query.exclude_file_path)) if query.exclude_file_path else None,
+    )
+
+    logger.info(
+        f"User {current_user.username} checked '{query.title}' for similar lyrics: {len(matches)} found"
+    )
+
+    return LyricSimilarityList(
+        indexed_songs=len(lyric_index),
+        matches=[
+            LyricMatchResponse(
+                key=match.key,
+                title=match.title,
+                similarity=match.similarity,
+                same_title=match.same_title,
+            )
+            for match in matches
+        ],
+    )
+
+
 @router.get("/songs/{song_id}", response_model=SongResponse)
 async def get_song(
     song_id: str,
@@ -220,11 +344,98 @@ async def create_song(
     await db.commit()
     await db.refresh(song)
 
+    # Keep the lyric duplicate index current as songs arrive
+    await _index_lyrics([song])
+
     logger.info(f"User {current_user.username} created song {song_id} - {song_data.title}")
 
     return SongResponse.model_validate(song)
 
 
+@router.post("/songs/bulk", response_model=SongBulkResult)
+async def bulk_upsert_songs(
+    bulk: SongBulkUpsert,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> SongBulkResult:
+    """Create or update many songs by source file path in one transaction.
+
+    Songs whose file path is already known are updated when any field
+    changed; the rest are created. With ``enqueue_suno``, created songs are
+    queued for Suno upload in the same transaction.
+    """
+    songs_by_path = {song.file_path: song for song in bulk.songs}  # last one wins
+
+    result = await db.execute(select(Song).where(Song.file_path.in_(songs_by_path)))
+    existing: dict[str, Song] = {}
+    for song in result.scalars().all():
+        existing.setdefault(song.file_path, song)
+
+    now = datetime.now(timezone.utc)
+    changed: list[Song] = []
+    created: list[Song] = []
+    actions: dict[str, str] = {}
+
+    for file_path, song_data in songs_by_path.items():
+        song = existing.get(file_path)
+        if song is None:
+            song = Song(id=str(uuid.uuid4()), file_path=file_path, status="pending")
+            for field in BULK_FIELDS:
+                setattr(song, field, getattr(song_data, field))
+            db.add(song)
+            existing[file_path] = song
+            created.append(song)
+            changed.append(song)
+            actions[file_path] = "created"
+            continue
+
+        updates = {
+            field: getattr(song_data, field)
+            for field in BULK_FIELDS
+            if getattr(song_data, field) != getattr(song, field)
+        }
+        if updates:
+            for field, value in updates.items():
+                setattr(song, field, value)
+            song.updated_at = now
+            changed.append(song)
+        actions[file_path] = "updated" if updates else "unchanged"
+
+    tasks: dict[str, TaskQueue] = {}
+    if bulk.enqueue_suno:
+        for song in created:
+            # Starts the song's pipeline: suno_upload first, plus cover art
+            pipeline_tasks = start_tasks(song.id, bulk.priority)
+            tasks[song.id] = pipeline_tasks[0]
+            song.status = "uploading"
+            db.add_all(pipeline_tasks)
+
+    await db.commit()
+
+    if changed:
+        await _index_lyrics(changed)
+
+    counts = {action: list(actions.values()).count(action) for action in ("created", "updated", "unchanged")}
+    logger.info(
+        f"User {current_user.username} bulk upserted {len(songs_by_path)} songs: "
+        f"{counts['created']} created, {counts['updated']} updated, {len(tasks)} queued for Suno"
+    )
+
+    return SongBulkResult(
+        **counts,
+        queued=len(tasks),
+        items=[
+            SongBulkItem(
+                file_path=file_path,
+                id=existing[file_path].id,
+                action=action,
+                task_id=tasks[existing[file_path].id].id if existing[file_path].id in tasks else None,
+            )
+            for file_path, action in actions.items()
+        ],
+    )
+
+
 @router.put("/songs/{song_id}", response_model=SongResponse)
 async def update_song(
     song_id: str,
@@ -399,6 +610,9 @@ async def upload_to_suno(
     await db.commit()
     await db.refresh(task)
 
+    # Start the rest of the song's pipeline (stages that need no audio)
+    await advance_pipeline(db, song_id, task.priority, start=True)
+
     logger.info(f"User {current_user.username} queued song {song_id} for Suno upload")
 
     return {
@@ -446,6 +660,60 @@ async def download_song(
     }
 
 
+@router.get("/songs/{song_id}/duplicates", response_model=SongDuplicateList)
+async def get_song_duplicates(
+    song_id: str,
+    limit: int = 5,
+    min_score: Optional[float] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> SongDuplicateList:
+    """Find songs whose audio sounds like this song.
+
+    Matches come from the landmark fingerprints stored with each audio
+    analysis, so only analyzed songs are compared.
+
+    - **limit**: Maximum number of duplicates to return
+    - **min_score**: Minimum share of aligned landmarks (default FINGERPRINT_MATCH_THRESHOLD)
+    """
+    result = await db.execute(select(Song).where(Song.id == song_id))
+    song = result.scalar_one_or_none()
+
+    if not song:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Song with ID '{song_id}' not found",
+        )
+
+    matches = await get_fingerprint_service().find_similar(
+        db, song_id, top_k=limit, min_score=min_score
+    )
+
+    match_ids = [match.song_id for match in matches if match.song_id]
+    songs_result = await db.execute(select(Song).where(Song.id.in_(match_ids)))
+    songs = {other.id: other for other in songs_result.scalars().all()}
+
+    logger.info(
+        f"User {current_user.username} checked song {song_id} for duplicates: {len(matches)} found"
+    )
+
+    return SongDuplicateList(
+        song_id=song_id,
+        duplicates=[
+            SongDuplicate(
+                song_id=match.song_id,
+                title=songs[match.song_id].title if match.song_id in songs else None,
+                status=songs[match.song_id].status if match.song_id in songs else None,
+                audio_path=match.audio_path,
+                score=match.score,
+                matched=match.matched,
+                offset_seconds=match.offset_seconds,
+            )
+            for match in matches
+        ],
+    )
+
+
 @router.get("/songs/{song_id}/video-project")
 async def get_song_video_project(
     song_id: str,
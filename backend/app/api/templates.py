@@ -12,6 +12,7 @@ from app.api.auth import get_current_user
 from app.database import get_db
 from app.models.style_template import StyleTemplate
 from app.models.user import User
+from app.services.search import TEMPLATES_INDEX, matching_rowids, search_templates
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -71,6 +72,21 @@ class TemplateList(BaseModel):
     limit: int
 
 
+class TemplateSearchHit(TemplateResponse):
+    """Schema for a template matching a full-text search."""
+    rank: float
+    highlights: dict[str, str]
+
+
+class TemplateSearchResults(BaseModel):
+    """Schema for ranked template search results."""
+    query: str
+    items: list[TemplateSearchHit]
+    total: int
+    skip: int
+    limit: int
+
+
 @router.get("/templates", response_model=TemplateList)
 async def list_templates(
     current_user: Annotated[User, Depends(get_current_user)],
@@ -92,12 +108,10 @@ async def list_templates(
     if is_featured is not None:
         query = query.where(StyleTemplate.is_featured == is_featured)
     if search:
-        search_term = f"%{search}%"
-        query = query.where(
-            (StyleTemplate.name.ilike(search_term)) |
-            (StyleTemplate.description.ilike(search_term)) |
-            (StyleTemplate.tags.ilike(search_term))
-        )
+        rowids = matching_rowids(TEMPLATES_INDEX, search)
+        if rowids is None:
+            return TemplateList(items=[], total=0, skip=skip, limit=limit)
+        query = query.where(StyleTemplate.id.in_(rowids))
 
     # Get total count
     count_query = select(func.count()).select_from(query.subquery())
@@ -117,6 +131,42 @@ async def list_templates(
     )
 
 
+@router.get("/templates/search", response_model=TemplateSearchResults)
+async def search_templates_endpoint(
+    current_user: Annotated[User, Depends(get_current_user)],
+    q: str = Query(..., min_length=1, max_length=200),
+    genre: Optional[str] = None,
+    mood: Optional[str] = None,
+    is_featured: Optional[bool] = None,
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+) -> TemplateSearchResults:
+    """Search public templates by relevance, with matched terms highlighted."""
+    total, hits = await search_templates(
+        db, q, genre=genre, mood=mood, is_featured=is_featured, skip=skip, limit=limit
+    )
+
+    templates = {}
+    if hits:
+        result = await db.execute(
+            select(StyleTemplate).where(StyleTemplate.id.in_([hit.id for hit in hits]))
+        )
+        templates = {t.id: t for t in result.scalars().all()}
+
+    items = [
+        TemplateSearchHit(
+            **TemplateResponse.model_validate(templates[hit.id]).model_dump(),
+            rank=hit.rank,
+            highlights=hit.highlights,
+        )
+        for hit in hits
+        if hit.id in templates
+    ]
+
+    return TemplateSearchResults(query=q, items=items, total=total, skip=skip, limit=limit)
+
+
 @router.get("/templates/{template_id}", response_model=TemplateResponse)
 async def get_template(
     template_id: int,
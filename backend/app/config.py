@@ -28,6 +28,7 @@ class Settings(BaseSettings):
     # File Paths
     WATCH_FOLDER: str = "./generated/songs"
     DOWNLOAD_FOLDER: str = "./downloads"
+    DOWNLOAD_CONCURRENCY: int = 4  # Parallel audio downloads
     DATA_FOLDER: str = "./data"
 
     # Suno (session-based authentication via saved browser session)
@@ -54,15 +55,31 @@ class Settings(BaseSettings):
     VIDEO_PREVIEW_DURATION: int = 30  # Seconds for preview video
     VIDEO_CACHE_PATH: str = "./data/cache/videos"
     VIDEO_OUTPUT_PATH: str = "./data/videos"
+    AUDIO_CACHE_PATH: str = "./data/cache/audio"  # AAC transcodes keyed by audio hash
+    RENDER_THREADS_PER_JOB: int = 2  # FFmpeg -threads for each render
+    RENDER_MAX_JOBS: int = 0  # Concurrent renders (0 = CPU count / threads per job)
+    LYRIC_VIDEO_SEGMENTS: int = 1  # Parallel chunks per lyric video (1 = single pass)
 
     # Workers
     WORKER_COUNT: int = 2  # Number of background workers
     WORKER_CHECK_INTERVAL: int = 60  # Seconds between task checks
     WORKER_MAX_RETRIES: int = 3
+    TASK_RETRY_BASE_DELAY: int = 30  # Seconds before the first retry, doubled per attempt
+    TASK_RETRY_MAX_DELAY: int = 3600  # Cap on the retry delay
     AUTO_UPLOAD_TO_SUNO: bool = False  # Auto-queue new songs for Suno upload
 
+    # Audio analysis
+    AUDIO_ANALYSIS_MEMORY_MB: int = 64  # Decode/feature buffer ceiling per streaming analysis
+    AUDIO_STREAMING_MIN_SECONDS: int = 600  # Stream-decode files longer than this (0 = always)
+    FINGERPRINT_MATCH_THRESHOLD: float = 0.1  # Share of aligned landmarks that flags a duplicate
+
+    # Lyric duplicate index
+    LYRIC_INDEX_PATH: str = "./data/lyric_index"  # MinHash signatures of generated songs
+    LYRIC_MATCH_THRESHOLD: float = 0.5  # Estimated Jaccard similarity that flags a near-duplicate
+
     # Evaluation
     MIN_QUALITY_SCORE: float = 70.0  # Auto-approve threshold for quality score
+    VARIATION_AUTO_SELECT_MARGIN: float = 5.0  # Score lead needed to auto-select a variation
 
     # Notifications (Discord/Slack webhooks)
     DISCORD_WEBHOOK_URL: str = ""  # Discord webhook URL for notifications
@@ -6,7 +6,8 @@ import logging
 from pathlib import Path
 from typing import AsyncGenerator, Optional
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.pool import NullPool, StaticPool
@@ -61,6 +62,34 @@ def get_session_local() -> async_sessionmaker:
 AsyncSessionLocal = None
 
 
+def _add_missing_columns(conn: Connection) -> None:
+    """Add nullable columns that exist on models but not yet in the database.
+
+    ``create_all`` only creates missing tables, so columns added to existing
+    models are appended here with ``ALTER TABLE ... ADD COLUMN``.
+    """
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+            logger.info(f"Added column {table.name}.{column.name}")
+
+
+def _add_missing_indexes(conn: Connection) -> None:
+    """Create indexes that exist on models but not yet in the database."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
 async def init_db() -> None:
     """Initialize database with all tables.
 
@@ -78,6 +107,7 @@ async def init_db() -> None:
     # Import all models to ensure they're registered with Base.metadata
     # These imports must happen before create_all is called
     from app.models import (  # noqa: F401
+        AudioAnalysis,
         Evaluation,
         Playlist,
         PlaylistSong,
@@ -90,6 +120,7 @@ async def init_db() -> None:
         VideoProject,
         YouTubeUpload,
     )
+    from app.services.search import create_search_indexes
 
     # Convert async URL to sync URL for table creation
     # sqlite+aiosqlite:///... -> sqlite:///...
@@ -117,6 +148,11 @@ async def init_db() -> None:
                 conn.execute(text("PRAGMA busy_timeout=60000"))
                 # Create all tables
                 Base.metadata.create_all(bind=conn)
+                # Add columns introduced since the tables were created
+                _add_missing_columns(conn)
+                _add_missing_indexes(conn)
+                # Full-text search indexes and their sync triggers
+                create_search_indexes(conn)
 
             # Dispose sync engine immediately after use
             sync_engine.dispose()
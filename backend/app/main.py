@@ -30,6 +30,7 @@ from app.database import init_db
 from app.middleware.security import SecurityHeadersMiddleware
 from app.services.backup import schedule_backups
 from app.services.init_admin import create_admin_user
+from app.services.render_farm import get_render_farm
 from app.services.worker import get_worker_pool
 
 settings = get_settings()
@@ -68,6 +69,10 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     await worker_pool.start()
     logger.info("Background workers started")
 
+    # Start render farm (video_generate tasks, scheduled across CPU cores)
+    render_farm = get_render_farm()
+    await render_farm.start()
+
     logger.info("Application startup complete")
 
     yield
@@ -79,6 +84,8 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     await worker_pool.stop()
     logger.info("Background workers stopped")
 
+    await render_farm.stop()
+
 
 app = FastAPI(
     title="Song Automation API",
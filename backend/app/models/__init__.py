@@ -1,5 +1,6 @@
 """SQLAlchemy models for the Song Automation system."""
 
+from app.models.audio_analysis import AudioAnalysis
 from app.models.evaluation import Evaluation
 from app.models.playlist import Playlist, PlaylistSong
 from app.models.song import Song
@@ -12,6 +13,7 @@ from app.models.video_project import VideoProject
 from app.models.youtube_upload import YouTubeUpload
 
 __all__ = [
+    "AudioAnalysis",
     "Evaluation",
     "Playlist",
     "PlaylistSong",
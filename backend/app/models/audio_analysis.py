@@ -0,0 +1,62 @@
+"""AudioAnalysis model for storing extracted audio features."""
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Float, ForeignKey, Integer, LargeBinary, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class AudioAnalysis(Base):
+    """Audio features extracted from one audio file.
+
+    Rows are keyed by file path and record the file's size and mtime, so a
+    file is only re-analyzed when it changes.
+    """
+
+    __tablename__ = "audio_analyses"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+
+    # Analyzed file
+    audio_path: Mapped[str] = mapped_column(String(500), nullable=False, unique=True, index=True)
+    file_size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    file_mtime_ns: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    # Owning song, when the file belongs to a known song or variation
+    song_id: Mapped[str | None] = mapped_column(
+        String(255), ForeignKey("songs.id", ondelete="SET NULL"), nullable=True, index=True
+    )
+
+    # Features (see app.services.audio_analyzer.AudioFeatures)
+    duration: Mapped[float] = mapped_column(Float, nullable=False)
+    tempo: Mapped[float] = mapped_column(Float, nullable=False)
+    key: Mapped[str | None] = mapped_column(String(5), nullable=True)
+    mode: Mapped[str | None] = mapped_column(String(10), nullable=True)
+    energy: Mapped[float] = mapped_column(Float, nullable=False)
+    danceability: Mapped[float] = mapped_column(Float, nullable=False)
+    spectral_centroid_mean: Mapped[float] = mapped_column(Float, nullable=False)
+    rms_mean: Mapped[float] = mapped_column(Float, nullable=False)
+    beat_times_json: Mapped[str | None] = mapped_column(Text, nullable=True)  # JSON array
+
+    # Quality metrics (see app.services.audio_analyzer.QualityMetrics)
+    clipping_ratio: Mapped[float | None] = mapped_column(Float, nullable=True)
+    silence_ratio: Mapped[float | None] = mapped_column(Float, nullable=True)
+    loudness_lufs: Mapped[float | None] = mapped_column(Float, nullable=True)
+    spectral_flatness: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+    # Landmark fingerprint (see app.services.audio_fingerprint), uint32 arrays
+    fingerprint_hashes: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    fingerprint_offsets: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    # Bumped on every fingerprint write; versions the in-memory fingerprint index
+    fingerprint_version: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    analyzed_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), onupdate=func.now()
+    )
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return f"<AudioAnalysis(id={self.id}, audio_path={self.audio_path}, tempo={self.tempo:.1f})>"
@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -26,6 +26,13 @@ class Evaluation(Base):
         String(255), ForeignKey("songs.id", ondelete="CASCADE"), nullable=False, index=True
     )
 
+    # Automated metrics
+    audio_quality_score: Mapped[float | None] = mapped_column(Float, nullable=True)  # 0-100
+    duration_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+    file_size_mb: Mapped[float | None] = mapped_column(Float, nullable=True)
+    sample_rate: Mapped[int | None] = mapped_column(Integer, nullable=True)  # Hz
+    bitrate: Mapped[int | None] = mapped_column(Integer, nullable=True)  # kbps
+
     # Evaluation data
     approved: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     rating: Mapped[int | None] = mapped_column(Integer, nullable=True)  # 1-5 stars
@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import DateTime, String, Text
+from sqlalchemy import DateTime, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -33,11 +33,14 @@ class Song(Base):
     lyrics: Mapped[str] = mapped_column(Text, nullable=False)
 
     # File path to original .md file
-    file_path: Mapped[str] = mapped_column(String(500), nullable=False)
+    file_path: Mapped[str] = mapped_column(String(500), nullable=False, index=True)
 
     # Audio file path (after download from Suno)
     audio_path: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
 
+    # Chosen SunoVariation (manual review or automatic ranking)
+    selected_variation_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)
+
     # Status tracking
     status: Mapped[str] = mapped_column(
         String(20),
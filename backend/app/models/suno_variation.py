@@ -48,6 +48,9 @@ class SunoVariation(Base):
     duration_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
     file_size_bytes: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
+    # Automatic ranking
+    quality_score: Mapped[float | None] = mapped_column(Float, nullable=True)  # 0-100
+
     # Error tracking
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
 
@@ -55,6 +58,7 @@ class SunoVariation(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     downloaded_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     selected_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    ranked_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
     # Relationships
     suno_job: Mapped["SunoJob"] = relationship("SunoJob", back_populates="variations")
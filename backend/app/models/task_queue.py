@@ -42,6 +42,9 @@ class TaskQueue(Base):
     # Result data (JSON string)
     result_json: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
+    # Per-stage timings reported by the worker (JSON string)
+    metrics_json: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
     # Error tracking
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     retry_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -52,6 +55,11 @@ class TaskQueue(Base):
     started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
 
+    # Not picked up before this time: retry backoff and scheduled publishes
+    run_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True, index=True)
+    # Requested start time as queued; unlike run_at it is not moved by retries
+    scheduled_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
     # Relationships
     song: Mapped[Optional["Song"]] = relationship("Song", back_populates="tasks")
 
@@ -56,6 +56,8 @@ class VideoProject(Base):
 
     # Lyric timing (JSON with beat-synced timing data)
     lyric_timing_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Per-word timing for karaoke highlighting (JSON, lines with nested words)
+    word_timing_json: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     # Output files
     preview_path: Mapped[str | None] = mapped_column(String(500), nullable=True)
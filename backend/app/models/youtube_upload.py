@@ -52,6 +52,7 @@ class YouTubeUpload(Base):
         Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True
     )
     uploaded_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    scheduled_time: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
     # Relationships
     song: Mapped["Song"] = relationship("Song", back_populates="youtube_uploads")
@@ -1,9 +1,9 @@
 """Pydantic schemas for task queue operations."""
 
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 class TaskQueueCreate(BaseModel):
@@ -13,6 +13,17 @@ class TaskQueueCreate(BaseModel):
     song_id: Optional[str] = None
     payload: Optional[str] = None
     priority: int = 0
+    run_at: Optional[datetime] = Field(
+        None, description="Run no earlier than this time (e.g. a scheduled YouTube publish)"
+    )
+
+    @field_validator("run_at")
+    @classmethod
+    def to_naive_utc(cls, v: Optional[datetime]) -> Optional[datetime]:
+        """Store times as naive UTC like the rest of the task timestamps."""
+        if v is not None and v.tzinfo is not None:
+            v = v.astimezone(timezone.utc).replace(tzinfo=None)
+        return v
 
 
 class TaskQueueUpdate(BaseModel):
@@ -37,9 +48,12 @@ class TaskQueueResponse(BaseModel):
     error_message: Optional[str] = None
     payload_json: Optional[str] = None
     result_json: Optional[str] = None
+    metrics_json: Optional[str] = None
     created_at: datetime
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
+    run_at: Optional[datetime] = None
+    scheduled_at: Optional[datetime] = None
 
 
 class TaskQueueListMeta(BaseModel):
@@ -70,5 +84,59 @@ class QueueStats(BaseModel):
     suno_download_count: int = 0
     youtube_upload_count: int = 0
     evaluate_count: int = 0
+    video_generate_count: int = 0
     avg_completion_time_seconds: Optional[float] = None
     oldest_pending_task_age_seconds: Optional[int] = None
+
+
+class TaskMetricsReport(BaseModel):
+    """Schema for per-stage timings reported by a worker."""
+
+    stages: dict[str, float] = Field(default_factory=dict)  # Stage name -> seconds
+    counters: dict[str, float] = Field(default_factory=dict)  # e.g. download_bytes
+    failure_reason: Optional[str] = Field(None, max_length=100)
+
+    @field_validator("stages", "counters")
+    @classmethod
+    def non_negative(cls, value: dict[str, float]) -> dict[str, float]:
+        if any(v < 0 for v in value.values()):
+            raise ValueError("Metric values must not be negative")
+        return value
+
+
+class StageSummary(BaseModel):
+    """Schema for timing statistics of one stage."""
+
+    count: int
+    mean_seconds: float
+    p50_seconds: float
+    p95_seconds: float
+    max_seconds: float
+
+
+class TaskMetricsSummary(BaseModel):
+    """Schema for stage timings aggregated across tasks."""
+
+    task_type: Optional[str] = None
+    tasks: int
+    stages: dict[str, StageSummary]
+    counters: dict[str, float]
+    failures: dict[str, int]
+
+
+class RenderBatchCreate(BaseModel):
+    """Schema for queueing video renders for a batch of songs."""
+
+    song_ids: list[str] = Field(..., min_length=1, max_length=500)
+    priority: int = 0
+    thumbnail: Optional[str] = None
+
+
+class RenderBatchResponse(BaseModel):
+    """Schema for render batch response."""
+
+    queued: int
+    task_ids: list[int]
+    missing_song_ids: list[str] = []
+    max_jobs: int
+    threads_per_job: int
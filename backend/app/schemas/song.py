@@ -95,3 +95,99 @@ class SongList(BaseModel):
 
     items: list[SongResponse]
     meta: SongListMeta
+
+
+class SongDuplicate(BaseModel):
+    """A song whose audio matches another song's audio."""
+
+    song_id: Optional[str] = None
+    title: Optional[str] = None
+    status: Optional[str] = None
+    audio_path: str
+    score: float = Field(..., description="Share of aligned fingerprint landmarks (0-1)")
+    matched: int = Field(..., description="Number of aligned landmarks")
+    offset_seconds: float
+
+
+class SongDuplicateList(BaseModel):
+    """Acoustic duplicates of a song."""
+
+    song_id: str
+    duplicates: list[SongDuplicate]
+
+
+class LyricSimilarityQuery(BaseModel):
+    """Title and lyrics to check against the lyric index."""
+
+    title: str = Field(..., min_length=1, max_length=255)
+    lyrics: str = Field(..., min_length=1)
+    limit: int = Field(5, ge=1, le=100)
+    min_similarity: Optional[float] = Field(
+        None, ge=0.0, le=1.0, description="Default LYRIC_MATCH_THRESHOLD"
+    )
+    exclude_file_path: Optional[str] = Field(None, description="Song file to leave out")
+
+
+class LyricMatchResponse(BaseModel):
+    """A generated song with similar lyrics."""
+
+    key: str = Field(..., description="<genre folder>/<file name>")
+    title: str
+    similarity: float = Field(..., description="Estimated Jaccard similarity of lyric shingles (0-1)")
+    same_title: bool
+
+
+class LyricSimilarityList(BaseModel):
+    """Nearest neighbors from the lyric index."""
+
+    indexed_songs: int
+    matches: list[LyricMatchResponse]
+
+
+class SongSearchHit(BaseModel):
+    """A song matching a full-text search."""
+
+    id: str
+    title: str
+    genre: str
+    status: str
+    rank: float = Field(..., description="bm25 relevance, lower is better")
+    highlights: dict[str, str] = Field(
+        default_factory=dict,
+        description="Matched fields with terms wrapped in <mark>; lyrics are cut to a snippet",
+    )
+
+
+class SongSearchResults(BaseModel):
+    """Ranked full-text search results."""
+
+    query: str
+    items: list[SongSearchHit]
+    meta: SongListMeta
+
+
+class SongBulkUpsert(BaseModel):
+    """Songs to create or update by file path in one request."""
+
+    songs: list[SongCreate] = Field(..., min_length=1, max_length=500)
+    enqueue_suno: bool = Field(False, description="Queue newly created songs for Suno upload")
+    priority: int = Field(0, ge=0, le=100, description="Priority of queued Suno tasks")
+
+
+class SongBulkItem(BaseModel):
+    """Outcome for one song of a bulk upsert."""
+
+    file_path: str
+    id: str
+    action: str = Field(..., description="created, updated or unchanged")
+    task_id: Optional[int] = None
+
+
+class SongBulkResult(BaseModel):
+    """Bulk upsert summary."""
+
+    created: int
+    updated: int
+    unchanged: int
+    queued: int
+    items: list[SongBulkItem]
@@ -1,9 +1,11 @@
 """Audio analysis service for extracting features from audio files.
 
 Uses librosa for audio analysis including beat detection, tempo estimation,
-key detection, and other musical features.
+key detection, and other musical features. Long files are analyzed in
+streaming mode, which decodes fixed-size blocks and needs no librosa.
 """
 
+import asyncio
 import logging
 from dataclasses import dataclass
 from pathlib import Path
@@ -11,7 +13,19 @@ from typing import Optional
 
 import numpy as np
 
+from app.config import get_settings
+from app.services.audio_fingerprint import Fingerprint, fingerprint_chroma
+from app.services.audio_stream import (
+    StreamedFeatures,
+    StreamingFeatureExtractor,
+    estimate_tempo,
+    stream_features,
+    track_beats,
+)
+from app.services.media_metadata import get_media_metadata_service
+
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 # Lazy import librosa to avoid startup overhead
 _librosa = None
@@ -44,82 +58,268 @@ class AudioFeatures:
     rms_mean: float  # Average loudness
 
 
+@dataclass
+class QualityMetrics:
+    """Technical quality indicators for an audio file."""
+    clipping_ratio: float  # Fraction of samples at full scale
+    silence_ratio: float  # Fraction of frames below -50 dBFS
+    loudness_lufs: float  # Gated loudness estimate
+    spectral_flatness: float  # 0 (tonal) to 1 (noise-like)
+
+
 class AudioAnalyzer:
     """Analyzes audio files to extract musical features."""
 
-    def __init__(self, sample_rate: int = 22050):
+    def __init__(self, sample_rate: int = 22050, memory_limit_mb: Optional[int] = None):
         """Initialize analyzer with sample rate.
 
         Args:
             sample_rate: Sample rate for audio loading. Default 22050 for librosa.
+            memory_limit_mb: Buffer ceiling for streaming analysis
+                (defaults to settings.AUDIO_ANALYSIS_MEMORY_MB)
         """
         self.sample_rate = sample_rate
+        self.memory_limit_mb = memory_limit_mb or settings.AUDIO_ANALYSIS_MEMORY_MB
         self._key_names = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
 
-    async def analyze(self, audio_path: Path) -> Optional[AudioFeatures]:
+    def should_stream(self, audio_path: Path) -> bool:
+        """Decide whether a file is long enough to analyze in streaming mode.
+
+        Args:
+            audio_path: Path to the audio file.
+
+        Returns:
+            True if the file is longer than settings.AUDIO_STREAMING_MIN_SECONDS
+        """
+        if settings.AUDIO_STREAMING_MIN_SECONDS <= 0:
+            return True
+
+        metadata = get_media_metadata_service().probe(audio_path)
+        return metadata is not None and metadata.duration > settings.AUDIO_STREAMING_MIN_SECONDS
+
+    async def analyze(
+        self,
+        audio_path: Path,
+        streaming: Optional[bool] = None
+    ) -> Optional[AudioFeatures]:
         """Analyze an audio file and extract features.
 
         Args:
             audio_path: Path to the audio file.
+            streaming: Force streaming (True) or full-load (False) analysis.
+                By default long files are streamed.
 
         Returns:
             AudioFeatures object with extracted features, or None if analysis fails.
         """
+        if streaming is None:
+            streaming = await asyncio.to_thread(self.should_stream, audio_path)
+
         librosa = _get_librosa()
-        if librosa is None:
-            logger.error("librosa not available for audio analysis")
-            return None
+        if librosa is None and not streaming:
+            logger.warning("librosa not available, using streaming analysis")
+            streaming = True
+
+        if streaming:
+            return await asyncio.to_thread(self.analyze_streaming, audio_path)
 
         try:
             logger.info(f"Analyzing audio: {audio_path}")
 
             # Load audio
             y, sr = librosa.load(str(audio_path), sr=self.sample_rate)
-            duration = len(y) / sr
-
-            # Beat detection
-            tempo, beats = librosa.beat.beat_track(y=y, sr=sr)
-            beat_times = librosa.frames_to_time(beats, sr=sr).tolist()
-
-            # Key detection using chromagram
-            key, mode = self._detect_key(y, sr, librosa)
-
-            # Energy analysis
-            rms = librosa.feature.rms(y=y)[0]
-            rms_mean = float(np.mean(rms))
-            energy = min(1.0, rms_mean * 10)  # Normalize to 0-1
-
-            # Spectral analysis for brightness
-            spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
-            spectral_centroid_mean = float(np.mean(spectral_centroid))
-
-            # Danceability (simplified: based on beat strength and tempo)
-            onset_env = librosa.onset.onset_strength(y=y, sr=sr)
-            danceability = self._calculate_danceability(tempo, onset_env)
-
-            features = AudioFeatures(
-                duration=duration,
-                tempo=float(tempo),
-                beat_times=beat_times,
-                key=key,
-                mode=mode,
-                energy=energy,
-                danceability=danceability,
-                spectral_centroid_mean=spectral_centroid_mean,
-                rms_mean=rms_mean
-            )
+            return self._features_from_samples(y, sr, librosa)
 
-            logger.info(
-                f"Audio analysis complete: {duration:.1f}s, {tempo:.0f}BPM, "
-                f"key={key} {mode}, energy={energy:.2f}"
-            )
+        except Exception as e:
+            logger.error(f"Audio analysis failed for {audio_path}: {e}", exc_info=True)
+            return None
+
+    def _features_from_samples(self, y: np.ndarray, sr: int, librosa) -> AudioFeatures:
+        """Extract features from loaded samples with librosa's beat tracker.
+
+        Args:
+            y: Mono samples
+            sr: Sample rate of the samples
+            librosa: librosa module
+
+        Returns:
+            AudioFeatures for the samples
+        """
+        duration = len(y) / sr
+
+        # Beat detection
+        tempo, beats = librosa.beat.beat_track(y=y, sr=sr)
+        beat_times = librosa.frames_to_time(beats, sr=sr).tolist()
+
+        # Key detection using chromagram
+        key, mode = self._detect_key(y, sr, librosa)
+
+        # Energy analysis
+        rms = librosa.feature.rms(y=y)[0]
+        rms_mean = float(np.mean(rms))
+        energy = min(1.0, rms_mean * 10)  # Normalize to 0-1
+
+        # Spectral analysis for brightness
+        spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
+        spectral_centroid_mean = float(np.mean(spectral_centroid))
+
+        # Danceability (simplified: based on beat strength and tempo)
+        onset_env = librosa.onset.onset_strength(y=y, sr=sr)
+        danceability = self._calculate_danceability(tempo, onset_env)
+
+        features = AudioFeatures(
+            duration=duration,
+            tempo=float(tempo),
+            beat_times=beat_times,
+            key=key,
+            mode=mode,
+            energy=energy,
+            danceability=danceability,
+            spectral_centroid_mean=spectral_centroid_mean,
+            rms_mean=rms_mean
+        )
+
+        logger.info(
+            f"Audio analysis complete: {duration:.1f}s, {tempo:.0f}BPM, "
+            f"key={key} {mode}, energy={energy:.2f}"
+        )
+
+        return features
+
+    def analyze_streaming(self, audio_path: Path) -> Optional[AudioFeatures]:
+        """Analyze an audio file block by block with bounded memory.
+
+        Args:
+            audio_path: Path to the audio file.
+
+        Returns:
+            AudioFeatures object with extracted features, or None if analysis fails.
+
+        Notes:
+            - Memory is capped by self.memory_limit_mb regardless of file length
+            - Tempo comes from onset autocorrelation and beats from a
+              constant-tempo grid, which is coarser than librosa's tracker
+        """
+        try:
+            logger.info(f"Analyzing audio (streaming): {audio_path}")
 
-            return features
+            streamed = stream_features(audio_path, self.sample_rate, self.memory_limit_mb)
+            return self._features_from_stream(streamed)
 
         except Exception as e:
-            logger.error(f"Audio analysis failed for {audio_path}: {e}", exc_info=True)
+            logger.error(f"Streaming audio analysis failed for {audio_path}: {e}", exc_info=True)
             return None
 
+    def analyze_with_quality(
+        self,
+        audio_path: Path,
+        streaming: Optional[bool] = None
+    ) -> tuple[AudioFeatures, QualityMetrics, Fingerprint]:
+        """Extract features, quality metrics and a fingerprint in one decode.
+
+        Files up to settings.AUDIO_STREAMING_MIN_SECONDS are loaded whole and
+        get librosa's beat tracker; the quality metrics and fingerprint are
+        computed from the same samples. Longer files, or all files without
+        librosa, are analyzed in one streamed pass.
+
+        Runs synchronously; call it from a worker thread.
+
+        Args:
+            audio_path: Path to the audio file.
+            streaming: Force streaming (True) or full-load (False) analysis.
+                By default long files are streamed.
+
+        Returns:
+            Tuple of (AudioFeatures, QualityMetrics, Fingerprint)
+
+        Raises:
+            FileNotFoundError: If the audio file does not exist
+            ValueError: If the file cannot be decoded
+        """
+        if streaming is None:
+            streaming = self.should_stream(audio_path)
+        librosa = _get_librosa()
+
+        if streaming or librosa is None:
+            streamed = stream_features(
+                audio_path, self.sample_rate, self.memory_limit_mb, keep_frame_chroma=True
+            )
+            features = self._features_from_stream(streamed)
+        else:
+            if not audio_path.exists():
+                raise FileNotFoundError(f"Audio file not found: {audio_path}")
+            try:
+                y, sr = librosa.load(str(audio_path), sr=self.sample_rate)
+            except Exception as e:
+                raise ValueError(f"Cannot decode {audio_path}: {e}") from e
+
+            extractor = StreamingFeatureExtractor(sr, keep_frame_chroma=True)
+            extractor.update(y.astype(np.float32, copy=False))
+            streamed = extractor.finish()
+            features = self._features_from_samples(y, sr, librosa)
+
+        metrics = QualityMetrics(
+            clipping_ratio=streamed.clipping_ratio,
+            silence_ratio=streamed.silence_ratio,
+            loudness_lufs=streamed.loudness_lufs,
+            spectral_flatness=streamed.spectral_flatness,
+        )
+        frame_chroma = streamed.frame_chroma if streamed.frame_chroma is not None else np.zeros((12, 0))
+        fingerprint = fingerprint_chroma(frame_chroma)
+        return features, metrics, fingerprint
+
+    def _features_from_stream(self, streamed: StreamedFeatures) -> AudioFeatures:
+        """Build AudioFeatures from streamed frame features.
+
+        Args:
+            streamed: Features collected by the streaming extractor
+
+        Returns:
+            AudioFeatures for the file
+        """
+        tempo = estimate_tempo(streamed.onset_env, streamed.sample_rate)
+        beats = track_beats(streamed.onset_env, tempo, streamed.sample_rate)
+        key, mode = self._key_from_chroma(streamed.chroma_mean)
+
+        return AudioFeatures(
+            duration=streamed.duration,
+            tempo=tempo,
+            beat_times=streamed.frames_to_time(beats).tolist(),
+            key=key,
+            mode=mode,
+            energy=min(1.0, streamed.rms_mean * 10),  # Normalize to 0-1
+            danceability=self._calculate_danceability(tempo, streamed.onset_env),
+            spectral_centroid_mean=streamed.spectral_centroid_mean,
+            rms_mean=streamed.rms_mean
+        )
+
+    def _key_from_chroma(self, chroma_mean: np.ndarray) -> tuple[Optional[str], Optional[str]]:
+        """Pick key and mode from mean chroma energy.
+
+        Args:
+            chroma_mean: Mean energy per pitch class (12)
+
+        Returns:
+            Tuple of (key_name, mode) e.g. ('C', 'Major')
+        """
+        if not np.any(chroma_mean):
+            return None, None
+
+        # Find dominant pitch class
+        key_idx = int(np.argmax(chroma_mean))
+        key_name = self._key_names[key_idx]
+
+        # Simple major/minor detection based on third interval
+        third_major = (key_idx + 4) % 12
+        third_minor = (key_idx + 3) % 12
+
+        if chroma_mean[third_major] > chroma_mean[third_minor]:
+            mode = "Major"
+        else:
+            mode = "Minor"
+
+        return key_name, mode
+
     def _detect_key(self, y: np.ndarray, sr: int, librosa) -> tuple[Optional[str], Optional[str]]:
         """Detect musical key using chromagram analysis.
 
@@ -134,22 +334,7 @@ class AudioAnalyzer:
         try:
             # Compute chromagram
             chroma = librosa.feature.chroma_cqt(y=y, sr=sr)
-            chroma_mean = np.mean(chroma, axis=1)
-
-            # Find dominant pitch class
-            key_idx = int(np.argmax(chroma_mean))
-            key_name = self._key_names[key_idx]
-
-            # Simple major/minor detection based on third interval
-            third_major = (key_idx + 4) % 12
-            third_minor = (key_idx + 3) % 12
-
-            if chroma_mean[third_major] > chroma_mean[third_minor]:
-                mode = "Major"
-            else:
-                mode = "Minor"
-
-            return key_name, mode
+            return self._key_from_chroma(np.mean(chroma, axis=1))
 
         except Exception as e:
             logger.warning(f"Key detection failed: {e}")
@@ -0,0 +1,377 @@
+"""Chroma landmark fingerprints for acoustic duplicate detection.
+
+A fingerprint is a set of landmark hashes. Per-frame chroma is pooled to about
+ten frames per second and reduced to a 12-bit word (the pitch classes near the
+frame's maximum). Every point where the word changes is an anchor, and each
+anchor is paired with the next few anchors: the two words and their distance
+are packed into one 30-bit hash, stored with the anchor's frame offset.
+
+Two recordings of the same audio share many hashes at a constant offset
+difference, so a match is a peak in the histogram of offset differences.
+The index keeps every posting in flat sorted numpy arrays, so a lookup is a
+pair of binary searches per query hash.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.audio_analysis import AudioAnalysis
+from app.services.audio_stream import HOP_LENGTH
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+POOL_FRAMES = 4  # Analysis frames averaged into one fingerprint frame
+WORD_THRESHOLD = 0.6  # Pitch classes at or above this share of the frame maximum
+SILENT_FRAME_RATIO = 0.01  # Frames quieter than this share of the median are skipped
+FAN_OUT = 3  # Targets paired with each anchor
+MAX_DELTA = 63  # Longest anchor-target distance in fingerprint frames (6 bits)
+MAX_POSTINGS = 2000  # Hashes shared by more postings carry no information
+OFFSET_BIN = 2  # Offset differences are compared in bins of this many frames
+
+FINGERPRINT_DTYPE = np.dtype("<u4")
+
+
+@dataclass
+class Fingerprint:
+    """Landmark hashes and their anchor offsets (fingerprint frames)."""
+
+    hashes: np.ndarray  # uint32
+    offsets: np.ndarray  # uint32
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def to_bytes(self) -> tuple[bytes, bytes]:
+        """Serialize to compact little-endian uint32 arrays."""
+        return (
+            self.hashes.astype(FINGERPRINT_DTYPE).tobytes(),
+            self.offsets.astype(FINGERPRINT_DTYPE).tobytes(),
+        )
+
+    @classmethod
+    def from_bytes(cls, hashes: bytes, offsets: bytes) -> "Fingerprint":
+        """Deserialize arrays written by to_bytes()."""
+        return cls(
+            hashes=np.frombuffer(hashes, dtype=FINGERPRINT_DTYPE),
+            offsets=np.frombuffer(offsets, dtype=FINGERPRINT_DTYPE),
+        )
+
+
+@dataclass
+class FingerprintMatch:
+    """An indexed recording that shares aligned landmarks with a query."""
+
+    audio_path: str
+    song_id: Optional[str]
+    matched: int  # Landmarks aligned at the best offset
+    score: float  # matched / query landmarks, 0-1
+    offset_seconds: float  # Position of the query within the match
+
+
+def store_fingerprint(analysis: AudioAnalysis, hashes: bytes, offsets: bytes) -> None:
+    """Write a serialized fingerprint to an analysis row and bump its version.
+
+    Args:
+        analysis: Row to update
+        hashes: Serialized landmark hashes
+        offsets: Serialized anchor offsets
+    """
+    analysis.fingerprint_hashes = hashes
+    analysis.fingerprint_offsets = offsets
+    analysis.fingerprint_version = (analysis.fingerprint_version or 0) + 1
+
+
+def fingerprint_seconds(frames: int, sample_rate: int) -> float:
+    """Convert fingerprint frames to seconds."""
+    return frames * POOL_FRAMES * HOP_LENGTH / sample_rate
+
+
+def fingerprint_chroma(frame_chroma: np.ndarray) -> Fingerprint:
+    """Compute landmark hashes from per-frame chroma.
+
+    Args:
+        frame_chroma: 12 x frames chroma energy
+
+    Returns:
+        Fingerprint with one hash per anchor-target pair
+    """
+    n_pooled = frame_chroma.shape[1] // POOL_FRAMES
+    empty = Fingerprint(np.zeros(0, FINGERPRINT_DTYPE), np.zeros(0, FINGERPRINT_DTYPE))
+    if n_pooled < 2:
+        return empty
+
+    pooled = frame_chroma[:, :n_pooled * POOL_FRAMES].reshape(12, n_pooled, POOL_FRAMES).mean(axis=2)
+    peak = pooled.max(axis=0)
+    audible = peak > SILENT_FRAME_RATIO * max(float(np.median(peak)), 1e-12)
+
+    bits = pooled >= WORD_THRESHOLD * np.maximum(peak, 1e-12)
+    words = (bits * (1 << np.arange(12))[:, None]).sum(axis=0).astype(np.int64)
+
+    # Anchors: audible frames whose word differs from the previous frame
+    changed = np.concatenate(([True], words[1:] != words[:-1]))
+    anchors = np.flatnonzero(changed & audible)
+    if len(anchors) < 2:
+        return empty
+
+    hashes, offsets = [], []
+    for step in range(1, FAN_OUT + 1):
+        source, target = anchors[:-step], anchors[step:]
+        delta = target - source
+        keep = delta <= MAX_DELTA
+        hashes.append((words[source[keep]] << 18) | (words[target[keep]] << 6) | delta[keep])
+        offsets.append(source[keep])
+
+    pairs = np.unique(np.stack((np.concatenate(hashes), np.concatenate(offsets))), axis=1)
+    return Fingerprint(
+        hashes=pairs[0].astype(FINGERPRINT_DTYPE),
+        offsets=pairs[1].astype(FINGERPRINT_DTYPE),
+    )
+
+
+class FingerprintIndex:
+    """Inverted index from landmark hash to (recording, offset) postings.
+
+    Postings are kept as three parallel arrays sorted by hash, so the
+    postings of a hash are a contiguous slice found by binary search.
+    """
+
+    def __init__(self, entries: Iterable[tuple[str, Optional[str], Fingerprint]] = ()):
+        """Build the index.
+
+        Args:
+            entries: (audio_path, song_id, fingerprint) per recording
+        """
+        self.audio_paths: list[str] = []
+        self.song_ids: list[Optional[str]] = []
+        hashes, offsets, ids = [], [], []
+
+        for audio_path, song_id, fingerprint in entries:
+            if len(fingerprint) == 0:
+                continue
+            ids.append(np.full(len(fingerprint), len(self.audio_paths), dtype=np.int64))
+            hashes.append(fingerprint.hashes)
+            offsets.append(fingerprint.offsets)
+            self.audio_paths.append(audio_path)
+            self.song_ids.append(song_id)
+
+        if hashes:
+            all_hashes = np.concatenate(hashes)
+            order = np.argsort(all_hashes, kind="stable")
+            self._hashes = all_hashes[order]
+            self._offsets = np.concatenate(offsets).astype(np.int64)[order]
+            self._ids = np.concatenate(ids)[order]
+        else:
+            self._hashes = np.zeros(0, FINGERPRINT_DTYPE)
+            self._offsets = np.zeros(0, np.int64)
+            self._ids = np.zeros(0, np.int64)
+
+    def __len__(self) -> int:
+        return len(self.audio_paths)
+
+    @property
+    def posting_count(self) -> int:
+        """Total number of indexed landmarks."""
+        return len(self._hashes)
+
+    def query(
+        self,
+        fingerprint: Fingerprint,
+        top_k: int = 5,
+        min_matched: int = 10,
+        sample_rate: int = 22050,
+        exclude_paths: Iterable[str] = (),
+    ) -> list[FingerprintMatch]:
+        """Find indexed recordings that share aligned landmarks with a fingerprint.
+
+        Args:
+            fingerprint: Query fingerprint
+            top_k: Maximum number of matches
+            min_matched: Minimum aligned landmarks for a match
+            sample_rate: Analysis sample rate, for offset_seconds
+            exclude_paths: Recordings to leave out (e.g. the query itself)
+
+        Returns:
+            Matches, best first
+        """
+        if len(fingerprint) == 0 or self.posting_count == 0:
+            return []
+
+        query_hashes = fingerprint.hashes.astype(FINGERPRINT_DTYPE)
+        lo = np.searchsorted(self._hashes, query_hashes, side="left")
+        hi = np.searchsorted(self._hashes, query_hashes, side="right")
+        counts = hi - lo
+        counts[counts > MAX_POSTINGS] = 0
+
+        total = int(counts.sum())
+        if total == 0:
+            return []
+
+        # Expand every query hash into the positions of its postings
+        starts = np.repeat(lo, counts)
+        within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        postings = starts + within
+
+        ids = self._ids[postings]
+        delta = (self._offsets[postings] - np.repeat(fingerprint.offsets.astype(np.int64), counts)) // OFFSET_BIN
+
+        # Count landmarks per (recording, offset bin); keep each recording's best bin
+        keys, matched = np.unique((ids << 32) + (delta + (1 << 31)), return_counts=True)
+        key_ids = keys >> 32
+        order = np.lexsort((-matched, key_ids))
+        first = np.concatenate(([True], key_ids[order][1:] != key_ids[order][:-1]))
+        best = order[first]
+
+        excluded = set(exclude_paths)
+        matches = []
+        for i in best[np.argsort(-matched[best], kind="stable")]:
+            if matched[i] < min_matched:
+                break
+            audio_path = self.audio_paths[key_ids[i]]
+            if audio_path in excluded:
+                continue
+            offset_frames = int((keys[i] & 0xFFFFFFFF) - (1 << 31)) * OFFSET_BIN
+            matches.append(FingerprintMatch(
+                audio_path=audio_path,
+                song_id=self.song_ids[key_ids[i]],
+                matched=int(matched[i]),
+                score=round(float(matched[i]) / len(fingerprint), 3),
+                offset_seconds=round(fingerprint_seconds(offset_frames, sample_rate), 2),
+            ))
+            if len(matches) >= top_k:
+                break
+
+        return matches
+
+
+class FingerprintService:
+    """Answers "which songs sound like this one" from stored fingerprints.
+
+    The index is built from the audio_analyses table and rebuilt only when
+    the stored fingerprints change: rows are added or removed (count and
+    max id) or rewritten (sum of the per-row ``fingerprint_version``).
+    """
+
+    def __init__(self, sample_rate: int = 22050):
+        """Initialize the fingerprint service.
+
+        Args:
+            sample_rate: Sample rate the fingerprints were computed at
+        """
+        self.sample_rate = sample_rate
+        self._index: Optional[FingerprintIndex] = None
+        self._index_version: Optional[tuple] = None
+
+    async def get_index(self, db: AsyncSession) -> FingerprintIndex:
+        """Get the fingerprint index, rebuilding it if stored fingerprints changed.
+
+        Args:
+            db: Database session
+
+        Returns:
+            FingerprintIndex over every stored fingerprint
+        """
+        has_fingerprint = AudioAnalysis.fingerprint_hashes.isnot(None)
+        version = tuple((await db.execute(
+            select(
+                func.count(AudioAnalysis.id),
+                func.max(AudioAnalysis.id),
+                func.coalesce(func.sum(AudioAnalysis.fingerprint_version), 0),
+            )
+            .where(has_fingerprint)
+        )).one())
+
+        if self._index is None or version != self._index_version:
+            result = await db.execute(
+                select(
+                    AudioAnalysis.audio_path,
+                    AudioAnalysis.song_id,
+                    AudioAnalysis.fingerprint_hashes,
+                    AudioAnalysis.fingerprint_offsets,
+                ).where(has_fingerprint)
+            )
+            self._index = FingerprintIndex(
+                (audio_path, song_id, Fingerprint.from_bytes(hashes, offsets))
+                for audio_path, song_id, hashes, offsets in result.all()
+            )
+            self._index_version = version
+            logger.info(
+                f"Built fingerprint index: {len(self._index)} recordings, "
+                f"{self._index.posting_count} landmarks"
+            )
+
+        return self._index
+
+    async def find_similar(
+        self,
+        db: AsyncSession,
+        song_id: str,
+        top_k: int = 5,
+        min_score: Optional[float] = None,
+    ) -> list[FingerprintMatch]:
+        """Find other songs whose audio matches any recording of a song.
+
+        Args:
+            db: Database session
+            song_id: Song to check
+            top_k: Maximum number of songs to return
+            min_score: Minimum match score (defaults to
+                settings.FINGERPRINT_MATCH_THRESHOLD)
+
+        Returns:
+            Best match per other song, best first
+        """
+        min_score = settings.FINGERPRINT_MATCH_THRESHOLD if min_score is None else min_score
+        index = await self.get_index(db)
+
+        result = await db.execute(
+            select(
+                AudioAnalysis.audio_path,
+                AudioAnalysis.fingerprint_hashes,
+                AudioAnalysis.fingerprint_offsets,
+            ).where(
+                AudioAnalysis.song_id == song_id,
+                AudioAnalysis.fingerprint_hashes.isnot(None),
+            )
+        )
+        own = result.all()
+        own_paths = [audio_path for audio_path, _, _ in own]
+
+        best: dict[str, FingerprintMatch] = {}
+        for _, hashes, offsets in own:
+            fingerprint = Fingerprint.from_bytes(hashes, offsets)
+            for match in index.query(
+                fingerprint,
+                top_k=top_k + len(own_paths),
+                sample_rate=self.sample_rate,
+                exclude_paths=own_paths,
+            ):
+                key = match.song_id or match.audio_path
+                if match.song_id == song_id or match.score < min_score:
+                    continue
+                if key not in best or match.score > best[key].score:
+                    best[key] = match
+
+        return sorted(best.values(), key=lambda m: m.score, reverse=True)[:top_k]
+
+
+# Global instance
+_fingerprint_service: Optional[FingerprintService] = None
+
+
+def get_fingerprint_service() -> FingerprintService:
+    """Get the global fingerprint service instance.
+
+    Returns:
+        The singleton FingerprintService instance
+    """
+    global _fingerprint_service
+    if _fingerprint_service is None:
+        _fingerprint_service = FingerprintService()
+    return _fingerprint_service
@@ -0,0 +1,421 @@
+"""Block-wise audio decoding and incremental feature extraction.
+
+Audio is decoded by an FFmpeg pipe into fixed-size blocks of mono float32
+samples, and frame features (RMS, spectral centroid, onset strength, chroma,
+loudness and quality indicators) are computed block by block. Only per-frame
+summaries are kept, so memory use is bounded by the block size instead of the
+file length and several workers can analyze long mixes side by side.
+"""
+
+import logging
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FRAME_LENGTH = 2048
+HOP_LENGTH = 512
+
+# Samples at or above this magnitude count as clipped
+CLIP_LEVEL = 0.99
+# Frames quieter than -50 dBFS RMS count as silence
+SILENCE_RMS = 10 ** (-50 / 20)
+# BS.1770 absolute and relative loudness gates
+ABSOLUTE_GATE_LUFS = -70.0
+RELATIVE_GATE_LU = 10.0
+
+# Rough working set per decoded sample: raw samples, windowed frames
+# (4x overlap) and their complex spectra
+BYTES_PER_SAMPLE_ESTIMATE = 64
+
+
+@dataclass
+class StreamedFeatures:
+    """Frame features collected from a streamed decode."""
+
+    duration: float  # Seconds
+    sample_rate: int
+    rms_mean: float
+    spectral_centroid_mean: float
+    onset_env: np.ndarray  # Onset strength per frame
+    chroma_mean: np.ndarray  # Mean energy per pitch class (12)
+    frame_chroma: Optional[np.ndarray] = None  # 12 x frames, if requested
+    clipping_ratio: float = 0.0  # Fraction of samples at full scale
+    silence_ratio: float = 0.0  # Fraction of frames below -50 dBFS
+    loudness_lufs: float = ABSOLUTE_GATE_LUFS  # Gated loudness estimate (mono downmix)
+    spectral_flatness: float = 0.0  # Mean flatness of non-silent frames (1 = noise)
+
+    def frames_to_time(self, frames: np.ndarray) -> np.ndarray:
+        """Convert frame indices to seconds."""
+        return np.asarray(frames) * HOP_LENGTH / self.sample_rate
+
+
+def block_samples_for_limit(memory_limit_mb: int) -> int:
+    """Get the decode block size that keeps buffers under a memory ceiling.
+
+    Args:
+        memory_limit_mb: Memory ceiling for one analysis in megabytes
+
+    Returns:
+        Block size in samples (a whole number of hops, at least a few frames)
+    """
+    samples = memory_limit_mb * 1024 * 1024 // BYTES_PER_SAMPLE_ESTIMATE
+    samples -= samples % HOP_LENGTH
+    return max(FRAME_LENGTH * 4, samples)
+
+
+def k_weighting(freqs: np.ndarray) -> np.ndarray:
+    """Approximate the BS.1770 K-weighting power response.
+
+    Args:
+        freqs: Frequencies in Hz
+
+    Returns:
+        Power gain per frequency (high-pass near 38 Hz, +4 dB shelf above ~1.7 kHz)
+    """
+    high_pass = freqs ** 4 / (freqs ** 4 + 38.0 ** 4)
+    shelf_db = 4.0 / (1.0 + (1700.0 / np.maximum(freqs, 1.0)) ** 2)
+    return high_pass * 10 ** (shelf_db / 10)
+
+
+def gated_loudness(mean_squares: np.ndarray) -> float:
+    """Integrate K-weighted frame power into a gated loudness value.
+
+    Args:
+        mean_squares: K-weighted mean square per frame
+
+    Returns:
+        Loudness in LUFS (ABSOLUTE_GATE_LUFS when everything is gated out)
+    """
+    loudness = -0.691 + 10 * np.log10(np.maximum(mean_squares, 1e-12))
+    kept = mean_squares[loudness > ABSOLUTE_GATE_LUFS]
+    if len(kept) == 0:
+        return ABSOLUTE_GATE_LUFS
+
+    relative_gate = -0.691 + 10 * np.log10(kept.mean()) - RELATIVE_GATE_LU
+    kept = mean_squares[loudness > max(ABSOLUTE_GATE_LUFS, relative_gate)]
+    return float(-0.691 + 10 * np.log10(kept.mean()))
+
+
+def iter_audio_blocks(
+    audio_path: Path,
+    sample_rate: int,
+    block_samples: int
+) -> Iterator[np.ndarray]:
+    """Decode an audio file into mono float32 blocks with FFmpeg.
+
+    Args:
+        audio_path: Path to the audio file
+        sample_rate: Output sample rate
+        block_samples: Samples per block (the last block may be shorter)
+
+    Yields:
+        Blocks of mono float32 samples
+
+    Raises:
+        FileNotFoundError: If the audio file does not exist
+        ValueError: If FFmpeg fails to decode the file
+    """
+    if not audio_path.exists():
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+    cmd = [
+        'ffmpeg',
+        '-v', 'error',
+        '-i', str(audio_path),
+        '-f', 'f32le',
+        '-ac', '1',
+        '-ar', str(sample_rate),
+        'pipe:1'
+    ]
+    block_bytes = block_samples * 4
+
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        while True:
+            data = process.stdout.read(block_bytes)
+            if not data:
+                break
+            yield np.frombuffer(data[:len(data) - len(data) % 4], dtype=np.float32)
+
+        stderr = process.stderr.read().decode(errors="replace")
+        if process.wait() != 0:
+            raise ValueError(f"FFmpeg failed to decode {audio_path}: {stderr.strip()}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+
+class StreamingFeatureExtractor:
+    """Computes frame features incrementally from consecutive audio blocks.
+
+    Frames are centered like librosa's defaults: the signal is padded by half
+    a frame at both ends, and samples that do not fill a whole hop yet are
+    carried over to the next block.
+    """
+
+    def __init__(self, sample_rate: int, keep_frame_chroma: bool = False):
+        """Initialize the extractor.
+
+        Args:
+            sample_rate: Sample rate of the incoming blocks
+            keep_frame_chroma: Keep per-frame chroma (12 floats per frame) for
+                beat-synchronous features
+        """
+        self.sample_rate = sample_rate
+        self.keep_frame_chroma = keep_frame_chroma
+
+        self._window = np.hanning(FRAME_LENGTH + 1)[:-1].astype(np.float32)
+        self._freqs = np.fft.rfftfreq(FRAME_LENGTH, 1.0 / sample_rate)
+        self._chroma_map = self._build_chroma_map()
+        self._k_weights = k_weighting(self._freqs)
+
+        self._carry = np.zeros(FRAME_LENGTH // 2, dtype=np.float32)
+        self._prev_log_mag: Optional[np.ndarray] = None
+        self._samples = 0
+        self._frames = 0
+        self._rms_sum = 0.0
+        self._centroid_sum = 0.0
+        self._chroma_sum = np.zeros(12)
+        self._onset_env: list[np.ndarray] = []
+        self._frame_chroma: list[np.ndarray] = []
+        self._k_mean_squares: list[np.ndarray] = []
+        self._clipped = 0
+        self._silent_frames = 0
+        self._flatness_sum = 0.0
+
+    def _build_chroma_map(self) -> np.ndarray:
+        """Map FFT bins between A1 and ~5 kHz onto the 12 pitch classes."""
+        chroma_map = np.zeros((12, len(self._freqs)), dtype=np.float32)
+        audible = (self._freqs >= 55.0) & (self._freqs <= 5000.0)
+        midi = 69 + 12 * np.log2(self._freqs[audible] / 440.0)
+        chroma_map[np.round(midi).astype(int) % 12, np.flatnonzero(audible)] = 1.0
+        return chroma_map
+
+    def update(self, block: np.ndarray) -> None:
+        """Consume the next block of samples.
+
+        Args:
+            block: Mono float32 samples following the previous block
+        """
+        self._samples += len(block)
+        self._clipped += int(np.count_nonzero(np.abs(block) >= CLIP_LEVEL))
+        samples = np.concatenate((self._carry, block))
+        if len(samples) < FRAME_LENGTH:
+            self._carry = samples
+            return
+
+        n_frames = (len(samples) - FRAME_LENGTH) // HOP_LENGTH + 1
+        frames = np.lib.stride_tricks.sliding_window_view(samples, FRAME_LENGTH)[::HOP_LENGTH][:n_frames]
+        self._carry = samples[n_frames * HOP_LENGTH:]
+        self._process_frames(frames)
+
+    def _process_frames(self, frames: np.ndarray) -> None:
+        """Accumulate features for a batch of frames."""
+        rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+        magnitude = np.abs(np.fft.rfft(frames * self._window, axis=1))
+
+        total = magnitude.sum(axis=1)
+        centroid = np.where(total > 0, magnitude @ self._freqs / np.maximum(total, 1e-10), 0.0)
+
+        # Onset strength: mean positive change of log magnitude between frames
+        log_mag = np.log1p(100.0 * magnitude)
+        previous = self._prev_log_mag if self._prev_log_mag is not None else log_mag[:1]
+        flux = np.diff(np.vstack((previous, log_mag)), axis=0)
+        self._onset_env.append(np.maximum(flux, 0.0).mean(axis=1).astype(np.float32))
+        self._prev_log_mag = log_mag[-1:]
+
+        power = magnitude ** 2
+        power_total = power.sum(axis=1)
+
+        # K-weighted loudness: scale frame power by the weighted share of its spectrum
+        weighted_share = np.where(
+            power_total > 0, power @ self._k_weights / np.maximum(power_total, 1e-20), 0.0
+        )
+        self._k_mean_squares.append((rms ** 2 * weighted_share).astype(np.float32))
+
+        # Spectral flatness (geometric / arithmetic mean of power) of non-silent frames
+        audible = rms >= SILENCE_RMS
+        if np.any(audible):
+            audible_power = power[audible] + 1e-10
+            flatness = np.exp(np.log(audible_power).mean(axis=1)) / audible_power.mean(axis=1)
+            self._flatness_sum += float(flatness.sum())
+        self._silent_frames += int(len(rms) - np.count_nonzero(audible))
+
+        chroma = power @ self._chroma_map.T
+        self._chroma_sum += chroma.sum(axis=0)
+        if self.keep_frame_chroma:
+            self._frame_chroma.append(chroma.T.astype(np.float32))
+
+        self._frames += len(frames)
+        self._rms_sum += float(rms.sum())
+        self._centroid_sum += float(centroid.sum())
+
+    def finish(self) -> StreamedFeatures:
+        """Flush the remaining samples and return the collected features.
+
+        Returns:
+            StreamedFeatures for everything passed to update()
+        """
+        tail = np.concatenate((self._carry, np.zeros(FRAME_LENGTH // 2, dtype=np.float32)))
+        if len(tail) >= FRAME_LENGTH:
+            n_frames = (len(tail) - FRAME_LENGTH) // HOP_LENGTH + 1
+            frames = np.lib.stride_tricks.sliding_window_view(tail, FRAME_LENGTH)[::HOP_LENGTH][:n_frames]
+            self._process_frames(frames)
+        self._carry = np.zeros(0, dtype=np.float32)
+
+        frames = max(1, self._frames)
+        audible_frames = max(1, self._frames - self._silent_frames)
+        k_mean_squares = (
+            np.concatenate(self._k_mean_squares) if self._k_mean_squares else np.zeros(0)
+        )
+        onset_env = np.concatenate(self._onset_env) if self._onset_env else np.zeros(0, dtype=np.float32)
+        frame_chroma = (
+            np.concatenate(self._frame_chroma, axis=1)
+            if self.keep_frame_chroma and self._frame_chroma
+            else None
+        )
+
+        return StreamedFeatures(
+            duration=self._samples / self.sample_rate,
+            sample_rate=self.sample_rate,
+            rms_mean=self._rms_sum / frames,
+            spectral_centroid_mean=self._centroid_sum / frames,
+            onset_env=onset_env,
+            chroma_mean=self._chroma_sum / frames,
+            frame_chroma=frame_chroma,
+            clipping_ratio=self._clipped / max(1, self._samples),
+            silence_ratio=self._silent_frames / frames,
+            loudness_lufs=gated_loudness(k_mean_squares),
+            spectral_flatness=self._flatness_sum / audible_frames,
+        )
+
+
+def stream_features(
+    audio_path: Path,
+    sample_rate: int,
+    memory_limit_mb: int,
+    keep_frame_chroma: bool = False
+) -> StreamedFeatures:
+    """Decode a file block by block and extract frame features.
+
+    Args:
+        audio_path: Path to the audio file
+        sample_rate: Analysis sample rate
+        memory_limit_mb: Memory ceiling for decode and feature buffers
+        keep_frame_chroma: Keep per-frame chroma for beat-synchronous features
+
+    Returns:
+        StreamedFeatures for the whole file
+    """
+    extractor = StreamingFeatureExtractor(sample_rate, keep_frame_chroma=keep_frame_chroma)
+    block_samples = block_samples_for_limit(memory_limit_mb)
+
+    for block in iter_audio_blocks(audio_path, sample_rate, block_samples):
+        extractor.update(block)
+
+    features = extractor.finish()
+    logger.info(
+        f"Streamed analysis of {audio_path}: {features.duration:.1f}s "
+        f"in blocks of {block_samples} samples"
+    )
+    return features
+
+
+def estimate_tempo(onset_env: np.ndarray, sample_rate: int) -> float:
+    """Estimate tempo from the onset envelope autocorrelation.
+
+    Args:
+        onset_env: Onset strength per frame
+        sample_rate: Sample rate the envelope was computed at
+
+    Returns:
+        Tempo in BPM (120 if the envelope is too short)
+    """
+    frame_rate = sample_rate / HOP_LENGTH
+    min_lag = int(frame_rate * 60 / 200)
+    max_lag = int(frame_rate * 60 / 60)
+    if len(onset_env) <= max_lag + 1:
+        return 120.0
+
+    env = onset_env - onset_env.mean()
+    spectrum = np.fft.rfft(env, n=2 * len(env))
+    autocorr = np.fft.irfft(np.abs(spectrum) ** 2)[:max_lag + 1]
+
+    lags = np.arange(min_lag, max_lag + 1)
+    bpm = 60 * frame_rate / lags
+    # Log-normal prior around 120 BPM, as in librosa's tempo estimator
+    prior = np.exp(-0.5 * (np.log2(bpm / 120.0)) ** 2)
+    scores = autocorr[lags] * prior
+    peak = int(np.argmax(scores))
+
+    # Parabolic interpolation for a sub-frame lag
+    lag = float(lags[peak])
+    if 0 < peak < len(scores) - 1:
+        left, center, right = scores[peak - 1:peak + 2]
+        curvature = left - 2 * center + right
+        if curvature < 0:
+            lag += 0.5 * (left - right) / curvature
+
+    return float(60 * frame_rate / lag)
+
+
+def track_beats(onset_env: np.ndarray, tempo: float, sample_rate: int) -> np.ndarray:
+    """Place a constant-tempo beat grid at the phase with the most onset energy.
+
+    Args:
+        onset_env: Onset strength per frame
+        tempo: Tempo in BPM
+        sample_rate: Sample rate the envelope was computed at
+
+    Returns:
+        Beat frame indices
+    """
+    period = sample_rate / HOP_LENGTH * 60 / tempo
+    if len(onset_env) == 0 or period <= 0:
+        return np.zeros(1, dtype=int)
+
+    phases = np.arange(int(np.ceil(period)))
+    grid = np.arange(0, len(onset_env), period)
+    positions = np.round(phases[:, None] + grid[None, :]).astype(int)
+    valid = positions < len(onset_env)
+    scores = np.where(valid, onset_env[np.minimum(positions, len(onset_env) - 1)], 0.0).sum(axis=1)
+
+    best = positions[np.argmax(scores)]
+    return best[best < len(onset_env)]
+
+
+def pick_onsets(onset_env: np.ndarray, sample_rate: int, min_gap: float = 0.05) -> np.ndarray:
+    """Pick onset frames as clear local maxima of the onset envelope.
+
+    Args:
+        onset_env: Onset strength per frame
+        sample_rate: Sample rate the envelope was computed at
+        min_gap: Minimum seconds between onsets
+
+    Returns:
+        Onset frame indices
+    """
+    if len(onset_env) < 3:
+        return np.zeros(0, dtype=int)
+
+    threshold = onset_env.mean() + 0.5 * onset_env.std()
+    inner = np.arange(1, len(onset_env) - 1)
+    peaks = inner[
+        (onset_env[inner] > onset_env[inner - 1])
+        & (onset_env[inner] >= onset_env[inner + 1])
+        & (onset_env[inner] > threshold)
+    ]
+    if len(peaks) == 0:
+        return peaks
+
+    gap = max(1, int(min_gap * sample_rate / HOP_LENGTH))
+    keep = np.concatenate(([True], np.diff(peaks) >= gap))
+    return peaks[keep]
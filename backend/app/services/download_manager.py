@@ -1,36 +1,99 @@
-"""Download manager for Suno-generated audio files."""
+"""Download manager for Suno-generated audio files.
+
+The resumable transfer (``part_path``, ``_total_size``, ``_fetch``) mirrors
+``tools/downloader.py``. The backend image is built from ``backend/`` alone
+and cannot import the standalone tools, so a fix to either copy must be
+made in both.
+"""
 
-import logging
 import asyncio
+import hashlib
+import logging
+import os
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
-import aiohttp
+
 import aiofiles
+import aiohttp
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
+from app.database import get_session_local
 from app.models.song import Song
 from app.models.suno_job import SunoJob
-from app.database import AsyncSessionLocal
+from app.models.suno_variation import SunoVariation
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+CHUNK_SIZE = 256 * 1024
+PART_SUFFIX = ".part"
+DOWNLOAD_ATTEMPTS = 3
+
+
+def part_path(file_path: Path) -> Path:
+    """Temporary path a download is written to before it is complete."""
+    return file_path.with_name(file_path.name + PART_SUFFIX)
+
+
+def _total_size(response: aiohttp.ClientResponse, offset: int) -> Optional[int]:
+    """Full file size from Content-Range (206) or Content-Length (200)."""
+    content_range = response.headers.get("Content-Range", "")
+    if "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        return int(total) if total.isdigit() else None
+    if response.content_length is not None:
+        return offset + response.content_length
+    return None
+
 
 class DownloadManager:
-    """Manages downloading audio files from Suno."""
+    """Manages downloading audio files from Suno.
+
+    Downloads share one pooled HTTP session and at most
+    ``DOWNLOAD_CONCURRENCY`` run at once. Each file is written to a
+    ``.part`` file that is resumed with a Range request after a failure
+    and only renamed into place once its size (and checksum, if known)
+    is verified, so the download folder never holds partial MP3s.
+    """
 
     def __init__(self):
         self.download_folder = Path(settings.DOWNLOAD_FOLDER)
         self.download_folder.mkdir(parents=True, exist_ok=True)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
 
-    async def download_song(self, song_id: str, audio_url: str) -> Optional[Path]:
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            concurrency = settings.DOWNLOAD_CONCURRENCY
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=concurrency),
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=60),
+            )
+            self._semaphore = asyncio.Semaphore(concurrency)
+        return self._session
+
+    async def close(self) -> None:
+        """Close the shared HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def download_song(
+        self,
+        song_id: str,
+        audio_url: str,
+        expected_size: Optional[int] = None,
+        sha256: Optional[str] = None,
+    ) -> Optional[Path]:
         """Download song audio from URL.
 
         Args:
             song_id: Unique song identifier
             audio_url: URL to download audio from
+            expected_size: Expected file size in bytes, if known
+            sha256: Expected SHA-256 hex digest, if known
 
         Returns:
             Path to downloaded file, or None if download failed
@@ -44,28 +107,29 @@ class DownloadManager:
             filename = f"{song_id}.mp3"
             file_path = self.download_folder / filename
 
-            # Skip if already downloaded
+            # Skip if already downloaded (partial downloads stay in .part files)
             if file_path.exists():
                 logger.info(f"Song already downloaded: {file_path}")
                 return file_path
 
             logger.info(f"Downloading song {song_id} from {audio_url}")
 
-            # Download with streaming
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    audio_url, timeout=aiohttp.ClientTimeout(total=300)
-                ) as response:
-                    response.raise_for_status()
-
-                    # Stream to file
-                    async with aiofiles.open(file_path, "wb") as f:
-                        async for chunk in response.content.iter_chunked(8192):
-                            await f.write(chunk)
+            session = self._get_session()
+            async with self._semaphore:
+                for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+                    try:
+                        await self._fetch(session, audio_url, file_path, expected_size)
+                        break
+                    except (aiohttp.ClientPayloadError, aiohttp.ServerDisconnectedError,
+                            asyncio.TimeoutError) as e:
+                        if attempt == DOWNLOAD_ATTEMPTS:
+                            raise
+                        logger.warning(
+                            f"Download of {song_id} interrupted ({e!r}), resuming "
+                            f"(attempt {attempt + 1}/{DOWNLOAD_ATTEMPTS})"
+                        )
 
-            # Verify file exists and has content
-            if not file_path.exists() or file_path.stat().st_size == 0:
-                raise ValueError(f"Downloaded file is empty or missing: {file_path}")
+            await self._verify(file_path, sha256)
 
             logger.info(
                 f"Song downloaded successfully: {file_path} ({file_path.stat().st_size} bytes)"
@@ -76,5 +140,137 @@ class DownloadManager:
             logger.error(f"Error downloading song {song_id}: {e}", exc_info=True)
             raise
 
+    async def _fetch(
+        self,
+        session: aiohttp.ClientSession,
+        audio_url: str,
+        file_path: Path,
+        expected_size: Optional[int],
+    ) -> None:
+        """Download into the .part file, resuming it, then move it into place.
+
+        Raises:
+            ValueError: If the file is empty or its size does not match
+        """
+        temp_path = part_path(file_path)
+        offset = temp_path.stat().st_size if temp_path.exists() else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+        async with session.get(audio_url, headers=headers) as response:
+            if response.status == 416:
+                # Nothing left to fetch: the .part file is already complete
+                total = _total_size(response, offset)
+                if total != offset:
+                    temp_path.unlink()
+                    raise ValueError(f"Partial download does not match remote file: {file_path}")
+            else:
+                response.raise_for_status()
+                if response.status != 206:
+                    offset = 0  # Range not honoured, start over
+                total = _total_size(response, offset)
+
+                async with aiofiles.open(temp_path, "ab" if offset else "wb") as f:
+                    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                        await f.write(chunk)
+
+        size = temp_path.stat().st_size if temp_path.exists() else 0
+        if size == 0:
+            temp_path.unlink(missing_ok=True)
+            raise ValueError(f"Downloaded file is empty or missing: {file_path}")
+        for expected in (total, expected_size):
+            if expected is not None and size != expected:
+                if size > expected:
+                    temp_path.unlink()
+                raise ValueError(
+                    f"Downloaded file size mismatch: {file_path} ({size} != {expected} bytes)"
+                )
+
+        os.replace(temp_path, file_path)
+
+    @staticmethod
+    async def _verify(file_path: Path, sha256: Optional[str]) -> None:
+        """Check a finished download against its expected digest.
+
+        Raises:
+            ValueError: If the digest does not match (the file is removed)
+        """
+        if not sha256:
+            return
+
+        def digest() -> str:
+            h = hashlib.sha256()
+            with open(file_path, "rb") as f:
+                for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    h.update(block)
+            return h.hexdigest()
+
+        actual = await asyncio.to_thread(digest)
+        if actual != sha256.lower():
+            file_path.unlink()
+            raise ValueError(f"Downloaded file checksum mismatch: {file_path}")
+
     async def download_from_suno_job(self, suno_job_id: int) -> Optional[Path]:
         """Download song from SunoJob record.
+
+        Fetches the job's selected variation, or else the first one that
+        has an audio URL.
+
+        Args:
+            suno_job_id: ID of the SunoJob to download
+
+        Returns:
+            Path to downloaded file
+
+        Raises:
+            ValueError: If the job does not exist or has no audio URL
+        """
+        session_local = get_session_local()
+        async with session_local() as db:
+            suno_job = await db.get(SunoJob, suno_job_id)
+            if not suno_job:
+                raise ValueError(f"Suno job not found: {suno_job_id}")
+
+            result = await db.execute(
+                select(SunoVariation)
+                .where(
+                    SunoVariation.suno_job_id == suno_job_id,
+                    SunoVariation.is_deleted.is_(False),
+                    SunoVariation.audio_url.is_not(None),
+                )
+                .order_by(SunoVariation.is_selected.desc(), SunoVariation.variation_index)
+                .limit(1)
+            )
+            variation = result.scalar_one_or_none()
+            if not variation:
+                raise ValueError(f"Suno job {suno_job_id} has no audio URL")
+
+            file_path = await self.download_song(suno_job.song_id, variation.audio_url)
+
+            suno_job.downloaded_path = str(file_path)
+            variation.audio_path = str(file_path)
+            variation.status = "downloaded"
+            variation.downloaded_at = datetime.utcnow()
+
+            song = await db.get(Song, suno_job.song_id)
+            if song:
+                song.audio_path = str(file_path)
+                song.status = "downloaded"
+
+            await db.commit()
+            return file_path
+
+
+# Global download manager instance
+_download_manager: Optional[DownloadManager] = None
+
+
+def get_download_manager() -> DownloadManager:
+    """Get or create the global download manager instance.
+
+    Returns:
+        DownloadManager instance
+    """
+    global _download_manager
+    if _download_manager is None:
+        _download_manager = DownloadManager()
+    return _download_manager
@@ -1,21 +1,66 @@
 """Song evaluation service for quality scoring."""
 
+import asyncio
+import json
 import logging
 from pathlib import Path
 from typing import Optional
 
+import numpy as np
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
-from app.database import AsyncSessionLocal
+from app.database import get_session_local
+from app.models.audio_analysis import AudioAnalysis
 from app.models.evaluation import Evaluation
 from app.models.song import Song
-from app.services.audio_analyzer import get_audio_analyzer
+from app.services.audio_analyzer import AudioFeatures, QualityMetrics, get_audio_analyzer
+from app.services.audio_fingerprint import Fingerprint, store_fingerprint
+from app.services.media_metadata import get_media_metadata_service
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Penalty curves: metric -> (metric breakpoints, penalty at each breakpoint).
+# Penalties are interpolated linearly and clamped at the ends.
+QUALITY_PENALTIES: dict[str, tuple[list[float], list[float]]] = {
+    "clipping": ([0.0001, 0.01], [0.0, 30.0]),  # Fraction of clipped samples
+    "silence": ([0.05, 0.5], [0.0, 30.0]),  # Fraction of silent frames
+    "loudness": ([2.0, 12.0], [0.0, 20.0]),  # LU away from TARGET_LOUDNESS_LUFS
+    "flatness": ([0.3, 0.6], [0.0, 20.0]),  # Noise-like spectrum
+    "too_short": ([-60.0, -20.0], [0.0, 40.0]),  # Negated duration in seconds
+    "too_long": ([480.0, 900.0], [0.0, 15.0]),  # Duration in seconds
+}
+
+TARGET_LOUDNESS_LUFS = -14.0
+
+
+def score_quality(duration: float, metrics: QualityMetrics) -> tuple[float, dict[str, float]]:
+    """Compute a 0-100 quality score from technical metrics.
+
+    Args:
+        duration: Audio duration in seconds
+        metrics: Clipping, silence, loudness and flatness measurements
+
+    Returns:
+        Tuple of (score, penalty per check)
+    """
+    values = {
+        "clipping": metrics.clipping_ratio,
+        "silence": metrics.silence_ratio,
+        "loudness": abs(metrics.loudness_lufs - TARGET_LOUDNESS_LUFS),
+        "flatness": metrics.spectral_flatness,
+        "too_short": -duration,
+        "too_long": duration,
+    }
+    penalties = {
+        name: float(np.interp(values[name], *QUALITY_PENALTIES[name]))
+        for name in QUALITY_PENALTIES
+    }
+    score = float(np.clip(100.0 - sum(penalties.values()), 0.0, 100.0))
+    return round(score, 1), penalties
+
 
 class EvaluatorService:
     """Service for evaluating song quality."""
@@ -26,6 +71,136 @@ class EvaluatorService:
         self.download_folder = Path(settings.DOWNLOAD_FOLDER)
         self.download_folder.mkdir(parents=True, exist_ok=True)
 
+    def _audio_file(self, song: Song) -> Path:
+        """Get the audio file to evaluate, preferring the selected variation."""
+        if song.audio_path:
+            return Path(song.audio_path)
+        return self.download_folder / f"{song.id}.mp3"
+
+    async def get_quality(
+        self, audio_file: Path, db: AsyncSession, song_id: Optional[str] = None
+    ) -> tuple[float, QualityMetrics]:
+        """Get duration and quality metrics, reusing a stored analysis.
+
+        Args:
+            audio_file: Audio file to analyze
+            db: Database session
+            song_id: Song the file belongs to, recorded on the analysis
+
+        Returns:
+            Tuple of (duration, QualityMetrics)
+        """
+        return (await self.get_quality_batch([audio_file], db, song_id))[0]
+
+    async def get_quality_batch(
+        self, audio_files: list[Path], db: AsyncSession, song_id: Optional[str] = None
+    ) -> list[tuple[float, QualityMetrics]]:
+        """Get duration and quality metrics for several files at once.
+
+        Stored analyses are looked up in one query and reused when the
+        file's size and mtime still match. The remaining files are decoded
+        concurrently in worker threads and their stored rows are updated
+        (without committing).
+
+        Args:
+            audio_files: Audio files to analyze
+            db: Database session
+            song_id: Song the files belong to, recorded on their analyses
+
+        Returns:
+            (duration, QualityMetrics) per file, in input order
+        """
+        stats = [audio_file.stat() for audio_file in audio_files]
+        result = await db.execute(
+            select(AudioAnalysis).where(
+                AudioAnalysis.audio_path.in_([str(f) for f in audio_files])
+            )
+        )
+        stored = {analysis.audio_path: analysis for analysis in result.scalars()}
+
+        qualities: list[Optional[tuple[float, QualityMetrics]]] = []
+        stale: list[int] = []
+        for i, (audio_file, stat) in enumerate(zip(audio_files, stats)):
+            analysis = stored.get(str(audio_file))
+            if (
+                analysis is not None
+                and analysis.file_size_bytes == stat.st_size
+                and analysis.file_mtime_ns == stat.st_mtime_ns
+                and analysis.loudness_lufs is not None
+            ):
+                logger.debug(f"Using stored analysis for {audio_file}")
+                qualities.append((analysis.duration, QualityMetrics(
+                    clipping_ratio=analysis.clipping_ratio,
+                    silence_ratio=analysis.silence_ratio,
+                    loudness_lufs=analysis.loudness_lufs,
+                    spectral_flatness=analysis.spectral_flatness,
+                )))
+            else:
+                qualities.append(None)
+                stale.append(i)
+
+        analyzed = await asyncio.gather(*(
+            asyncio.to_thread(self.analyzer.analyze_with_quality, audio_files[i])
+            for i in stale
+        ))
+
+        for i, (features, metrics, fingerprint) in zip(stale, analyzed):
+            analysis = stored.get(str(audio_files[i]))
+            if analysis is None:
+                analysis = AudioAnalysis(audio_path=str(audio_files[i]))
+                db.add(analysis)
+            self._store_analysis(analysis, stats[i], features, metrics, fingerprint)
+            stored[analysis.audio_path] = analysis
+            qualities[i] = (features.duration, metrics)
+
+        if song_id is not None:
+            for audio_file in audio_files:
+                stored[str(audio_file)].song_id = song_id
+
+        return qualities
+
+    async def score_files(
+        self, audio_files: list[Path], db: AsyncSession, song_id: Optional[str] = None
+    ) -> list[float]:
+        """Score several audio files in one batch.
+
+        Args:
+            audio_files: Audio files to score
+            db: Database session
+            song_id: Song the files belong to, recorded on their analyses
+
+        Returns:
+            Quality score (0-100) per file, in input order
+        """
+        qualities = await self.get_quality_batch(audio_files, db, song_id)
+        return [score_quality(duration, metrics)[0] for duration, metrics in qualities]
+
+    def _store_analysis(
+        self,
+        analysis: AudioAnalysis,
+        stat,
+        features: AudioFeatures,
+        metrics: QualityMetrics,
+        fingerprint: Fingerprint
+    ) -> None:
+        """Copy features, metrics and the fingerprint onto an analysis row."""
+        analysis.file_size_bytes = stat.st_size
+        analysis.file_mtime_ns = stat.st_mtime_ns
+        analysis.duration = features.duration
+        analysis.tempo = features.tempo
+        analysis.key = features.key
+        analysis.mode = features.mode
+        analysis.energy = features.energy
+        analysis.danceability = features.danceability
+        analysis.spectral_centroid_mean = features.spectral_centroid_mean
+        analysis.rms_mean = features.rms_mean
+        analysis.beat_times_json = json.dumps([round(t, 3) for t in features.beat_times])
+        analysis.clipping_ratio = metrics.clipping_ratio
+        analysis.silence_ratio = metrics.silence_ratio
+        analysis.loudness_lufs = metrics.loudness_lufs
+        analysis.spectral_flatness = metrics.spectral_flatness
+        store_fingerprint(analysis, *fingerprint.to_bytes())
+
     async def evaluate_song(self, song_id: str) -> Evaluation:
         """Evaluate a song's quality.
 
@@ -39,7 +214,8 @@ class EvaluatorService:
             ValueError: If song not found
             FileNotFoundError: If audio file not found
         """
-        async with AsyncSessionLocal() as db:
+        session_local = get_session_local()
+        async with session_local() as db:
             # Get song
             result = await db.execute(
                 select(Song).where(Song.id == song_id)
@@ -50,55 +226,44 @@ class EvaluatorService:
                 raise ValueError(f"Song not found: {song_id}")
 
             # Get audio file
-            audio_file = self.download_folder / f"{song_id}.mp3"
+            audio_file = self._audio_file(song)
             if not audio_file.exists():
                 raise FileNotFoundError(f"Audio file not found: {audio_file}")
 
             logger.info(f"Evaluating song {song_id}")
 
-            # Analyze audio
-            analysis = self.analyzer.analyze_audio(audio_file)
+            # Analyze audio (stored analysis or a worker thread)
+            duration, metrics = await self.get_quality(audio_file, db, song_id)
+            audio_quality_score, penalties = score_quality(duration, metrics)
+            media = await get_media_metadata_service().probe_async(audio_file)
 
             # Check for existing evaluation
             eval_result = await db.execute(
                 select(Evaluation).where(Evaluation.song_id == song_id)
             )
-            existing_eval = eval_result.scalar_one_or_none()
+            evaluation = eval_result.scalar_one_or_none()
+            if evaluation is None:
+                evaluation = Evaluation(song_id=song_id)
+                db.add(evaluation)
 
             # Determine if approved based on quality score
-            audio_quality_score = analysis.get("audio_quality_score", 0)
             is_approved = audio_quality_score >= settings.MIN_QUALITY_SCORE
 
-            if existing_eval:
-                # Update existing evaluation
-                existing_eval.audio_quality_score = audio_quality_score
-                existing_eval.duration_seconds = analysis.get("duration_seconds")
-                existing_eval.file_size_mb = analysis.get("file_size_mb")
-                existing_eval.sample_rate = analysis.get("sample_rate")
-                existing_eval.bitrate = analysis.get("bitrate")
-                existing_eval.approved = is_approved
-                evaluation = existing_eval
-            else:
-                # Create new evaluation
-                evaluation = Evaluation(
-                    song_id=song_id,
-                    audio_quality_score=audio_quality_score,
-                    duration_seconds=analysis.get("duration_seconds"),
-                    file_size_mb=analysis.get("file_size_mb"),
-                    sample_rate=analysis.get("sample_rate"),
-                    bitrate=analysis.get("bitrate"),
-                    approved=is_approved,
-                )
-                db.add(evaluation)
+            evaluation.audio_quality_score = audio_quality_score
+            evaluation.duration_seconds = duration
+            evaluation.file_size_mb = round(audio_file.stat().st_size / (1024 * 1024), 2)
+            evaluation.sample_rate = media.sample_rate if media else None
+            evaluation.bitrate = media.bit_rate // 1000 if media and media.bit_rate else None
+            evaluation.approved = is_approved
 
             # Update song status
             song.status = "evaluated"
             await db.commit()
-            await db.commit()  # Second commit to ensure all changes are persisted
 
             logger.info(
-                f"Song {song_id} evaluated: "
-                f"score={audio_quality_score:.1f}, approved={is_approved}"
+                f"Song {song_id} evaluated: score={audio_quality_score:.1f}, "
+                f"approved={is_approved}, penalties="
+                + ", ".join(f"{name}={value:.1f}" for name, value in penalties.items() if value)
             )
 
             return evaluation
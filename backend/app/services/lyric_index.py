@@ -0,0 +1,405 @@
+"""MinHash/LSH index for near-duplicate lyric detection.
+
+Each song is reduced to a set of shingles (three-word windows of its
+normalized lyrics plus its normalized title) and summarized by a MinHash
+signature, whose agreement rate estimates the Jaccard similarity of two
+shingle sets. Signatures are split into bands; songs that share any band are
+candidates, so a query only compares against a handful of songs no matter
+how large the corpus is.
+
+The index is keyed by ``<genre folder>/<file name>`` (the same keys as
+generated/songs-metadata.json), so host and container paths agree. It is
+persisted as a signature matrix plus a JSON document list and updated
+incrementally from file size and mtime.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+NUM_PERM = 128  # MinHash permutations
+BANDS = 32  # LSH bands (rows per band = NUM_PERM // BANDS)
+SHINGLE_WORDS = 3
+SEED = 1
+
+SIGNATURES_FILE = "signatures.npy"
+DOCUMENTS_FILE = "documents.json"
+
+_TAG_RE = re.compile(r"\[[^\]]*\]|\*[^*]*\*")  # [Section] tags and *stage directions*
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+@dataclass
+class LyricMatch:
+    """An indexed song similar to a query."""
+
+    key: str
+    title: str
+    similarity: float  # Estimated Jaccard similarity, 0-1
+    same_title: bool
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase a title and drop track numbers and punctuation."""
+    title = re.sub(r"^\d+[-_. ]+", "", title.strip().lower())
+    return " ".join(_WORD_RE.findall(title))
+
+
+def shingles(title: str, lyrics: str) -> set[str]:
+    """Build the shingle set for a song.
+
+    Args:
+        title: Song title
+        lyrics: Lyrics with optional [Section] tags and *directions*
+
+    Returns:
+        Three-word lyric shingles plus a title shingle
+    """
+    words = _WORD_RE.findall(_TAG_RE.sub(" ", lyrics.lower()))
+    result = {
+        " ".join(words[i:i + SHINGLE_WORDS])
+        for i in range(max(1, len(words) - SHINGLE_WORDS + 1))
+    }
+    result.discard("")
+    title = normalize_title(title)
+    if title:
+        result.add(f"title:{title}")
+    return result
+
+
+def song_key(path: Path) -> str:
+    """Index key for a song file: ``<genre folder>/<file name>``."""
+    path = Path(path)
+    return f"{path.parent.name}/{path.name}"
+
+
+def read_song_file(path: Path) -> tuple[str, str]:
+    """Read the title and lyrics of a generated song file.
+
+    The title is the first ``# `` heading and the lyrics are the ``## Lyrics``
+    section (or the whole file when there is none).
+
+    Returns:
+        Tuple of (title, lyrics)
+    """
+    content = path.read_text(encoding="utf-8", errors="replace")
+    title: Optional[str] = None
+    lyrics: list[str] = []
+    in_lyrics = False
+
+    for line in content.splitlines():
+        if line.startswith("# ") and title is None:
+            title = line[2:].strip()
+        elif line.startswith("## "):
+            in_lyrics = line[3:].strip().lower().startswith("lyrics")
+        elif in_lyrics and not line.startswith("```"):
+            lyrics.append(line)
+
+    return title or path.stem.replace("-", " "), "\n".join(lyrics) if lyrics else content
+
+
+class MinHasher:
+    """Computes MinHash signatures with fixed random permutations."""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = SEED):
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: odd 64-bit multipliers, wrapping arithmetic
+        self.a = rng.integers(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set: set[str]) -> np.ndarray:
+        """Compute the signature of a shingle set.
+
+        Returns:
+            uint32 array of length num_perm (all ones for an empty set)
+        """
+        if not shingle_set:
+            return np.full(len(self.a), 0xFFFFFFFF, dtype=np.uint32)
+
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingle_set),
+            dtype=np.uint64, count=len(shingle_set),
+        )
+        permuted = (self.a[:, None] * hashes[None, :] + self.b[:, None]) >> np.uint64(32)
+        return permuted.min(axis=1).astype(np.uint32)
+
+
+class LyricIndex:
+    """Incrementally updated MinHash/LSH index of song lyrics."""
+
+    def __init__(self, num_perm: int = NUM_PERM, bands: int = BANDS):
+        """Initialize an empty index.
+
+        Args:
+            num_perm: Signature length
+            bands: Number of LSH bands (must divide num_perm)
+        """
+        if num_perm % bands:
+            raise ValueError(f"bands ({bands}) must divide num_perm ({num_perm})")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+
+        self._signatures = np.zeros((0, num_perm), dtype=np.uint32)
+        self._documents: list[Optional[dict]] = []  # None marks a removed slot
+        self._positions: dict[str, int] = {}
+        self._buckets: list[dict[bytes, set[int]]] = [{} for _ in range(bands)]
+        self._titles: dict[str, set[int]] = {}  # Normalized title -> positions
+        self._lock = threading.Lock()
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._positions
+
+    def _band_keys(self, signature: np.ndarray) -> list[bytes]:
+        return [
+            signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def _append(self, document: dict, signature: np.ndarray) -> None:
+        """Store a document and its signature in the next free row."""
+        position = len(self._documents)
+        if position >= len(self._signatures):
+            grown = np.zeros((max(64, 2 * len(self._signatures)), self.num_perm), dtype=np.uint32)
+            grown[:len(self._signatures)] = self._signatures
+            self._signatures = grown
+
+        self._signatures[position] = signature
+        self._documents.append(document)
+        self._positions[document["key"]] = position
+        for band, band_key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(band_key, set()).add(position)
+        self._titles.setdefault(normalize_title(document["title"]), set()).add(position)
+
+    def _remove(self, key: str) -> bool:
+        position = self._positions.pop(key, None)
+        if position is None:
+            return False
+        for band, band_key in enumerate(self._band_keys(self._signatures[position])):
+            bucket = self._buckets[band].get(band_key)
+            if bucket is not None:
+                bucket.discard(position)
+                if not bucket:
+                    del self._buckets[band][band_key]
+        title_key = normalize_title(self._documents[position]["title"])
+        self._titles[title_key].discard(position)
+        if not self._titles[title_key]:
+            del self._titles[title_key]
+        self._documents[position] = None
+        return True
+
+    def add(
+        self,
+        key: str,
+        title: str,
+        lyrics: str,
+        size: Optional[int] = None,
+        mtime_ns: Optional[int] = None,
+    ) -> None:
+        """Add or replace a song.
+
+        Args:
+            key: Index key (see song_key)
+            title: Song title
+            lyrics: Song lyrics
+            size: Source file size, for incremental updates
+            mtime_ns: Source file mtime, for incremental updates
+        """
+        signature = self.hasher.signature(shingles(title, lyrics))
+        document = {"key": key, "title": title, "size": size, "mtime_ns": mtime_ns}
+        with self._lock:
+            self._remove(key)
+            self._append(document, signature)
+            self.dirty = True
+
+    def remove(self, key: str) -> bool:
+        """Remove a song.
+
+        Returns:
+            True if the song was indexed
+        """
+        with self._lock:
+            removed = self._remove(key)
+            self.dirty = self.dirty or removed
+            return removed
+
+    def query(
+        self,
+        title: str,
+        lyrics: str,
+        top_k: int = 5,
+        min_similarity: float = 0.0,
+        exclude: Optional[str] = None,
+    ) -> list[LyricMatch]:
+        """Find indexed songs similar to a title and lyrics.
+
+        Args:
+            title: Query title
+            lyrics: Query lyrics
+            top_k: Maximum number of matches
+            min_similarity: Minimum estimated Jaccard similarity
+            exclude: Key to leave out (e.g. the query song itself)
+
+        Returns:
+            Matches, most similar first
+        """
+        signature = self.hasher.signature(shingles(title, lyrics))
+        wanted_title = normalize_title(title)
+
+        with self._lock:
+            # Songs sharing a band, plus exact title matches
+            candidates: set[int] = set(self._titles.get(wanted_title, ())) if wanted_title else set()
+            for band, band_key in enumerate(self._band_keys(signature)):
+                candidates.update(self._buckets[band].get(band_key, ()))
+            if exclude in self._positions:
+                candidates.discard(self._positions[exclude])
+
+            if not candidates:
+                return []
+
+            positions = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            similarity = (self._signatures[positions] == signature).mean(axis=1)
+            documents = [self._documents[p] for p in positions]
+
+        matches = [
+            LyricMatch(
+                key=document["key"],
+                title=document["title"],
+                similarity=round(float(score), 3),
+                same_title=normalize_title(document["title"]) == wanted_title,
+            )
+            for document, score in zip(documents, similarity)
+            if score >= min_similarity or normalize_title(document["title"]) == wanted_title
+        ]
+        matches.sort(key=lambda m: (m.similarity, m.same_title), reverse=True)
+        return matches[:top_k]
+
+    def update_from_folder(self, folder: Path) -> dict[str, int]:
+        """Sync the index with the song files below a folder.
+
+        New and changed files (by size and mtime) are indexed and songs whose
+        file is gone are removed.
+
+        Args:
+            folder: Folder with ``<genre>/<name>.md`` files
+
+        Returns:
+            Counts of added, updated, removed and unchanged songs
+        """
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        seen: set[str] = set()
+
+        for path in sorted(Path(folder).rglob("*.md")):
+            key = song_key(path)
+            seen.add(key)
+            stat = path.stat()
+
+            position = self._positions.get(key)
+            document = self._documents[position] if position is not None else None
+            if document and (document["size"], document["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+                stats["unchanged"] += 1
+                continue
+
+            try:
+                title, lyrics = read_song_file(path)
+            except OSError as e:
+                logger.warning(f"Cannot read song file {path}: {e}")
+                continue
+
+            self.add(key, title, lyrics, stat.st_size, stat.st_mtime_ns)
+            stats["updated" if document else "added"] += 1
+
+        for key in list(self._positions):
+            if key not in seen and self._documents[self._positions[key]]["size"] is not None:
+                self.remove(key)
+                stats["removed"] += 1
+
+        logger.info(f"Lyric index updated from {folder}: {stats}")
+        return stats
+
+    def save(self, directory: Path) -> None:
+        """Persist the index, dropping removed slots.
+
+        Args:
+            directory: Directory for the signature and document files
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        with self._lock:
+            live = [p for p, document in enumerate(self._documents) if document is not None]
+            signatures = self._signatures[live]
+            documents = [self._documents[p] for p in live]
+            self.dirty = False
+
+        for name, write in (
+            (SIGNATURES_FILE, lambda f: np.save(f, signatures)),
+            (DOCUMENTS_FILE, lambda f: f.write(json.dumps(documents).encode("utf-8"))),
+        ):
+            tmp = directory / f"{name}.tmp"
+            with open(tmp, "wb") as f:
+                write(f)
+            os.replace(tmp, directory / name)
+
+        logger.info(f"Saved lyric index with {len(documents)} songs to {directory}")
+
+    @classmethod
+    def load(cls, directory: Path) -> "LyricIndex":
+        """Load a saved index, or return an empty one if none exists.
+
+        Args:
+            directory: Directory passed to save()
+
+        Returns:
+            The loaded LyricIndex
+        """
+        index = cls()
+        directory = Path(directory)
+        if not (directory / SIGNATURES_FILE).exists():
+            return index
+
+        signatures = np.load(directory / SIGNATURES_FILE)
+        documents = json.loads((directory / DOCUMENTS_FILE).read_text(encoding="utf-8"))
+        if signatures.shape != (len(documents), index.num_perm):
+            logger.warning(f"Lyric index in {directory} is inconsistent, starting empty")
+            return index
+
+        for document, signature in zip(documents, signatures):
+            index._append(document, signature)
+        logger.info(f"Loaded lyric index with {len(index)} songs from {directory}")
+        return index
+
+
+# Global instance
+_lyric_index: Optional[LyricIndex] = None
+
+
+def get_lyric_index() -> LyricIndex:
+    """Get the global lyric index, loading it from settings.LYRIC_INDEX_PATH.
+
+    Returns:
+        The singleton LyricIndex instance
+    """
+    global _lyric_index
+    if _lyric_index is None:
+        _lyric_index = LyricIndex.load(Path(settings.LYRIC_INDEX_PATH))
+    return _lyric_index
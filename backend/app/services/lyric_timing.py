@@ -1,5 +1,6 @@
 """Beat-synced lyric timing service for video generation."""
 
+import asyncio
 import logging
 import re
 import json
@@ -9,9 +10,28 @@ from typing import Optional, Literal
 import numpy as np
 import librosa
 
+from app.config import get_settings
+from app.services.audio_stream import estimate_tempo, pick_onsets, stream_features, track_beats
+from app.services.media_metadata import get_media_metadata_service
+
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+TimingMode = Literal["beat_synced", "uniform", "measures", "sections"]
+
+# Compact per-line timing; rows serialize to the timed lyric line JSON shape
+TIMING_DTYPE = np.dtype([
+    ("text", object),
+    ("start_time", np.float64),
+    ("end_time", np.float64),
+    ("is_emphasized", np.bool_),
+])
 
-TimingMode = Literal["beat_synced", "uniform", "measures"]
+# Width (in beats) of the checkerboard kernel used for section novelty
+SECTION_KERNEL_BEATS = 16
+
+# Maximum distance (seconds) a word start is moved to land on an onset
+WORD_ONSET_SNAP = 0.2
 
 
 class LyricTimingService:
@@ -36,15 +56,18 @@ class LyricTimingService:
             lyrics: Raw lyrics string with section markers and formatting
 
         Returns:
-            List of lyric line dictionaries with text and emphasis flags
+            List of lyric line dictionaries with text, emphasis flag and
+            section index
 
         Notes:
-            - Filters out section markers like [Verse 1], [Chorus]
+            - Filters out section markers like [Verse 1], [Chorus], but counts
+              them so each line knows which section it belongs to
             - Filters out standalone performance directions in parentheses
             - Preserves inline performance directions as part of lyrics
             - Detects emphasis from CAPS or exclamation marks
         """
         lines = []
+        section = 0
 
         for line in lyrics.strip().split("\n"):
             line = line.strip()
@@ -55,6 +78,8 @@ class LyricTimingService:
 
             # Skip section markers like [Verse 1], [Chorus], etc.
             if re.match(r"^\[.*\]$", line):
+                if lines and lines[-1]["section"] == section:
+                    section += 1
                 continue
 
             # Skip standalone performance directions in parentheses
@@ -64,6 +89,7 @@ class LyricTimingService:
             lines.append({
                 "text": line,
                 "is_emphasized": line.isupper() or line.endswith("!"),
+                "section": section,
             })
 
         return lines
@@ -81,6 +107,7 @@ class LyricTimingService:
                 - beat_times: Array of beat timestamps
                 - onset_times: Array of onset (attack) timestamps
                 - beat_count: Total number of detected beats
+                - beat_chroma: 12 x beat_count chroma, one column per beat
 
         Raises:
             FileNotFoundError: If audio file doesn't exist
@@ -89,6 +116,9 @@ class LyricTimingService:
         Notes:
             - Uses librosa for beat detection and tempo estimation
             - Detects onsets for more precise timing points
+            - Beat-synchronous chroma is kept for section detection
+            - Files longer than settings.AUDIO_STREAMING_MIN_SECONDS are
+              decoded block by block with bounded memory
             - Results are cached to avoid redundant analysis
         """
         logger.info(f"Analyzing audio: {audio_path}")
@@ -104,6 +134,11 @@ class LyricTimingService:
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
         try:
+            if self._should_stream(audio_path):
+                analysis = await asyncio.to_thread(self._analyze_streaming, audio_path)
+                self._cache[cache_key] = analysis
+                return analysis
+
             # Load audio (resample to 22050 Hz for consistent processing)
             y, sr = librosa.load(str(audio_path), sr=22050)
             duration = len(y) / sr
@@ -117,6 +152,7 @@ class LyricTimingService:
                     "beat_times": [0.0],
                     "onset_times": [0.0],
                     "beat_count": 1,
+                    "beat_chroma": [],
                 }
                 self._cache[cache_key] = analysis
                 return analysis
@@ -141,6 +177,11 @@ class LyricTimingService:
             if len(beat_times) == 0:
                 logger.warning("No beats detected, using default timing")
                 beat_times = np.array([0.0])
+                beat_chroma = np.empty((12, 0))
+            else:
+                # Median chroma per beat (the column before the first beat is dropped)
+                chroma = librosa.feature.chroma_stft(y=y, sr=sr)
+                beat_chroma = librosa.util.sync(chroma, beat_frames, aggregate=np.median)[:, 1:]
 
             analysis = {
                 "duration": float(duration),
@@ -148,6 +189,7 @@ class LyricTimingService:
                 "beat_times": beat_times.tolist(),
                 "onset_times": onset_times.tolist(),
                 "beat_count": len(beat_times),
+                "beat_chroma": beat_chroma.tolist(),
             }
 
             # Cache the result
@@ -183,6 +225,7 @@ class LyricTimingService:
             - beat_synced: Aligns lyrics to detected beats (recommended)
             - uniform: Evenly distributes lyrics across duration
             - measures: Aligns lyrics to musical measures (4/4 time)
+            - sections: Maps lyric sections onto detected song sections
         """
         logger.info(f"Generating {mode} timing for lyrics")
 
@@ -196,16 +239,142 @@ class LyricTimingService:
         analysis = await self.analyze_audio(audio_path)
         duration = analysis["duration"]
         beat_times = np.array(analysis["beat_times"])
+        beat_chroma = np.array(analysis.get("beat_chroma") or [], dtype=float)
+
+        timing = self.compute_timing(lines, beat_times, duration, mode, beat_chroma)
+        return self.timing_array_to_list(timing)
+
+    def _should_stream(self, audio_path: Path) -> bool:
+        """Check whether a file is long enough for streaming analysis."""
+        if settings.AUDIO_STREAMING_MIN_SECONDS <= 0:
+            return True
+
+        metadata = get_media_metadata_service().probe(audio_path)
+        return metadata is not None and metadata.duration > settings.AUDIO_STREAMING_MIN_SECONDS
+
+    def _analyze_streaming(self, audio_path: Path) -> dict:
+        """Analyze beats, onsets and chroma from a block-wise decode.
+
+        Args:
+            audio_path: Path to audio file
+
+        Returns:
+            Analysis dictionary with the same keys as analyze_audio
+        """
+        streamed = stream_features(
+            audio_path, 22050, settings.AUDIO_ANALYSIS_MEMORY_MB, keep_frame_chroma=True
+        )
+
+        tempo = estimate_tempo(streamed.onset_env, streamed.sample_rate)
+        beat_frames = track_beats(streamed.onset_env, tempo, streamed.sample_rate)
+        if len(beat_frames) == 0:
+            beat_frames = np.zeros(1, dtype=int)
+        onset_frames = pick_onsets(streamed.onset_env, streamed.sample_rate)
+
+        # Mean chroma over each beat interval (last beat runs to the end)
+        frame_chroma = streamed.frame_chroma
+        if frame_chroma is not None and frame_chroma.shape[1] > beat_frames[-1]:
+            sums = np.add.reduceat(frame_chroma, beat_frames, axis=1)
+            lengths = np.diff(np.append(beat_frames, frame_chroma.shape[1]))
+            beat_chroma = sums / np.maximum(lengths, 1)
+        else:
+            beat_chroma = np.empty((12, 0))
+
+        beat_times = streamed.frames_to_time(beat_frames)
+        logger.info(
+            f"Streaming audio analysis complete: {streamed.duration:.1f}s, "
+            f"{tempo:.1f} BPM, {len(beat_times)} beats"
+        )
+
+        return {
+            "duration": float(streamed.duration),
+            "tempo": tempo,
+            "beat_times": beat_times.tolist(),
+            "onset_times": streamed.frames_to_time(onset_frames).tolist(),
+            "beat_count": len(beat_times),
+            "beat_chroma": beat_chroma.tolist(),
+        }
+
+    def compute_timing(
+        self,
+        lines: list[dict],
+        beat_times: np.ndarray,
+        duration: float,
+        mode: TimingMode = "beat_synced",
+        beat_chroma: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Compute lyric timing from already-analyzed audio.
+
+        Args:
+            lines: Parsed lyric lines
+            beat_times: Array of beat timestamps
+            duration: Total audio duration
+            mode: Timing mode - "beat_synced", "uniform", "measures" or "sections"
+            beat_chroma: Beat-synchronous chroma (12 x beats), used by "sections"
 
-        # Generate timing based on mode
+        Returns:
+            Structured array with TIMING_DTYPE fields, one row per line
+
+        Notes:
+            - Needs no audio access, so cached analyses can be retimed in bulk
+        """
         if mode == "uniform":
             return self._uniform_timing(lines, duration)
         elif mode == "measures":
             return self._measure_timing(lines, beat_times, duration)
+        elif mode == "sections":
+            return self._section_timing(lines, beat_times, beat_chroma, duration)
         else:  # beat_synced (default)
             return self._beat_synced_timing(lines, beat_times, duration)
 
-    def _uniform_timing(self, lines: list[dict], duration: float) -> list[dict]:
+    def _timing_array(
+        self,
+        lines: list[dict],
+        start_times: np.ndarray,
+        end_times: np.ndarray
+    ) -> np.ndarray:
+        """Pack line texts and times into a structured timing array.
+
+        Args:
+            lines: Parsed lyric lines
+            start_times: Start time per line
+            end_times: End time per line
+
+        Returns:
+            Structured array with TIMING_DTYPE fields
+        """
+        timing = np.empty(len(lines), dtype=TIMING_DTYPE)
+        timing["text"] = [line["text"] for line in lines]
+        timing["start_time"] = np.round(start_times, 3)
+        timing["end_time"] = np.round(end_times, 3)
+        timing["is_emphasized"] = [line["is_emphasized"] for line in lines]
+        return timing
+
+    def timing_array_to_list(self, timing: np.ndarray) -> list[dict]:
+        """Convert a structured timing array to timed lyric line dicts.
+
+        Args:
+            timing: Structured array with TIMING_DTYPE fields
+
+        Returns:
+            List of timed lyric lines in the JSON shape used by the API
+        """
+        return [
+            {
+                "text": text,
+                "start_time": start_time,
+                "end_time": end_time,
+                "is_emphasized": is_emphasized,
+            }
+            for text, start_time, end_time, is_emphasized in zip(
+                timing["text"].tolist(),
+                timing["start_time"].tolist(),
+                timing["end_time"].tolist(),
+                timing["is_emphasized"].tolist(),
+            )
+        ]
+
+    def _uniform_timing(self, lines: list[dict], duration: float) -> np.ndarray:
         """Distribute lyrics evenly across duration.
 
         Args:
@@ -213,7 +382,7 @@ class LyricTimingService:
             duration: Total audio duration
 
         Returns:
-            List of timed lyric lines
+            Structured timing array
 
         Notes:
             - Leaves buffer at start (intro) and end (outro)
@@ -221,7 +390,7 @@ class LyricTimingService:
             - Display time is 90% of slot or 4s max (whichever is less)
         """
         if not lines:
-            return []
+            return np.empty(0, dtype=TIMING_DTYPE)
 
         # Leave buffer at start and end (5% of duration or 3s max)
         start_buffer = min(3.0, duration * 0.05)
@@ -231,24 +400,15 @@ class LyricTimingService:
         time_per_line = effective_duration / len(lines)
         display_time = min(time_per_line * 0.9, 4.0)  # Show for 90% of slot or 4s max
 
-        timed_lines = []
-        for i, line in enumerate(lines):
-            start_time = start_buffer + (i * time_per_line)
-            timed_lines.append({
-                "text": line["text"],
-                "start_time": round(start_time, 3),
-                "end_time": round(start_time + display_time, 3),
-                "is_emphasized": line["is_emphasized"],
-            })
-
-        return timed_lines
+        start_times = start_buffer + np.arange(len(lines)) * time_per_line
+        return self._timing_array(lines, start_times, start_times + display_time)
 
     def _beat_synced_timing(
         self,
         lines: list[dict],
         beat_times: np.ndarray,
         duration: float
-    ) -> list[dict]:
+    ) -> np.ndarray:
         """Align lyrics to detected beats.
 
         Args:
@@ -257,7 +417,7 @@ class LyricTimingService:
             duration: Total audio duration
 
         Returns:
-            List of timed lyric lines aligned to beats
+            Structured timing array aligned to beats
 
         Notes:
             - Skips intro and outro beats
@@ -286,40 +446,28 @@ class LyricTimingService:
             )
             return self._uniform_timing(lines, duration)
 
-        # Calculate beats per line
+        # Beat index for the start of each line and of the following line
         beats_per_line = len(usable_beats) / len(lines)
+        positions = np.arange(len(lines) + 1) * beats_per_line
+        beat_idx = np.floor(positions[:-1]).astype(int)
+        next_beat_idx = np.minimum(np.floor(positions[1:]).astype(int), len(usable_beats) - 1)
 
-        timed_lines = []
-        for i, line in enumerate(lines):
-            # Get beat index for this line
-            beat_idx = int(i * beats_per_line)
-            next_beat_idx = min(int((i + 1) * beats_per_line), len(usable_beats) - 1)
-
-            start_time = usable_beats[beat_idx]
-            end_time = (
-                usable_beats[next_beat_idx]
-                if next_beat_idx > beat_idx
-                else start_time + 2.0
-            )
-
-            # Cap display time at reasonable duration
-            end_time = min(end_time, start_time + 5.0)
+        start_times = usable_beats[beat_idx]
+        end_times = np.where(
+            next_beat_idx > beat_idx, usable_beats[next_beat_idx], start_times + 2.0
+        )
 
-            timed_lines.append({
-                "text": line["text"],
-                "start_time": round(float(start_time), 3),
-                "end_time": round(float(end_time), 3),
-                "is_emphasized": line["is_emphasized"],
-            })
+        # Cap display time at reasonable duration
+        end_times = np.minimum(end_times, start_times + 5.0)
 
-        return timed_lines
+        return self._timing_array(lines, start_times, end_times)
 
     def _measure_timing(
         self,
         lines: list[dict],
         beat_times: np.ndarray,
         duration: float
-    ) -> list[dict]:
+    ) -> np.ndarray:
         """Align lyrics to musical measures (4 beats = 1 measure in 4/4 time).
 
         Args:
@@ -328,7 +476,7 @@ class LyricTimingService:
             duration: Total audio duration
 
         Returns:
-            List of timed lyric lines aligned to measures
+            Structured timing array aligned to measures
 
         Notes:
             - Assumes 4/4 time signature
@@ -339,37 +487,260 @@ class LyricTimingService:
             logger.warning("Not enough beats for measure timing, falling back to uniform")
             return self._uniform_timing(lines, duration)
 
-        # Group beats into measures (assuming 4/4 time)
-        measures = []
-        for i in range(0, len(beat_times) - 3, 4):
-            measures.append({
-                "start": beat_times[i],
-                "end": beat_times[i + 3] if i + 3 < len(beat_times) else beat_times[-1],
-            })
+        # Group beats into complete measures (assuming 4/4 time)
+        measure_count = len(beat_times) // 4
+        measures = beat_times[:measure_count * 4].reshape(measure_count, 4)
 
-        if len(measures) < len(lines):
+        if measure_count < len(lines):
             logger.warning(
-                f"Not enough measures ({len(measures)}) for lines ({len(lines)}), "
+                f"Not enough measures ({measure_count}) for lines ({len(lines)}), "
                 "falling back to uniform timing"
             )
             return self._uniform_timing(lines, duration)
 
         # Assign 1-2 lines per measure
-        measures_per_line = len(measures) / len(lines)
-
-        timed_lines = []
-        for i, line in enumerate(lines):
-            measure_idx = int(i * measures_per_line)
-            measure = measures[min(measure_idx, len(measures) - 1)]
-
-            timed_lines.append({
-                "text": line["text"],
-                "start_time": round(float(measure["start"]), 3),
-                "end_time": round(float(measure["end"]), 3),
-                "is_emphasized": line["is_emphasized"],
-            })
+        measures_per_line = measure_count / len(lines)
+        measure_idx = np.minimum(
+            np.floor(np.arange(len(lines)) * measures_per_line).astype(int),
+            measure_count - 1,
+        )
+
+        return self._timing_array(
+            lines, measures[measure_idx, 0], measures[measure_idx, 3]
+        )
+
+    def _novelty_curve(self, beat_chroma: np.ndarray) -> np.ndarray:
+        """Compute a section-boundary novelty curve from beat chroma.
+
+        Args:
+            beat_chroma: Beat-synchronous chroma (12 x beats)
+
+        Returns:
+            Novelty per beat; high values mark a change of section at that beat
+
+        Notes:
+            - Correlates a Gaussian-tapered checkerboard kernel along the
+              diagonal of the cosine self-similarity matrix (Foote novelty)
+        """
+        features = beat_chroma / (np.linalg.norm(beat_chroma, axis=0, keepdims=True) + 1e-9)
+        similarity = features.T @ features
+
+        half = SECTION_KERNEL_BEATS // 2
+        offsets = np.arange(-half, half) + 0.5
+        sign = np.sign(offsets)
+        taper = np.exp(-0.5 * (offsets / (half / 2)) ** 2)
+        kernel = np.outer(sign * taper, sign * taper)
+
+        padded = np.pad(similarity, half)
+        windows = np.lib.stride_tricks.sliding_window_view(padded, kernel.shape)
+        beats = np.arange(similarity.shape[0])
+        return np.einsum("nij,ij->n", windows[beats, beats], kernel)
+
+    def _section_timing(
+        self,
+        lines: list[dict],
+        beat_times: np.ndarray,
+        beat_chroma: Optional[np.ndarray],
+        duration: float
+    ) -> np.ndarray:
+        """Align lyric sections to sections detected in the audio.
+
+        Args:
+            lines: Parsed lyric lines with section indices
+            beat_times: Array of beat timestamps
+            beat_chroma: Beat-synchronous chroma (12 x beats)
+            duration: Total audio duration
+
+        Returns:
+            Structured timing array with each lyric section starting on a
+            novelty peak
+
+        Notes:
+            - The first section starts at the strongest novelty peak in the
+              first quarter of the song (vocal entry), not at a fixed intro
+            - Later section starts are the strongest peaks near the position
+              expected from the line counts of the preceding sections
+            - Lines are spread over the beats of their own section
+            - Falls back to beat-synced timing without usable chroma
+        """
+        if (
+            beat_chroma is None
+            or beat_chroma.ndim != 2
+            or beat_chroma.shape[1] != len(beat_times)
+            or len(beat_times) < 2 * SECTION_KERNEL_BEATS
+        ):
+            logger.warning("No usable chroma for section timing, falling back to beat-synced")
+            return self._beat_synced_timing(lines, beat_times, duration)
+
+        beat_count = len(beat_times)
+        half = SECTION_KERNEL_BEATS // 2
+        novelty = self._novelty_curve(beat_chroma)
+
+        # Local maxima away from the edges, where the kernel only sees padding
+        inner = np.arange(half, beat_count - half)
+        is_peak = (novelty[inner] >= novelty[inner - 1]) & (novelty[inner] >= novelty[inner + 1])
+        peaks = inner[is_peak]
+
+        outro_beats = max(2, beat_count // 20)
+        last_beat = beat_count - outro_beats
+
+        # Vocal entry: strongest clear peak in the first quarter, else the default intro
+        intro_peaks = peaks[peaks < beat_count // 4]
+        intro_peaks = intro_peaks[novelty[intro_peaks] > np.median(novelty)]
+        first_beat = (
+            int(intro_peaks[np.argmax(novelty[intro_peaks])])
+            if len(intro_peaks)
+            else max(4, beat_count // 10)
+        )
+
+        sections = np.array([line.get("section", 0) for line in lines])
+        _, section_idx, line_counts = np.unique(sections, return_inverse=True, return_counts=True)
+
+        # Expected section starts from line counts, snapped to the strongest nearby peak
+        span = last_beat - first_beat
+        expected = first_beat + span * np.cumsum(line_counts)[:-1] / len(lines)
+        window = span / (2 * len(line_counts))
+        starts = [first_beat]
+        for target in expected:
+            nearby = peaks[(np.abs(peaks - target) <= window) & (peaks > starts[-1])]
+            starts.append(
+                int(nearby[np.argmax(novelty[nearby])]) if len(nearby) else int(round(target))
+            )
+        section_starts = np.array(starts)
+        section_beats = np.diff(np.append(section_starts, last_beat))
 
-        return timed_lines
+        if np.any(section_beats < line_counts):
+            logger.warning("Detected sections too short for lyrics, falling back to beat-synced")
+            return self._beat_synced_timing(lines, beat_times, duration)
+
+        # Position of each line within its section, then beat index by proportion
+        line_offsets = np.concatenate(([0], np.cumsum(line_counts)[:-1]))
+        order = np.argsort(section_idx, kind="stable")
+        local_idx = np.empty(len(lines), dtype=int)
+        local_idx[order] = np.arange(len(lines)) - line_offsets[section_idx[order]]
+
+        beats_per_line = section_beats[section_idx] / line_counts[section_idx]
+        base = section_starts[section_idx]
+        beat_idx = base + np.floor(local_idx * beats_per_line).astype(int)
+        next_beat_idx = np.minimum(
+            base + np.floor((local_idx + 1) * beats_per_line).astype(int), beat_count - 1
+        )
+
+        start_times = beat_times[beat_idx]
+        end_times = np.where(
+            next_beat_idx > beat_idx, beat_times[next_beat_idx], start_times + 2.0
+        )
+        end_times = np.minimum(end_times, start_times + 5.0)
+
+        return self._timing_array(lines, start_times, end_times)
+
+    async def generate_word_timing(
+        self,
+        audio_path: Path,
+        lyrics: str,
+        mode: TimingMode = "beat_synced"
+    ) -> list[dict]:
+        """Generate per-word timing for karaoke highlighting.
+
+        Args:
+            audio_path: Path to audio file
+            lyrics: Raw lyrics string
+            mode: Line timing mode used before words are distributed
+
+        Returns:
+            List of timed lyric lines, each with a ``words`` list of
+            ``{"word", "start_time", "end_time"}`` entries
+        """
+        timed_lines = await self.generate_timing(audio_path, lyrics, mode)
+        if not timed_lines:
+            return []
+
+        analysis = await self.analyze_audio(audio_path)
+        onset_times = np.asarray(analysis["onset_times"], dtype=float)
+
+        return self._word_timing(timed_lines, onset_times)
+
+    def _word_timing(self, timed_lines: list[dict], onset_times: np.ndarray) -> list[dict]:
+        """Distribute the words of each timed line across detected onsets.
+
+        Args:
+            timed_lines: Lyric lines with start/end times, in order
+            onset_times: Sorted array of onset timestamps
+
+        Returns:
+            Timed lyric lines with a ``words`` list added to each line
+
+        Notes:
+            - Words first get a slot proportional to their length within the line
+            - Each slot start then snaps to the nearest onset if one lies within
+              WORD_ONSET_SNAP seconds and inside the line
+            - The first word of a line always starts with the line
+            - All words of all lines are processed as flat numpy arrays
+        """
+        words_per_line = [line["text"].split() for line in timed_lines]
+        counts = np.array([len(words) for words in words_per_line])
+        words = [word for line_words in words_per_line for word in line_words]
+
+        if not words:
+            return [{**line, "words": []} for line in timed_lines]
+
+        line_idx = np.repeat(np.arange(len(timed_lines)), counts)
+        line_start = np.array([line["start_time"] for line in timed_lines])[line_idx]
+        line_end = np.array([line["end_time"] for line in timed_lines])[line_idx]
+
+        # Proportional slot starts: cumulative word weight before each word in its line
+        weights = np.array([len(word) + 1 for word in words], dtype=float)
+        cumulative = np.cumsum(weights)
+        line_offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        first_of_line = np.zeros(len(words), dtype=bool)
+        first_of_line[line_offsets[counts > 0]] = True
+
+        before = cumulative - weights
+        line_base = before[first_of_line][np.cumsum(first_of_line) - 1]
+        line_total = np.add.reduceat(weights, line_offsets[counts > 0])[np.cumsum(first_of_line) - 1]
+        starts = line_start + (before - line_base) / line_total * (line_end - line_start)
+
+        # Snap to the nearest onset inside the line window
+        if len(onset_times):
+            pos = np.searchsorted(onset_times, starts)
+            left = onset_times[np.clip(pos - 1, 0, len(onset_times) - 1)]
+            right = onset_times[np.clip(pos, 0, len(onset_times) - 1)]
+            nearest = np.where(np.abs(starts - left) <= np.abs(right - starts), left, right)
+            snap = (
+                (np.abs(nearest - starts) <= WORD_ONSET_SNAP)
+                & (nearest >= line_start)
+                & (nearest < line_end)
+                & ~first_of_line
+            )
+            starts = np.where(snap, nearest, starts)
+
+        # Keep words ordered; lines are already in time order
+        starts = np.maximum.accumulate(starts)
+
+        # Each word ends where the next one starts; the last word ends with its line
+        last_of_line = np.roll(first_of_line, -1)
+        last_of_line[-1] = True
+        ends = np.empty_like(starts)
+        ends[:-1] = starts[1:]
+        ends[last_of_line] = line_end[last_of_line]
+
+        starts = np.round(starts, 3).tolist()
+        ends = np.round(ends, 3).tolist()
+
+        timed_words = []
+        position = 0
+        for line, line_words in zip(timed_lines, words_per_line):
+            line_timing = []
+            for word in line_words:
+                line_timing.append({
+                    "word": word,
+                    "start_time": starts[position],
+                    "end_time": ends[position],
+                })
+                position += 1
+            timed_words.append({**line, "words": line_timing})
+
+        return timed_words
 
     def timing_to_json(self, timing: list[dict]) -> str:
         """Convert timing data to JSON string.
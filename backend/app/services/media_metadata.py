@@ -0,0 +1,208 @@
+"""Cached media metadata probing using FFprobe.
+
+Audio files are probed once and the result is cached by path, modification
+time and size, so repeated renders and evaluations of the same file never
+shell out to FFprobe again.
+"""
+
+import asyncio
+import json
+import logging
+import subprocess
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from app.models.suno_variation import SunoVariation
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MediaMetadata:
+    """Container for probed media metadata."""
+
+    duration: float  # Duration in seconds
+    codec_name: Optional[str] = None  # Audio codec (mp3, aac, ...)
+    sample_rate: Optional[int] = None  # Hz
+    channels: Optional[int] = None
+    bit_rate: Optional[int] = None  # Bits per second
+    file_size_bytes: Optional[int] = None
+
+
+def _to_int(value) -> Optional[int]:
+    """Convert an FFprobe field to int, returning None when missing."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class MediaMetadataService:
+    """Probes media files with FFprobe and caches the results.
+
+    Attributes:
+        _cache: Probed metadata keyed by resolved path, stored alongside the
+            file's mtime and size so edited files are re-probed
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        """Initialize the metadata service.
+
+        Args:
+            max_entries: Maximum number of files kept in the cache
+        """
+        self.max_entries = max_entries
+        self._cache: OrderedDict[str, tuple[int, int, MediaMetadata]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def probe(self, path: Path) -> Optional[MediaMetadata]:
+        """Get metadata for a media file, probing it only if not cached.
+
+        Args:
+            path: Path to the media file
+
+        Returns:
+            MediaMetadata for the file, or None if it is missing or cannot be probed
+        """
+        try:
+            stat = path.stat()
+        except OSError as e:
+            logger.warning(f"Cannot probe missing file {path}: {e}")
+            return None
+
+        cache_key = str(path.resolve())
+        with self._lock:
+            entry = self._cache.get(cache_key)
+            if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                self._cache.move_to_end(cache_key)
+                return entry[2]
+
+        metadata = self._run_ffprobe(path, stat.st_size)
+        if metadata is None:
+            return None
+
+        with self._lock:
+            self._cache[cache_key] = (stat.st_mtime_ns, stat.st_size, metadata)
+            self._cache.move_to_end(cache_key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+        return metadata
+
+    async def probe_async(self, path: Path) -> Optional[MediaMetadata]:
+        """Probe a file without blocking the event loop.
+
+        Args:
+            path: Path to the media file
+
+        Returns:
+            MediaMetadata for the file, or None if it cannot be probed
+        """
+        return await asyncio.to_thread(self.probe, path)
+
+    def _run_ffprobe(self, path: Path, file_size: int) -> Optional[MediaMetadata]:
+        """Run FFprobe on a file and parse the first audio stream.
+
+        Args:
+            path: Path to the media file
+            file_size: File size in bytes from the stat call
+
+        Returns:
+            Parsed MediaMetadata, or None if FFprobe fails
+        """
+        cmd = [
+            'ffprobe',
+            '-v', 'quiet',
+            '-print_format', 'json',
+            '-show_format',
+            '-show_streams',
+            '-select_streams', 'a:0',
+            str(path)
+        ]
+
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            data = json.loads(result.stdout)
+        except Exception as e:
+            logger.warning(f"FFprobe failed for {path}: {e}")
+            return None
+
+        stream = (data.get("streams") or [{}])[0]
+        fmt = data.get("format", {})
+
+        try:
+            duration = float(stream.get("duration") or fmt.get("duration"))
+        except (TypeError, ValueError):
+            logger.warning(f"FFprobe reported no duration for {path}")
+            return None
+
+        logger.debug(f"Probed {path}: {duration:.1f}s, codec={stream.get('codec_name')}")
+
+        return MediaMetadata(
+            duration=duration,
+            codec_name=stream.get("codec_name"),
+            sample_rate=_to_int(stream.get("sample_rate")),
+            channels=_to_int(stream.get("channels")),
+            bit_rate=_to_int(stream.get("bit_rate") or fmt.get("bit_rate")),
+            file_size_bytes=file_size,
+        )
+
+    async def fill_variation_metadata(self, variation: "SunoVariation") -> bool:
+        """Persist probed duration and size onto a variation that lacks them.
+
+        Args:
+            variation: Variation with an audio_path
+
+        Returns:
+            True if the variation was updated
+        """
+        if variation.duration_seconds is not None and variation.file_size_bytes is not None:
+            return False
+        if not variation.audio_path:
+            return False
+
+        metadata = await self.probe_async(Path(variation.audio_path))
+        if metadata is None:
+            return False
+
+        variation.duration_seconds = metadata.duration
+        variation.file_size_bytes = metadata.file_size_bytes
+        return True
+
+    def clear_cache(self) -> None:
+        """Clear the metadata cache."""
+        with self._lock:
+            self._cache.clear()
+        logger.info("Media metadata cache cleared")
+
+    def get_cache_stats(self) -> dict:
+        """Get cache statistics.
+
+        Returns:
+            Dictionary with cache size and limit
+        """
+        with self._lock:
+            return {
+                "size": len(self._cache),
+                "max_entries": self.max_entries,
+            }
+
+
+# Global instance
+_media_metadata_service: Optional[MediaMetadataService] = None
+
+
+def get_media_metadata_service() -> MediaMetadataService:
+    """Get the global media metadata service instance.
+
+    Returns:
+        The singleton MediaMetadataService instance
+    """
+    global _media_metadata_service
+    if _media_metadata_service is None:
+        _media_metadata_service = MediaMetadataService()
+    return _media_metadata_service
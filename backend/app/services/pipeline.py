@@ -0,0 +1,192 @@
+"""Per-song pipeline orchestration.
+
+A song's stages form a DAG of task types. When a task completes, every
+stage whose dependencies have all completed is queued, so a song moves
+from its ``.md`` file to a published video without manual steps.
+Independent stages are queued together and run concurrently on the
+worker pool: cover art is made while Suno generates, and evaluation and
+lyric timing run side by side once the audio is downloaded. Lyric timing
+is a side branch: the render does not use it, so a failing timing task
+never holds up the video.
+
+::
+
+    suno_upload ──┬── lyric_timing
+                  └── evaluate ───┬── video_generate ── youtube_upload
+    cover_generate ───────────────┘
+
+Stages marked ``requires_approval`` wait for an approved evaluation; a
+rejected song stops there until it is approved by hand.
+"""
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.evaluation import Evaluation
+from app.models.task_queue import TaskQueue
+from app.services.render_farm import RENDER_TASK_TYPE, get_render_farm
+from app.services.scheduler import get_task_timer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A pipeline stage: a task type and the task types it waits for."""
+
+    task_type: str
+    depends_on: tuple[str, ...] = ()
+    requires_approval: bool = False
+
+
+PIPELINE: tuple[Stage, ...] = (
+    Stage("suno_upload"),
+    Stage("cover_generate"),
+    Stage("evaluate", ("suno_upload",)),
+    Stage("lyric_timing", ("suno_upload",)),
+    Stage(RENDER_TASK_TYPE, ("cover_generate", "evaluate"), requires_approval=True),
+    Stage("youtube_upload", (RENDER_TASK_TYPE,), requires_approval=True),
+)
+PIPELINE_TASK_TYPES = frozenset(stage.task_type for stage in PIPELINE)
+START_STAGE = "suno_upload"
+
+# Two stages finishing at once must not both queue their common successor
+_advance_lock = asyncio.Lock()
+
+
+def start_tasks(song_id: str, priority: int = 0) -> list[TaskQueue]:
+    """Tasks for the stages without dependencies, to start a new song's pipeline.
+
+    The ``suno_upload`` task comes first.
+
+    Args:
+        song_id: Song identifier
+        priority: Priority for the tasks
+
+    Returns:
+        Unsaved pending tasks
+    """
+    return [
+        TaskQueue(task_type=stage.task_type, song_id=song_id, priority=priority, status="pending")
+        for stage in PIPELINE
+        if not stage.depends_on
+    ]
+
+
+async def _current_run(db: AsyncSession, song_id: str) -> dict[str, TaskQueue]:
+    """Latest task per type since the song was last sent to Suno.
+
+    Tasks older than the latest ``suno_upload`` belong to an earlier run
+    and do not count, so re-uploading a song runs its later stages again.
+    """
+    result = await db.execute(
+        select(TaskQueue).where(TaskQueue.song_id == song_id).order_by(TaskQueue.id)
+    )
+    tasks = result.scalars().all()
+    start_ids = [task.id for task in tasks if task.task_type == START_STAGE]
+    run_start = start_ids[-1] if start_ids else 0
+    return {task.task_type: task for task in tasks if task.id >= run_start}
+
+
+async def _is_approved(db: AsyncSession, song_id: str) -> bool:
+    result = await db.execute(
+        select(Evaluation.id).where(Evaluation.song_id == song_id, Evaluation.approved == True)  # noqa: E712
+    )
+    return result.first() is not None
+
+
+def _payload(stage: Stage, run: dict[str, TaskQueue]) -> Optional[str]:
+    """Pass the cover from cover_generate on to the video render."""
+    if stage.task_type != RENDER_TASK_TYPE or "cover_generate" not in run:
+        return None
+    result = json.loads(run["cover_generate"].result_json or "{}")
+    return json.dumps({"thumbnail": result["cover_path"]}) if result.get("cover_path") else None
+
+
+async def advance_pipeline(
+    db: AsyncSession,
+    song_id: Optional[str],
+    priority: int = 0,
+    start: bool = False,
+) -> list[TaskQueue]:
+    """Queue every stage of a song's pipeline whose dependencies are done.
+
+    Each stage runs at most once per run. Stages without dependencies are
+    only queued when ``start`` is set. Commits the session.
+
+    Args:
+        db: Database session
+        song_id: Song identifier (no-op for tasks without a song)
+        priority: Priority for the new tasks
+        start: Also queue the stages without dependencies
+
+    Returns:
+        Newly queued tasks
+    """
+    if not song_id:
+        return []
+
+    async with _advance_lock:
+        run = await _current_run(db, song_id)
+        approved: Optional[bool] = None
+        created = []
+
+        for stage in PIPELINE:
+            if stage.task_type in run or (not stage.depends_on and not start):
+                continue
+            if not all(dep in run and run[dep].status == "completed" for dep in stage.depends_on):
+                continue
+            if stage.requires_approval:
+                if approved is None:
+                    approved = await _is_approved(db, song_id)
+                if not approved:
+                    continue
+
+            task = TaskQueue(
+                task_type=stage.task_type,
+                song_id=song_id,
+                priority=priority,
+                status="pending",
+                payload_json=_payload(stage, run),
+            )
+            db.add(task)
+            created.append(task)
+
+        await db.commit()
+
+    if created:
+        logger.info(
+            f"Pipeline for song {song_id}: queued {', '.join(task.task_type for task in created)}"
+        )
+    if any(task.task_type == RENDER_TASK_TYPE for task in created):
+        get_render_farm().wake()
+    if created:
+        get_task_timer().wake()
+    return created
+
+
+async def on_task_completed(db: AsyncSession, task: TaskQueue) -> list[TaskQueue]:
+    """Advance the pipeline of a task's song after the task completed.
+
+    Args:
+        db: Database session
+        task: The completed task
+
+    Returns:
+        Newly queued tasks
+    """
+    if task.task_type not in PIPELINE_TASK_TYPES:
+        return []
+    try:
+        return await advance_pipeline(db, task.song_id, task.priority)
+    except Exception as e:
+        # The completed task stays completed; the next completion retries
+        logger.error(f"Failed to advance pipeline after task {task.id}: {e}")
+        await db.rollback()
+        return []
@@ -0,0 +1,305 @@
+"""Parallel video rendering for queued video_generate tasks.
+
+The render farm claims pending ``video_generate`` tasks and runs several FFmpeg
+encodes at once, each capped to a fixed number of threads. The number of
+concurrent jobs defaults to the CPU count divided by the threads per job, so a
+large batch keeps every core busy without one encode saturating the machine.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import select
+
+from app.config import get_settings
+from app.database import get_session_local
+from app.models.song import Song
+from app.models.task_queue import TaskQueue
+from app.services.scheduler import get_task_timer, is_due, next_due_time, schedule_retry
+from app.services.video_generator import VideoGenerator
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+RENDER_TASK_TYPE = "video_generate"
+
+
+def default_render_slots(threads_per_job: int) -> int:
+    """Compute how many renders fit on this machine.
+
+    Args:
+        threads_per_job: FFmpeg threads given to each render
+
+    Returns:
+        Number of concurrent render jobs (at least 1)
+    """
+    return max(1, (os.cpu_count() or 1) // max(1, threads_per_job))
+
+
+def resolve_audio_path(song: Song) -> Path:
+    """Get the audio file for a song, preferring the selected variation path."""
+    if song.audio_path:
+        return Path(song.audio_path)
+    return Path(settings.DOWNLOAD_FOLDER) / f"{song.id}.mp3"
+
+
+def resolve_video_path(song_id: str) -> Path:
+    """Get the output video path for a song."""
+    return Path(settings.VIDEO_OUTPUT_PATH) / f"{song_id}.mp4"
+
+
+class RenderFarm:
+    """Schedules video_generate tasks across CPU cores."""
+
+    def __init__(
+        self,
+        max_jobs: Optional[int] = None,
+        threads_per_job: Optional[int] = None,
+    ) -> None:
+        """Initialize the render farm.
+
+        Args:
+            max_jobs: Concurrent render jobs (defaults to settings.RENDER_MAX_JOBS,
+                or a CPU-based value when that is 0)
+            threads_per_job: FFmpeg threads per job (defaults to
+                settings.RENDER_THREADS_PER_JOB)
+        """
+        self.threads_per_job = threads_per_job or settings.RENDER_THREADS_PER_JOB
+        self.max_jobs = (
+            max_jobs
+            or settings.RENDER_MAX_JOBS
+            or default_render_slots(self.threads_per_job)
+        )
+        self.video_generator = VideoGenerator(threads=self.threads_per_job)
+        self.running = False
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._active: set[asyncio.Task] = set()
+        self._wake_event = asyncio.Event()
+        self._loop_task: Optional[asyncio.Task] = None
+
+    @property
+    def free_slots(self) -> int:
+        """Number of render jobs that can start right now."""
+        return max(0, self.max_jobs - len(self._active))
+
+    async def start(self) -> None:
+        """Start the dispatch loop in the background."""
+        if self.running:
+            return
+
+        self.running = True
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_jobs, thread_name_prefix="render"
+        )
+        get_task_timer().add_listener(self.wake)
+        self._loop_task = asyncio.create_task(self._dispatch_loop())
+        logger.info(
+            f"Render farm started: {self.max_jobs} jobs x {self.threads_per_job} threads"
+        )
+
+    async def stop(self) -> None:
+        """Stop dispatching and wait for in-flight renders to finish."""
+        self.running = False
+        get_task_timer().remove_listener(self.wake)
+        self.wake()
+
+        if self._loop_task:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+
+        if self._active:
+            await asyncio.gather(*self._active, return_exceptions=True)
+
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+        logger.info("Render farm stopped")
+
+    def wake(self) -> None:
+        """Wake the dispatch loop, e.g. after new render tasks are queued."""
+        self._wake_event.set()
+
+    async def _dispatch_loop(self) -> None:
+        """Claim pending render tasks whenever a slot is free."""
+        while self.running:
+            try:
+                await self.dispatch_pending()
+            except Exception as e:
+                logger.error(f"Render farm dispatch error: {e}")
+
+            self._wake_event.clear()
+            try:
+                await asyncio.wait_for(
+                    self._wake_event.wait(), timeout=settings.WORKER_CHECK_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def dispatch_pending(self) -> int:
+        """Claim as many pending render tasks as there are free slots.
+
+        Returns:
+            Number of render jobs started
+        """
+        slots = self.free_slots
+        if slots == 0:
+            return 0
+
+        task_ids = await self._claim_tasks(slots)
+        for task_id in task_ids:
+            job = asyncio.create_task(self._run_task(task_id))
+            self._active.add(job)
+            job.add_done_callback(self._on_job_done)
+
+        if task_ids:
+            logger.info(f"Render farm started {len(task_ids)} job(s), {len(self._active)} active")
+        return len(task_ids)
+
+    def _on_job_done(self, job: asyncio.Task) -> None:
+        """Release a slot and look for more work."""
+        self._active.discard(job)
+        if self.running:
+            self.wake()
+
+    async def _claim_tasks(self, limit: int) -> list[int]:
+        """Mark up to ``limit`` pending render tasks as running.
+
+        Args:
+            limit: Maximum number of tasks to claim
+
+        Returns:
+            IDs of the claimed tasks
+        """
+        session_local = get_session_local()
+        async with session_local() as db:
+            result = await db.execute(
+                select(TaskQueue)
+                .where(
+                    TaskQueue.status == "pending",
+                    TaskQueue.task_type == RENDER_TASK_TYPE,
+                    is_due(),
+                )
+                .order_by(TaskQueue.priority.desc(), TaskQueue.created_at.asc())
+                .limit(limit)
+            )
+            tasks = result.scalars().all()
+
+            if len(tasks) < limit:
+                # Wake up again when the next delayed render is due
+                next_due = await next_due_time(db, TaskQueue.task_type == RENDER_TASK_TYPE)
+                if next_due:
+                    get_task_timer().schedule(next_due)
+
+            now = datetime.utcnow()
+            for task in tasks:
+                task.status = "running"
+                task.started_at = now
+            await db.commit()
+
+            return [task.id for task in tasks]
+
+    async def _run_task(self, task_id: int) -> None:
+        """Render the video for one claimed task and record the outcome.
+
+        Args:
+            task_id: ID of a running video_generate task
+        """
+        session_local = get_session_local()
+        async with session_local() as db:
+            task = await db.get(TaskQueue, task_id)
+            if task is None:
+                return
+
+            try:
+                song = await db.get(Song, task.song_id)
+                if song is None:
+                    raise ValueError(f"Song not found: {task.song_id}")
+
+                payload = json.loads(task.payload_json) if task.payload_json else {}
+                video_path = await self.render_song(song, payload)
+
+                task.status = "completed"
+                task.completed_at = datetime.utcnow()
+                task.result_json = json.dumps({"video_path": str(video_path)})
+                logger.info(f"Render task {task.id} completed: {video_path}")
+
+            except Exception as e:
+                logger.error(f"Render task {task.id} failed: {e}")
+                task.retry_count = (task.retry_count or 0) + 1
+                task.error_message = str(e)
+
+                if task.retry_count >= task.max_retries:
+                    task.status = "failed"
+                    task.completed_at = datetime.utcnow()
+                else:
+                    schedule_retry(task)
+
+            await db.commit()
+
+            if task.status == "completed":
+                from app.services.pipeline import on_task_completed
+
+                await on_task_completed(db, task)
+
+    async def render_song(self, song: Song, payload: Optional[dict] = None) -> Path:
+        """Render a song's video on the farm's thread pool.
+
+        Args:
+            song: Song to render
+            payload: Optional task payload with ``thumbnail`` path
+
+        Returns:
+            Path to the rendered video
+        """
+        payload = payload or {}
+        audio_path = resolve_audio_path(song)
+        video_path = resolve_video_path(song.id)
+        thumbnail = Path(payload["thumbnail"]) if payload.get("thumbnail") else None
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            lambda: self.video_generator.generate_video(
+                audio_file=audio_path,
+                output_file=video_path,
+                thumbnail=thumbnail,
+                title=song.title,
+            ),
+        )
+
+    def get_stats(self) -> dict:
+        """Get render farm statistics.
+
+        Returns:
+            Dictionary with slot configuration and active job count
+        """
+        return {
+            "running": self.running,
+            "max_jobs": self.max_jobs,
+            "threads_per_job": self.threads_per_job,
+            "active_jobs": len(self._active),
+        }
+
+
+# Global instance
+_render_farm: Optional[RenderFarm] = None
+
+
+def get_render_farm() -> RenderFarm:
+    """Get the global render farm instance.
+
+    Returns:
+        The singleton RenderFarm instance
+    """
+    global _render_farm
+    if _render_farm is None:
+        _render_farm = RenderFarm()
+    return _render_farm
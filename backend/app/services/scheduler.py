@@ -0,0 +1,206 @@
+"""Delayed task execution: retry backoff and an in-memory wake-up timer.
+
+A task with ``run_at`` set is not picked up before that time. Failed tasks
+are retried after an exponentially growing, jittered delay instead of
+immediately, and tasks can be queued for a later time (a scheduled
+YouTube publish).
+
+``TaskTimer`` wakes the workers when the next delayed task becomes due,
+so they can wait on it instead of polling the queue. The database stays
+the source of truth: the workers re-arm the timer from the earliest
+``run_at`` on every pass, so delayed tasks survive a restart and the
+regular check interval remains a fallback.
+"""
+
+import asyncio
+import heapq
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import ColumnElement, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.task_queue import TaskQueue
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def retry_delay(
+    retry_count: int,
+    base: Optional[float] = None,
+    cap: Optional[float] = None,
+) -> float:
+    """Seconds to wait before retrying a task, with exponential backoff.
+
+    The delay doubles with every attempt up to ``cap``. Half of it is
+    randomized so that tasks failing together do not retry together.
+
+    Args:
+        retry_count: Number of failed attempts so far (1 for the first retry)
+        base: Delay before the first retry (default TASK_RETRY_BASE_DELAY)
+        cap: Maximum delay (default TASK_RETRY_MAX_DELAY)
+
+    Returns:
+        Delay in seconds
+    """
+    base = settings.TASK_RETRY_BASE_DELAY if base is None else base
+    cap = settings.TASK_RETRY_MAX_DELAY if cap is None else cap
+    delay = min(cap, base * 2 ** max(0, retry_count - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def schedule_retry(task: TaskQueue, now: Optional[datetime] = None) -> datetime:
+    """Put a failed task back to pending, due after its backoff delay.
+
+    Args:
+        task: Task whose ``retry_count`` was already incremented
+        now: Current time (default utcnow)
+
+    Returns:
+        Time the task becomes due
+    """
+    now = now or datetime.utcnow()
+    task.status = "pending"
+    task.run_at = now + timedelta(seconds=retry_delay(task.retry_count or 1))
+    get_task_timer().schedule(task.run_at)
+    return task.run_at
+
+
+def is_due(now: Optional[datetime] = None) -> ColumnElement[bool]:
+    """Filter for tasks that may run now."""
+    now = now or datetime.utcnow()
+    return or_(TaskQueue.run_at.is_(None), TaskQueue.run_at <= now)
+
+
+async def next_due_time(db: AsyncSession, *criteria: ColumnElement[bool]) -> Optional[datetime]:
+    """Earliest ``run_at`` of the pending tasks that are not due yet.
+
+    Args:
+        db: Database session
+        criteria: Extra filters, e.g. on the task type
+
+    Returns:
+        Earliest future ``run_at``, None if no task is waiting
+    """
+    result = await db.execute(
+        select(func.min(TaskQueue.run_at)).where(
+            TaskQueue.status == "pending",
+            TaskQueue.run_at > datetime.utcnow(),
+            *criteria,
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+class TaskTimer:
+    """Wakes waiting workers when a task is queued or becomes due."""
+
+    def __init__(self) -> None:
+        self._due: list[datetime] = []  # Heap of naive UTC times
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiters: set[asyncio.Future] = set()
+        self._listeners: list[Callable[[], None]] = []
+        self.generation = 0
+
+    def add_listener(self, callback: Callable[[], None]) -> None:
+        """Call ``callback`` on every wake-up (e.g. the render farm's wake)."""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[], None]) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def wake(self) -> None:
+        """Wake all waiting workers now, e.g. after a task was queued."""
+        self.generation += 1
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        for callback in list(self._listeners):
+            callback()
+
+    def schedule(self, when: Optional[datetime]) -> None:
+        """Wake the workers at ``when`` (naive UTC), or now if it has passed.
+
+        Args:
+            when: Time a delayed task becomes due; None wakes immediately
+        """
+        if when is None or when <= datetime.utcnow():
+            self.wake()
+            return
+        if when in self._due:
+            return
+        heapq.heappush(self._due, when)
+        self._arm()
+
+    def _arm(self) -> None:
+        """Point the loop timer at the earliest due time."""
+        if not self._due:
+            return
+        loop = asyncio.get_running_loop()
+        due = loop.time() + (self._due[0] - datetime.utcnow()).total_seconds()
+        if self._handle is not None:
+            if self._loop is loop and self._handle.when() <= due:
+                return
+            self._handle.cancel()
+        self._loop = loop
+        self._handle = loop.call_at(due, self._fire)
+
+    def _fire(self) -> None:
+        self._handle = None
+        now = datetime.utcnow()
+        while self._due and self._due[0] <= now:
+            heapq.heappop(self._due)
+        self.wake()
+        self._arm()
+
+    def pending(self) -> int:
+        """Number of future wake-ups."""
+        return len(self._due)
+
+    async def wait(self, timeout: float, generation: Optional[int] = None) -> bool:
+        """Wait for the next wake-up.
+
+        Args:
+            timeout: Maximum seconds to wait
+            generation: ``generation`` read before the caller last looked
+                for work; returns at once if a wake-up happened since
+
+        Returns:
+            True if woken, False on timeout
+        """
+        if generation is not None and generation != self.generation:
+            return True
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiters.discard(waiter)
+
+    def reset(self) -> None:
+        """Drop all scheduled wake-ups (on shutdown)."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._due.clear()
+
+
+_task_timer: Optional[TaskTimer] = None
+
+
+def get_task_timer() -> TaskTimer:
+    """Get the task timer singleton."""
+    global _task_timer
+    if _task_timer is None:
+        _task_timer = TaskTimer()
+    return _task_timer
@@ -0,0 +1,281 @@
+"""Full-text search over songs and style templates with SQLite FTS5.
+
+Each searchable table has an external-content FTS5 index (``songs_fts``,
+``style_templates_fts``) that stores only the inverted index and reads
+column text back from the base table. Triggers keep the indexes in sync
+on insert, update and delete, so searches never scan the base tables.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import Select, literal_column, select, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+SNIPPET_TOKENS = 16
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass(frozen=True)
+class FtsIndex:
+    """An FTS5 index over some text columns of a table."""
+
+    table: str
+    rowid: str  # Base table rowid column
+    columns: tuple[str, ...]
+    weights: tuple[float, ...]  # bm25 column weights, same order as columns
+
+    @property
+    def name(self) -> str:
+        return f"{self.table}_fts"
+
+
+SONGS_INDEX = FtsIndex(
+    table="songs",
+    rowid="rowid",
+    columns=("title", "lyrics", "style_prompt", "genre"),
+    weights=(10.0, 1.0, 3.0, 3.0),
+)
+TEMPLATES_INDEX = FtsIndex(
+    table="style_templates",
+    rowid="id",
+    columns=("name", "description", "tags", "style_prompt", "genre"),
+    weights=(10.0, 2.0, 5.0, 1.0, 3.0),
+)
+INDEXES = (SONGS_INDEX, TEMPLATES_INDEX)
+
+
+@dataclass
+class SearchHit:
+    """A search result with its rank and highlighted text."""
+
+    id: int | str
+    rank: float  # bm25 score, lower is better
+    highlights: dict[str, str]
+
+
+def _trigger_sql(index: FtsIndex) -> list[str]:
+    columns = ", ".join(index.columns)
+    new_values = ", ".join(f"new.{column}" for column in index.columns)
+    old_values = ", ".join(f"old.{column}" for column in index.columns)
+    insert = (
+        f"INSERT INTO {index.name}(rowid, {columns}) "
+        f"VALUES (new.{index.rowid}, {new_values});"
+    )
+    delete = (
+        f"INSERT INTO {index.name}({index.name}, rowid, {columns}) "
+        f"VALUES ('delete', old.{index.rowid}, {old_values});"
+    )
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {index.name}_ai AFTER INSERT ON {index.table} "
+        f"BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {index.name}_ad AFTER DELETE ON {index.table} "
+        f"BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {index.name}_au AFTER UPDATE OF {columns} ON {index.table} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+
+def create_search_indexes(conn: Connection) -> None:
+    """Create missing FTS5 indexes and their sync triggers.
+
+    New indexes are filled from the existing rows of their table. Safe to
+    call on every startup.
+
+    Args:
+        conn: Synchronous SQLite connection (inside a transaction)
+    """
+    if conn.dialect.name != "sqlite":
+        return
+
+    for index in INDEXES:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": index.name},
+        ).first()
+        if not exists:
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE {index.name} USING fts5("
+                f"{', '.join(index.columns)}, content='{index.table}', "
+                f"content_rowid='{index.rowid}', "
+                f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            ))
+            conn.execute(text(f"INSERT INTO {index.name}({index.name}) VALUES ('rebuild')"))
+            logger.info(f"Created full-text index {index.name}")
+
+        for statement in _trigger_sql(index):
+            conn.execute(text(statement))
+
+
+def rebuild_search_indexes(conn: Connection) -> None:
+    """Rebuild all FTS5 indexes from their base tables.
+
+    Needed if the base tables were changed with the triggers missing (e.g.
+    rows restored by a raw SQL import) or after VACUUM, which may renumber
+    the implicit rowids of ``songs``.
+    """
+    for index in INDEXES:
+        conn.execute(text(f"INSERT INTO {index.name}({index.name}) VALUES ('rebuild')"))
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """Turn free text into a safe FTS5 MATCH expression.
+
+    Every word must match; the last word also matches as a prefix so
+    results update while the user is typing. FTS5 operators and quotes
+    in the input are treated as plain text.
+
+    Returns:
+        MATCH expression, or None if the query has no searchable words
+    """
+    terms = _TERM_RE.findall(query)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    if query[-1:].isalnum():
+        quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def matching_rowids(index: FtsIndex, query: str) -> Optional[Select]:
+    """Subquery of base table rowids matching a free-text query.
+
+    Lets list endpoints filter with ``Model.id.in_(...)`` while keeping
+    their own ordering.
+
+    Returns:
+        SELECT of rowids, or None if the query has no searchable words
+    """
+    match = build_match_query(query)
+    if match is None:
+        return None
+    return (
+        select(literal_column("rowid"))
+        .select_from(table(index.name))
+        .where(text(f"{index.name} MATCH :match").bindparams(match=match))
+    )
+
+
+async def _search(
+    db: AsyncSession,
+    index: FtsIndex,
+    query: str,
+    filters: dict[str, object],
+    snippet_columns: tuple[str, ...],
+    skip: int,
+    limit: int,
+) -> tuple[int, list[SearchHit]]:
+    match = build_match_query(query)
+    if match is None:
+        return 0, []
+
+    where = [f"{index.name} MATCH :match"]
+    params: dict[str, object] = {"match": match}
+    for column, value in filters.items():
+        if value is not None:
+            where.append(f"t.{column} = :{column}")
+            params[column] = value
+    source = (
+        f"FROM {index.name} JOIN {index.table} AS t ON t.{index.rowid} = {index.name}.rowid "
+        f"WHERE {' AND '.join(where)}"
+    )
+
+    total = (await db.execute(text(f"SELECT count(*) {source}"), params)).scalar() or 0
+    if not total:
+        return 0, []
+
+    # Short columns are highlighted in full, long ones cut to a snippet
+    marks = f"'{HIGHLIGHT_START}', '{HIGHLIGHT_END}'"
+    highlight_sql = [
+        f"snippet({index.name}, {i}, {marks}, '…', {SNIPPET_TOKENS})"
+        if column in snippet_columns
+        else f"highlight({index.name}, {i}, {marks})"
+        for i, column in enumerate(index.columns)
+    ]
+    weights = ", ".join(str(weight) for weight in index.weights)
+    rows = await db.execute(
+        text(
+            f"SELECT t.id, bm25({index.name}, {weights}) AS rank, {', '.join(highlight_sql)} "
+            f"{source} ORDER BY rank LIMIT :limit OFFSET :skip"
+        ),
+        {**params, "limit": limit, "skip": skip},
+    )
+
+    hits = [
+        SearchHit(
+            id=row[0],
+            rank=float(row[1]),
+            highlights={
+                column: value
+                for column, value in zip(index.columns, row[2:])
+                if value and HIGHLIGHT_START in value
+            },
+        )
+        for row in rows
+    ]
+    return total, hits
+
+
+async def search_songs(
+    db: AsyncSession,
+    query: str,
+    genre: Optional[str] = None,
+    status: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 20,
+) -> tuple[int, list[SearchHit]]:
+    """Search songs by title, lyrics, style prompt and genre.
+
+    Args:
+        db: Database session
+        query: Free-text query
+        genre: Only songs of this genre
+        status: Only songs with this status
+        skip: Number of results to skip
+        limit: Maximum number of results
+
+    Returns:
+        Tuple of (total matches, hits ordered by relevance)
+    """
+    return await _search(
+        db, SONGS_INDEX, query, {"genre": genre, "status": status},
+        snippet_columns=("lyrics", "style_prompt"), skip=skip, limit=limit,
+    )
+
+
+async def search_templates(
+    db: AsyncSession,
+    query: str,
+    genre: Optional[str] = None,
+    mood: Optional[str] = None,
+    is_featured: Optional[bool] = None,
+    skip: int = 0,
+    limit: int = 20,
+) -> tuple[int, list[SearchHit]]:
+    """Search public style templates by name, description, tags, style and genre.
+
+    Args:
+        db: Database session
+        query: Free-text query
+        genre: Only templates of this genre
+        mood: Only templates with this mood
+        is_featured: Only featured (or non-featured) templates
+        skip: Number of results to skip
+        limit: Maximum number of results
+
+    Returns:
+        Tuple of (total matches, hits ordered by relevance)
+    """
+    return await _search(
+        db, TEMPLATES_INDEX, query,
+        {"is_public": True, "genre": genre, "mood": mood, "is_featured": is_featured},
+        snippet_columns=("description", "style_prompt"), skip=skip, limit=limit,
+    )
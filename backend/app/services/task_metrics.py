@@ -0,0 +1,97 @@
+"""Per-stage timing metrics reported by task workers.
+
+Workers (e.g. tools/suno_worker.py) report how long each stage of a task
+took, such as submit, first_seen, complete and download, plus counters
+like downloaded bytes and a failure reason. They are stored as JSON on
+the task (``TaskQueue.metrics_json``) and summarized across tasks to show
+where batch time goes.
+"""
+
+import json
+import math
+from collections import Counter, defaultdict
+from typing import Iterable, Optional
+
+
+def merge_metrics(existing_json: Optional[str], update: dict) -> str:
+    """Merge a metrics report into a task's stored metrics.
+
+    Stages and counters are merged key by key, so a worker can report
+    stages as they finish; a failure reason replaces the previous one.
+
+    Args:
+        existing_json: Stored metrics JSON (or None)
+        update: Dict with ``stages``, ``counters`` and ``failure_reason``
+
+    Returns:
+        Merged metrics JSON
+    """
+    try:
+        metrics = json.loads(existing_json) if existing_json else {}
+    except ValueError:
+        metrics = {}
+    if not isinstance(metrics, dict):
+        metrics = {}
+
+    for key in ("stages", "counters"):
+        if update.get(key):
+            metrics[key] = {**metrics.get(key, {}), **update[key]}
+    if update.get("failure_reason"):
+        metrics["failure_reason"] = update["failure_reason"]
+    return json.dumps(metrics, sort_keys=True)
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    index = max(0, math.ceil(fraction * len(values)) - 1)
+    return values[index]
+
+
+def summarize_metrics(metrics_jsons: Iterable[Optional[str]]) -> dict:
+    """Aggregate stored metrics of many tasks.
+
+    Args:
+        metrics_jsons: ``metrics_json`` values of the tasks
+
+    Returns:
+        Dict with ``tasks`` (count with metrics), ``stages`` (count, mean,
+        p50, p95 and max seconds per stage), ``counters`` (totals) and
+        ``failures`` (count per failure reason)
+    """
+    tasks = 0
+    stages: dict[str, list[float]] = defaultdict(list)
+    counters: Counter = Counter()
+    failures: Counter = Counter()
+
+    for raw in metrics_jsons:
+        try:
+            metrics = json.loads(raw) if raw else None
+        except ValueError:
+            continue
+        if not isinstance(metrics, dict):
+            continue
+        tasks += 1
+        for stage, seconds in (metrics.get("stages") or {}).items():
+            stages[stage].append(float(seconds))
+        for name, value in (metrics.get("counters") or {}).items():
+            counters[name] += float(value)
+        if metrics.get("failure_reason"):
+            failures[metrics["failure_reason"]] += 1
+
+    summaries = {}
+    for stage, values in sorted(stages.items()):
+        values.sort()
+        summaries[stage] = {
+            "count": len(values),
+            "mean_seconds": sum(values) / len(values),
+            "p50_seconds": _percentile(values, 0.5),
+            "p95_seconds": _percentile(values, 0.95),
+            "max_seconds": values[-1],
+        }
+
+    return {
+        "tasks": tasks,
+        "stages": summaries,
+        "counters": dict(counters),
+        "failures": dict(failures),
+    }
@@ -13,6 +13,7 @@ from app.config import get_settings
 from app.models.song import Song
 from app.models.suno_job import SunoJob
 from app.models.suno_variation import SunoVariation
+from app.services.media_metadata import get_media_metadata_service
 
 if TYPE_CHECKING:
     pass
@@ -110,6 +111,15 @@ class VariationService:
                 suno_job.variations, key=lambda v: v.variation_index
             )
 
+            # Persist probed duration/size once so later reads skip FFprobe
+            metadata_service = get_media_metadata_service()
+            updated = [
+                await metadata_service.fill_variation_metadata(variation)
+                for variation in variations
+            ]
+            if any(updated):
+                await db.flush()
+
             logger.info(
                 f"Found {len(variations)} variations for song {song_id} (job {suno_job.id})"
             )
@@ -121,6 +131,106 @@ class VariationService:
             )
             raise
 
+    async def rank_variations(
+        self,
+        db: AsyncSession,
+        song_id: str,
+        auto_select: bool = True,
+        margin: float | None = None,
+    ) -> list[SunoVariation]:
+        """Score all downloaded variations of a song and rank them.
+
+        Every variation of the latest SunoJob is scored in one batch by the
+        evaluator and the scores are stored on the variations. With
+        ``auto_select``, the best variation is selected when it passes
+        settings.MIN_QUALITY_SCORE and leads the runner-up by at least
+        ``margin`` points; otherwise the song is left for manual review.
+
+        Args:
+            db: Database session
+            song_id: Song identifier
+            auto_select: Whether to select a clear winner
+            margin: Score lead required to auto-select (defaults to
+                settings.VARIATION_AUTO_SELECT_MARGIN)
+
+        Returns:
+            Ranked variations, best first
+
+        Raises:
+            ValueError: If the SunoJob is not found or has no audio on disk
+        """
+        from app.services.evaluator import get_evaluator
+
+        margin = settings.VARIATION_AUTO_SELECT_MARGIN if margin is None else margin
+
+        variations = [
+            variation
+            for variation in await self.get_variations(db, song_id)
+            if not variation.is_deleted
+            and variation.audio_path
+            and Path(variation.audio_path).exists()
+        ]
+        if not variations:
+            raise ValueError(f"No downloaded variations for song: {song_id}")
+
+        scores = await get_evaluator().score_files(
+            [Path(variation.audio_path) for variation in variations], db, song_id
+        )
+
+        now = datetime.utcnow()
+        for variation, score in zip(variations, scores):
+            variation.quality_score = score
+            variation.ranked_at = now
+
+        ranked = sorted(variations, key=lambda v: v.quality_score, reverse=True)
+        best = ranked[0]
+        lead = best.quality_score - ranked[1].quality_score if len(ranked) > 1 else float("inf")
+        logger.info(
+            f"Ranked {len(ranked)} variations for song {song_id}: "
+            + ", ".join(f"#{v.variation_index}={v.quality_score:.1f}" for v in ranked)
+        )
+
+        if auto_select and best.quality_score >= settings.MIN_QUALITY_SCORE and lead >= margin:
+            # select_variation commits the scores along with the selection
+            await self.select_variation(db, song_id, best.id)
+            logger.info(f"Auto-selected variation {best.id} for song {song_id} (lead {lead:.1f})")
+        else:
+            await db.commit()
+
+        return ranked
+
+    async def rank_pending_review(
+        self, db: AsyncSession, limit: int = 50, margin: float | None = None
+    ) -> dict[str, int]:
+        """Rank variations for every song awaiting review.
+
+        Args:
+            db: Database session
+            limit: Maximum number of songs to rank
+            margin: Score lead required to auto-select
+
+        Returns:
+            Counts of ranked, auto-selected and failed songs
+        """
+        stats = {"ranked": 0, "selected": 0, "failed": 0}
+        song_ids = [song.id for song in await self.get_pending_review_songs(db, limit)]
+
+        for song_id in song_ids:
+            try:
+                ranked = await self.rank_variations(db, song_id, margin=margin)
+            except Exception as e:
+                await db.rollback()
+                logger.warning(f"Could not rank variations for song {song_id}: {e}")
+                stats["failed"] += 1
+                continue
+
+            stats["ranked"] += 1
+            if ranked[0].is_selected:
+                stats["selected"] += 1
+
+        logger.info(f"Pending review ranking complete: {stats}")
+        return stats
+
     async def select_variation(
         self,
         db: AsyncSession,
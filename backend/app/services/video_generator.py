@@ -1,15 +1,34 @@
 """Generate videos from audio files for YouTube upload."""
 
+import hashlib
 import json
 import logging
 import re
 import subprocess
 import tempfile
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from pathlib import Path
 from typing import Optional
 
+from app.config import get_settings
+from app.services.media_metadata import MediaMetadata, get_media_metadata_service
+
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Audio codecs that can be muxed into the MP4 upload container as-is
+UPLOAD_COMPATIBLE_AUDIO_CODECS = frozenset({"aac"})
+UPLOAD_COMPATIBLE_SAMPLE_RATES = frozenset({44100, 48000})
+
+# Encoder settings used whenever audio has to be transcoded
+AUDIO_ENCODE_ARGS = ['-c:a', 'aac', '-b:a', '192k']
+AUDIO_COPY_ARGS = ['-c:a', 'copy']
+
+# Frame rate of the lavfi color source; segment boundaries snap to whole frames
+LYRIC_VIDEO_FPS = 25
+# Segments shorter than this are merged into their neighbour
+MIN_SEGMENT_SECONDS = 10.0
 
 
 @dataclass
@@ -25,9 +44,78 @@ class LyricLine:
         return self.end_time - self.start_time
 
 
+def is_upload_compatible_audio(metadata: MediaMetadata) -> bool:
+    """Check whether an audio stream can be stream-copied into the MP4 output."""
+    return (
+        metadata.codec_name in UPLOAD_COMPATIBLE_AUDIO_CODECS
+        and metadata.sample_rate in UPLOAD_COMPATIBLE_SAMPLE_RATES
+    )
+
+
+def plan_lyric_segments(
+    lyric_lines: list[LyricLine],
+    duration: float,
+    segments: int
+) -> list[tuple[float, float]]:
+    """
+    Split a lyric video timeline into chunks at lyric-line boundaries.
+
+    Boundaries are placed at the line start nearest to each even split point
+    and snapped to whole frames, so no line is cut across two chunks.
+
+    Args:
+        lyric_lines: Timed lyric lines
+        duration: Total video duration in seconds
+        segments: Requested number of chunks
+
+    Returns:
+        List of (start, end) times covering the whole timeline
+    """
+    starts = sorted({
+        round(line.start_time * LYRIC_VIDEO_FPS) / LYRIC_VIDEO_FPS
+        for line in lyric_lines
+    })
+    candidates = [t for t in starts if MIN_SEGMENT_SECONDS <= t <= duration - MIN_SEGMENT_SECONDS]
+
+    boundaries = [0.0]
+    for k in range(1, segments):
+        if not candidates:
+            break
+        target = duration * k / segments
+        nearest = min(candidates, key=lambda t: abs(t - target))
+        if nearest - boundaries[-1] >= MIN_SEGMENT_SECONDS:
+            boundaries.append(nearest)
+
+    boundaries.append(duration)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
 class VideoGenerator:
     """Generates videos from audio files using FFmpeg."""
 
+    def __init__(
+        self,
+        audio_cache_dir: Optional[Path] = None,
+        threads: Optional[int] = None,
+        lyric_segments: Optional[int] = None
+    ) -> None:
+        """Initialize the video generator.
+
+        Args:
+            audio_cache_dir: Folder for cached AAC transcodes
+                (defaults to settings.AUDIO_CACHE_PATH)
+            threads: FFmpeg thread cap per encode (None lets FFmpeg decide)
+            lyric_segments: Parallel chunks per lyric video
+                (defaults to settings.LYRIC_VIDEO_SEGMENTS)
+        """
+        self.audio_cache_dir = audio_cache_dir or Path(settings.AUDIO_CACHE_PATH)
+        self.threads = threads
+        self.lyric_segments = lyric_segments or settings.LYRIC_VIDEO_SEGMENTS
+
+    def _thread_args(self) -> list[str]:
+        """FFmpeg arguments limiting encoder threads, if configured."""
+        return ['-threads', str(self.threads)] if self.threads else []
+
     def generate_video(
         self,
         audio_file: Path,
@@ -65,6 +153,9 @@ class VideoGenerator:
             # Ensure output directory exists
             output_file.parent.mkdir(parents=True, exist_ok=True)
 
+            # Stream-copy audio when possible instead of re-encoding
+            audio_input, audio_args = self.prepare_audio(audio_file)
+
             # FFmpeg command to create video from audio
             if thumbnail and thumbnail.exists():
                 # Use provided thumbnail as static image
@@ -72,13 +163,13 @@ class VideoGenerator:
                     'ffmpeg',
                     '-loop', '1',                    # Loop image
                     '-i', str(thumbnail),            # Input image
-                    '-i', str(audio_file),           # Input audio
+                    '-i', str(audio_input),          # Input audio
                     '-c:v', 'libx264',              # Video codec
                     '-tune', 'stillimage',          # Optimize for still image
-                    '-c:a', 'aac',                  # Audio codec
-                    '-b:a', '192k',                 # Audio bitrate
+                    *audio_args,                    # Audio codec (copy or AAC)
                     '-pix_fmt', 'yuv420p',          # Pixel format for compatibility
                     '-shortest',                     # End when shortest input ends
+                    *self._thread_args(),           # Thread cap per encode
                     '-y',                           # Overwrite output
                     str(output_file)
                 ]
@@ -86,15 +177,15 @@ class VideoGenerator:
                 # Generate video with waveform visualization
                 cmd = [
                     'ffmpeg',
-                    '-i', str(audio_file),
+                    '-i', str(audio_input),
                     '-filter_complex',
                     # Create waveform visualization
                     '[0:a]showwaves=s=1920x1080:mode=line:colors=white,format=yuv420p[v]',
                     '-map', '[v]',                  # Map video output
                     '-map', '0:a',                  # Map audio
                     '-c:v', 'libx264',              # Video codec
-                    '-c:a', 'aac',                  # Audio codec
-                    '-b:a', '192k',                 # Audio bitrate
+                    *audio_args,                    # Audio codec (copy or AAC)
+                    *self._thread_args(),           # Thread cap per encode
                     '-y',                           # Overwrite output
                     str(output_file)
                 ]
@@ -160,22 +251,24 @@ class VideoGenerator:
             # Escape special characters in title for FFmpeg
             escaped_title = title.replace("'", "'\\\\\\''").replace(":", "\\:")
 
+            audio_input, audio_args = self.prepare_audio(audio_file)
+
             # FFmpeg command with text overlay
             cmd = [
                 'ffmpeg',
                 '-f', 'lavfi',
                 '-i', f'color=c={background_color}:s=1920x1080:d=300',  # Color background
-                '-i', str(audio_file),              # Input audio
+                '-i', str(audio_input),             # Input audio
                 '-filter_complex',
                 # Add text overlay
                 f"[0:v]drawtext=text='{escaped_title}':fontcolor=white:fontsize=72:x=(w-text_w)/2:y=(h-text_h)/2[v]",
                 '-map', '[v]',
                 '-map', '1:a',                      # Map audio from second input
                 '-c:v', 'libx264',
-                '-c:a', 'aac',
-                '-b:a', '192k',
+                *audio_args,
                 '-pix_fmt', 'yuv420p',
                 '-shortest',
+                *self._thread_args(),
                 '-y',
                 str(output_file)
             ]
@@ -283,6 +376,21 @@ class VideoGenerator:
 
         return lines
 
+    def probe_audio(self, audio_file: Path) -> Optional[MediaMetadata]:
+        """
+        Describe the first audio stream of a file using FFprobe.
+
+        Results come from the shared media metadata cache, so a file is
+        only probed once per modification.
+
+        Args:
+            audio_file: Path to audio file
+
+        Returns:
+            MediaMetadata for the file, or None if probing fails
+        """
+        return get_media_metadata_service().probe(audio_file)
+
     def get_audio_duration(self, audio_file: Path) -> float:
         """
         Get duration of an audio file using FFprobe.
@@ -293,19 +401,86 @@ class VideoGenerator:
         Returns:
             Duration in seconds
         """
+        info = self.probe_audio(audio_file)
+        if info is None:
+            logger.warning(f"Could not get audio duration for {audio_file}")
+            return 180.0  # Default to 3 minutes
+        return info.duration
+
+    def prepare_audio(self, audio_file: Path) -> tuple[Path, list[str]]:
+        """
+        Decide how the audio track should be written into the output video.
+
+        Audio that is already upload-compatible is stream-copied. Anything
+        else is transcoded to AAC once and cached by content hash, so later
+        renders and retries of the same song copy the cached track instead
+        of encoding again.
+
+        Args:
+            audio_file: Path to the source audio file
+
+        Returns:
+            Tuple of (audio input path, FFmpeg audio codec arguments)
+        """
+        info = self.probe_audio(audio_file)
+        if info is not None and is_upload_compatible_audio(info):
+            logger.info(f"Stream-copying {info.codec_name} audio from {audio_file}")
+            return audio_file, list(AUDIO_COPY_ARGS)
+
         try:
-            cmd = [
-                'ffprobe',
-                '-v', 'quiet',
-                '-show_entries', 'format=duration',
-                '-of', 'default=noprint_wrappers=1:nokey=1',
-                str(audio_file)
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            return float(result.stdout.strip())
+            cached = self._get_cached_transcode(audio_file)
         except Exception as e:
-            logger.warning(f"Could not get audio duration: {e}")
-            return 180.0  # Default to 3 minutes
+            logger.warning(f"Could not cache AAC transcode for {audio_file}: {e}")
+            return audio_file, list(AUDIO_ENCODE_ARGS)
+
+        return cached, list(AUDIO_COPY_ARGS)
+
+    def _hash_audio_file(self, audio_file: Path) -> str:
+        """Compute a SHA-256 digest of the audio file contents."""
+        digest = hashlib.sha256()
+        with open(audio_file, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _get_cached_transcode(self, audio_file: Path) -> Path:
+        """
+        Get the cached AAC transcode for an audio file, creating it if needed.
+
+        Args:
+            audio_file: Path to the source audio file
+
+        Returns:
+            Path to the cached .m4a file
+
+        Raises:
+            subprocess.CalledProcessError: If FFmpeg fails to transcode
+        """
+        self.audio_cache_dir.mkdir(parents=True, exist_ok=True)
+        cached = self.audio_cache_dir / f"{self._hash_audio_file(audio_file)}.m4a"
+
+        if cached.exists() and cached.stat().st_size > 0:
+            logger.info(f"Reusing cached AAC transcode: {cached}")
+            return cached
+
+        # Write to a temp name first so a failed encode never looks cached
+        partial = cached.with_name(f"{cached.stem}.part.m4a")
+        cmd = [
+            'ffmpeg',
+            '-i', str(audio_file),
+            '-vn',
+            *AUDIO_ENCODE_ARGS,
+            '-y',
+            str(partial)
+        ]
+        logger.info(f"Transcoding audio to AAC cache: {audio_file} -> {cached}")
+        try:
+            subprocess.run(cmd, capture_output=True, text=True, check=True)
+            partial.replace(cached)
+        finally:
+            partial.unlink(missing_ok=True)
+
+        return cached
 
     def generate_lyric_video(
         self,
@@ -317,13 +492,16 @@ class VideoGenerator:
         text_color: str = "white",
         font_size: int = 48,
         highlight_color: str = "yellow",
-        style: str = "fade"  # fade, karaoke, scroll
+        style: str = "fade",  # fade, karaoke, scroll
+        segments: Optional[int] = None
     ) -> Path:
         """
         Generate video with animated lyrics.
 
         Creates an MP4 video with lyrics displayed and animated.
-        Supports multiple animation styles.
+        Supports multiple animation styles. With more than one segment, the
+        timeline is split at lyric-line boundaries, the chunks are encoded by
+        parallel FFmpeg processes and joined with the concat demuxer.
 
         Args:
             audio_file: Path to audio file
@@ -335,6 +513,8 @@ class VideoGenerator:
             font_size: Font size for lyrics (default: 48)
             highlight_color: Color for highlighted/active text
             style: Animation style - 'fade', 'karaoke', or 'scroll'
+            segments: Number of parallel chunks (defaults to self.lyric_segments;
+                the scroll style always renders in a single pass)
 
         Returns:
             Path to generated video file
@@ -346,6 +526,8 @@ class VideoGenerator:
         if not audio_file.exists():
             raise FileNotFoundError(f"Audio file not found: {audio_file}")
 
+        segments = segments or self.lyric_segments
+
         try:
             logger.info(f"Generating lyric video: {audio_file}")
 
@@ -362,48 +544,50 @@ class VideoGenerator:
             # Ensure output directory exists
             output_file.parent.mkdir(parents=True, exist_ok=True)
 
-            # Build FFmpeg filter based on style
-            if style == "karaoke":
-                filter_complex = self._build_karaoke_filter(
-                    lyric_lines, duration, text_color, highlight_color, font_size, title
-                )
-            elif style == "scroll":
-                filter_complex = self._build_scroll_filter(
-                    lyric_lines, duration, text_color, font_size, title
+            audio_input, audio_args = self.prepare_audio(audio_file)
+
+            plan = []
+            if segments > 1 and style != "scroll":
+                plan = plan_lyric_segments(lyric_lines, duration, segments)
+
+            if len(plan) > 1:
+                self._render_lyric_segments(
+                    plan, audio_input, audio_args, output_file, lyric_lines,
+                    background_color, text_color, font_size, highlight_color, style, title
                 )
-            else:  # fade (default)
-                filter_complex = self._build_fade_filter(
-                    lyric_lines, duration, text_color, font_size, title
+            else:
+                filter_complex = self._build_lyric_filter(
+                    style, lyric_lines, duration, text_color, highlight_color, font_size, title
                 )
 
-            # FFmpeg command
-            cmd = [
-                'ffmpeg',
-                '-f', 'lavfi',
-                '-i', f'color=c={background_color}:s=1920x1080:d={duration}',
-                '-i', str(audio_file),
-                '-filter_complex', filter_complex,
-                '-map', '[out]',
-                '-map', '1:a',
-                '-c:v', 'libx264',
-                '-preset', 'medium',
-                '-crf', '23',
-                '-c:a', 'aac',
-                '-b:a', '192k',
-                '-pix_fmt', 'yuv420p',
-                '-shortest',
-                '-y',
-                str(output_file)
-            ]
+                # FFmpeg command
+                cmd = [
+                    'ffmpeg',
+                    '-f', 'lavfi',
+                    '-i', f'color=c={background_color}:s=1920x1080:d={duration}',
+                    '-i', str(audio_input),
+                    '-filter_complex', filter_complex,
+                    '-map', '[out]',
+                    '-map', '1:a',
+                    '-c:v', 'libx264',
+                    '-preset', 'medium',
+                    '-crf', '23',
+                    *audio_args,
+                    '-pix_fmt', 'yuv420p',
+                    '-shortest',
+                    *self._thread_args(),
+                    '-y',
+                    str(output_file)
+                ]
 
-            logger.info(f"Running FFmpeg for lyric video generation")
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=600  # 10 minute timeout
-            )
+                logger.info("Running FFmpeg for lyric video generation")
+                subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                    timeout=600  # 10 minute timeout
+                )
 
             if not output_file.exists():
                 raise ValueError(f"Lyric video generation failed: {output_file} not created")
@@ -425,6 +609,124 @@ class VideoGenerator:
             logger.error(f"Lyric video generation error: {e}")
             raise
 
+    def _build_lyric_filter(
+        self,
+        style: str,
+        lyric_lines: list[LyricLine],
+        duration: float,
+        text_color: str,
+        highlight_color: str,
+        font_size: int,
+        title: Optional[str]
+    ) -> str:
+        """Build the FFmpeg filter graph for a lyric animation style."""
+        if style == "karaoke":
+            return self._build_karaoke_filter(
+                lyric_lines, duration, text_color, highlight_color, font_size, title
+            )
+        if style == "scroll":
+            return self._build_scroll_filter(
+                lyric_lines, duration, text_color, font_size, title
+            )
+        return self._build_fade_filter(  # fade (default)
+            lyric_lines, duration, text_color, font_size, title
+        )
+
+    def _render_lyric_segments(
+        self,
+        plan: list[tuple[float, float]],
+        audio_input: Path,
+        audio_args: list[str],
+        output_file: Path,
+        lyric_lines: list[LyricLine],
+        background_color: str,
+        text_color: str,
+        font_size: int,
+        highlight_color: str,
+        style: str,
+        title: Optional[str]
+    ) -> None:
+        """
+        Render a lyric video as parallel chunks joined by the concat demuxer.
+
+        Each chunk is a silent video whose drawtext filters only cover the
+        lines that fall inside it, shifted to chunk-local time. The chunks are
+        then stream-copied into one file alongside the full audio track.
+
+        Raises:
+            subprocess.CalledProcessError: If any FFmpeg process fails
+            subprocess.TimeoutExpired: If any FFmpeg process times out
+        """
+        with tempfile.TemporaryDirectory(prefix="lyric_segments_") as tmp:
+            tmp_dir = Path(tmp)
+            commands = []
+
+            for index, (start, end) in enumerate(plan):
+                # Lines overlapping the chunk, plus the following line so the
+                # karaoke preview still shows at the end of the chunk
+                inside = [
+                    line for line in lyric_lines
+                    if line.start_time < end and line.end_time > start
+                ]
+                following = [line for line in lyric_lines if line.start_time >= end][:1]
+                local_lines = [
+                    replace(line, start_time=line.start_time - start, end_time=line.end_time - start)
+                    for line in inside + following
+                ]
+
+                filter_complex = self._build_lyric_filter(
+                    style, local_lines, end - start, text_color, highlight_color,
+                    font_size, title if index == 0 else None
+                )
+                segment_file = tmp_dir / f"segment_{index:03d}.mp4"
+                commands.append([
+                    'ffmpeg',
+                    '-f', 'lavfi',
+                    '-i', f'color=c={background_color}:s=1920x1080:r={LYRIC_VIDEO_FPS}:d={end - start}',
+                    '-filter_complex', filter_complex,
+                    '-map', '[out]',
+                    '-c:v', 'libx264',
+                    '-preset', 'medium',
+                    '-crf', '23',
+                    '-pix_fmt', 'yuv420p',
+                    *self._thread_args(),
+                    '-y',
+                    str(segment_file)
+                ])
+
+            logger.info(f"Rendering lyric video in {len(commands)} parallel segments")
+            with ThreadPoolExecutor(max_workers=len(commands)) as pool:
+                futures = [
+                    pool.submit(
+                        subprocess.run, cmd,
+                        capture_output=True, text=True, check=True, timeout=600
+                    )
+                    for cmd in commands
+                ]
+                for future in futures:
+                    future.result()
+
+            concat_list = tmp_dir / "segments.txt"
+            concat_list.write_text(
+                "".join(f"file '{cmd[-1]}'\n" for cmd in commands)
+            )
+
+            cmd = [
+                'ffmpeg',
+                '-f', 'concat',
+                '-safe', '0',
+                '-i', str(concat_list),
+                '-i', str(audio_input),
+                '-map', '0:v',
+                '-map', '1:a',
+                '-c:v', 'copy',
+                *audio_args,
+                '-shortest',
+                '-y',
+                str(output_file)
+            ]
+            subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=600)
+
     def _escape_text_for_ffmpeg(self, text: str) -> str:
         """Escape special characters for FFmpeg drawtext filter."""
         # Escape characters that have special meaning in FFmpeg
@@ -632,12 +934,13 @@ class VideoGenerator:
             escaped_text = self._escape_text_for_ffmpeg(display_text.replace('\n', '\\n'))
 
             duration = self.get_audio_duration(audio_file)
+            audio_input, audio_args = self.prepare_audio(audio_file)
 
             cmd = [
                 'ffmpeg',
                 '-f', 'lavfi',
                 '-i', f'color=c={background_color}:s=1920x1080:d={duration}',
-                '-i', str(audio_file),
+                '-i', str(audio_input),
                 '-filter_complex',
                 f"[0:v]drawtext=text='{escaped_text}':"
                 f"fontcolor={text_color}:fontsize=32:"
@@ -645,10 +948,10 @@ class VideoGenerator:
                 '-map', '[out]',
                 '-map', '1:a',
                 '-c:v', 'libx264',
-                '-c:a', 'aac',
-                '-b:a', '192k',
+                *audio_args,
                 '-pix_fmt', 'yuv420p',
                 '-shortest',
+                *self._thread_args(),
                 '-y',
                 str(output_file)
             ]
@@ -1,9 +1,10 @@
 """Background worker for processing async tasks."""
 
 import asyncio
+import json
 import logging
+import uuid
 from datetime import datetime
-from pathlib import Path
 from typing import Optional
 
 from sqlalchemy import select
@@ -14,11 +15,27 @@ from app.database import get_session_local
 from app.models.evaluation import Evaluation
 from app.models.song import Song
 from app.models.task_queue import TaskQueue
+from app.models.video_project import VideoProject
 from app.models.youtube_upload import YouTubeUpload
+from app.services.pipeline import on_task_completed
+from app.services.render_farm import (
+    RENDER_TASK_TYPE,
+    get_render_farm,
+    resolve_audio_path,
+    resolve_video_path,
+)
+from app.services.scheduler import get_task_timer, is_due, next_due_time, schedule_retry
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Processed outside this pool: Suno tasks by tools/suno_worker.py, renders by the render farm
+EXTERNAL_TASK_TYPES = ("suno_upload", "suno_download", RENDER_TASK_TYPE)
+
+
+class PermanentTaskError(ValueError):
+    """A task failure that a retry cannot fix; the task fails without retries."""
+
 
 class BackgroundWorker:
     """Background worker for processing tasks from the queue."""
@@ -38,35 +55,53 @@ class BackgroundWorker:
         self.running = True
         logger.info(f"Worker {self.worker_id} starting")
 
+        timer = get_task_timer()
         while self.running:
+            generation = timer.generation
             try:
-                await self.process_next_task()
+                if await self.process_next_task():
+                    continue
             except Exception as e:
                 logger.error(f"Worker {self.worker_id} error: {e}")
 
-            # Wait before checking for next task
-            await asyncio.sleep(settings.WORKER_CHECK_INTERVAL)
+            # Sleep until a task is queued or the next delayed task is due
+            await timer.wait(settings.WORKER_CHECK_INTERVAL, generation)
 
     async def stop(self) -> None:
         """Stop the worker."""
         self.running = False
         logger.info(f"Worker {self.worker_id} stopped")
 
-    async def process_next_task(self) -> None:
-        """Process the next pending task from the queue."""
+    async def process_next_task(self) -> bool:
+        """Process the next due pending task from the queue.
+
+        Returns:
+            True if a task was processed, False if none was due
+        """
         session_local = get_session_local()
         async with session_local() as db:
-            # Get next pending task (ordered by priority desc, created_at asc)
+            # Get next due pending task (ordered by priority desc, created_at asc).
+            # Suno and render tasks are picked up by their own workers.
             result = await db.execute(
                 select(TaskQueue)
-                .where(TaskQueue.status == "pending")
+                .where(
+                    TaskQueue.status == "pending",
+                    TaskQueue.task_type.notin_(EXTERNAL_TASK_TYPES),
+                    is_due(),
+                )
                 .order_by(TaskQueue.priority.desc(), TaskQueue.created_at.asc())
                 .limit(1)
             )
             task = result.scalar_one_or_none()
 
             if not task:
-                return
+                # Wake up again when the next delayed task is due
+                next_due = await next_due_time(
+                    db, TaskQueue.task_type.notin_(EXTERNAL_TASK_TYPES)
+                )
+                if next_due:
+                    get_task_timer().schedule(next_due)
+                return False
 
             # Mark as running
             task.status = "running"
@@ -89,6 +124,9 @@ class BackgroundWorker:
 
                 logger.info(f"Worker {self.worker_id} completed task {task.id}")
 
+                # Queue the song's next pipeline stages
+                await on_task_completed(db, task)
+
             except Exception as e:
                 logger.error(
                     f"Worker {self.worker_id} task {task.id} failed: {e}"
@@ -98,16 +136,20 @@ class BackgroundWorker:
                 task.retry_count = (task.retry_count or 0) + 1
                 task.error_message = str(e)
 
-                if task.retry_count >= task.max_retries:
+                if isinstance(e, PermanentTaskError):
+                    task.status = "failed"
+                    task.completed_at = datetime.utcnow()
+                    logger.error(f"Task {task.id} failed permanently, not retrying")
+                elif task.retry_count >= task.max_retries:
                     task.status = "failed"
                     task.completed_at = datetime.utcnow()
                     logger.error(
                         f"Task {task.id} failed after {task.retry_count} retries"
                     )
                 else:
-                    task.status = "pending"
+                    run_at = schedule_retry(task)
                     logger.info(
-                        f"Task {task.id} will be retried "
+                        f"Task {task.id} will be retried at {run_at:%H:%M:%S} "
                         f"(attempt {task.retry_count}/{task.max_retries})"
                     )
 
@@ -116,6 +158,8 @@ class BackgroundWorker:
             finally:
                 self.current_task = None
 
+            return True
+
     async def execute_task(
         self, task: TaskQueue, db: AsyncSession
     ) -> None:
@@ -138,6 +182,12 @@ class BackgroundWorker:
             return
         elif task.task_type == "evaluate":
             await self.execute_evaluation(task, db)
+        elif task.task_type == "cover_generate":
+            await self.execute_cover_generate(task, db)
+        elif task.task_type == "lyric_timing":
+            await self.execute_lyric_timing(task, db)
+        elif task.task_type == "rank_variations":
+            await self.execute_rank_variations(task, db)
         elif task.task_type == "youtube_upload":
             await self.execute_youtube_upload(task, db)
         else:
@@ -174,22 +224,123 @@ class BackgroundWorker:
         notification_service = get_notification_service()
         await notification_service.notify_evaluation_complete(song, evaluation)
 
-        # If approved, create YouTube upload task
+        # Approved songs continue to video and YouTube upload via the pipeline
         if evaluation.approved:
-            youtube_task = TaskQueue(
-                task_type="youtube_upload",
-                song_id=task.song_id,
-                status="pending",
-                priority=task.priority,
-            )
-            db.add(youtube_task)
-            await db.commit()
-            logger.info(
-                f"Song {task.song_id} approved - YouTube upload task created"
-            )
+            logger.info(f"Song {task.song_id} approved")
 
         logger.info(f"Evaluation complete for song {task.song_id}")
 
+    async def execute_cover_generate(
+        self, task: TaskQueue, db: AsyncSession
+    ) -> None:
+        """Execute cover art generation task.
+
+        Args:
+            task: The task to execute
+            db: Database session
+
+        Raises:
+            ValueError: If song not found
+        """
+        from app.services.cover_generator import generate_cover
+
+        result = await db.execute(
+            select(Song).where(Song.id == task.song_id)
+        )
+        song = result.scalar_one_or_none()
+
+        if not song:
+            raise ValueError(f"Song not found: {task.song_id}")
+
+        payload = json.loads(task.payload_json) if task.payload_json else {}
+        cover_path = await generate_cover(
+            title=song.title,
+            genre=song.genre,
+            song_id=song.id,
+            method=payload.get("method", "template"),
+            template_id=payload.get("template_id"),
+            style_prompt=song.style_prompt,
+        )
+        task.result_json = json.dumps({"cover_path": str(cover_path)})
+
+        logger.info(f"Cover generated for song {task.song_id}: {cover_path}")
+
+    async def execute_lyric_timing(
+        self, task: TaskQueue, db: AsyncSession
+    ) -> None:
+        """Execute lyric timing task on the song's downloaded audio.
+
+        Line and per-word timing are stored on the song's latest video
+        project, which is created if the song has none yet.
+
+        Args:
+            task: The task to execute
+            db: Database session
+
+        Raises:
+            ValueError: If song not found
+            FileNotFoundError: If the song's audio has not been downloaded
+        """
+        from app.services.lyric_timing import LyricTimingService
+
+        result = await db.execute(
+            select(Song).where(Song.id == task.song_id)
+        )
+        song = result.scalar_one_or_none()
+
+        if not song:
+            raise ValueError(f"Song not found: {task.song_id}")
+
+        audio_path = resolve_audio_path(song)
+        if not audio_path.exists():
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+        service = LyricTimingService()
+        word_timing = await service.generate_word_timing(audio_path, song.lyrics)
+        timing = [
+            {key: value for key, value in line.items() if key != "words"}
+            for line in word_timing
+        ]
+
+        result = await db.execute(
+            select(VideoProject)
+            .where(VideoProject.song_id == song.id)
+            .order_by(VideoProject.created_at.desc())
+            .limit(1)
+        )
+        project = result.scalar_one_or_none()
+        if project is None:
+            project = VideoProject(id=str(uuid.uuid4()), song_id=song.id)
+            db.add(project)
+
+        project.lyric_timing_json = service.timing_to_json(timing)
+        project.word_timing_json = service.timing_to_json(word_timing)
+        task.result_json = json.dumps({"timing": timing, "video_project_id": project.id})
+
+        logger.info(
+            f"Lyric timing generated for song {task.song_id}: {len(timing)} lines, "
+            f"{sum(len(line['words']) for line in word_timing)} words"
+        )
+
+    async def execute_rank_variations(
+        self, task: TaskQueue, db: AsyncSession
+    ) -> None:
+        """Execute variation ranking task.
+
+        Args:
+            task: The task to execute
+            db: Database session
+        """
+        from app.services.variation_service import get_variation_service
+
+        ranked = await get_variation_service().rank_variations(db, task.song_id)
+
+        task.result_json = json.dumps({
+            "scores": {str(v.id): v.quality_score for v in ranked},
+            "selected_variation_id": ranked[0].id if ranked[0].is_selected else None,
+        })
+        logger.info(f"Variation ranking complete for song {task.song_id}")
+
     async def execute_youtube_upload(
         self, task: TaskQueue, db: AsyncSession
     ) -> None:
@@ -201,9 +352,10 @@ class BackgroundWorker:
 
         Raises:
             ValueError: If song not found or not approved
+            PermanentTaskError: If the audio matches an already published song
         """
+        from app.services.audio_fingerprint import get_fingerprint_service
         from app.services.notification import get_notification_service
-        from app.services.video_generator import get_video_generator
         from app.services.youtube_uploader import get_youtube_uploader
 
         logger.info(f"Uploading song {task.song_id} to YouTube")
@@ -227,16 +379,27 @@ class BackgroundWorker:
         if not evaluation:
             raise ValueError(f"Song {task.song_id} is not approved for YouTube upload")
 
-        # Generate video
-        video_generator = get_video_generator()
-        audio_path = Path(settings.DOWNLOAD_FOLDER) / f"{song.id}.mp3"
-        video_path = Path(settings.VIDEO_OUTPUT_PATH) / f"{song.id}.mp4"
+        # Don't spend upload quota on audio that is already published
+        duplicates = await get_fingerprint_service().find_similar(db, song.id)
+        if duplicates:
+            published = await db.execute(
+                select(Song.id).where(
+                    Song.id.in_([match.song_id for match in duplicates if match.song_id]),
+                    Song.status == "published",
+                )
+            )
+            published_ids = published.scalars().all()
+            if published_ids:
+                raise PermanentTaskError(
+                    f"Song {task.song_id} sounds like published song(s) {', '.join(published_ids)}"
+                )
 
-        video_generator.generate_video(
-            audio_file=audio_path,
-            output_file=video_path,
-            title=song.title,
-        )
+        # Reuse a video already rendered by the render farm, else render now
+        video_path = resolve_video_path(song.id)
+        if video_path.exists():
+            logger.info(f"Using pre-rendered video for song {song.id}: {video_path}")
+        else:
+            video_path = await get_render_farm().render_song(song)
 
         # Upload to YouTube
         youtube_uploader = get_youtube_uploader()
@@ -253,7 +416,7 @@ class BackgroundWorker:
             video_id=upload_result.get("video_id"),
             upload_status="published",
             title=song.title,
-            scheduled_time=None,
+            scheduled_time=task.scheduled_at,
         )
         db.add(youtube_upload)
 
@@ -312,6 +475,7 @@ class WorkerPool:
         # Wait for cancellation
         if self.tasks:
             await asyncio.gather(*self.tasks, return_exceptions=True)
+        get_task_timer().reset()
 
         self.workers.clear()
         self.tasks.clear()
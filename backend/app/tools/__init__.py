@@ -0,0 +1 @@
+"""Command-line maintenance tools run with ``python -m app.tools.<name>``."""
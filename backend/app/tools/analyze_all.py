@@ -0,0 +1,315 @@
+"""Batch audio analysis for backfilling the catalog.
+
+Discovers audio files, skips files whose analysis is already stored for the
+same size and mtime, analyzes the rest across a process pool and writes the
+results to the audio_analyses table in batched transactions. Each file is
+decoded once for its features, quality metrics and landmark fingerprint:
+files up to AUDIO_STREAMING_MIN_SECONDS with librosa (warmed up once per
+worker process), longer ones in streaming mode.
+
+Usage:
+    python -m app.tools.analyze_all [--folder PATH] [--workers N] [--batch-size N]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import select
+
+from app.config import get_settings
+from app.database import get_session_local, init_db
+from app.models.audio_analysis import AudioAnalysis
+from app.models.song import Song
+from app.models.suno_job import SunoJob
+from app.models.suno_variation import SunoVariation
+from app.services.audio_analyzer import AudioAnalyzer, _get_librosa
+from app.services.audio_fingerprint import store_fingerprint
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+AUDIO_EXTENSIONS = frozenset({".mp3", ".m4a", ".wav", ".flac", ".ogg"})
+
+# Analyzer owned by each pool process (set by _init_worker)
+_worker_analyzer: Optional[AudioAnalyzer] = None
+
+
+def discover_audio_files(folder: Path) -> list[Path]:
+    """Find audio files below a folder.
+
+    Args:
+        folder: Folder to scan recursively
+
+    Returns:
+        Sorted list of audio file paths
+    """
+    return sorted(
+        path for path in folder.rglob("*")
+        if path.is_file() and path.suffix.lower() in AUDIO_EXTENSIONS
+    )
+
+
+def _init_worker() -> None:
+    """Create the worker's analyzer and warm up librosa.
+
+    Importing librosa and running the beat tracker once compiles its numba
+    kernels, so the first real file in each process is not slowed down.
+    """
+    global _worker_analyzer
+    _worker_analyzer = AudioAnalyzer()
+
+    librosa = _get_librosa()
+    if librosa is not None:
+        noise = np.random.default_rng(0).normal(0, 0.1, 22050 * 2).astype(np.float32)
+        librosa.beat.beat_track(y=noise, sr=22050)
+        librosa.onset.onset_strength(y=noise, sr=22050)
+
+
+def _analyze_file(path_str: str) -> dict:
+    """Analyze one file inside a pool process.
+
+    Args:
+        path_str: Path to the audio file
+
+    Returns:
+        Dictionary with the path, file stat, features, quality metrics and
+        fingerprint (features is None on failure)
+    """
+    path = Path(path_str)
+    stat = path.stat()
+    result = {
+        "audio_path": path_str,
+        "file_size_bytes": stat.st_size,
+        "file_mtime_ns": stat.st_mtime_ns,
+        "features": None,
+    }
+
+    try:
+        features, metrics, fingerprint = _worker_analyzer.analyze_with_quality(path)
+    except Exception as e:
+        logger.error(f"Audio analysis failed for {path}: {e}")
+        return result
+
+    result["features"] = asdict(features)
+    result["quality"] = asdict(metrics)
+    result["fingerprint"] = fingerprint.to_bytes()
+    return result
+
+
+async def load_analyzed(session_local) -> dict[str, tuple[int, int]]:
+    """Load stat info for every stored analysis.
+
+    Returns:
+        Mapping of audio path to (file_size_bytes, file_mtime_ns)
+    """
+    async with session_local() as db:
+        result = await db.execute(
+            select(AudioAnalysis.audio_path, AudioAnalysis.file_size_bytes, AudioAnalysis.file_mtime_ns)
+        )
+        return {path: (size, mtime) for path, size, mtime in result.all()}
+
+
+async def load_song_paths(session_local) -> dict[str, str]:
+    """Map known song and variation audio paths to their song IDs.
+
+    Returns:
+        Mapping of resolved audio path to song ID
+    """
+    async with session_local() as db:
+        songs = await db.execute(
+            select(Song.audio_path, Song.id).where(Song.audio_path.isnot(None))
+        )
+        variations = await db.execute(
+            select(SunoVariation.audio_path, SunoJob.song_id)
+            .join(SunoJob, SunoVariation.suno_job_id == SunoJob.id)
+            .where(SunoVariation.audio_path.isnot(None))
+        )
+
+    paths = {}
+    for audio_path, song_id in [*variations.all(), *songs.all()]:
+        paths[str(Path(audio_path).resolve())] = song_id
+    return paths
+
+
+def select_pending(
+    files: list[Path],
+    analyzed: dict[str, tuple[int, int]],
+    force: bool = False
+) -> list[Path]:
+    """Drop files whose stored analysis matches their current size and mtime.
+
+    Args:
+        files: Candidate audio files
+        analyzed: Stored (size, mtime) per path
+        force: Re-analyze every file
+
+    Returns:
+        Files that need analysis
+    """
+    if force:
+        return files
+
+    pending = []
+    for path in files:
+        stat = path.stat()
+        if analyzed.get(str(path)) != (stat.st_size, stat.st_mtime_ns):
+            pending.append(path)
+    return pending
+
+
+async def write_batch(session_local, results: list[dict], song_paths: dict[str, str]) -> int:
+    """Upsert a batch of analysis results in one transaction.
+
+    Args:
+        session_local: Session factory
+        results: Worker results with features
+        song_paths: Mapping of resolved audio path to song ID
+
+    Returns:
+        Number of rows written
+    """
+    rows = [result for result in results if result["features"]]
+    if not rows:
+        return 0
+
+    async with session_local() as db:
+        existing = await db.execute(
+            select(AudioAnalysis).where(
+                AudioAnalysis.audio_path.in_([row["audio_path"] for row in rows])
+            )
+        )
+        by_path = {analysis.audio_path: analysis for analysis in existing.scalars().all()}
+
+        for row in rows:
+            features = dict(row["features"])
+            beat_times = features.pop("beat_times")
+
+            analysis = by_path.get(row["audio_path"])
+            if analysis is None:
+                analysis = AudioAnalysis(audio_path=row["audio_path"])
+                db.add(analysis)
+
+            analysis.file_size_bytes = row["file_size_bytes"]
+            analysis.file_mtime_ns = row["file_mtime_ns"]
+            analysis.song_id = song_paths.get(str(Path(row["audio_path"]).resolve()))
+            analysis.beat_times_json = json.dumps([round(t, 3) for t in beat_times])
+            for field, value in {**features, **row.get("quality", {})}.items():
+                setattr(analysis, field, value)
+            if row.get("fingerprint"):
+                store_fingerprint(analysis, *row["fingerprint"])
+
+        await db.commit()
+
+    return len(rows)
+
+
+async def analyze_all(
+    folder: Path,
+    workers: int,
+    batch_size: int = 50,
+    force: bool = False,
+    limit: Optional[int] = None
+) -> dict:
+    """Analyze every new or changed audio file in a folder.
+
+    Args:
+        folder: Folder to scan
+        workers: Number of pool processes
+        batch_size: Results per database transaction
+        force: Re-analyze files that already have a stored analysis
+        limit: Analyze at most this many files
+
+    Returns:
+        Summary with file counts, elapsed seconds and songs per minute
+    """
+    await init_db()
+    session_local = get_session_local()
+
+    files = discover_audio_files(folder)
+    pending = select_pending(files, await load_analyzed(session_local), force)
+    if limit is not None:
+        pending = pending[:limit]
+    song_paths = await load_song_paths(session_local)
+
+    logger.info(
+        f"Found {len(files)} audio files, {len(files) - len(pending)} already analyzed, "
+        f"analyzing {len(pending)} with {workers} workers"
+    )
+
+    started = time.monotonic()
+    stored = failed = done = 0
+    buffer: list[dict] = []
+    loop = asyncio.get_running_loop()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [loop.run_in_executor(pool, _analyze_file, str(path)) for path in pending]
+
+        for future in asyncio.as_completed(futures):
+            try:
+                result = await future
+            except Exception as e:
+                logger.error(f"Analysis worker failed: {e}")
+                result = None
+
+            done += 1
+            if result is None or result["features"] is None:
+                failed += 1
+            else:
+                buffer.append(result)
+
+            if len(buffer) >= batch_size or done == len(pending):
+                stored += await write_batch(session_local, buffer, song_paths)
+                buffer = []
+
+                elapsed = time.monotonic() - started
+                logger.info(
+                    f"{done}/{len(pending)} analyzed ({failed} failed), "
+                    f"{done / elapsed * 60:.1f} songs/min"
+                )
+
+    elapsed = time.monotonic() - started
+    return {
+        "discovered": len(files),
+        "skipped": len(files) - len(pending),
+        "analyzed": stored,
+        "failed": failed,
+        "elapsed_seconds": round(elapsed, 1),
+        "songs_per_minute": round(done / elapsed * 60, 1) if done and elapsed > 0 else 0.0,
+    }
+
+
+def main() -> None:
+    """Parse arguments and run the backfill."""
+    parser = argparse.ArgumentParser(description="Analyze all audio files into the analysis store")
+    parser.add_argument(
+        "--folder", type=Path, default=Path(settings.DOWNLOAD_FOLDER),
+        help="Folder to scan (default: DOWNLOAD_FOLDER)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1,
+        help="Number of worker processes (default: CPU count)"
+    )
+    parser.add_argument("--batch-size", type=int, default=50, help="Results per DB transaction")
+    parser.add_argument("--force", action="store_true", help="Re-analyze already analyzed files")
+    parser.add_argument("--limit", type=int, default=None, help="Analyze at most N files")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    summary = asyncio.run(
+        analyze_all(args.folder, args.workers, args.batch_size, args.force, args.limit)
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Lyric near-duplicate index maintenance and lookup.
+
+Updates the MinHash/LSH lyric index from the generated songs folder (only
+new or changed files are re-hashed) and queries it for the nearest
+neighbors of a song file or of every indexed song.
+
+Usage:
+    python -m app.tools.lyric_duplicates update [--folder PATH]
+    python -m app.tools.lyric_duplicates query FILE.md [--limit N] [--min-similarity X]
+    python -m app.tools.lyric_duplicates scan [--min-similarity X]
+"""
+
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+
+from app.config import get_settings
+from app.services.lyric_index import LyricIndex, read_song_file, song_key
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def update_index(index_path: Path, folder: Path) -> dict:
+    """Sync the persisted index with a folder and save it.
+
+    Args:
+        index_path: Index directory
+        folder: Generated songs folder
+
+    Returns:
+        Update counts, index size and elapsed seconds
+    """
+    started = time.monotonic()
+    index = LyricIndex.load(index_path)
+    stats = index.update_from_folder(folder)
+    if index.dirty:
+        index.save(index_path)
+    return {**stats, "indexed": len(index), "elapsed_seconds": round(time.monotonic() - started, 2)}
+
+
+def query_file(index: LyricIndex, path: Path, limit: int, min_similarity: float) -> list[dict]:
+    """Find the nearest neighbors of a song file.
+
+    Args:
+        index: Lyric index
+        path: Song file to check
+        limit: Maximum number of matches
+        min_similarity: Minimum estimated Jaccard similarity
+
+    Returns:
+        Matches as dictionaries, most similar first
+    """
+    title, lyrics = read_song_file(path)
+    matches = index.query(title, lyrics, limit, min_similarity, exclude=song_key(path))
+    return [vars(match) for match in matches]
+
+
+def scan_folder(index: LyricIndex, folder: Path, min_similarity: float) -> list[dict]:
+    """List every pair of near-duplicate songs in a folder.
+
+    Args:
+        index: Lyric index covering the folder
+        folder: Generated songs folder
+        min_similarity: Minimum estimated Jaccard similarity
+
+    Returns:
+        One entry per pair, most similar first
+    """
+    pairs = {}
+    for path in sorted(folder.rglob("*.md")):
+        key = song_key(path)
+        for match in query_file(index, path, limit=10, min_similarity=min_similarity):
+            pair = tuple(sorted((key, match["key"])))
+            pairs[pair] = max(pairs.get(pair, 0.0), match["similarity"])
+
+    return [
+        {"songs": list(pair), "similarity": similarity}
+        for pair, similarity in sorted(pairs.items(), key=lambda item: item[1], reverse=True)
+    ]
+
+
+def main() -> None:
+    """Parse arguments and run the command."""
+    parser = argparse.ArgumentParser(description="Lyric near-duplicate index")
+    parser.add_argument(
+        "--index", type=Path, default=Path(settings.LYRIC_INDEX_PATH),
+        help="Index directory (default: LYRIC_INDEX_PATH)"
+    )
+    parser.add_argument(
+        "--folder", type=Path, default=Path(settings.WATCH_FOLDER),
+        help="Generated songs folder (default: WATCH_FOLDER)"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("update", help="Index new and changed song files")
+
+    query = subparsers.add_parser("query", help="Find songs similar to a song file")
+    query.add_argument("file", type=Path)
+    query.add_argument("--limit", type=int, default=5)
+    query.add_argument("--min-similarity", type=float, default=settings.LYRIC_MATCH_THRESHOLD)
+
+    scan = subparsers.add_parser("scan", help="List all near-duplicate pairs")
+    scan.add_argument("--min-similarity", type=float, default=settings.LYRIC_MATCH_THRESHOLD)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.command == "update":
+        result = update_index(args.index, args.folder)
+    else:
+        update_index(args.index, args.folder)
+        index = LyricIndex.load(args.index)
+        if args.command == "query":
+            result = query_file(index, args.file, args.limit, args.min_similarity)
+        else:
+            result = scan_folder(index, args.folder, args.min_similarity)
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Benchmark vectorized lyric timing against the original loop implementation.
+
+Generates synthetic songs (line counts, durations and beat grids), times every
+timing mode with both implementations and checks that they agree.
+
+Usage:
+    python benchmark_lyric_timing.py [--songs 10000] [--seed 42]
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services.lyric_timing import LyricTimingService
+
+# Original loop implementations, kept here as the comparison baseline
+
+def legacy_uniform(lines: list[dict], duration: float) -> list[dict]:
+    if not lines:
+        return []
+    start_buffer = min(3.0, duration * 0.05)
+    end_buffer = min(3.0, duration * 0.05)
+    effective_duration = duration - start_buffer - end_buffer
+    time_per_line = effective_duration / len(lines)
+    display_time = min(time_per_line * 0.9, 4.0)
+    timed_lines = []
+    for i, line in enumerate(lines):
+        start_time = start_buffer + (i * time_per_line)
+        timed_lines.append({
+            "text": line["text"],
+            "start_time": round(start_time, 3),
+            "end_time": round(start_time + display_time, 3),
+            "is_emphasized": line["is_emphasized"],
+        })
+    return timed_lines
+
+
+def legacy_beat_synced(lines: list[dict], beat_times: np.ndarray, duration: float) -> list[dict]:
+    if len(beat_times) < 2:
+        return legacy_uniform(lines, duration)
+    intro_beats = max(4, len(beat_times) // 10)
+    outro_beats = max(2, len(beat_times) // 20)
+    usable_beats = (
+        beat_times[intro_beats:-outro_beats]
+        if len(beat_times) > intro_beats + outro_beats
+        else beat_times
+    )
+    if len(usable_beats) < len(lines):
+        return legacy_uniform(lines, duration)
+    beats_per_line = len(usable_beats) / len(lines)
+    timed_lines = []
+    for i, line in enumerate(lines):
+        beat_idx = int(i * beats_per_line)
+        next_beat_idx = min(int((i + 1) * beats_per_line), len(usable_beats) - 1)
+        start_time = usable_beats[beat_idx]
+        end_time = (
+            usable_beats[next_beat_idx]
+            if next_beat_idx > beat_idx
+            else start_time + 2.0
+        )
+        end_time = min(end_time, start_time + 5.0)
+        timed_lines.append({
+            "text": line["text"],
+            "start_time": round(float(start_time), 3),
+            "end_time": round(float(end_time), 3),
+            "is_emphasized": line["is_emphasized"],
+        })
+    return timed_lines
+
+
+def legacy_measures(lines: list[dict], beat_times: np.ndarray, duration: float) -> list[dict]:
+    if len(beat_times) < 8:
+        return legacy_uniform(lines, duration)
+    measures = []
+    for i in range(0, len(beat_times) - 3, 4):
+        measures.append({
+            "start": beat_times[i],
+            "end": beat_times[i + 3] if i + 3 < len(beat_times) else beat_times[-1],
+        })
+    if len(measures) < len(lines):
+        return legacy_uniform(lines, duration)
+    measures_per_line = len(measures) / len(lines)
+    timed_lines = []
+    for i, line in enumerate(lines):
+        measure_idx = int(i * measures_per_line)
+        measure = measures[min(measure_idx, len(measures) - 1)]
+        timed_lines.append({
+            "text": line["text"],
+            "start_time": round(float(measure["start"]), 3),
+            "end_time": round(float(measure["end"]), 3),
+            "is_emphasized": line["is_emphasized"],
+        })
+    return timed_lines
+
+
+LEGACY = {
+    "uniform": lambda lines, beats, duration: legacy_uniform(lines, duration),
+    "beat_synced": legacy_beat_synced,
+    "measures": legacy_measures,
+}
+
+
+def synthetic_songs(count: int, seed: int) -> list[tuple[list[dict], np.ndarray, float]]:
+    """Create songs with random line counts, durations and tempos."""
+    rng = np.random.default_rng(seed)
+    songs = []
+    for _ in range(count):
+        duration = float(rng.uniform(90, 300))
+        tempo = float(rng.uniform(70, 160))
+        beat_times = np.arange(0.5, duration, 60.0 / tempo)
+        beat_times = beat_times + rng.normal(0, 0.01, len(beat_times))
+        lines = [
+            {"text": f"line {i}", "is_emphasized": bool(i % 7 == 0)}
+            for i in range(int(rng.integers(8, 80)))
+        ]
+        songs.append((lines, beat_times, duration))
+    return songs
+
+
+def same_timing(a: list[dict], b: list[dict]) -> bool:
+    """Check two timings match (allowing for last-digit rounding differences)."""
+    if len(a) != len(b):
+        return False
+    return all(
+        x["text"] == y["text"]
+        and x["is_emphasized"] == y["is_emphasized"]
+        and abs(x["start_time"] - y["start_time"]) <= 0.0011
+        and abs(x["end_time"] - y["end_time"]) <= 0.0011
+        for x, y in zip(a, b, strict=True)
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--songs", type=int, default=10000, help="Number of synthetic songs")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    # Fallback warnings would otherwise dominate the output
+    logging.disable(logging.WARNING)
+
+    service = LyricTimingService()
+    songs = synthetic_songs(args.songs, args.seed)
+    print(f"Benchmarking lyric timing on {len(songs)} synthetic songs")
+
+    ok = True
+    for mode, legacy in LEGACY.items():
+        started = time.perf_counter()
+        legacy_results = [legacy(lines, beats, duration) for lines, beats, duration in songs]
+        legacy_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        arrays = [service.compute_timing(lines, beats, duration, mode) for lines, beats, duration in songs]
+        vector_seconds = time.perf_counter() - started
+
+        mismatches = sum(
+            not same_timing(expected, service.timing_array_to_list(timing))
+            for expected, timing in zip(legacy_results, arrays, strict=True)
+        )
+        ok = ok and mismatches == 0
+
+        print(
+            f"  {mode:<12} loop {legacy_seconds:7.3f}s  "
+            f"numpy {vector_seconds:7.3f}s  "
+            f"speedup {legacy_seconds / vector_seconds:5.1f}x  "
+            f"mismatches {mismatches}"
+        )
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -575,3 +575,108 @@ class TestCombinedFilters:
         assert len(data["items"]) == 3
         assert data["meta"]["total"] == 5
         assert data["meta"]["has_more"] is True
+
+
+# =============================================================================
+# Task Metrics Tests
+# =============================================================================
+
+
+@pytest.mark.integration
+@pytest.mark.api
+class TestTaskMetrics:
+    """Test worker stage metrics reporting."""
+
+    def test_report_and_summarize_metrics(
+        self, client, auth_headers, song_factory, task_factory
+    ):
+        """Reports are merged per task and summarized across tasks."""
+        song = song_factory(song_id="song-001")
+        task = task_factory(song_id=song.id, task_type="suno_upload", status="running")
+
+        response = client.post(
+            f"/api/v1/queue/tasks/{task.id}/metrics",
+            json={"stages": {"submit": 4.5}},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+
+        response = client.post(
+            f"/api/v1/queue/tasks/{task.id}/metrics",
+            json={"stages": {"complete": 120.0}, "counters": {"download_bytes": 2048}},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        assert '"submit": 4.5' in response.json()["metrics_json"]
+
+        response = client.get(
+            "/api/v1/queue/metrics",
+            params={"task_type": "suno_upload"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["tasks"] == 1
+        assert data["stages"]["complete"]["max_seconds"] == 120.0
+        assert data["counters"] == {"download_bytes": 2048.0}
+
+    def test_report_metrics_validation(
+        self, client, auth_headers, song_factory, task_factory
+    ):
+        """Negative timings and unknown tasks are rejected."""
+        song = song_factory(song_id="song-001")
+        task = task_factory(song_id=song.id, task_type="suno_upload")
+
+        response = client.post(
+            f"/api/v1/queue/tasks/{task.id}/metrics",
+            json={"stages": {"submit": -1}},
+            headers=auth_headers,
+        )
+        assert response.status_code == 422
+
+        response = client.post(
+            "/api/v1/queue/tasks/99999/metrics",
+            json={"stages": {"submit": 1}},
+            headers=auth_headers,
+        )
+        assert response.status_code == 404
+
+
+
+# =============================================================================
+# Scheduled Tasks Tests
+# =============================================================================
+
+
+@pytest.mark.integration
+@pytest.mark.api
+class TestScheduledTasks:
+    """Test tasks queued to run at a later time."""
+
+    def test_scheduled_task_is_not_due(self, client, auth_headers, song_factory):
+        """A task with a future run_at is hidden from workers and cannot start."""
+        song = song_factory(song_id="song-001")
+        response = client.post(
+            "/api/v1/queue/tasks",
+            json={
+                "task_type": "suno_upload",
+                "song_id": song.id,
+                "run_at": "2099-01-01T12:00:00+02:00",
+            },
+            headers=auth_headers,
+        )
+        assert response.status_code == 201
+        task = response.json()
+        assert task["run_at"].startswith("2099-01-01T10:00:00")
+        assert task["scheduled_at"] == task["run_at"]
+
+        response = client.get(
+            "/api/v1/queue/tasks",
+            params={"status_filter": "pending", "due_only": True},
+            headers=auth_headers,
+        )
+        assert response.json()["meta"]["total"] == 0
+
+        response = client.post(f"/api/v1/queue/tasks/{task['id']}/start", headers=auth_headers)
+        assert response.status_code == 400
+        assert "scheduled" in response.json()["detail"]
@@ -274,6 +274,83 @@ class TestCreateSong:
         assert response.status_code == 403
 
 
+# =============================================================================
+# Bulk Upsert Tests
+# =============================================================================
+
+
+@pytest.mark.integration
+@pytest.mark.api
+class TestBulkUpsertSongs:
+    """Test bulk song import by file path."""
+
+    @staticmethod
+    def _song(path, **fields):
+        return {
+            "title": fields.get("title", "Bulk Song"),
+            "genre": "Pop",
+            "style_prompt": "Pop song",
+            "lyrics": fields.get("lyrics", "[Verse]\nLyrics"),
+            "file_path": path,
+        }
+
+    def test_bulk_creates_and_updates_by_file_path(self, client, auth_headers, song_factory):
+        """Known file paths are updated, unknown ones created."""
+        song_factory(song_id="existing", file_path="/generated/songs/a.md", lyrics="[Verse]\nLyrics")
+
+        response = client.post(
+            "/api/v1/songs/bulk",
+            json={
+                "songs": [
+                    self._song("/generated/songs/a.md", lyrics="[Verse]\nNew lyrics"),
+                    self._song("/generated/songs/b.md"),
+                    self._song("/generated/songs/c.md"),
+                ],
+            },
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["created"], data["updated"], data["unchanged"], data["queued"]) == (2, 1, 0, 0)
+        items = {item["file_path"]: item for item in data["items"]}
+        assert items["/generated/songs/a.md"]["id"] == "existing"
+        assert items["/generated/songs/a.md"]["action"] == "updated"
+
+        song = client.get("/api/v1/songs/existing", headers=auth_headers).json()
+        assert song["lyrics"] == "[Verse]\nNew lyrics"
+
+    def test_bulk_enqueues_created_songs(self, client, auth_headers, song_factory):
+        """Only newly created songs are queued for Suno upload."""
+        song_factory(song_id="existing", title="Bulk Song", file_path="/generated/songs/a.md",
+                     style_prompt="Pop song", lyrics="[Verse]\nLyrics")
+
+        response = client.post(
+            "/api/v1/songs/bulk",
+            json={
+                "songs": [self._song("/generated/songs/a.md"), self._song("/generated/songs/b.md")],
+                "enqueue_suno": True,
+            },
+            headers=auth_headers,
+        )
+
+        data = response.json()
+        assert (data["created"], data["unchanged"], data["queued"]) == (1, 1, 1)
+        created = next(item for item in data["items"] if item["action"] == "created")
+        assert created["task_id"] is not None
+        song = client.get(f"/api/v1/songs/{created['id']}", headers=auth_headers).json()
+        assert song["status"] == "uploading"
+
+    def test_bulk_rejects_empty_and_oversized_batches(self, client, auth_headers):
+        """Batches must hold 1 to 500 songs."""
+        response = client.post("/api/v1/songs/bulk", json={"songs": []}, headers=auth_headers)
+        assert response.status_code == 422
+
+        songs = [self._song(f"/generated/songs/{i}.md") for i in range(501)]
+        response = client.post("/api/v1/songs/bulk", json={"songs": songs}, headers=auth_headers)
+        assert response.status_code == 422
+
+
 # =============================================================================
 # Update Song Tests
 # =============================================================================
@@ -0,0 +1,129 @@
+"""Unit tests for the batch audio analysis tool."""
+
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database import Base
+from app.models.audio_analysis import AudioAnalysis
+from app.tools.analyze_all import (
+    _init_worker,
+    discover_audio_files,
+    load_analyzed,
+    select_pending,
+    write_batch,
+)
+
+
+def _features(tempo=120.0):
+    return {
+        "duration": 180.0,
+        "tempo": tempo,
+        "beat_times": [0.5, 1.0004],
+        "key": "A",
+        "mode": "Minor",
+        "energy": 0.5,
+        "danceability": 0.7,
+        "spectral_centroid_mean": 1500.0,
+        "rms_mean": 0.05,
+    }
+
+
+def _result(path, features):
+    stat = path.stat()
+    return {
+        "audio_path": str(path),
+        "file_size_bytes": stat.st_size,
+        "file_mtime_ns": stat.st_mtime_ns,
+        "features": features,
+    }
+
+
+async def _session_local(tmp_path):
+    """Create a session factory on a fresh SQLite database."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'analysis.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.mark.unit
+class TestDiscovery:
+    """Test file discovery and skip logic."""
+
+    def test_discovers_audio_files_recursively(self, tmp_path):
+        """Only audio extensions are picked up, in nested folders too."""
+        (tmp_path / "a").mkdir()
+        (tmp_path / "a" / "one.mp3").write_bytes(b"x")
+        (tmp_path / "two.WAV").write_bytes(b"x")
+        (tmp_path / "notes.txt").write_text("x")
+
+        files = discover_audio_files(tmp_path)
+
+        assert [f.name for f in files] == ["one.mp3", "two.WAV"]
+
+    def test_skips_unchanged_files(self, tmp_path):
+        """Files with matching size and mtime are skipped; changed ones are not."""
+        same = tmp_path / "same.mp3"
+        changed = tmp_path / "changed.mp3"
+        new = tmp_path / "new.mp3"
+        for path in (same, changed, new):
+            path.write_bytes(b"audio")
+
+        analyzed = {
+            str(same): (same.stat().st_size, same.stat().st_mtime_ns),
+            str(changed): (changed.stat().st_size, changed.stat().st_mtime_ns - 1),
+        }
+
+        assert select_pending([same, changed, new], analyzed) == [changed, new]
+        assert select_pending([same, changed, new], analyzed, force=True) == [same, changed, new]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestWriteBatch:
+    """Test batched result storage."""
+
+    async def test_write_batch_inserts_and_updates(self, tmp_path):
+        """Results are upserted by path and failed results are skipped."""
+        engine, session_local = await _session_local(tmp_path)
+        first = tmp_path / "first.mp3"
+        second = tmp_path / "second.mp3"
+        first.write_bytes(b"audio")
+        second.write_bytes(b"audio")
+
+        written = await write_batch(
+            session_local,
+            [_result(first, _features()), _result(second, None)],
+            {},
+        )
+        assert written == 1
+
+        os.utime(first, ns=(1, 1))
+        await write_batch(session_local, [_result(first, _features(tempo=90.0))], {})
+
+        async with session_local() as db:
+            rows = (await db.execute(select(AudioAnalysis))).scalars().all()
+
+        assert len(rows) == 1
+        assert rows[0].tempo == 90.0
+        assert rows[0].file_mtime_ns == 1
+        assert json.loads(rows[0].beat_times_json) == [0.5, 1.0]
+
+        assert await load_analyzed(session_local) == {str(first): (5, 1)}
+        await engine.dispose()
+
+
+@pytest.mark.unit
+def test_init_worker_warms_up_librosa():
+    """Each pool process runs the beat tracker once before real files."""
+    librosa = MagicMock()
+    with patch("app.tools.analyze_all._get_librosa", return_value=librosa):
+        _init_worker()
+
+    librosa.beat.beat_track.assert_called_once()
+    librosa.onset.onset_strength.assert_called_once()
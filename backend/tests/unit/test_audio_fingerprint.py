@@ -0,0 +1,155 @@
+"""Unit tests for audio fingerprinting and duplicate lookup."""
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database import Base
+from app.models.audio_analysis import AudioAnalysis
+from app.models.song import Song
+from app.services.audio_fingerprint import (
+    Fingerprint,
+    FingerprintIndex,
+    FingerprintService,
+    fingerprint_chroma,
+    store_fingerprint,
+)
+from app.services.audio_stream import StreamingFeatureExtractor
+
+SAMPLE_RATE = 22050
+
+
+def _melody(seed, seconds=40):
+    """Random chords, four per second."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(SAMPLE_RATE // 4) / SAMPLE_RATE
+    chords = []
+    for _ in range(seconds * 4):
+        notes = rng.integers(48, 72, size=rng.integers(1, 4))
+        chords.append(sum(np.sin(2 * np.pi * 440 * 2 ** ((n - 69) / 12) * t) for n in notes))
+    return (0.1 * np.concatenate(chords)).astype(np.float32)
+
+
+def _fingerprint(samples):
+    extractor = StreamingFeatureExtractor(SAMPLE_RATE, keep_frame_chroma=True)
+    for start in range(0, len(samples), 8192):
+        extractor.update(samples[start:start + 8192])
+    return fingerprint_chroma(extractor.finish().frame_chroma)
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    """Fingerprints of eight different melodies."""
+    melodies = {f"song-{i}": _melody(i) for i in range(8)}
+    return melodies, {name: _fingerprint(y) for name, y in melodies.items()}
+
+
+@pytest.mark.unit
+class TestFingerprint:
+    """Test landmark hashing."""
+
+    def test_round_trips_through_bytes(self, catalog):
+        """Fingerprints survive serialization as uint32 arrays."""
+        _, fingerprints = catalog
+        fingerprint = fingerprints["song-0"]
+        restored = Fingerprint.from_bytes(*fingerprint.to_bytes())
+
+        assert len(fingerprint) > 100
+        assert np.array_equal(restored.hashes, fingerprint.hashes)
+        assert np.array_equal(restored.offsets, fingerprint.offsets)
+        assert len(fingerprint.to_bytes()[0]) == 4 * len(fingerprint)
+
+    def test_silence_has_no_landmarks(self):
+        """Silent audio produces an empty fingerprint."""
+        assert len(_fingerprint(np.zeros(SAMPLE_RATE * 5, dtype=np.float32))) == 0
+
+
+@pytest.mark.unit
+class TestFingerprintIndex:
+    """Test inverted index lookups."""
+
+    def test_excerpt_matches_its_source(self, catalog):
+        """A noisy, quieter excerpt is matched to its source at the right offset."""
+        melodies, fingerprints = catalog
+        index = FingerprintIndex((name, name, fp) for name, fp in fingerprints.items())
+
+        noise = np.random.default_rng(99).normal(0, 0.005, SAMPLE_RATE * 20).astype(np.float32)
+        excerpt = 0.7 * melodies["song-3"][SAMPLE_RATE * 10:SAMPLE_RATE * 30] + noise
+        matches = index.query(_fingerprint(excerpt))
+
+        assert matches[0].song_id == "song-3"
+        assert matches[0].offset_seconds == pytest.approx(10.0, abs=0.3)
+        assert all(match.song_id == "song-3" for match in matches)
+
+    def test_unrelated_audio_has_no_matches(self, catalog):
+        """Audio that is not in the index matches nothing."""
+        _, fingerprints = catalog
+        index = FingerprintIndex((name, name, fp) for name, fp in fingerprints.items())
+
+        assert index.query(_fingerprint(_melody(500, seconds=20))) == []
+
+    def test_excluded_paths_are_skipped(self, catalog):
+        """A recording never matches itself when excluded."""
+        _, fingerprints = catalog
+        index = FingerprintIndex((name, name, fp) for name, fp in fingerprints.items())
+
+        assert index.query(fingerprints["song-1"])[0].score == 1.0
+        assert index.query(fingerprints["song-1"], exclude_paths=["song-1"]) == []
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestFingerprintService:
+    """Test duplicate lookup from stored fingerprints."""
+
+    async def test_find_similar_across_songs(self, tmp_path, catalog):
+        """Another song with the same audio is reported, the song itself is not."""
+        _, fingerprints = catalog
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'fp.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_local = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        recordings = {
+            "a.mp3": ("song-a", fingerprints["song-0"]),
+            "b.mp3": ("song-b", fingerprints["song-0"]),  # Suno returned the same audio
+            "c.mp3": ("song-c", fingerprints["song-5"]),
+        }
+        async with session_local() as db:
+            for path, (song_id, fingerprint) in recordings.items():
+                db.add(Song(
+                    id=song_id, title=song_id, genre="pop", style_prompt="pop",
+                    lyrics="la", file_path=f"/songs/{song_id}.md",
+                ))
+                hashes, offsets = fingerprint.to_bytes()
+                db.add(AudioAnalysis(
+                    audio_path=path, song_id=song_id, file_size_bytes=1, file_mtime_ns=1,
+                    duration=40.0, tempo=120.0, energy=0.5, danceability=0.5,
+                    spectral_centroid_mean=1000.0, rms_mean=0.1,
+                    fingerprint_hashes=hashes, fingerprint_offsets=offsets,
+                ))
+            await db.commit()
+
+        service = FingerprintService()
+        async with session_local() as db:
+            matches = await service.find_similar(db, "song-a")
+            index = await service.get_index(db)
+            assert await service.get_index(db) is index
+
+        assert [match.song_id for match in matches] == ["song-b"]
+        assert matches[0].score == 1.0
+        assert len(index) == 3
+
+        # A re-analysis within the same second still rebuilds the index
+        async with session_local() as db:
+            analysis = (await db.execute(
+                select(AudioAnalysis).where(AudioAnalysis.audio_path == "c.mp3")
+            )).scalar_one()
+            store_fingerprint(analysis, *fingerprints["song-0"].to_bytes())
+            await db.commit()
+
+            assert await service.get_index(db) is not index
+            matches = await service.find_similar(db, "song-a")
+        assert sorted(match.song_id for match in matches) == ["song-b", "song-c"]
+        await engine.dispose()
@@ -0,0 +1,234 @@
+"""Unit tests for streaming audio analysis."""
+
+import io
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from app.services.audio_analyzer import AudioAnalyzer
+from app.services.audio_stream import (
+    FRAME_LENGTH,
+    HOP_LENGTH,
+    StreamingFeatureExtractor,
+    block_samples_for_limit,
+    estimate_tempo,
+    iter_audio_blocks,
+    pick_onsets,
+    track_beats,
+)
+
+SAMPLE_RATE = 22050
+
+
+@pytest.fixture
+def click_track():
+    """30 seconds of an A4 tone with a click every half second (120 BPM)."""
+    rng = np.random.default_rng(0)
+    t = np.arange(SAMPLE_RATE * 30) / SAMPLE_RATE
+    y = (0.1 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    for beat in np.arange(0.25, 30, 0.5):
+        start = int(beat * SAMPLE_RATE)
+        y[start:start + 200] += rng.normal(0, 0.8, 200).astype(np.float32)
+    return y
+
+
+def _extract(samples, block_size):
+    extractor = StreamingFeatureExtractor(SAMPLE_RATE, keep_frame_chroma=True)
+    for start in range(0, len(samples), block_size):
+        extractor.update(samples[start:start + block_size])
+    return extractor.finish()
+
+
+@pytest.mark.unit
+class TestStreamingFeatureExtractor:
+    """Test incremental feature extraction."""
+
+    def test_features_do_not_depend_on_block_size(self, click_track):
+        """Small and large blocks yield the same frame features."""
+        small = _extract(click_track, 3001)
+        whole = _extract(click_track, len(click_track))
+
+        assert small.duration == pytest.approx(30.0)
+        assert len(small.onset_env) == len(whole.onset_env) == len(click_track) // HOP_LENGTH + 1
+        assert np.allclose(small.onset_env, whole.onset_env, atol=1e-4)
+        assert small.rms_mean == pytest.approx(whole.rms_mean)
+        assert small.spectral_centroid_mean == pytest.approx(whole.spectral_centroid_mean)
+        assert small.frame_chroma.shape == (12, len(small.onset_env))
+
+    def test_chroma_finds_tone_pitch_class(self, click_track):
+        """The A4 tone dominates pitch class A."""
+        features = _extract(click_track, 8192)
+        assert int(np.argmax(features.chroma_mean)) == 9
+
+    def test_tempo_beats_and_onsets(self, click_track):
+        """Tempo, beat grid and onsets follow the clicks."""
+        features = _extract(click_track, 8192)
+
+        tempo = estimate_tempo(features.onset_env, SAMPLE_RATE)
+        assert tempo == pytest.approx(120.0, abs=1.0)
+
+        beats = features.frames_to_time(track_beats(features.onset_env, tempo, SAMPLE_RATE))
+        assert np.all(np.abs(np.diff(beats) - 0.5) < 0.05)
+
+        onsets = features.frames_to_time(pick_onsets(features.onset_env, SAMPLE_RATE))
+        assert len(onsets) == 60
+
+
+@pytest.mark.unit
+class TestQualityMetrics:
+    """Test streamed technical quality metrics."""
+
+    @staticmethod
+    def _tone(seconds=10.0, amplitude=0.1):
+        t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+        return (amplitude * np.sin(2 * np.pi * 1000 * t)).astype(np.float32)
+
+    def test_clean_tone(self):
+        """A moderate tone has no clipping or silence and a tonal spectrum."""
+        features = _extract(self._tone(), 8192)
+        assert features.clipping_ratio == 0.0
+        assert features.silence_ratio == 0.0
+        assert features.spectral_flatness < 0.1
+        assert -25.0 < features.loudness_lufs < -15.0
+
+    def test_loudness_tracks_level(self):
+        """Doubling the amplitude raises loudness by about 6 LU."""
+        quiet = _extract(self._tone(amplitude=0.1), 8192).loudness_lufs
+        loud = _extract(self._tone(amplitude=0.2), 8192).loudness_lufs
+        assert loud - quiet == pytest.approx(6.0, abs=0.3)
+
+    def test_silence_and_clipping_are_measured(self):
+        """Half-silent and clipped audio is reported as such."""
+        tone = self._tone(amplitude=4.0).clip(-1.0, 1.0)
+        samples = np.concatenate([tone, np.zeros_like(tone)])
+        features = _extract(samples, 8192)
+        assert features.silence_ratio == pytest.approx(0.5, abs=0.02)
+        assert features.clipping_ratio > 0.3
+
+    def test_noise_is_flat(self):
+        """White noise has a flat spectrum."""
+        noise = np.random.default_rng(1).normal(0, 0.1, SAMPLE_RATE * 5).astype(np.float32)
+        assert _extract(noise, 8192).spectral_flatness > 0.4
+
+
+@pytest.mark.unit
+class TestBlockDecoding:
+    """Test memory-bounded decoding."""
+
+    def test_block_size_follows_memory_limit(self):
+        """Larger ceilings give larger blocks, always in whole hops."""
+        small = block_samples_for_limit(1)
+        large = block_samples_for_limit(64)
+
+        assert small >= FRAME_LENGTH * 4
+        assert large > small
+        assert large % HOP_LENGTH == 0
+
+    def test_iter_blocks_reads_fixed_size_chunks(self, tmp_path):
+        """FFmpeg output is read in blocks of the requested size."""
+        audio = tmp_path / "song.mp3"
+        audio.write_bytes(b"fake")
+        samples = np.arange(10, dtype=np.float32)
+
+        process = MagicMock()
+        process.stdout = io.BytesIO(samples.tobytes())
+        process.stderr = io.BytesIO(b"")
+        process.wait.return_value = 0
+        process.poll.return_value = 0
+
+        with patch("app.services.audio_stream.subprocess.Popen", return_value=process):
+            blocks = list(iter_audio_blocks(audio, SAMPLE_RATE, block_samples=4))
+
+        assert [len(block) for block in blocks] == [4, 4, 2]
+        assert np.array_equal(np.concatenate(blocks), samples)
+
+    def test_iter_blocks_raises_on_decode_failure(self, tmp_path):
+        """A failing FFmpeg process raises ValueError."""
+        audio = tmp_path / "song.mp3"
+        audio.write_bytes(b"fake")
+
+        process = MagicMock()
+        process.stdout = io.BytesIO(b"")
+        process.stderr = io.BytesIO(b"Invalid data")
+        process.wait.return_value = 1
+        process.poll.return_value = 1
+
+        with patch("app.services.audio_stream.subprocess.Popen", return_value=process):
+            with pytest.raises(ValueError, match="Invalid data"):
+                list(iter_audio_blocks(audio, SAMPLE_RATE, block_samples=4))
+
+    def test_iter_blocks_missing_file(self):
+        """Missing files raise FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            list(iter_audio_blocks(Path("/nonexistent.mp3"), SAMPLE_RATE, 1024))
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestStreamingAnalyzer:
+    """Test AudioAnalyzer streaming mode."""
+
+    async def test_streaming_analysis_builds_features(self, click_track, tmp_path):
+        """Streaming analysis returns AudioFeatures within the memory limit."""
+        analyzer = AudioAnalyzer(memory_limit_mb=1)
+        audio = tmp_path / "song.mp3"
+
+        def fake_stream(path, sample_rate, memory_limit_mb, keep_frame_chroma=False):
+            assert memory_limit_mb == 1
+            return _extract(click_track, block_samples_for_limit(memory_limit_mb))
+
+        with patch("app.services.audio_analyzer.stream_features", side_effect=fake_stream):
+            features = await analyzer.analyze(audio, streaming=True)
+
+        assert features.duration == pytest.approx(30.0)
+        assert features.tempo == pytest.approx(120.0, abs=1.0)
+        assert features.key == "A"
+        assert 0.0 <= features.danceability <= 1.0
+
+    async def test_streaming_failure_returns_none(self, tmp_path):
+        """Decode errors are logged and return None."""
+        analyzer = AudioAnalyzer()
+
+        with patch("app.services.audio_analyzer.stream_features", side_effect=ValueError("bad")):
+            assert await analyzer.analyze(tmp_path / "song.mp3", streaming=True) is None
+
+
+@pytest.mark.unit
+class TestAnalyzeWithQuality:
+    """Test the single-decode features, quality and fingerprint pass."""
+
+    def test_short_file_uses_librosa_samples(self, click_track, tmp_path):
+        """Short files get librosa features; quality comes from the same samples."""
+        analyzer = AudioAnalyzer()
+        audio = tmp_path / "song.mp3"
+        audio.write_bytes(b"audio")
+        librosa = MagicMock()
+        librosa.load.return_value = (click_track, SAMPLE_RATE)
+
+        with patch("app.services.audio_analyzer._get_librosa", return_value=librosa), \
+                patch("app.services.audio_analyzer.stream_features") as stream, \
+                patch.object(analyzer, "_features_from_samples", return_value="features") as tracked:
+            features, metrics, fingerprint = analyzer.analyze_with_quality(audio, streaming=False)
+
+        stream.assert_not_called()
+        librosa.load.assert_called_once_with(str(audio), sr=SAMPLE_RATE)
+        tracked.assert_called_once()
+        assert features == "features"
+        assert metrics.clipping_ratio == _extract(click_track, len(click_track)).clipping_ratio
+        assert len(fingerprint) > 0
+
+    def test_long_file_is_streamed(self, click_track, tmp_path):
+        """Long files keep the bounded-memory streaming pass."""
+        analyzer = AudioAnalyzer()
+
+        with patch("app.services.audio_analyzer._get_librosa", return_value=MagicMock()) as librosa, \
+                patch(
+                    "app.services.audio_analyzer.stream_features",
+                    return_value=_extract(click_track, 4096),
+                ):
+            features, _, _ = analyzer.analyze_with_quality(tmp_path / "song.mp3", streaming=True)
+
+        librosa.return_value.load.assert_not_called()
+        assert features.tempo == pytest.approx(120.0, abs=1.0)
@@ -174,6 +174,49 @@ class TestInitDb:
                 app.database._session_local = original_session
 
 
+class TestAddMissingColumns:
+    """Tests for additive column migration."""
+
+    def test_adds_new_nullable_columns(self, temp_dir):
+        """Columns added to a model are appended to an existing table."""
+        from sqlalchemy import inspect, text
+
+        import app.models  # noqa: F401
+        from app.database import Base, _add_missing_columns
+
+        engine = create_engine(f"sqlite:///{temp_dir / 'migrate.db'}")
+        with engine.begin() as conn:
+            Base.metadata.create_all(bind=conn)
+            conn.execute(text("ALTER TABLE video_projects DROP COLUMN word_timing_json"))
+
+            _add_missing_columns(conn)
+
+            columns = {c["name"] for c in inspect(conn).get_columns("video_projects")}
+        engine.dispose()
+
+        assert "word_timing_json" in columns
+
+    def test_adds_new_indexes(self, temp_dir):
+        """Indexes added to a model are created on an existing table."""
+        from sqlalchemy import inspect, text
+
+        import app.models  # noqa: F401
+        from app.database import Base, _add_missing_indexes
+
+        engine = create_engine(f"sqlite:///{temp_dir / 'migrate.db'}")
+        with engine.begin() as conn:
+            Base.metadata.create_all(bind=conn)
+            conn.execute(text("DROP INDEX ix_songs_file_path"))
+
+            _add_missing_indexes(conn)
+            _add_missing_indexes(conn)
+
+            indexes = {i["name"] for i in inspect(conn).get_indexes("songs")}
+        engine.dispose()
+
+        assert "ix_songs_file_path" in indexes
+
+
 class TestGetDb:
     """Tests for get_db dependency function."""
 
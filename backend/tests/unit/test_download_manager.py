@@ -12,13 +12,19 @@ from datetime import datetime
 import pytest
 import aiohttp
 
+from aiohttp import web
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
 from app.services.download_manager import (
     DownloadManager,
     get_download_manager,
     _download_manager,
+    part_path,
 )
+from app.database import Base
 from app.models.song import Song
 from app.models.suno_job import SunoJob
+from app.models.suno_variation import SunoVariation
 
 
 @pytest.mark.unit
@@ -98,107 +104,206 @@ class TestDownloadManagerDownloadSong:
                     )
 
 
+async def _serve(data: bytes, honour_range: bool = True):
+    """Serve ``data`` at /audio.mp3 on a local port, optionally with Range support."""
+    requests = []
+
+    async def handler(request):
+        requests.append(request.headers.get("Range"))
+        if honour_range and request.http_range.start:
+            start = request.http_range.start
+            if start >= len(data):
+                return web.Response(status=416, headers={"Content-Range": f"bytes */{len(data)}"})
+            return web.Response(
+                status=206, body=data[start:],
+                headers={"Content-Range": f"bytes {start}-{len(data) - 1}/{len(data)}"},
+            )
+        return web.Response(body=data)
+
+    app = web.Application()
+    app.router.add_get("/audio.mp3", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}/audio.mp3", requests
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestDownloadManagerTransfers:
+    """Test resumable downloads through the shared session."""
+
+    def _manager(self, download_folder):
+        with patch('app.services.download_manager.settings') as mock_settings:
+            mock_settings.DOWNLOAD_FOLDER = str(download_folder)
+            mock_settings.DOWNLOAD_CONCURRENCY = 2
+            manager = DownloadManager()
+        return manager, patch('app.services.download_manager.settings', mock_settings)
+
+    async def test_resumes_partial_download(self, temp_dir):
+        """A leftover .part file is resumed with a Range request and renamed."""
+        data = bytes(range(256)) * 1000
+        runner, url, requests = await _serve(data)
+        manager, settings_patch = self._manager(temp_dir)
+        part_path(temp_dir / "song.mp3").write_bytes(data[:1000])
+
+        with settings_patch:
+            try:
+                result = await manager.download_song("song", url, expected_size=len(data))
+            finally:
+                await manager.close()
+                await runner.cleanup()
+
+        assert result == temp_dir / "song.mp3"
+        assert result.read_bytes() == data
+        assert requests == ["bytes=1000-"]
+        assert not part_path(result).exists()
+
+    async def test_restarts_when_range_is_ignored(self, temp_dir):
+        """A server without Range support rewrites the file from the start."""
+        data = b"ID3" + b"x" * 5000
+        runner, url, _ = await _serve(data, honour_range=False)
+        manager, settings_patch = self._manager(temp_dir)
+        part_path(temp_dir / "song.mp3").write_bytes(b"garbage")
+
+        with settings_patch:
+            try:
+                result = await manager.download_song("song", url)
+            finally:
+                await manager.close()
+                await runner.cleanup()
+
+        assert result.read_bytes() == data
+
+    async def test_size_mismatch_is_not_published(self, temp_dir):
+        """A short download stays a .part file and raises."""
+        runner, url, _ = await _serve(b"x" * 100)
+        manager, settings_patch = self._manager(temp_dir)
+
+        with settings_patch:
+            try:
+                with pytest.raises(ValueError, match="size mismatch"):
+                    await manager.download_song("song", url, expected_size=200)
+            finally:
+                await manager.close()
+                await runner.cleanup()
+
+        assert not (temp_dir / "song.mp3").exists()
+        assert part_path(temp_dir / "song.mp3").stat().st_size == 100
+
+    async def test_checksum_mismatch_removes_file(self, temp_dir):
+        """A download with the wrong digest is removed."""
+        runner, url, _ = await _serve(b"audio")
+        manager, settings_patch = self._manager(temp_dir)
+
+        with settings_patch:
+            try:
+                with pytest.raises(ValueError, match="checksum"):
+                    await manager.download_song("song", url, sha256="0" * 64)
+            finally:
+                await manager.close()
+                await runner.cleanup()
+
+        assert not (temp_dir / "song.mp3").exists()
+
+
+async def _database(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'downloads.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
 @pytest.mark.unit
 @pytest.mark.asyncio
 class TestDownloadManagerDownloadFromSunoJob:
     """Test DownloadManager.download_from_suno_job method."""
 
+    async def _seed(self, session_local, variations):
+        async with session_local() as db:
+            db.add(Song(
+                id="test-song-001", title="Song", genre="pop", style_prompt="pop",
+                lyrics="la", file_path="/songs/test-song-001.md", status="downloading",
+            ))
+            db.add(SunoJob(id=1, song_id="test-song-001", status="completed"))
+            for index, (audio_url, selected) in enumerate(variations):
+                db.add(SunoVariation(
+                    suno_job_id=1, variation_index=index,
+                    audio_url=audio_url, is_selected=selected,
+                ))
+            await db.commit()
+
     async def test_download_from_suno_job_success(self, temp_dir):
-        """Test successful download from Suno job."""
+        """The selected variation is downloaded and the records are updated."""
         download_folder = temp_dir / "downloads"
         download_folder.mkdir()
-
-        # Create mock Suno job
-        mock_suno_job = MagicMock(spec=SunoJob)
-        mock_suno_job.id = 1
-        mock_suno_job.song_id = "test-song-001"
-        mock_suno_job.audio_url = "https://cdn.suno.com/audio/test.mp3"
-
-        # Create mock song
-        mock_song = MagicMock(spec=Song)
-        mock_song.id = "test-song-001"
-        mock_song.status = "downloading"
-
-        # Mock database session
-        mock_db = AsyncMock()
-        mock_result_job = MagicMock()
-        mock_result_job.scalar_one_or_none.return_value = mock_suno_job
-        mock_result_song = MagicMock()
-        mock_result_song.scalar_one_or_none.return_value = mock_song
-        mock_db.execute.side_effect = [mock_result_job, mock_result_song]
-
-        with patch('app.services.download_manager.settings') as mock_settings:
+        engine, session_local = await _database(temp_dir)
+        await self._seed(session_local, [
+            ("https://cdn.suno.com/audio/first.mp3", False),
+            ("https://cdn.suno.com/audio/selected.mp3", True),
+        ])
+
+        with patch('app.services.download_manager.settings') as mock_settings, \
+                patch('app.services.download_manager.get_session_local', return_value=session_local):
             mock_settings.DOWNLOAD_FOLDER = str(download_folder)
+            manager = DownloadManager()
 
-            with patch('app.services.download_manager.AsyncSessionLocal') as mock_session_local:
-                mock_session_local.return_value.__aenter__.return_value = mock_db
-                mock_session_local.return_value.__aexit__.return_value = None
-
-                manager = DownloadManager()
+            expected_path = download_folder / "test-song-001.mp3"
+            with patch.object(
+                manager, 'download_song', new_callable=AsyncMock
+            ) as mock_download:
+                mock_download.return_value = expected_path
 
-                # Mock download_song method
-                expected_path = download_folder / "test-song-001.mp3"
-                with patch.object(
-                    manager, 'download_song', new_callable=AsyncMock
-                ) as mock_download:
-                    mock_download.return_value = expected_path
+                result = await manager.download_from_suno_job(1)
 
-                    result = await manager.download_from_suno_job(1)
+                assert result == expected_path
+                mock_download.assert_called_once_with(
+                    "test-song-001",
+                    "https://cdn.suno.com/audio/selected.mp3",
+                )
 
-                    assert result == expected_path
-                    mock_download.assert_called_once_with(
-                        "test-song-001",
-                        "https://cdn.suno.com/audio/test.mp3",
-                    )
+        async with session_local() as db:
+            job = await db.get(SunoJob, 1)
+            song = await db.get(Song, "test-song-001")
+            variation = await db.get(SunoVariation, 2)
+        assert job.downloaded_path == str(expected_path)
+        assert song.audio_path == str(expected_path)
+        assert song.status == "downloaded"
+        assert variation.status == "downloaded"
+        await engine.dispose()
 
     async def test_download_from_suno_job_not_found(self, temp_dir):
         """Test download from non-existent Suno job."""
         download_folder = temp_dir / "downloads"
         download_folder.mkdir()
+        engine, session_local = await _database(temp_dir)
 
-        mock_db = AsyncMock()
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_db.execute.return_value = mock_result
-
-        with patch('app.services.download_manager.settings') as mock_settings:
+        with patch('app.services.download_manager.settings') as mock_settings, \
+                patch('app.services.download_manager.get_session_local', return_value=session_local):
             mock_settings.DOWNLOAD_FOLDER = str(download_folder)
+            manager = DownloadManager()
 
-            with patch('app.services.download_manager.AsyncSessionLocal') as mock_session_local:
-                mock_session_local.return_value.__aenter__.return_value = mock_db
-                mock_session_local.return_value.__aexit__.return_value = None
-
-                manager = DownloadManager()
-
-                with pytest.raises(ValueError, match="Suno job not found"):
-                    await manager.download_from_suno_job(999)
+            with pytest.raises(ValueError, match="Suno job not found"):
+                await manager.download_from_suno_job(999)
+        await engine.dispose()
 
     async def test_download_from_suno_job_no_audio_url(self, temp_dir):
         """Test download from Suno job with no audio URL."""
         download_folder = temp_dir / "downloads"
         download_folder.mkdir()
+        engine, session_local = await _database(temp_dir)
+        await self._seed(session_local, [(None, False)])
 
-        mock_suno_job = MagicMock(spec=SunoJob)
-        mock_suno_job.id = 1
-        mock_suno_job.song_id = "test-song-001"
-        mock_suno_job.audio_url = None
-
-        mock_db = AsyncMock()
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_suno_job
-        mock_db.execute.return_value = mock_result
-
-        with patch('app.services.download_manager.settings') as mock_settings:
+        with patch('app.services.download_manager.settings') as mock_settings, \
+                patch('app.services.download_manager.get_session_local', return_value=session_local):
             mock_settings.DOWNLOAD_FOLDER = str(download_folder)
+            manager = DownloadManager()
 
-            with patch('app.services.download_manager.AsyncSessionLocal') as mock_session_local:
-                mock_session_local.return_value.__aenter__.return_value = mock_db
-                mock_session_local.return_value.__aexit__.return_value = None
-
-                manager = DownloadManager()
-
-                with pytest.raises(ValueError, match="no audio URL"):
-                    await manager.download_from_suno_job(1)
+            with pytest.raises(ValueError, match="no audio URL"):
+                await manager.download_from_suno_job(1)
+        await engine.dispose()
 
 
 @pytest.mark.unit
@@ -4,17 +4,124 @@ Tests for song evaluation and quality scoring.
 """
 
 from pathlib import Path
-from unittest.mock import AsyncMock, MagicMock, patch, Mock
-from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import numpy as np
 import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
+from app.database import Base
+from app.models.audio_analysis import AudioAnalysis
+from app.models.evaluation import Evaluation
+from app.models.song import Song
+from app.services.audio_analyzer import AudioFeatures, QualityMetrics
+from app.services.audio_fingerprint import Fingerprint
 from app.services.evaluator import (
     EvaluatorService,
     get_evaluator,
+    score_quality,
 )
-from app.models.song import Song
-from app.models.evaluation import Evaluation
+from app.services.media_metadata import MediaMetadata
+
+
+CLEAN = QualityMetrics(
+    clipping_ratio=0.0, silence_ratio=0.01, loudness_lufs=-14.0, spectral_flatness=0.1
+)
+FINGERPRINT = Fingerprint(hashes=np.array([7, 9], dtype=np.uint32), offsets=np.array([0, 3], dtype=np.uint32))
+
+
+def _features(duration=180.0):
+    return AudioFeatures(
+        duration=duration,
+        tempo=120.0,
+        beat_times=[0.5, 1.0],
+        key="A",
+        mode="Minor",
+        energy=0.5,
+        danceability=0.7,
+        spectral_centroid_mean=1500.0,
+        rms_mean=0.05,
+    )
+
+
+async def _session_local(tmp_path):
+    """Create a session factory on a fresh SQLite database."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'eval.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def _add_song(session_local, song_id="test-song-001", audio_path=None):
+    async with session_local() as db:
+        db.add(Song(
+            id=song_id,
+            title="Test",
+            genre="pop",
+            style_prompt="pop",
+            lyrics="la la",
+            file_path=f"/songs/{song_id}.md",
+            audio_path=audio_path,
+            status="downloaded",
+        ))
+        await db.commit()
+
+
+@pytest.fixture
+def evaluator(tmp_path):
+    """Create an evaluator with a stubbed analyzer and download folder."""
+    analyzer = MagicMock()
+    analyzer.analyze_with_quality.return_value = (_features(), CLEAN, FINGERPRINT)
+    with patch('app.services.evaluator.settings') as mock_settings, \
+            patch('app.services.evaluator.get_audio_analyzer', return_value=analyzer):
+        mock_settings.DOWNLOAD_FOLDER = str(tmp_path / "downloads")
+        mock_settings.MIN_QUALITY_SCORE = 70.0
+        yield EvaluatorService()
+
+
+@pytest.fixture
+def media_service():
+    """Stub FFprobe metadata."""
+    service = MagicMock()
+    service.probe_async = AsyncMock(return_value=MediaMetadata(
+        duration=180.0, codec_name="mp3", sample_rate=44100, bit_rate=192000
+    ))
+    with patch('app.services.evaluator.get_media_metadata_service', return_value=service):
+        yield service
+
+
+@pytest.mark.unit
+class TestScoreQuality:
+    """Test the quality scoring function."""
+
+    def test_clean_track_scores_full_marks(self):
+        """A well-mastered track of normal length has no penalties."""
+        score, penalties = score_quality(180.0, CLEAN)
+        assert score == 100.0
+        assert not any(penalties.values())
+
+    def test_clipping_and_silence_are_penalized(self):
+        """Heavy clipping and long silences lower the score."""
+        metrics = QualityMetrics(
+            clipping_ratio=0.05, silence_ratio=0.5, loudness_lufs=-14.0, spectral_flatness=0.1
+        )
+        score, penalties = score_quality(180.0, metrics)
+        assert penalties["clipping"] == 30.0
+        assert penalties["silence"] == 30.0
+        assert score == 40.0
+
+    def test_loudness_penalty_is_symmetric(self):
+        """Too quiet and too loud are penalized by distance from the target."""
+        quiet = QualityMetrics(0.0, 0.0, -21.0, 0.1)
+        loud = QualityMetrics(0.0, 0.0, -7.0, 0.1)
+        assert score_quality(180.0, quiet)[0] == score_quality(180.0, loud)[0] == 90.0
+
+    def test_short_track_is_penalized(self):
+        """Very short tracks lose points; the score never drops below zero."""
+        assert score_quality(20.0, CLEAN)[0] == 60.0
+        worst = QualityMetrics(1.0, 1.0, -60.0, 1.0)
+        assert score_quality(5.0, worst)[0] == 0.0
 
 
 @pytest.mark.unit
@@ -41,247 +148,163 @@ class TestEvaluatorService:
 class TestEvaluatorServiceEvaluateSong:
     """Test EvaluatorService.evaluate_song method."""
 
-    async def test_evaluate_song_success_new_evaluation(self, temp_dir):
-        """Test successful song evaluation creating new evaluation."""
-        download_folder = temp_dir / "downloads"
-        download_folder.mkdir()
-        audio_file = download_folder / "test-song-001.mp3"
-        audio_file.write_bytes(b"fake audio data")
-
-        # Mock song
-        mock_song = MagicMock(spec=Song)
-        mock_song.id = "test-song-001"
-        mock_song.status = "downloaded"
-
-        # Mock audio analyzer
-        mock_analyzer = MagicMock()
-        mock_analyzer.analyze_audio.return_value = {
-            "audio_quality_score": 85.5,
-            "duration_seconds": 180.0,
-            "file_size_mb": 4.2,
-            "sample_rate": 44100,
-            "bitrate": 192000,
-        }
-
-        # Mock database session
-        mock_db = AsyncMock()
-        mock_result_song = MagicMock()
-        mock_result_song.scalar_one_or_none.return_value = mock_song
-        mock_result_eval = MagicMock()
-        mock_result_eval.scalar_one_or_none.return_value = None  # No existing evaluation
-        mock_db.execute.side_effect = [mock_result_song, mock_result_eval]
-
-        mock_evaluation = MagicMock(spec=Evaluation)
-
-        with patch('app.services.evaluator.settings') as mock_settings:
-            mock_settings.DOWNLOAD_FOLDER = str(download_folder)
-            mock_settings.MIN_QUALITY_SCORE = 70.0
-
-            with patch('app.services.evaluator.get_audio_analyzer', return_value=mock_analyzer):
-                with patch('app.services.evaluator.AsyncSessionLocal') as mock_session_local:
-                    mock_session_local.return_value.__aenter__.return_value = mock_db
-                    mock_session_local.return_value.__aexit__.return_value = None
-
-                    evaluator = EvaluatorService()
-                    result = await evaluator.evaluate_song("test-song-001")
-
-                    # Verify analyzer was called
-                    mock_analyzer.analyze_audio.assert_called_once_with(audio_file)
-
-                    # Verify evaluation was added to database
-                    mock_db.add.assert_called_once()
-                    added_eval = mock_db.add.call_args[0][0]
-                    assert added_eval.song_id == "test-song-001"
-                    assert added_eval.audio_quality_score == 85.5
-                    assert added_eval.approved is True  # Score > MIN_QUALITY_SCORE
-
-    async def test_evaluate_song_updates_existing_evaluation(self, temp_dir):
-        """Test song evaluation updates existing evaluation."""
-        download_folder = temp_dir / "downloads"
-        download_folder.mkdir()
-        audio_file = download_folder / "test-song-001.mp3"
-        audio_file.write_bytes(b"fake audio data")
-
-        mock_song = MagicMock(spec=Song)
-        mock_song.id = "test-song-001"
-        mock_song.status = "downloaded"
-
-        # Existing evaluation
-        mock_existing_eval = MagicMock(spec=Evaluation)
-        mock_existing_eval.song_id = "test-song-001"
-        mock_existing_eval.audio_quality_score = 60.0
-
-        mock_analyzer = MagicMock()
-        mock_analyzer.analyze_audio.return_value = {
-            "audio_quality_score": 90.0,
-            "duration_seconds": 200.0,
-            "file_size_mb": 5.0,
-            "sample_rate": 48000,
-            "bitrate": 256000,
-        }
-
-        mock_db = AsyncMock()
-        mock_result_song = MagicMock()
-        mock_result_song.scalar_one_or_none.return_value = mock_song
-        mock_result_eval = MagicMock()
-        mock_result_eval.scalar_one_or_none.return_value = mock_existing_eval
-        mock_db.execute.side_effect = [mock_result_song, mock_result_eval]
-
-        with patch('app.services.evaluator.settings') as mock_settings:
-            mock_settings.DOWNLOAD_FOLDER = str(download_folder)
-            mock_settings.MIN_QUALITY_SCORE = 70.0
-
-            with patch('app.services.evaluator.get_audio_analyzer', return_value=mock_analyzer):
-                with patch('app.services.evaluator.AsyncSessionLocal') as mock_session_local:
-                    mock_session_local.return_value.__aenter__.return_value = mock_db
-                    mock_session_local.return_value.__aexit__.return_value = None
-
-                    evaluator = EvaluatorService()
-                    result = await evaluator.evaluate_song("test-song-001")
-
-                    # Should update existing evaluation, not add new
-                    mock_db.add.assert_not_called()
-                    assert mock_existing_eval.audio_quality_score == 90.0
-                    assert mock_existing_eval.duration_seconds == 200.0
-
-    async def test_evaluate_song_not_found(self, temp_dir):
-        """Test evaluation of non-existent song."""
-        download_folder = temp_dir / "downloads"
-        download_folder.mkdir()
-
-        mock_db = AsyncMock()
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_db.execute.return_value = mock_result
-
-        with patch('app.services.evaluator.settings') as mock_settings:
-            mock_settings.DOWNLOAD_FOLDER = str(download_folder)
-            mock_settings.MIN_QUALITY_SCORE = 70.0
-
-            with patch('app.services.evaluator.get_audio_analyzer'):
-                with patch('app.services.evaluator.AsyncSessionLocal') as mock_session_local:
-                    mock_session_local.return_value.__aenter__.return_value = mock_db
-                    mock_session_local.return_value.__aexit__.return_value = None
-
-                    evaluator = EvaluatorService()
-
-                    with pytest.raises(ValueError, match="Song not found"):
-                        await evaluator.evaluate_song("nonexistent-song")
+    async def test_evaluate_song_success_new_evaluation(self, tmp_path, evaluator, media_service):
+        """A new evaluation stores the score, file metrics and approval."""
+        engine, session_local = await _session_local(tmp_path)
+        audio_file = evaluator.download_folder / "test-song-001.mp3"
+        audio_file.write_bytes(b"x" * 2 * 1024 * 1024)
+        await _add_song(session_local)
+
+        with patch('app.services.evaluator.get_session_local', return_value=session_local):
+            evaluation = await evaluator.evaluate_song("test-song-001")
+
+        assert evaluation.audio_quality_score == 100.0
+        assert evaluation.duration_seconds == 180.0
+        assert evaluation.file_size_mb == 2.0
+        assert evaluation.sample_rate == 44100
+        assert evaluation.bitrate == 192
+        assert evaluation.approved is True
+
+        async with session_local() as db:
+            song = await db.get(Song, "test-song-001")
+            assert song.status == "evaluated"
+            analysis = (await db.execute(select(AudioAnalysis))).scalar_one()
+            assert analysis.audio_path == str(audio_file)
+            assert analysis.song_id == "test-song-001"
+            assert analysis.loudness_lufs == -14.0
+            assert Fingerprint.from_bytes(
+                analysis.fingerprint_hashes, analysis.fingerprint_offsets
+            ).hashes.tolist() == [7, 9]
+        await engine.dispose()
+
+    async def test_evaluate_song_updates_existing_evaluation(self, tmp_path, evaluator, media_service):
+        """Re-evaluating a song updates its evaluation instead of adding one."""
+        engine, session_local = await _session_local(tmp_path)
+        (evaluator.download_folder / "test-song-001.mp3").write_bytes(b"audio")
+        await _add_song(session_local)
+
+        with patch('app.services.evaluator.get_session_local', return_value=session_local):
+            await evaluator.evaluate_song("test-song-001")
+            await evaluator.evaluate_song("test-song-001")
+
+        async with session_local() as db:
+            evaluations = (await db.execute(select(Evaluation))).scalars().all()
+        assert len(evaluations) == 1
+        await engine.dispose()
+
+    async def test_stored_analysis_is_reused(self, tmp_path, evaluator, media_service):
+        """An unchanged file is not decoded again."""
+        engine, session_local = await _session_local(tmp_path)
+        audio_file = evaluator.download_folder / "test-song-001.mp3"
+        audio_file.write_bytes(b"audio")
+        await _add_song(session_local)
+
+        with patch('app.services.evaluator.get_session_local', return_value=session_local):
+            await evaluator.evaluate_song("test-song-001")
+            await evaluator.evaluate_song("test-song-001")
+            assert evaluator.analyzer.analyze_with_quality.call_count == 1
+
+            audio_file.write_bytes(b"new audio")
+            await evaluator.evaluate_song("test-song-001")
+            assert evaluator.analyzer.analyze_with_quality.call_count == 2
+        await engine.dispose()
+
+    async def test_selected_variation_audio_is_preferred(self, tmp_path, evaluator, media_service):
+        """The song's audio_path is evaluated instead of the download folder file."""
+        engine, session_local = await _session_local(tmp_path)
+        variation = tmp_path / "variation.mp3"
+        variation.write_bytes(b"audio")
+        await _add_song(session_local, audio_path=str(variation))
+
+        with patch('app.services.evaluator.get_session_local', return_value=session_local):
+            await evaluator.evaluate_song("test-song-001")
+
+        evaluator.analyzer.analyze_with_quality.assert_called_once_with(variation)
+        await engine.dispose()
+
+    async def test_evaluate_song_not_found(self, tmp_path, evaluator):
+        """Test ValueError when song doesn't exist."""
+        engine, session_local = await _session_local(tmp_path)
+
+        with patch('app.services.evaluator.get_session_local', return_value=session_local):
+            with pytest.raises(ValueError, match="Song not found"):
+                await evaluator.evaluate_song("nonexistent-song")
+        await engine.dispose()
+
+    async def test_evaluate_song_audio_file_not_found(self, tmp_path, evaluator):
+        """Test FileNotFoundError when audio file doesn't exist."""
+        engine, session_local = await _session_local(tmp_path)
+        await _add_song(session_local)
+
+        with patch('app.services.evaluator.get_session_local', return_value=session_local):
+            with pytest.raises(FileNotFoundError, match="Audio file not found"):
+                await evaluator.evaluate_song("test-song-001")
+        await engine.dispose()
+
+    async def test_evaluate_song_below_quality_threshold(self, tmp_path, evaluator, media_service):
+        """A low score is stored but not approved."""
+        engine, session_local = await _session_local(tmp_path)
+        (evaluator.download_folder / "test-song-001.mp3").write_bytes(b"audio")
+        await _add_song(session_local)
+        metrics = QualityMetrics(0.05, 0.5, -14.0, 0.1)
+        evaluator.analyzer.analyze_with_quality.return_value = (_features(), metrics, FINGERPRINT)
+
+        with patch('app.services.evaluator.get_session_local', return_value=session_local):
+            evaluation = await evaluator.evaluate_song("test-song-001")
+
+        assert evaluation.audio_quality_score == 40.0
+        assert evaluation.approved is False
+        await engine.dispose()
+
+    async def test_evaluate_song_analyzer_error(self, tmp_path, evaluator):
+        """Decoding errors propagate and nothing is committed."""
+        engine, session_local = await _session_local(tmp_path)
+        (evaluator.download_folder / "test-song-001.mp3").write_bytes(b"audio")
+        await _add_song(session_local)
+        evaluator.analyzer.analyze_with_quality.side_effect = ValueError("cannot decode")
+
+        with patch('app.services.evaluator.get_session_local', return_value=session_local):
+            with pytest.raises(ValueError, match="cannot decode"):
+                await evaluator.evaluate_song("test-song-001")
+
+        async with session_local() as db:
+            song = await db.get(Song, "test-song-001")
+            assert song.status == "downloaded"
+        await engine.dispose()
 
-    async def test_evaluate_song_audio_file_not_found(self, temp_dir):
-        """Test evaluation when audio file doesn't exist."""
-        download_folder = temp_dir / "downloads"
-        download_folder.mkdir()
-        # Don't create audio file
 
-        mock_song = MagicMock(spec=Song)
-        mock_song.id = "test-song-001"
-        mock_song.status = "downloaded"
-
-        mock_db = AsyncMock()
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_song
-        mock_db.execute.return_value = mock_result
-
-        with patch('app.services.evaluator.settings') as mock_settings:
-            mock_settings.DOWNLOAD_FOLDER = str(download_folder)
-            mock_settings.MIN_QUALITY_SCORE = 70.0
-
-            with patch('app.services.evaluator.get_audio_analyzer'):
-                with patch('app.services.evaluator.AsyncSessionLocal') as mock_session_local:
-                    mock_session_local.return_value.__aenter__.return_value = mock_db
-                    mock_session_local.return_value.__aexit__.return_value = None
-
-                    evaluator = EvaluatorService()
-
-                    with pytest.raises(FileNotFoundError, match="Audio file not found"):
-                        await evaluator.evaluate_song("test-song-001")
-
-    async def test_evaluate_song_below_quality_threshold(self, temp_dir):
-        """Test evaluation with score below quality threshold."""
-        download_folder = temp_dir / "downloads"
-        download_folder.mkdir()
-        audio_file = download_folder / "test-song-001.mp3"
-        audio_file.write_bytes(b"fake audio data")
-
-        mock_song = MagicMock(spec=Song)
-        mock_song.id = "test-song-001"
-        mock_song.status = "downloaded"
-
-        mock_analyzer = MagicMock()
-        mock_analyzer.analyze_audio.return_value = {
-            "audio_quality_score": 50.0,  # Below threshold
-            "duration_seconds": 120.0,
-            "file_size_mb": 3.0,
-            "sample_rate": 44100,
-            "bitrate": 128000,
-        }
-
-        mock_db = AsyncMock()
-        mock_result_song = MagicMock()
-        mock_result_song.scalar_one_or_none.return_value = mock_song
-        mock_result_eval = MagicMock()
-        mock_result_eval.scalar_one_or_none.return_value = None
-        mock_db.execute.side_effect = [mock_result_song, mock_result_eval]
-
-        with patch('app.services.evaluator.settings') as mock_settings:
-            mock_settings.DOWNLOAD_FOLDER = str(download_folder)
-            mock_settings.MIN_QUALITY_SCORE = 70.0  # Score is below this
-
-            with patch('app.services.evaluator.get_audio_analyzer', return_value=mock_analyzer):
-                with patch('app.services.evaluator.AsyncSessionLocal') as mock_session_local:
-                    mock_session_local.return_value.__aenter__.return_value = mock_db
-                    mock_session_local.return_value.__aexit__.return_value = None
-
-                    evaluator = EvaluatorService()
-                    result = await evaluator.evaluate_song("test-song-001")
-
-                    # Evaluation should NOT be auto-approved
-                    added_eval = mock_db.add.call_args[0][0]
-                    assert added_eval.audio_quality_score == 50.0
-                    # approved should not be set to True
-                    assert not hasattr(added_eval, 'approved') or added_eval.approved is not True
-
-    async def test_evaluate_song_analyzer_error(self, temp_dir):
-        """Test evaluation when analyzer throws error."""
-        download_folder = temp_dir / "downloads"
-        download_folder.mkdir()
-        audio_file = download_folder / "test-song-001.mp3"
-        audio_file.write_bytes(b"corrupted audio data")
-
-        mock_song = MagicMock(spec=Song)
-        mock_song.id = "test-song-001"
-        mock_song.status = "downloaded"
-
-        mock_analyzer = MagicMock()
-        mock_analyzer.analyze_audio.side_effect = Exception("Invalid audio format")
-
-        mock_db = AsyncMock()
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_song
-        mock_db.execute.return_value = mock_result
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestScoreFiles:
+    """Test batch scoring of several files."""
 
-        with patch('app.services.evaluator.settings') as mock_settings:
-            mock_settings.DOWNLOAD_FOLDER = str(download_folder)
-            mock_settings.MIN_QUALITY_SCORE = 70.0
+    async def test_only_changed_files_are_analyzed(self, tmp_path, evaluator):
+        """Files with a current stored analysis are not decoded again."""
+        engine, session_local = await _session_local(tmp_path)
+        first, second = tmp_path / "v1.mp3", tmp_path / "v2.mp3"
+        first.write_bytes(b"one")
+        second.write_bytes(b"two")
 
-            with patch('app.services.evaluator.get_audio_analyzer', return_value=mock_analyzer):
-                with patch('app.services.evaluator.AsyncSessionLocal') as mock_session_local:
-                    mock_session_local.return_value.__aenter__.return_value = mock_db
-                    mock_session_local.return_value.__aexit__.return_value = None
+        async with session_local() as db:
+            await evaluator.score_files([first], db)
+            await db.commit()
 
-                    evaluator = EvaluatorService()
+            loud = QualityMetrics(0.05, 0.0, -14.0, 0.1)
+            evaluator.analyzer.analyze_with_quality.return_value = (_features(), loud, FINGERPRINT)
+            scores = await evaluator.score_files([first, second], db)
 
-                    with pytest.raises(Exception, match="Invalid audio format"):
-                        await evaluator.evaluate_song("test-song-001")
+        assert scores == [100.0, 70.0]
+        assert evaluator.analyzer.analyze_with_quality.call_count == 2
+        evaluator.analyzer.analyze_with_quality.assert_called_with(second)
+        await engine.dispose()
 
 
 @pytest.mark.unit
 class TestGetEvaluator:
-    """Test get_evaluator singleton function."""
+    """Test get_evaluator function."""
 
     def test_get_evaluator_creates_singleton(self, temp_dir):
-        """Test that get_evaluator creates a singleton."""
+        """Test that get_evaluator creates singleton instance."""
         import app.services.evaluator as ev
         ev._evaluator = None
 
@@ -314,53 +337,3 @@ class TestGetEvaluator:
 
         # Clean up
         ev._evaluator = None
-
-
-@pytest.mark.unit
-@pytest.mark.asyncio
-class TestEvaluatorServiceEdgeCases:
-    """Test edge cases for EvaluatorService."""
-
-    async def test_evaluate_song_updates_song_status(self, temp_dir):
-        """Test that evaluation updates song status to 'evaluated'."""
-        download_folder = temp_dir / "downloads"
-        download_folder.mkdir()
-        audio_file = download_folder / "test-song-001.mp3"
-        audio_file.write_bytes(b"fake audio data")
-
-        mock_song = MagicMock(spec=Song)
-        mock_song.id = "test-song-001"
-        mock_song.status = "downloaded"
-
-        mock_analyzer = MagicMock()
-        mock_analyzer.analyze_audio.return_value = {
-            "audio_quality_score": 75.0,
-            "duration_seconds": 180.0,
-            "file_size_mb": 4.0,
-            "sample_rate": 44100,
-            "bitrate": 192000,
-        }
-
-        mock_db = AsyncMock()
-        mock_result_song = MagicMock()
-        mock_result_song.scalar_one_or_none.return_value = mock_song
-        mock_result_eval = MagicMock()
-        mock_result_eval.scalar_one_or_none.return_value = None
-        mock_db.execute.side_effect = [mock_result_song, mock_result_eval]
-
-        with patch('app.services.evaluator.settings') as mock_settings:
-            mock_settings.DOWNLOAD_FOLDER = str(download_folder)
-            mock_settings.MIN_QUALITY_SCORE = 70.0
-
-            with patch('app.services.evaluator.get_audio_analyzer', return_value=mock_analyzer):
-                with patch('app.services.evaluator.AsyncSessionLocal') as mock_session_local:
-                    mock_session_local.return_value.__aenter__.return_value = mock_db
-                    mock_session_local.return_value.__aexit__.return_value = None
-
-                    evaluator = EvaluatorService()
-                    await evaluator.evaluate_song("test-song-001")
-
-                    # Verify song status was updated
-                    assert mock_song.status == "evaluated"
-                    # Verify commit was called at least twice
-                    assert mock_db.commit.call_count >= 2
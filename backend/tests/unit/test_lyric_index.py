@@ -0,0 +1,136 @@
+"""Unit tests for the MinHash/LSH lyric duplicate index."""
+
+import os
+import random
+
+import pytest
+
+from app.services.lyric_index import (
+    LyricIndex,
+    normalize_title,
+    read_song_file,
+    shingles,
+    song_key,
+)
+
+WORDS = (
+    "fire night road heart city light rain dream gold river stone shadow "
+    "wild sky run burn fall rise break chain home ghost storm neon"
+).split()
+
+
+def _lyrics(seed, lines=24):
+    rng = random.Random(seed)
+    verses = [" ".join(rng.choice(WORDS) for _ in range(8)) for _ in range(lines)]
+    return "[Verse 1]\n" + "\n".join(verses[:lines // 2]) + "\n[Chorus]\n" + "\n".join(verses[lines // 2:])
+
+
+def _edit(lyrics, changed_lines):
+    lines = lyrics.splitlines()
+    for i in range(1, changed_lines + 1):
+        lines[i] = "completely different words on this line now"
+    return "\n".join(lines)
+
+
+def _write_song(folder, genre, name, title, lyrics):
+    path = folder / genre / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"# {title}\n\n## Style\n\npop\n\n## Lyrics\n\n{lyrics}\n", encoding="utf-8")
+    return path
+
+
+@pytest.mark.unit
+class TestShingles:
+    """Test lyric normalization."""
+
+    def test_tags_and_directions_are_ignored(self):
+        """Section tags and stage directions do not change the shingles."""
+        plain = shingles("Song", "we run all night\nunder neon light")
+        tagged = shingles("Song", "[Verse 1]\nwe run all night\n*whispered*\n[Chorus]\nunder neon light")
+
+        assert plain == tagged
+        assert "title:song" in plain
+
+    def test_normalize_title(self):
+        """Track numbers and punctuation are dropped."""
+        assert normalize_title("03-Break the Chains!") == "break the chains"
+
+    def test_read_song_file(self, tmp_path):
+        """Title and lyrics section are read from a song file."""
+        path = _write_song(tmp_path, "rock", "01-a.md", "Break The Chains", "[Verse]\nla la la")
+
+        title, lyrics = read_song_file(path)
+
+        assert title == "Break The Chains"
+        assert lyrics.strip() == "[Verse]\nla la la"
+        assert song_key(path) == "rock/01-a.md"
+
+
+@pytest.mark.unit
+class TestLyricIndex:
+    """Test near-duplicate lookups."""
+
+    @pytest.fixture
+    def index(self):
+        index = LyricIndex()
+        for i in range(50):
+            index.add(f"pop/{i:02d}.md", f"Song {i}", _lyrics(i))
+        return index
+
+    def test_near_duplicate_is_found(self, index):
+        """A lightly edited copy matches its source with high similarity."""
+        matches = index.query("Another Title", _edit(_lyrics(7), 2), min_similarity=0.5)
+
+        assert [match.key for match in matches] == ["pop/07.md"]
+        assert matches[0].similarity > 0.7
+        assert not matches[0].same_title
+
+    def test_unrelated_lyrics_do_not_match(self, index):
+        """New lyrics have no matches above the threshold."""
+        assert index.query("New", _lyrics(999), min_similarity=0.5) == []
+
+    def test_exact_title_is_always_reported(self, index):
+        """A reused title is reported even when the lyrics differ."""
+        matches = index.query("song 12", _lyrics(999), min_similarity=0.5)
+
+        assert [match.key for match in matches] == ["pop/12.md"]
+        assert matches[0].same_title
+
+    def test_exclude_and_remove(self, index):
+        """A song can be left out of its own query and removed."""
+        assert index.query("Song 3", _lyrics(3))[0].similarity == 1.0
+        assert index.query("Song 3", _lyrics(3), min_similarity=0.5, exclude="pop/03.md") == []
+
+        assert index.remove("pop/03.md")
+        assert "pop/03.md" not in index
+        assert len(index) == 49
+        assert index.query("Song 3", _lyrics(3), min_similarity=0.5) == []
+
+    def test_save_and_load(self, index, tmp_path):
+        """A saved index answers queries the same way after loading."""
+        index.remove("pop/10.md")
+        index.save(tmp_path / "index")
+        loaded = LyricIndex.load(tmp_path / "index")
+
+        assert len(loaded) == len(index)
+        assert "pop/10.md" not in loaded
+        query = ("x", _edit(_lyrics(20), 3))
+        assert loaded.query(*query) == index.query(*query)
+
+    def test_update_from_folder(self, tmp_path):
+        """Only new and changed files are indexed, deleted ones are removed."""
+        folder = tmp_path / "songs"
+        first = _write_song(folder, "pop", "01-one.md", "One", _lyrics(1))
+        second = _write_song(folder, "rock", "02-two.md", "Two", _lyrics(2))
+
+        index = LyricIndex()
+        assert index.update_from_folder(folder) == {"added": 2, "updated": 0, "removed": 0, "unchanged": 0}
+
+        _write_song(folder, "pop", "01-one.md", "One", _lyrics(100))
+        os.utime(first, ns=(first.stat().st_atime_ns, first.stat().st_mtime_ns + 10**9))
+        second.unlink()
+        _write_song(folder, "pop", "03-three.md", "Three", _lyrics(3))
+
+        assert index.update_from_folder(folder) == {"added": 1, "updated": 1, "removed": 1, "unchanged": 0}
+        assert index.query("One", _lyrics(100))[0].key == "pop/01-one.md"
+        assert index.update_from_folder(folder)["unchanged"] == 2
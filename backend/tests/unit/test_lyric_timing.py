@@ -0,0 +1,216 @@
+"""Unit tests for lyric timing service."""
+
+import json
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+pytest.importorskip("librosa")
+
+from app.database import Base  # noqa: E402
+from app.models.song import Song  # noqa: E402
+from app.models.task_queue import TaskQueue  # noqa: E402
+from app.models.video_project import VideoProject  # noqa: E402
+from app.services.lyric_timing import (  # noqa: E402
+    TIMING_DTYPE,
+    WORD_ONSET_SNAP,
+    LyricTimingService,
+)
+from app.services.worker import BackgroundWorker  # noqa: E402
+
+
+@pytest.fixture
+def service():
+    """Create lyric timing service."""
+    return LyricTimingService()
+
+
+def _line(text, start, end):
+    return {"text": text, "start_time": start, "end_time": end, "is_emphasized": False}
+
+
+def _lines_of(count):
+    return [{"text": f"line {i}", "is_emphasized": i == 0} for i in range(count)]
+
+
+@pytest.mark.unit
+class TestTimingModes:
+    """Test vectorized line timing modes."""
+
+    def test_uniform_timing(self, service):
+        """Uniform timing spaces lines evenly after the intro buffer."""
+        timing = service.compute_timing(_lines_of(4), np.array([]), 100.0, "uniform")
+
+        assert timing.dtype == TIMING_DTYPE
+        assert timing["start_time"].tolist() == [3.0, 26.5, 50.0, 73.5]
+        assert timing["end_time"].tolist() == [7.0, 30.5, 54.0, 77.5]
+
+    def test_beat_synced_timing_uses_beats(self, service):
+        """Beat-synced lines start on beats and are capped at 5 seconds."""
+        beats = np.arange(0.0, 100.0, 0.5)
+        timing = service.compute_timing(_lines_of(10), beats, 100.0, "beat_synced")
+
+        assert np.all(np.isin(timing["start_time"], beats))
+        assert np.all(timing["end_time"] - timing["start_time"] <= 5.0)
+        assert np.all(np.diff(timing["start_time"]) > 0)
+
+    def test_measure_timing_uses_measure_bounds(self, service):
+        """Measure timing starts on the first and ends on the fourth beat."""
+        beats = np.arange(0.0, 32.0)
+        timing = service.compute_timing(_lines_of(4), beats, 32.0, "measures")
+
+        assert timing["start_time"].tolist() == [0.0, 8.0, 16.0, 24.0]
+        assert timing["end_time"].tolist() == [3.0, 11.0, 19.0, 27.0]
+
+    def test_too_few_beats_falls_back_to_uniform(self, service):
+        """Modes fall back to uniform timing without enough beats."""
+        lines = _lines_of(4)
+        expected = service.compute_timing(lines, np.array([]), 100.0, "uniform")
+
+        for mode in ("beat_synced", "measures"):
+            timing = service.compute_timing(lines, np.array([1.0]), 100.0, mode)
+            assert timing.tolist() == expected.tolist()
+
+    def test_array_serializes_to_line_dicts(self, service):
+        """Structured timing converts to the JSON line shape."""
+        timing = service.compute_timing(_lines_of(2), np.array([]), 100.0, "uniform")
+
+        assert service.timing_array_to_list(timing)[0] == {
+            "text": "line 0",
+            "start_time": 3.0,
+            "end_time": 7.0,
+            "is_emphasized": True,
+        }
+
+
+def _sectioned_chroma(lengths, seed=0):
+    """Build beat chroma with a distinct pattern per section (A B A ...)."""
+    rng = np.random.default_rng(seed)
+    patterns = {}
+    columns = []
+    for label, length in lengths:
+        pattern = patterns.setdefault(label, rng.random(12))
+        columns.extend(pattern + rng.normal(0, 0.05, 12) for _ in range(length))
+    return np.array(columns).T
+
+
+@pytest.mark.unit
+class TestSectionTiming:
+    """Test section-aware alignment."""
+
+    def test_parse_lyrics_tracks_sections(self, service):
+        """Section markers split lines into numbered sections."""
+        lines = service._parse_lyrics("[Intro]\n[Verse]\na\nb\n[Chorus]\nc\n(ooh)\n[Verse 2]\nd")
+        assert [line["section"] for line in lines] == [0, 0, 1, 2]
+
+    def test_sections_start_on_detected_boundaries(self, service):
+        """Each lyric section starts where the audio changes section."""
+        chroma = _sectioned_chroma([("intro", 16), ("a", 64), ("b", 48), ("a", 64), ("outro", 16)])
+        beats = np.arange(chroma.shape[1]) * 0.5
+        lyrics = "\n".join(
+            ["[Verse]", *[f"v{i}" for i in range(8)],
+             "[Chorus]", *[f"c{i}" for i in range(4)],
+             "[Verse 2]", *[f"w{i}" for i in range(8)]]
+        )
+        lines = service._parse_lyrics(lyrics)
+
+        timing = service.compute_timing(lines, beats, 104.0, "sections", chroma)
+
+        starts = dict(zip(timing["text"].tolist(), timing["start_time"].tolist()))
+        assert starts["v0"] == beats[16]
+        assert starts["c0"] == beats[80]
+        assert starts["w0"] == beats[128]
+
+    def test_missing_chroma_falls_back_to_beat_synced(self, service):
+        """Without chroma the aligner uses beat-synced timing."""
+        lines = service._parse_lyrics("a\nb\nc")
+        beats = np.arange(0.0, 100.0, 0.5)
+
+        timing = service.compute_timing(lines, beats, 100.0, "sections", None)
+        expected = service.compute_timing(lines, beats, 100.0, "beat_synced")
+        assert timing.tolist() == expected.tolist()
+
+
+@pytest.mark.unit
+class TestWordTiming:
+    """Test word-level timing from onsets."""
+
+    def test_words_cover_each_line(self, service):
+        """Words are contiguous and span exactly their line."""
+        lines = [_line("hello there my friend", 1.0, 4.0), _line("go now", 5.0, 7.0)]
+        timed = service._word_timing(lines, np.array([]))
+
+        for line in timed:
+            words = line["words"]
+            assert [w["word"] for w in words] == line["text"].split()
+            assert words[0]["start_time"] == line["start_time"]
+            assert words[-1]["end_time"] == line["end_time"]
+            for current, following in zip(words, words[1:]):
+                assert current["end_time"] == following["start_time"]
+
+    def test_word_starts_snap_to_nearby_onsets(self, service):
+        """Word starts move onto onsets within the snap tolerance."""
+        lines = [_line("hello there my friend", 1.0, 4.0)]
+        onsets = np.array([0.5, 1.9, 2.6, 3.3])
+        words = service._word_timing(lines, onsets)[0]["words"]
+
+        assert words[1]["start_time"] == 1.9
+        assert words[2]["start_time"] == 2.6
+
+    def test_onsets_outside_line_are_ignored(self, service):
+        """Onsets beyond the line window never pull words out of the line."""
+        lines = [_line("one two", 1.0, 2.0)]
+        onsets = np.array([2.0 + WORD_ONSET_SNAP / 2])
+        words = service._word_timing(lines, onsets)[0]["words"]
+
+        assert all(1.0 <= w["start_time"] < 2.0 for w in words)
+
+    def test_empty_lines_have_no_words(self, service):
+        """Lines without words get an empty word list."""
+        timed = service._word_timing([_line("", 0.0, 1.0)], np.array([0.5]))
+        assert timed[0]["words"] == []
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestLyricTimingTask:
+    """Test that the pipeline's lyric_timing task stores its timing."""
+
+    async def test_word_timing_is_stored_on_video_project(self, tmp_path):
+        """The song's video project gets both line and word timing."""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'timing.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_local = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        audio_path = tmp_path / "song-1.mp3"
+        audio_path.write_bytes(b"audio")
+        word_timing = LyricTimingService()._word_timing(
+            [_line("hello there", 1.0, 3.0)], np.array([])
+        )
+
+        async with session_local() as db:
+            db.add(Song(
+                id="song-1", title="Song", genre="pop", style_prompt="pop",
+                lyrics="hello there", file_path="/songs/song-1.md", audio_path=str(audio_path),
+            ))
+            task = TaskQueue(task_type="lyric_timing", song_id="song-1", status="running")
+            db.add(task)
+            await db.commit()
+
+            with patch.object(
+                LyricTimingService, "generate_word_timing", AsyncMock(return_value=word_timing)
+            ):
+                await BackgroundWorker(worker_id=0).execute_lyric_timing(task, db)
+            await db.commit()
+
+        async with session_local() as db:
+            project = (await db.execute(select(VideoProject))).scalar_one()
+        assert project.song_id == "song-1"
+        assert json.loads(project.word_timing_json) == word_timing
+        assert "words" not in json.loads(project.lyric_timing_json)[0]
+        assert json.loads(task.result_json)["video_project_id"] == project.id
+        await engine.dispose()
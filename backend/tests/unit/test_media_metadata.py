@@ -0,0 +1,147 @@
+"""Unit tests for media metadata service."""
+
+import json
+import os
+import subprocess
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.models.suno_variation import SunoVariation
+from app.services.media_metadata import MediaMetadataService
+
+
+def _ffprobe_output(codec: str = "mp3", duration: str = "200.5") -> Mock:
+    """Build a fake ffprobe CompletedProcess."""
+    payload = {
+        "streams": [
+            {
+                "codec_name": codec,
+                "sample_rate": "44100",
+                "channels": 2,
+                "bit_rate": "192000",
+                "duration": duration,
+            }
+        ],
+        "format": {"duration": duration, "bit_rate": "192000"},
+    }
+    return Mock(stdout=json.dumps(payload), returncode=0)
+
+
+@pytest.fixture
+def audio_file(tmp_path):
+    """Create a fake audio file."""
+    path = tmp_path / "song.mp3"
+    path.write_bytes(b"fake mp3 data")
+    return path
+
+
+@pytest.mark.unit
+class TestMediaMetadataService:
+    """Test FFprobe parsing and caching."""
+
+    def test_probe_parses_stream(self, audio_file):
+        """Probe returns codec, sample rate, channels, bitrate and size."""
+        service = MediaMetadataService()
+        with patch("app.services.media_metadata.subprocess.run", return_value=_ffprobe_output()):
+            metadata = service.probe(audio_file)
+
+        assert metadata.duration == 200.5
+        assert metadata.codec_name == "mp3"
+        assert metadata.sample_rate == 44100
+        assert metadata.channels == 2
+        assert metadata.bit_rate == 192000
+        assert metadata.file_size_bytes == audio_file.stat().st_size
+
+    def test_probe_is_cached(self, audio_file):
+        """An unchanged file is only probed once."""
+        service = MediaMetadataService()
+        with patch(
+            "app.services.media_metadata.subprocess.run", return_value=_ffprobe_output()
+        ) as mock_run:
+            first = service.probe(audio_file)
+            second = service.probe(audio_file)
+
+        assert mock_run.call_count == 1
+        assert first is second
+        assert service.get_cache_stats()["size"] == 1
+
+    def test_modified_file_is_reprobed(self, audio_file):
+        """Changing the file's mtime or size invalidates the cache entry."""
+        service = MediaMetadataService()
+        with patch(
+            "app.services.media_metadata.subprocess.run", return_value=_ffprobe_output()
+        ) as mock_run:
+            service.probe(audio_file)
+            audio_file.write_bytes(b"a different, longer payload")
+            stat = audio_file.stat()
+            os.utime(audio_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            service.probe(audio_file)
+
+        assert mock_run.call_count == 2
+
+    def test_probe_failure_returns_none(self, audio_file):
+        """FFprobe errors return None and are not cached."""
+        service = MediaMetadataService()
+        error = subprocess.CalledProcessError(1, "ffprobe")
+        with patch("app.services.media_metadata.subprocess.run", side_effect=error):
+            assert service.probe(audio_file) is None
+
+        assert service.get_cache_stats()["size"] == 0
+
+    def test_probe_missing_file(self, tmp_path):
+        """Missing files return None without running FFprobe."""
+        service = MediaMetadataService()
+        with patch("app.services.media_metadata.subprocess.run") as mock_run:
+            assert service.probe(tmp_path / "missing.mp3") is None
+
+        mock_run.assert_not_called()
+
+    def test_cache_evicts_oldest(self, tmp_path):
+        """The cache is bounded by max_entries."""
+        service = MediaMetadataService(max_entries=2)
+        files = []
+        for i in range(3):
+            path = tmp_path / f"song{i}.mp3"
+            path.write_bytes(b"data")
+            files.append(path)
+
+        with patch("app.services.media_metadata.subprocess.run", return_value=_ffprobe_output()):
+            for path in files:
+                service.probe(path)
+
+        assert service.get_cache_stats()["size"] == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestFillVariationMetadata:
+    """Test persisting probed metadata onto variations."""
+
+    async def test_fills_missing_fields(self, audio_file):
+        """Duration and size are copied onto the variation."""
+        service = MediaMetadataService()
+        variation = SunoVariation(suno_job_id=1, audio_path=str(audio_file))
+
+        with patch("app.services.media_metadata.subprocess.run", return_value=_ffprobe_output()):
+            updated = await service.fill_variation_metadata(variation)
+
+        assert updated is True
+        assert variation.duration_seconds == 200.5
+        assert variation.file_size_bytes == audio_file.stat().st_size
+
+    async def test_skips_populated_variation(self, audio_file):
+        """Variations that already have metadata are not re-probed."""
+        service = MediaMetadataService()
+        variation = SunoVariation(
+            suno_job_id=1,
+            audio_path=str(audio_file),
+            duration_seconds=120.0,
+            file_size_bytes=1024,
+        )
+
+        with patch("app.services.media_metadata.subprocess.run") as mock_run:
+            updated = await service.fill_variation_metadata(variation)
+
+        assert updated is False
+        mock_run.assert_not_called()
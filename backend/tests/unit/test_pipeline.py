@@ -0,0 +1,120 @@
+"""Unit tests for per-song pipeline orchestration."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database import Base
+from app.models.evaluation import Evaluation
+from app.models.song import Song
+from app.models.task_queue import TaskQueue
+from app.services.pipeline import advance_pipeline, on_task_completed, start_tasks
+
+
+async def _database(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'pipeline.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_local = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with session_local() as db:
+        db.add(Song(
+            id="song-1", title="Song", genre="pop", style_prompt="pop",
+            lyrics="[Verse]\nla la", file_path="/songs/song-1.md",
+        ))
+        await db.commit()
+    return engine, session_local
+
+
+async def _complete(db, task_type, result=None):
+    task = (await db.execute(
+        select(TaskQueue).where(TaskQueue.task_type == task_type).order_by(TaskQueue.id.desc())
+    )).scalars().first()
+    task.status = "completed"
+    task.result_json = json.dumps(result) if result else None
+    await db.commit()
+    return await on_task_completed(db, task)
+
+
+async def _queued(db):
+    result = await db.execute(select(TaskQueue.task_type).where(TaskQueue.status == "pending"))
+    return sorted(result.scalars().all())
+
+
+@pytest.mark.unit
+def test_start_tasks_begin_with_suno_upload():
+    """A new song's pipeline starts with Suno and cover art in parallel."""
+    tasks = start_tasks("song-1", priority=7)
+    assert [task.task_type for task in tasks] == ["suno_upload", "cover_generate"]
+    assert all(task.priority == 7 and task.status == "pending" for task in tasks)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestAdvancePipeline:
+    """Test queueing of ready stages."""
+
+    async def test_stages_follow_dependencies(self, tmp_path):
+        """Each stage is queued once all of its dependencies completed."""
+        engine, session_local = await _database(tmp_path)
+        with patch("app.services.pipeline.get_render_farm") as render_farm:
+            async with session_local() as db:
+                created = await advance_pipeline(db, "song-1", start=True)
+                assert [task.task_type for task in created] == ["suno_upload", "cover_generate"]
+
+                # Independent stages are queued together once audio exists
+                created = await _complete(db, "suno_upload")
+                assert sorted(task.task_type for task in created) == ["evaluate", "lyric_timing"]
+
+                await _complete(db, "cover_generate", {"cover_path": "/covers/song-1.png"})
+                assert await _queued(db) == ["evaluate", "lyric_timing"]
+
+                # Rendering waits for an approved evaluation
+                assert await _complete(db, "evaluate") == []
+                db.add(Evaluation(song_id="song-1", approved=True))
+                await db.commit()
+                created = await advance_pipeline(db, "song-1")
+                # Lyric timing is a side branch and does not hold up the render
+                assert [task.task_type for task in created] == ["video_generate"]
+                assert json.loads(created[0].payload_json) == {"thumbnail": "/covers/song-1.png"}
+                render_farm.return_value.wake.assert_called_once()
+
+                # Nothing is queued twice
+                assert await advance_pipeline(db, "song-1") == []
+
+                created = await _complete(db, "video_generate")
+                assert [task.task_type for task in created] == ["youtube_upload"]
+        await engine.dispose()
+
+    async def test_reupload_starts_a_new_run(self, tmp_path):
+        """Stages of an earlier run do not count after a new Suno upload."""
+        engine, session_local = await _database(tmp_path)
+        with patch("app.services.pipeline.get_render_farm"):
+            async with session_local() as db:
+                await advance_pipeline(db, "song-1", start=True)
+                await _complete(db, "suno_upload")
+                await _complete(db, "evaluate")
+
+                db.add(TaskQueue(task_type="suno_upload", song_id="song-1", status="pending"))
+                await db.commit()
+                created = await advance_pipeline(db, "song-1", start=True)
+                assert [task.task_type for task in created] == ["cover_generate"]
+
+                created = await _complete(db, "suno_upload")
+                assert sorted(task.task_type for task in created) == ["evaluate", "lyric_timing"]
+        await engine.dispose()
+
+    async def test_other_tasks_do_not_start_a_pipeline(self, tmp_path):
+        """Completing a task outside a pipeline run queues nothing."""
+        engine, session_local = await _database(tmp_path)
+        async with session_local() as db:
+            db.add(TaskQueue(task_type="evaluate", song_id="song-1", status="pending"))
+            db.add(TaskQueue(task_type="rank_variations", song_id="song-1", status="pending"))
+            await db.commit()
+
+            assert await _complete(db, "evaluate") == []
+            assert await _complete(db, "rank_variations") == []
+        await engine.dispose()
@@ -0,0 +1,87 @@
+"""Unit tests for render farm service."""
+
+import asyncio
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.models.song import Song
+from app.services.render_farm import RenderFarm, default_render_slots, resolve_audio_path
+
+
+@pytest.mark.unit
+class TestRenderSlots:
+    """Test CPU-aware slot computation."""
+
+    def test_slots_divide_cpus_by_threads(self):
+        """Slots equal CPU count divided by threads per job."""
+        with patch("app.services.render_farm.os.cpu_count", return_value=16):
+            assert default_render_slots(2) == 8
+            assert default_render_slots(4) == 4
+
+    def test_slots_never_below_one(self):
+        """At least one render always runs."""
+        with patch("app.services.render_farm.os.cpu_count", return_value=2):
+            assert default_render_slots(8) == 1
+
+    def test_farm_uses_explicit_limits(self):
+        """Explicit limits override settings."""
+        farm = RenderFarm(max_jobs=3, threads_per_job=4)
+
+        assert farm.max_jobs == 3
+        assert farm.threads_per_job == 4
+        assert farm.video_generator.threads == 4
+        assert farm.free_slots == 3
+
+    def test_resolve_audio_prefers_song_audio_path(self):
+        """The selected audio path wins over the download folder default."""
+        song = Song(id="song-1", audio_path="/audio/song-1_v2.mp3")
+        assert resolve_audio_path(song) == Path("/audio/song-1_v2.mp3")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestRenderFarmDispatch:
+    """Test task dispatch."""
+
+    async def test_dispatch_claims_only_free_slots(self):
+        """Dispatch claims at most as many tasks as free slots."""
+        farm = RenderFarm(max_jobs=2, threads_per_job=1)
+        release = asyncio.Event()
+
+        async def fake_run(task_id):
+            await release.wait()
+
+        with patch.object(farm, "_claim_tasks", new_callable=AsyncMock, return_value=[1, 2]) as mock_claim, \
+                patch.object(farm, "_run_task", side_effect=fake_run):
+            started = await farm.dispatch_pending()
+            assert started == 2
+            mock_claim.assert_called_once_with(2)
+            assert farm.free_slots == 0
+
+            # No free slots: nothing is claimed
+            assert await farm.dispatch_pending() == 0
+            assert mock_claim.call_count == 1
+
+            release.set()
+            await asyncio.gather(*list(farm._active))
+
+        assert farm.free_slots == 2
+
+    async def test_render_song_runs_generator_with_song_paths(self, tmp_path):
+        """render_song renders the song's audio into the video output path."""
+        farm = RenderFarm(max_jobs=1, threads_per_job=2)
+        farm.video_generator = MagicMock()
+        farm.video_generator.generate_video.side_effect = lambda **kwargs: kwargs["output_file"]
+
+        song = Song(id="song-1", title="Test", audio_path=str(tmp_path / "a.mp3"))
+
+        with patch("app.services.render_farm.settings") as mock_settings:
+            mock_settings.VIDEO_OUTPUT_PATH = str(tmp_path / "videos")
+            video_path = await farm.render_song(song)
+
+        assert video_path == tmp_path / "videos" / "song-1.mp4"
+        kwargs = farm.video_generator.generate_video.call_args.kwargs
+        assert kwargs["audio_file"] == tmp_path / "a.mp3"
+        assert kwargs["title"] == "Test"
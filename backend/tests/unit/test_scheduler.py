@@ -0,0 +1,225 @@
+"""Unit tests for delayed task scheduling."""
+
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database import Base
+from app.models.evaluation import Evaluation
+from app.models.song import Song
+from app.models.task_queue import TaskQueue
+from app.models.youtube_upload import YouTubeUpload
+from app.services.scheduler import TaskTimer, retry_delay, schedule_retry
+from app.services.worker import BackgroundWorker
+
+
+async def _database(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'scheduler.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.mark.unit
+class TestRetryDelay:
+    """Test exponential backoff with jitter."""
+
+    def test_delay_doubles_per_attempt(self):
+        """Each attempt waits between half and all of base * 2^(n-1)."""
+        for attempt, full in [(1, 10), (2, 20), (3, 40)]:
+            for _ in range(50):
+                assert full / 2 <= retry_delay(attempt, base=10, cap=1000) <= full
+
+    def test_delay_is_capped(self):
+        """The delay never exceeds the cap."""
+        assert all(retry_delay(30, base=10, cap=60) <= 60 for _ in range(50))
+
+    def test_delay_is_jittered(self):
+        """Tasks failing together do not retry at the same moment."""
+        assert len({retry_delay(2, base=10, cap=1000) for _ in range(20)}) > 1
+
+    def test_schedule_retry_sets_run_at(self):
+        """A retried task goes back to pending, due after its backoff."""
+        now = datetime(2024, 1, 1, 12, 0, 0)
+        task = TaskQueue(task_type="evaluate", status="running", retry_count=1)
+
+        with patch("app.services.scheduler.get_task_timer") as timer:
+            run_at = schedule_retry(task, now=now)
+
+        assert task.status == "pending"
+        assert task.run_at == run_at
+        assert now < run_at <= now + timedelta(seconds=retry_delay(1, cap=10**9) * 2)
+        timer.return_value.schedule.assert_called_once_with(run_at)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestTaskTimer:
+    """Test the in-memory wake-up timer."""
+
+    async def test_wakes_when_due(self):
+        """A scheduled time wakes waiters, without waiting for the timeout."""
+        timer = TaskTimer()
+        timer.schedule(datetime.utcnow() + timedelta(seconds=0.05))
+        assert timer.pending() == 1
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        assert await timer.wait(5) is True
+        assert loop.time() - started < 1
+        assert timer.pending() == 0
+
+    async def test_past_time_wakes_now(self):
+        """Scheduling a time that has passed wakes immediately."""
+        timer = TaskTimer()
+        generation = timer.generation
+        timer.schedule(datetime.utcnow() - timedelta(seconds=1))
+        assert timer.generation == generation + 1
+        assert timer.pending() == 0
+
+    async def test_wake_between_checks_is_not_lost(self):
+        """A wake-up after the caller looked for work returns at once."""
+        timer = TaskTimer()
+        generation = timer.generation
+        timer.wake()
+        assert await timer.wait(5, generation) is True
+
+    async def test_timeout_without_wake(self):
+        """Without a wake-up, wait returns after its timeout."""
+        assert await TaskTimer().wait(0.01) is False
+
+    async def test_listeners_are_called(self):
+        """Listeners (the render farm) are woken with the workers."""
+        timer = TaskTimer()
+        calls = []
+        timer.add_listener(lambda: calls.append(1))
+        timer.wake()
+        assert calls == [1]
+
+    async def test_earliest_time_fires_first(self):
+        """A later schedule does not delay an earlier one."""
+        timer = TaskTimer()
+        timer.schedule(datetime.utcnow() + timedelta(seconds=10))
+        timer.schedule(datetime.utcnow() + timedelta(seconds=0.05))
+        assert await timer.wait(5) is True
+        assert timer.pending() == 1
+        timer.reset()
+        assert timer.pending() == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestDelayedTasks:
+    """Test that workers skip tasks that are not due."""
+
+    async def test_failed_task_backs_off(self, tmp_path):
+        """A failed task is not picked up again until its retry time."""
+        engine, session_local = await _database(tmp_path)
+        timer = TaskTimer()
+        async with session_local() as db:
+            db.add(TaskQueue(task_type="evaluate", status="pending", max_retries=3))
+            await db.commit()
+
+        worker = BackgroundWorker(worker_id=0)
+        with patch("app.services.worker.get_session_local", return_value=session_local), \
+                patch("app.services.scheduler.get_task_timer", return_value=timer), \
+                patch("app.services.worker.get_task_timer", return_value=timer), \
+                patch.object(worker, "execute_task", AsyncMock(side_effect=RuntimeError("boom"))):
+            assert await worker.process_next_task() is True
+            assert await worker.process_next_task() is False
+
+        async with session_local() as db:
+            task = await db.get(TaskQueue, 1)
+        assert task.status == "pending"
+        assert task.retry_count == 1
+        assert task.run_at > datetime.utcnow()
+        assert timer.pending() == 1
+        timer.reset()
+        await engine.dispose()
+
+    async def test_due_task_is_picked(self, tmp_path):
+        """A task whose run_at has passed runs like any other."""
+        engine, session_local = await _database(tmp_path)
+        async with session_local() as db:
+            db.add(TaskQueue(
+                task_type="evaluate", status="pending",
+                run_at=datetime.utcnow() - timedelta(seconds=1),
+            ))
+            await db.commit()
+
+        worker = BackgroundWorker(worker_id=0)
+        with patch("app.services.worker.get_session_local", return_value=session_local), \
+                patch("app.services.worker.on_task_completed", AsyncMock()), \
+                patch.object(worker, "execute_task", AsyncMock()):
+            assert await worker.process_next_task() is True
+
+        async with session_local() as db:
+            task = await db.get(TaskQueue, 1)
+        assert task.status == "completed"
+        await engine.dispose()
+
+    async def test_retried_upload_keeps_requested_publish_time(self, tmp_path):
+        """A retry moves run_at, but the upload records the requested time."""
+        engine, session_local = await _database(tmp_path)
+        timer = TaskTimer()
+        publish_at = datetime.utcnow() - timedelta(seconds=1)
+        async with session_local() as db:
+            db.add(Song(
+                id="song-1", title="Song", genre="pop", style_prompt="pop",
+                lyrics="la", file_path="/songs/song-1.md",
+            ))
+            db.add(Evaluation(song_id="song-1", approved=True))
+            db.add(TaskQueue(
+                task_type="youtube_upload", song_id="song-1", status="pending",
+                run_at=publish_at, scheduled_at=publish_at,
+            ))
+            await db.commit()
+
+        video_path = tmp_path / "song-1.mp4"
+        video_path.write_bytes(b"video")
+        uploader = MagicMock()
+        uploader.get_youtube_uploader.return_value.upload = AsyncMock(
+            side_effect=[RuntimeError("quota"), {"video_id": "abc"}]
+        )
+        notification = MagicMock()
+        notification.get_notification_service.return_value.notify_youtube_upload_complete = AsyncMock()
+        fingerprints = MagicMock()
+        fingerprints.find_similar = AsyncMock(return_value=[])
+
+        worker = BackgroundWorker(worker_id=0)
+        with patch.dict(sys.modules, {
+                    "app.services.youtube_uploader": uploader,
+                    "app.services.notification": notification,
+                }), \
+                patch("app.services.audio_fingerprint.get_fingerprint_service", return_value=fingerprints), \
+                patch("app.services.worker.resolve_video_path", return_value=video_path), \
+                patch("app.services.worker.get_session_local", return_value=session_local), \
+                patch("app.services.worker.on_task_completed", AsyncMock()), \
+                patch("app.services.scheduler.get_task_timer", return_value=timer), \
+                patch("app.services.worker.get_task_timer", return_value=timer):
+            assert await worker.process_next_task() is True
+
+            async with session_local() as db:
+                task = await db.get(TaskQueue, 1)
+                assert task.status == "pending"
+                assert task.run_at > publish_at
+                # Let the backoff elapse
+                await db.execute(
+                    update(TaskQueue).values(run_at=datetime.utcnow() - timedelta(seconds=1))
+                )
+                await db.commit()
+
+            assert await worker.process_next_task() is True
+
+        async with session_local() as db:
+            upload = (await db.execute(select(YouTubeUpload))).scalar_one()
+            task = await db.get(TaskQueue, 1)
+        assert task.status == "completed"
+        assert upload.scheduled_time == publish_at
+        timer.reset()
+        await engine.dispose()
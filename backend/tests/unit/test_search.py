@@ -0,0 +1,131 @@
+"""Unit tests for FTS5 full-text search."""
+
+import pytest
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database import Base
+from app.models.song import Song
+from app.models.style_template import StyleTemplate
+from app.services.search import (
+    TEMPLATES_INDEX,
+    build_match_query,
+    create_search_indexes,
+    matching_rowids,
+    search_songs,
+    search_templates,
+)
+
+
+def _song(song_id, title, lyrics, genre="pop", status="pending"):
+    return Song(
+        id=song_id, title=title, genre=genre, style_prompt=f"{genre}, upbeat",
+        lyrics=lyrics, file_path=f"/songs/{song_id}.md", status=status,
+    )
+
+
+async def _database(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'search.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_local = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    # Rows added before the index exists are picked up when it is created
+    async with session_local() as db:
+        db.add(_song("neon", "Neon Nights", "[Verse]\nwe dance in the city lights"))
+        await db.commit()
+    async with engine.begin() as conn:
+        await conn.run_sync(create_search_indexes)
+        await conn.run_sync(create_search_indexes)  # idempotent
+
+    return engine, session_local
+
+
+@pytest.mark.unit
+class TestBuildMatchQuery:
+    """Test free text to MATCH expression conversion."""
+
+    def test_last_word_is_a_prefix(self):
+        """Words are quoted and the word being typed matches as a prefix."""
+        assert build_match_query("city lig") == '"city" "lig"*'
+        assert build_match_query("city lights ") == '"city" "lights"'
+
+    def test_operators_are_plain_text(self):
+        """FTS5 syntax in user input cannot break the query."""
+        assert build_match_query('NEAR("a" OR b) -c:') == '"NEAR" "a" "OR" "b" "c"'
+        assert build_match_query("  *() ") is None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestSearch:
+    """Test ranked search and trigger sync."""
+
+    async def test_title_matches_rank_first(self, tmp_path):
+        """A title match outranks a lyrics match and terms are highlighted."""
+        engine, session_local = await _database(tmp_path)
+        async with session_local() as db:
+            db.add(_song("fire", "Fire Inside", "burning bright"))
+            db.add(_song("ballad", "Slow Ballad", "there is a fire inside my heart"))
+            await db.commit()
+
+            total, hits = await search_songs(db, "fire")
+
+        assert total == 2
+        assert [hit.id for hit in hits] == ["fire", "ballad"]
+        assert hits[0].highlights["title"] == "<mark>Fire</mark> Inside"
+        assert "<mark>fire</mark>" in hits[1].highlights["lyrics"]
+        assert "title" not in hits[1].highlights
+        await engine.dispose()
+
+    async def test_index_follows_updates_and_deletes(self, tmp_path):
+        """Triggers keep the index in sync with the songs table."""
+        engine, session_local = await _database(tmp_path)
+        async with session_local() as db:
+            assert [hit.id for hit in (await search_songs(db, "city lig"))[1]] == ["neon"]
+
+            await db.execute(update(Song).where(Song.id == "neon").values(lyrics="ocean waves"))
+            await db.commit()
+            assert (await search_songs(db, "city"))[0] == 0
+            assert (await search_songs(db, "ocean"))[0] == 1
+
+            await db.execute(update(Song).where(Song.id == "neon").values(status="uploaded"))
+            await db.execute(delete(Song).where(Song.id == "neon"))
+            await db.commit()
+            assert (await search_songs(db, "ocean"))[0] == 0
+        await engine.dispose()
+
+    async def test_filters_and_pagination(self, tmp_path):
+        """Genre and status filters apply and total counts all matches."""
+        engine, session_local = await _database(tmp_path)
+        async with session_local() as db:
+            for i in range(5):
+                db.add(_song(f"rock-{i}", f"Storm {i}", "thunder", genre="rock"))
+            db.add(_song("pop-storm", "Storm Pop", "thunder", status="uploaded"))
+            await db.commit()
+
+            total, hits = await search_songs(db, "thunder", genre="rock", skip=3, limit=10)
+            assert total == 5
+            assert len(hits) == 2
+            assert [hit.id for hit in (await search_songs(db, "thunder", status="uploaded"))[1]] == [
+                "pop-storm"
+            ]
+        await engine.dispose()
+
+    async def test_templates(self, tmp_path):
+        """Templates are searched by tags and only public ones are returned."""
+        engine, session_local = await _database(tmp_path)
+        async with session_local() as db:
+            db.add(StyleTemplate(name="Dark Synthwave", style_prompt="synth", genre="edm", tags="retro,80s"))
+            db.add(StyleTemplate(name="Retro Private", style_prompt="synth", genre="edm", is_public=False))
+            await db.commit()
+
+            total, hits = await search_templates(db, "retro")
+            assert total == 1
+            assert hits[0].highlights["tags"] == "<mark>retro</mark>,80s"
+
+            ids = (await db.execute(
+                select(StyleTemplate.name).where(StyleTemplate.id.in_(matching_rowids(TEMPLATES_INDEX, "retr")))
+            )).scalars().all()
+            assert sorted(ids) == ["Dark Synthwave", "Retro Private"]
+        await engine.dispose()
@@ -0,0 +1,54 @@
+"""Unit tests for worker stage metrics."""
+
+import json
+
+import pytest
+
+from app.services.task_metrics import merge_metrics, summarize_metrics
+
+
+@pytest.mark.unit
+class TestMergeMetrics:
+    """Test merging metric reports into stored metrics."""
+
+    def test_reports_are_merged_by_key(self):
+        """Later reports add and overwrite stages without dropping others."""
+        stored = merge_metrics(None, {"stages": {"submit": 4.0}, "counters": {}})
+        stored = merge_metrics(stored, {"stages": {"complete": 90.0, "submit": 5.0}})
+        stored = merge_metrics(stored, {"counters": {"download_bytes": 1000}, "failure_reason": None})
+
+        assert json.loads(stored) == {
+            "stages": {"submit": 5.0, "complete": 90.0},
+            "counters": {"download_bytes": 1000},
+        }
+
+    def test_invalid_stored_json_is_replaced(self):
+        """Corrupt stored metrics do not block new reports."""
+        stored = merge_metrics("not json", {"failure_reason": "upload_failed"})
+        assert json.loads(stored) == {"failure_reason": "upload_failed"}
+
+
+@pytest.mark.unit
+class TestSummarizeMetrics:
+    """Test aggregation across tasks."""
+
+    def test_stage_statistics(self):
+        """Stages get count, mean and nearest-rank percentiles."""
+        rows = [
+            json.dumps({"stages": {"complete": float(seconds)}, "counters": {"download_bytes": 10}})
+            for seconds in range(1, 21)
+        ]
+        rows.append(json.dumps({"stages": {"submit": 2.0}, "failure_reason": "download_failed"}))
+        rows.append(None)
+
+        summary = summarize_metrics(rows)
+
+        assert summary["tasks"] == 21
+        complete = summary["stages"]["complete"]
+        assert complete["count"] == 20
+        assert complete["mean_seconds"] == 10.5
+        assert complete["p50_seconds"] == 10.0
+        assert complete["p95_seconds"] == 19.0
+        assert complete["max_seconds"] == 20.0
+        assert summary["counters"] == {"download_bytes": 200.0}
+        assert summary["failures"] == {"download_failed": 1}
@@ -8,7 +8,9 @@ from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
+from app.database import Base
 from app.services.variation_service import (
     VariationService,
     get_variation_service,
@@ -446,6 +448,105 @@ class TestVariationServiceGetVariationById:
         assert variation is None
 
 
+async def _song_with_variations(tmp_path, count=2):
+    """Create a database with one song, its SunoJob and downloaded variations."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'variations.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_local = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with session_local() as db:
+        db.add(Song(
+            id="test-song-001", title="Test", genre="pop", style_prompt="pop",
+            lyrics="la la", file_path="/songs/test-song-001.md", status="downloaded",
+        ))
+        job = SunoJob(song_id="test-song-001", status="completed")
+        db.add(job)
+        await db.flush()
+        for index in range(1, count + 1):
+            audio = tmp_path / f"test-song-001_v{index}.mp3"
+            audio.write_bytes(b"audio")
+            db.add(SunoVariation(
+                suno_job_id=job.id, variation_index=index,
+                audio_path=str(audio), status="downloaded",
+            ))
+        await db.commit()
+
+    return engine, session_local
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestVariationServiceRankVariations:
+    """Test automatic variation ranking."""
+
+    @staticmethod
+    def _evaluator(scores):
+        evaluator = MagicMock()
+        evaluator.score_files = AsyncMock(return_value=scores)
+        return patch("app.services.evaluator.get_evaluator", return_value=evaluator)
+
+    async def test_clear_winner_is_selected(self, tmp_path):
+        """A variation that leads by the margin is selected and stored on the song."""
+        engine, session_local = await _song_with_variations(tmp_path)
+
+        async with session_local() as db:
+            with self._evaluator([72.0, 91.0]):
+                ranked = await VariationService().rank_variations(db, "test-song-001", margin=5.0)
+
+        assert [v.variation_index for v in ranked] == [2, 1]
+        assert [v.quality_score for v in ranked] == [91.0, 72.0]
+        assert ranked[0].is_selected and not ranked[1].is_selected
+
+        async with session_local() as db:
+            song = await db.get(Song, "test-song-001")
+            assert song.selected_variation_id == ranked[0].id
+            assert song.audio_path == ranked[0].audio_path
+            assert song.status == "evaluated"
+        await engine.dispose()
+
+    async def test_close_scores_are_left_for_review(self, tmp_path):
+        """Variations within the margin are scored but not selected."""
+        engine, session_local = await _song_with_variations(tmp_path)
+
+        async with session_local() as db:
+            with self._evaluator([88.0, 90.0]):
+                ranked = await VariationService().rank_variations(db, "test-song-001", margin=5.0)
+
+        assert not any(v.is_selected for v in ranked)
+        async with session_local() as db:
+            song = await db.get(Song, "test-song-001")
+            assert song.selected_variation_id is None
+            stored = await db.get(SunoVariation, ranked[0].id)
+            assert stored.quality_score == 90.0
+            assert stored.ranked_at is not None
+        await engine.dispose()
+
+    async def test_low_quality_winner_is_not_selected(self, tmp_path):
+        """A clear winner below the quality threshold still needs review."""
+        engine, session_local = await _song_with_variations(tmp_path)
+
+        async with session_local() as db:
+            with self._evaluator([20.0, 50.0]):
+                ranked = await VariationService().rank_variations(db, "test-song-001", margin=5.0)
+
+        assert not ranked[0].is_selected
+        await engine.dispose()
+
+    async def test_pending_review_backlog(self, tmp_path):
+        """Ranking the backlog selects clear winners."""
+        engine, session_local = await _song_with_variations(tmp_path)
+
+        async with session_local() as db:
+            with self._evaluator([95.0, 60.0]):
+                stats = await VariationService().rank_pending_review(db)
+
+        assert stats == {"ranked": 1, "selected": 1, "failed": 0}
+        async with session_local() as db:
+            assert await VariationService().get_pending_review_songs(db) == []
+        await engine.dispose()
+
+
 @pytest.mark.unit
 def test_get_variation_service_singleton():
     """Test that get_variation_service returns singleton."""
@@ -1,74 +1,207 @@
-services:
-  backend:
-    build:
-      context: ./backend
-      dockerfile: Dockerfile
-    container_name: songs-backend
-    restart: unless-stopped
-    ports:
-      - "7000:8000"
-    volumes:
-      - ./generated:/app/generated:ro
-      - ./downloads:/app/downloads
-      - songs_data:/app/data
-    environment:
-      - APP_ENV=${APP_ENV:-development}
-      - DEBUG=${DEBUG:-true}
-      - LOG_LEVEL=${LOG_LEVEL:-INFO}
-      - BACKEND_HOST=0.0.0.0
-      - BACKEND_PORT=8000
-      - DATABASE_URL=sqlite+aiosqlite:////app/data/songs.db
-      - SECRET_KEY=${SECRET_KEY}
-      - JWT_ALGORITHM=HS256
-      - JWT_EXPIRE_MINUTES=15
-      - JWT_REFRESH_EXPIRE_DAYS=7
-      - WATCH_FOLDER=/app/generated/songs
-      - DOWNLOAD_FOLDER=/app/downloads
-      - DATA_FOLDER=/app/data
-      - SUNO_EMAIL=${SUNO_EMAIL:-}
-      - SUNO_PASSWORD=${SUNO_PASSWORD:-}
-      - YOUTUBE_CLIENT_ID=${YOUTUBE_CLIENT_ID:-}
-      - YOUTUBE_CLIENT_SECRET=${YOUTUBE_CLIENT_SECRET:-}
-      - YOUTUBE_REDIRECT_URI=${YOUTUBE_REDIRECT_URI:-http://localhost:5173/oauth/callback}
-      - WORKER_CHECK_INTERVAL=${WORKER_CHECK_INTERVAL:-60}
-      - WORKER_MAX_RETRIES=${WORKER_MAX_RETRIES:-3}
-      - ADMIN_USERNAME=${ADMIN_USERNAME:-admin}
-      - ADMIN_PASSWORD=${ADMIN_PASSWORD:-changeme}
-    networks:
-      - songs-network
-    healthcheck:
-      test: ["CMD", "curl", "-f", "http://localhost:8000/health"]
-      interval: 30s
-      timeout: 10s
-      retries: 3
-      start_period: 40s
-
-  frontend:
-    build:
-      context: ./frontend
-      dockerfile: Dockerfile
-      target: dev
-    container_name: songs-frontend
-    restart: unless-stopped
-    ports:
-      - "5173:5173"
-    volumes:
-      - ./frontend:/app
-      - /app/node_modules
-    environment:
-      - VITE_API_URL=http://backend:8000
-      - APP_ENV=${APP_ENV:-development}
-    networks:
-      - songs-network
-    depends_on:
-      backend:
-        condition: service_healthy
-
-networks:
-  songs-network:
-    driver: bridge
-
-volumes:
-  songs_data:
-    name: songs-data
-  downloads:
+"""Unit tests for video generator service."""
+
+import subprocess
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.services.media_metadata import MediaMetadata
+from app.services.video_generator import (
+    AUDIO_COPY_ARGS,
+    AUDIO_ENCODE_ARGS,
+    LyricLine,
+    VideoGenerator,
+    is_upload_compatible_audio,
+    plan_lyric_segments,
+)
+
+
+@pytest.fixture
+def audio_file(tmp_path):
+    """Create a fake audio file."""
+    path = tmp_path / "song.mp3"
+    path.write_bytes(b"fake mp3 data")
+    return path
+
+
+@pytest.fixture
+def generator(tmp_path):
+    """Create generator with a temporary audio cache."""
+    return VideoGenerator(audio_cache_dir=tmp_path / "cache")
+
+
+class TestUploadCompatibility:
+    """Test upload compatibility decisions."""
+
+    def test_aac_is_compatible(self):
+        """AAC at a standard sample rate can be stream-copied."""
+        info = MediaMetadata(duration=10.0, codec_name="aac", sample_rate=44100)
+        assert is_upload_compatible_audio(info)
+
+    def test_mp3_is_not_compatible(self):
+        """MP3 needs transcoding."""
+        info = MediaMetadata(duration=10.0, codec_name="mp3", sample_rate=44100)
+        assert not is_upload_compatible_audio(info)
+
+    def test_unusual_sample_rate_is_not_compatible(self):
+        """AAC at an unusual sample rate needs transcoding."""
+        info = MediaMetadata(duration=10.0, codec_name="aac", sample_rate=22050)
+        assert not is_upload_compatible_audio(info)
+
+    def test_duration_falls_back_on_failure(self, generator, audio_file):
+        """Duration falls back to the default when probing fails."""
+        with patch.object(generator, "probe_audio", return_value=None):
+            assert generator.get_audio_duration(audio_file) == 180.0
+
+
+class TestPrepareAudio:
+    """Test stream-copy vs transcode decisions."""
+
+    def test_compatible_audio_is_copied(self, generator, audio_file):
+        """Upload-compatible audio is stream-copied from the source."""
+        info = MediaMetadata(duration=10.0, codec_name="aac", sample_rate=48000)
+        with patch.object(generator, "probe_audio", return_value=info):
+            audio_input, args = generator.prepare_audio(audio_file)
+
+        assert audio_input == audio_file
+        assert args == AUDIO_COPY_ARGS
+
+    def test_incompatible_audio_is_transcoded_once(self, generator, audio_file):
+        """Incompatible audio is transcoded into the cache and reused."""
+        info = MediaMetadata(duration=10.0, codec_name="mp3", sample_rate=44100)
+
+        def fake_ffmpeg(cmd, **kwargs):
+            Path(cmd[-1]).write_bytes(b"aac data")
+            return Mock(returncode=0)
+
+        with patch.object(generator, "probe_audio", return_value=info), \
+                patch("app.services.video_generator.subprocess.run", side_effect=fake_ffmpeg) as mock_run:
+            first_input, first_args = generator.prepare_audio(audio_file)
+            second_input, second_args = generator.prepare_audio(audio_file)
+
+        assert mock_run.call_count == 1
+        assert first_input == second_input
+        assert first_input.parent == generator.audio_cache_dir
+        assert first_input.suffix == ".m4a"
+        assert first_args == second_args == AUDIO_COPY_ARGS
+
+    def test_transcode_failure_falls_back_to_inline_encode(self, generator, audio_file):
+        """A failed cache transcode falls back to encoding during the render."""
+        info = MediaMetadata(duration=10.0, codec_name="mp3", sample_rate=44100)
+        error = subprocess.CalledProcessError(1, "ffmpeg")
+
+        with patch.object(generator, "probe_audio", return_value=info), \
+                patch("app.services.video_generator.subprocess.run", side_effect=error):
+            audio_input, args = generator.prepare_audio(audio_file)
+
+        assert audio_input == audio_file
+        assert args == AUDIO_ENCODE_ARGS
+        assert not list(generator.audio_cache_dir.glob("*.m4a"))
+
+
+class TestGenerateVideo:
+    """Test FFmpeg command construction."""
+
+    def test_generate_video_uses_prepared_audio(self, generator, audio_file, tmp_path):
+        """The render command uses the prepared audio input and codec args."""
+        output = tmp_path / "out.mp4"
+        cached = tmp_path / "cache" / "abc.m4a"
+
+        def fake_ffmpeg(cmd, **kwargs):
+            output.write_bytes(b"video")
+            return Mock(returncode=0)
+
+        with patch.object(generator, "prepare_audio", return_value=(cached, list(AUDIO_COPY_ARGS))), \
+                patch("app.services.video_generator.subprocess.run", side_effect=fake_ffmpeg) as mock_run:
+            generator.generate_video(audio_file, output)
+
+        cmd = mock_run.call_args[0][0]
+        assert str(cached) in cmd
+        assert "copy" in cmd
+        assert "aac" not in cmd
+
+    def test_thread_cap_is_passed_to_ffmpeg(self, audio_file, tmp_path):
+        """A configured thread cap is added to the render command."""
+        generator = VideoGenerator(audio_cache_dir=tmp_path / "cache", threads=3)
+        output = tmp_path / "out.mp4"
+
+        def fake_ffmpeg(cmd, **kwargs):
+            output.write_bytes(b"video")
+            return Mock(returncode=0)
+
+        with patch.object(generator, "prepare_audio", return_value=(audio_file, list(AUDIO_COPY_ARGS))), \
+                patch("app.services.video_generator.subprocess.run", side_effect=fake_ffmpeg) as mock_run:
+            generator.generate_video(audio_file, output)
+
+        cmd = mock_run.call_args[0][0]
+        assert cmd[cmd.index("-threads") + 1] == "3"
+
+
+class TestSegmentedLyricVideo:
+    """Test segmented parallel lyric video rendering."""
+
+    @staticmethod
+    def _lines(count, length=6.0):
+        return [
+            LyricLine(text=f"line {i}", start_time=i * length, end_time=(i + 1) * length)
+            for i in range(count)
+        ]
+
+    def test_plan_splits_at_line_starts(self):
+        """Segment boundaries fall on lyric line starts and cover the timeline."""
+        lines = self._lines(30)
+        plan = plan_lyric_segments(lines, 180.0, 4)
+
+        assert len(plan) == 4
+        assert plan[0][0] == 0.0
+        assert plan[-1][1] == 180.0
+        line_starts = {line.start_time for line in lines}
+        for (_, end), (start, _) in zip(plan, plan[1:]):
+            assert end == start
+            assert start in line_starts
+
+    def test_plan_keeps_short_tracks_whole(self):
+        """Tracks too short to split render as one segment."""
+        plan = plan_lyric_segments(self._lines(3), 18.0, 4)
+        assert plan == [(0.0, 18.0)]
+
+    def test_segments_are_rendered_and_concatenated(self, generator, audio_file, tmp_path):
+        """Each segment is encoded separately and joined with the concat demuxer."""
+        output = tmp_path / "lyrics.mp4"
+        lyrics = "\n".join(f"line number {i}" for i in range(30))
+        commands = []
+
+        def fake_ffmpeg(cmd, **kwargs):
+            commands.append(cmd)
+            Path(cmd[-1]).write_bytes(b"video")
+            return Mock(returncode=0)
+
+        with patch.object(generator, "get_audio_duration", return_value=180.0), \
+                patch.object(generator, "prepare_audio", return_value=(audio_file, list(AUDIO_COPY_ARGS))), \
+                patch("app.services.video_generator.subprocess.run", side_effect=fake_ffmpeg):
+            generator.generate_lyric_video(audio_file, output, lyrics, segments=3)
+
+        segment_cmds, concat_cmd = commands[:-1], commands[-1]
+        assert len(segment_cmds) == 3
+        assert all(str(audio_file) not in cmd for cmd in segment_cmds)
+        assert "concat" in concat_cmd
+        assert str(audio_file) in concat_cmd
+        assert concat_cmd[concat_cmd.index("-c:v") + 1] == "copy"
+        assert output.exists()
+
+    def test_scroll_style_renders_single_pass(self, generator, audio_file, tmp_path):
+        """The scroll style is never segmented."""
+        output = tmp_path / "lyrics.mp4"
+        lyrics = "\n".join(f"line number {i}" for i in range(30))
+
+        def fake_ffmpeg(cmd, **kwargs):
+            Path(cmd[-1]).write_bytes(b"video")
+            return Mock(returncode=0)
+
+        with patch.object(generator, "get_audio_duration", return_value=180.0), \
+                patch.object(generator, "prepare_audio", return_value=(audio_file, list(AUDIO_COPY_ARGS))), \
+                patch("app.services.video_generator.subprocess.run", side_effect=fake_ffmpeg) as mock_run:
+            generator.generate_lyric_video(audio_file, output, lyrics, style="scroll", segments=3)
+
+        assert mock_run.call_count == 1
@@ -12,6 +12,7 @@ import pytest
 
 from app.services.worker import (
     BackgroundWorker,
+    PermanentTaskError,
     WorkerPool,
     get_worker_pool,
 )
@@ -119,8 +120,8 @@ class TestBackgroundWorkerProcessNextTask:
         with patch('app.services.worker.get_session_local', return_value=mock_session_local):
             await worker.process_next_task()
 
-            # Should query but not execute any task
-            mock_db.execute.assert_called_once()
+            # Should query (the due task, then the next due time) but not execute any task
+            assert mock_db.execute.call_count == 2
             mock_db.commit.assert_not_called()
 
     async def test_process_next_task_executes_task(self):
@@ -215,6 +216,37 @@ class TestBackgroundWorkerProcessNextTask:
                 assert mock_task.retry_count == 3
                 assert mock_task.status == "failed"
 
+    async def test_process_next_task_permanent_failure_is_not_retried(self):
+        """Test a permanent failure fails the task on the first attempt."""
+        worker = BackgroundWorker(worker_id=0)
+
+        mock_task = MagicMock(spec=TaskQueue)
+        mock_task.id = 1
+        mock_task.task_type = "youtube_upload"
+        mock_task.song_id = "test-song-001"
+        mock_task.status = "pending"
+        mock_task.retry_count = 0
+        mock_task.max_retries = 3
+
+        mock_db = AsyncMock()
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = mock_task
+        mock_db.execute.return_value = mock_result
+
+        mock_session_local = MagicMock()
+        mock_session_local.return_value.__aenter__ = AsyncMock(return_value=mock_db)
+        mock_session_local.return_value.__aexit__ = AsyncMock(return_value=None)
+
+        with patch('app.services.worker.get_session_local', return_value=mock_session_local):
+            with patch.object(worker, 'execute_task', new_callable=AsyncMock) as mock_execute:
+                mock_execute.side_effect = PermanentTaskError("Duplicate audio")
+
+                await worker.process_next_task()
+
+                assert mock_task.retry_count == 1
+                assert mock_task.status == "failed"
+                assert "Duplicate audio" in mock_task.error_message
+
 
 @pytest.mark.unit
 @pytest.mark.asyncio
@@ -490,8 +522,8 @@ class TestBackgroundWorkerEvaluation:
                 await worker.execute_evaluation(mock_task, mock_db)
 
                 mock_evaluator.evaluate_song.assert_called_once_with("test-song-001")
-                # Should create YouTube upload task since approved
-                mock_db.add.assert_called_once()
+                # The pipeline queues the next stages once the task completes
+                mock_db.add.assert_not_called()
 
 
 @pytest.mark.unit
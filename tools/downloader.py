@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Resumable audio downloads for the standalone tools.
+
+A ``Downloader`` shares one pooled aiohttp session between all downloads
+and bounds how many run at once, across songs. Each file is written to a
+``.part`` file next to its destination, resumed with an HTTP Range request
+after an interruption, size-checked against the server's Content-Length /
+Content-Range, and only then renamed into place. A file that exists under
+its final name is therefore always complete.
+
+The backend's ``app/services/download_manager.py`` carries the same
+transfer logic, since the backend image is built without the tools. Keep
+the two in step when changing either.
+
+Requirements:
+    pip install aiohttp aiofiles
+"""
+
+import asyncio
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+import aiofiles
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 256 * 1024
+PART_SUFFIX = '.part'
+ATTEMPTS = 3
+
+
+def part_path(path: Path) -> Path:
+    """Temporary path a download is written to until it is complete."""
+    return path.with_name(path.name + PART_SUFFIX)
+
+
+def _total_size(response: aiohttp.ClientResponse, offset: int) -> Optional[int]:
+    content_range = response.headers.get('Content-Range', '')
+    if '/' in content_range:
+        total = content_range.rsplit('/', 1)[1]
+        return int(total) if total.isdigit() else None
+    if response.content_length is not None:
+        return offset + response.content_length
+    return None
+
+
+class Downloader:
+    """Shared-session, bounded-concurrency, resumable file downloads."""
+
+    def __init__(self, concurrency: int = 4, timeout: int = 300):
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout, sock_connect=30),
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def download(self, url: str, path: Path, expected_size: Optional[int] = None) -> Optional[Path]:
+        """Download a URL to a path, resuming a previous partial download.
+
+        Args:
+            url: URL to download from
+            path: Destination file
+            expected_size: Expected size in bytes, if known
+
+        Returns:
+            Path to the complete file, None on failure
+        """
+        path = Path(path)
+        if path.exists():
+            logger.info(f'Already downloaded: {path}')
+            return path
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        session = self._get_session()
+        async with self._semaphore:
+            for attempt in range(1, ATTEMPTS + 1):
+                try:
+                    await self._fetch(session, url, path, expected_size)
+                    logger.info(f'Downloaded: {path} ({path.stat().st_size} bytes)')
+                    return path
+                except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                    logger.warning(f'Download of {path.name} failed (attempt {attempt}/{ATTEMPTS}): {e}')
+                    if attempt < ATTEMPTS:
+                        await asyncio.sleep(2 ** attempt)
+        return None
+
+    async def _fetch(self, session: aiohttp.ClientSession, url: str, path: Path,
+                     expected_size: Optional[int]):
+        temp_path = part_path(path)
+        offset = temp_path.stat().st_size if temp_path.exists() else 0
+        headers = {'Range': f'bytes={offset}-'} if offset else {}
+
+        async with session.get(url, headers=headers) as resp:
+            if resp.status == 416:
+                # Nothing left to fetch: the .part file is already complete
+                total = _total_size(resp, offset)
+                if total != offset:
+                    temp_path.unlink()
+                    raise ValueError('partial file does not match the remote file')
+            else:
+                resp.raise_for_status()
+                if resp.status != 206:
+                    offset = 0  # Range not honoured, start over
+                total = _total_size(resp, offset)
+
+                async with aiofiles.open(temp_path, 'ab' if offset else 'wb') as f:
+                    async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                        await f.write(chunk)
+
+        size = temp_path.stat().st_size if temp_path.exists() else 0
+        if size == 0:
+            temp_path.unlink(missing_ok=True)
+            raise ValueError('downloaded file is empty')
+        for expected in (total, expected_size):
+            if expected is not None and size != expected:
+                if size > expected:
+                    temp_path.unlink()
+                raise ValueError(f'size mismatch ({size} != {expected} bytes)')
+
+        os.replace(temp_path, path)
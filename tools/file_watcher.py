@@ -4,35 +4,278 @@
 import argparse
 import json
 import os
+import sqlite3
 import sys
 import time
 import threading
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from queue import Queue, Empty
+from typing import Callable, Optional
 
 import requests
-from watchdog.events import FileCreatedEvent, FileSystemEventHandler
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
 from watchdog.observers import Observer
 
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.song_parser import SongRecord, parse_song_file, parse_song_files, song_path, song_stat
+
 # Default configuration
 DEFAULT_BACKEND_URL = "http://localhost:7000"
 DEFAULT_WATCH_FOLDER = "generated/songs"
 DEFAULT_USERNAME = "admin"
 DEFAULT_PASSWORD = "pass123"
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_BATCH_WINDOW = 1.0  # Seconds without new files before a batch is sent
+MAX_BATCH_SIZE = 500  # Backend limit for POST /songs/bulk
+DEFAULT_QUIET_WINDOW = 1.0  # Seconds without events before a song is synced
+MAX_EVENT_WAIT = 30.0  # Sync a song even if it keeps changing for this long
+
+# Event types that can change a song (opened / closed-without-write cannot)
+SONG_EVENT_TYPES = {"created", "modified", "moved", "deleted", "closed"}
+
+
+@dataclass
+class FileRecord:
+    """Last synced state of a song file."""
+
+    path: str
+    mtime_ns: int
+    size: int
+    sha256: Optional[str]
+    song_id: Optional[str]
+
+
+class WatcherState:
+    """SQLite store of synced song files, keyed by absolute path.
+
+    Each file's mtime, size and content hash are kept so that a restart only
+    has to stat files, and files whose stat changed are hashed to tell real
+    edits from touches. Every change is a single-row upsert.
+    """
+
+    def __init__(self, db_path: Path, legacy_json: Optional[Path] = None):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                sha256 TEXT,
+                song_id TEXT,
+                synced_at REAL NOT NULL
+            )
+            """
+        )
+        if legacy_json is not None and legacy_json.exists():
+            self._import_legacy(legacy_json)
+
+    def _import_legacy(self, legacy_json: Path) -> None:
+        """Import paths from the old processed_songs.json, then retire it."""
+        try:
+            paths = json.loads(legacy_json.read_text())
+        except (OSError, ValueError):
+            return
+
+        rows = []
+        for path in paths:
+            try:
+                mtime_ns, size = song_stat(Path(path))
+            except OSError:
+                continue
+            rows.append((path, mtime_ns, size, None, None, time.time()))
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO files VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+        legacy_json.rename(legacy_json.with_suffix(".json.imported"))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM files").fetchone()[0]
+
+    def get(self, path: str) -> Optional[FileRecord]:
+        """Get the stored state of a file."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, mtime_ns, size, sha256, song_id FROM files WHERE path = ?", (path,)
+            ).fetchone()
+        return FileRecord(*row) if row else None
+
+    def stats(self) -> dict[str, tuple[int, int]]:
+        """Get (mtime_ns, size) of every stored file, for startup scans."""
+        with self._lock:
+            rows = self._conn.execute("SELECT path, mtime_ns, size FROM files").fetchall()
+        return {path: (mtime_ns, size) for path, mtime_ns, size in rows}
+
+    def record(
+        self, path: str, mtime_ns: int, size: int, sha256: Optional[str], song_id: Optional[str]
+    ) -> None:
+        """Store a file as synced."""
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO files (path, mtime_ns, size, sha256, song_id, synced_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    mtime_ns = excluded.mtime_ns, size = excluded.size, sha256 = excluded.sha256,
+                    song_id = COALESCE(excluded.song_id, files.song_id), synced_at = excluded.synced_at
+                """,
+                (path, mtime_ns, size, sha256, song_id, time.time()),
+            )
+
+    def remove(self, paths: list[str]) -> None:
+        """Forget files that no longer exist."""
+        with self._lock:
+            self._conn.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in paths])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+@dataclass
+class PendingSong:
+    """Events seen for a song since it was last emitted."""
+
+    first_event: float
+    last_event: float
+    events: int
+    snapshot: Optional[tuple[int, int]]  # song_stat() at the last event
+
+
+class EventAggregator:
+    """Coalesces file events per song and emits each song once it settles.
+
+    Create, modify, move and delete events for a ``.md`` file and its
+    ``.meta.json`` companion are grouped by song. A song is emitted once no
+    event arrived for ``quiet_window`` seconds and its size and mtime are
+    unchanged since the last event, so editor save bursts and half-written
+    files produce a single sync. Songs that keep changing are emitted after
+    ``max_wait`` seconds regardless.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[Path, int], None],
+        quiet_window: float = DEFAULT_QUIET_WINDOW,
+        max_wait: float = MAX_EVENT_WAIT,
+    ):
+        self.emit = emit
+        self.quiet_window = quiet_window
+        self.max_wait = max_wait
+        self._pending: dict[Path, PendingSong] = {}
+        self._condition = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _snapshot(path: Path) -> Optional[tuple[int, int]]:
+        try:
+            return song_stat(path)
+        except OSError:
+            return None
+
+    def add(self, path: Path) -> None:
+        """Record an event for a file; unrelated files are ignored."""
+        song = song_path(path)
+        if song is None:
+            return
+
+        song = song.absolute()
+        snapshot = self._snapshot(song)
+        now = time.monotonic()
+        with self._condition:
+            pending = self._pending.get(song)
+            if pending is None:
+                self._pending[song] = PendingSong(now, now, 1, snapshot)
+            else:
+                pending.last_event = now
+                pending.events += 1
+                pending.snapshot = snapshot
+            self._condition.notify()
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._pending)
+
+    def _run(self) -> None:
+        with self._condition:
+            while self._running:
+                now = time.monotonic()
+                for song, pending in list(self._pending.items()):
+                    if now - pending.last_event < self.quiet_window:
+                        continue
+
+                    # Still being written: wait for another quiet window
+                    snapshot = self._snapshot(song)
+                    if snapshot != pending.snapshot and now - pending.first_event < self.max_wait:
+                        pending.snapshot = snapshot
+                        pending.last_event = now
+                        continue
+
+                    del self._pending[song]
+                    self.emit(song, pending.events)
+
+                timeout = None
+                if self._pending:
+                    next_due = min(p.last_event for p in self._pending.values()) + self.quiet_window
+                    timeout = max(0.0, next_due - time.monotonic())
+                self._condition.wait(timeout)
+
+    def flush(self) -> None:
+        """Emit all pending songs now."""
+        with self._condition:
+            pending, self._pending = self._pending, {}
+        for song, state in pending.items():
+            self.emit(song, state.events)
+
+    def stop(self) -> None:
+        """Stop the aggregator thread; pending songs are dropped."""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self._thread.join(timeout=5)
 
 
 class SongFileHandler(FileSystemEventHandler):
     """Handler for new song files with queue-based batch processing."""
 
-    def __init__(self, backend_url: str, token: str, auto_upload: bool = True, data_dir: Path = None):
+    def __init__(
+        self,
+        backend_url: str,
+        token: str,
+        auto_upload: bool = True,
+        data_dir: Path = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        batch_window: float = DEFAULT_BATCH_WINDOW,
+        quiet_window: float = DEFAULT_QUIET_WINDOW,
+    ):
         super().__init__()
         self.backend_url = backend_url
         self.token = token
         self.auto_upload = auto_upload
+        self.batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+        self.batch_window = batch_window
+
+        # One pooled connection for all backend calls
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {token}"
         self.data_dir = data_dir or Path(__file__).parent.parent / "data"
-        self.processed_file = self.data_dir / "processed_songs.json"
-        self.processed_files: set[str] = self._load_processed_files()
+        self.state = WatcherState(
+            self.data_dir / "watcher_state.db",
+            legacy_json=self.data_dir / "processed_songs.json",
+        )
 
         # Queue for batch processing
         self.file_queue: Queue[Path] = Queue()
@@ -40,21 +283,8 @@ class SongFileHandler(FileSystemEventHandler):
         self.worker_thread = threading.Thread(target=self._process_queue, daemon=True)
         self.worker_thread.start()
 
-    def _load_processed_files(self) -> set[str]:
-        """Load processed files from persistent storage."""
-        if self.processed_file.exists():
-            try:
-                with open(self.processed_file, "r") as f:
-                    return set(json.load(f))
-            except Exception:
-                pass
-        return set()
-
-    def _save_processed_files(self) -> None:
-        """Save processed files to persistent storage."""
-        self.data_dir.mkdir(parents=True, exist_ok=True)
-        with open(self.processed_file, "w") as f:
-            json.dump(list(self.processed_files), f, indent=2)
+        # Coalesces filesystem events into one queued sync per song
+        self.aggregator = EventAggregator(self._queue_song, quiet_window=quiet_window)
 
     def _timestamp(self) -> str:
         return datetime.now().strftime("%H:%M:%S")
@@ -62,241 +292,127 @@ class SongFileHandler(FileSystemEventHandler):
     def _log(self, msg: str) -> None:
         print(f"[{self._timestamp()}] {msg}")
 
-    def _check_song_exists(self, file_path: Path) -> bool:
-        """Check if song already exists in backend by file path."""
-        try:
-            headers = {"Authorization": f"Bearer {self.token}"}
-            response = requests.get(
-                f"{self.backend_url}/api/v1/songs",
-                params={"file_path": str(file_path.absolute()), "limit": 1},
-                headers=headers,
-                timeout=10,
-            )
-            if response.status_code == 200:
-                items = response.json().get("items", [])
-                return len(items) > 0
-        except Exception as e:
-            self._log(f"Error checking if song exists: {e}")
-        return False
-
     def _process_queue(self) -> None:
-        """Worker thread that processes files from the queue."""
-        batch_save_count = 0
+        """Worker thread that syncs queued files in batches.
 
+        After the first file arrives, files are collected until none has
+        been queued for ``batch_window`` seconds or the batch is full, so a
+        large drop of files goes to the backend in a few requests.
+        """
         while self.worker_running:
             try:
                 # Wait for file with timeout (allows clean shutdown)
-                file_path = self.file_queue.get(timeout=1)
+                batch = [self.file_queue.get(timeout=1)]
             except Empty:
-                # Save periodically even if no new files
-                if batch_save_count > 0:
-                    self._save_processed_files()
-                    batch_save_count = 0
                 continue
 
-            try:
-                abs_path = str(file_path.absolute())
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.file_queue.get(timeout=self.batch_window))
+                except Empty:
+                    break
 
-                # Skip if already processed
-                if abs_path in self.processed_files:
+            try:
+                self.sync_files(batch)
+            except Exception as e:
+                self._log(f"Error processing batch of {len(batch)} files: {e}")
+            finally:
+                for _ in batch:
                     self.file_queue.task_done()
-                    continue
 
-                # Check backend
-                if self._check_song_exists(file_path):
-                    self._log(f"Already in backend: {file_path.name}")
-                    self.processed_files.add(abs_path)
-                    batch_save_count += 1
-                    self.file_queue.task_done()
-                    continue
+    def _detect_change(self, item: Path | SongRecord) -> Optional[SongRecord]:
+        """Check a queued file (or an already parsed one) against the watcher state.
 
-                # Wait for file to be fully written
-                time.sleep(0.5)
+        Touched-but-unchanged files are recorded and deleted ones forgotten
+        here, so only real edits and new files are returned.
 
-                # Process the file
-                self._log(f"Processing: {file_path.name}")
-                self.process_song_file(file_path)
-                self.processed_files.add(abs_path)
-                batch_save_count += 1
+        Returns:
+            Parsed song if the file needs syncing
+        """
+        if isinstance(item, SongRecord):
+            record = self.state.get(item.path)
+        else:
+            abs_path = str(item.absolute())
+            try:
+                stat = song_stat(item)
+            except FileNotFoundError:
+                self.state.remove([abs_path])
+                return None
+
+            record = self.state.get(abs_path)
+            if record and (record.mtime_ns, record.size) == stat:
+                return None
+            item = parse_song_file(item)
+
+        if record and record.sha256 == item.sha256:
+            self.state.record(item.path, item.mtime_ns, item.size, item.sha256, record.song_id)
+            return None
+        return item
 
-                # Batch save every 5 files
-                if batch_save_count >= 5:
-                    self._save_processed_files()
-                    batch_save_count = 0
+    def sync_files(self, items: list[Path | SongRecord]) -> None:
+        """Create or update the backend songs for new and edited files.
 
-                self.file_queue.task_done()
+        Changed files are sent in one ``POST /songs/bulk`` upsert keyed by
+        file path; with auto-upload, new songs are queued for Suno in the
+        same request.
+        """
+        changes: dict[str, SongRecord] = {}
+        for item in items:
+            try:
+                song = self._detect_change(item)
+            except OSError as e:
+                self._log(f"Cannot read {item}: {e}")
+                continue
+            if song:
+                changes[song.path] = song
+        if not changes:
+            return
 
-            except Exception as e:
-                self._log(f"Error processing {file_path.name}: {e}")
-                self.file_queue.task_done()
+        response = self.session.post(
+            f"{self.backend_url}/api/v1/songs/bulk",
+            json={
+                "songs": [song.to_song_data() for song in changes.values()],
+                "enqueue_suno": self.auto_upload,
+            },
+            timeout=60,
+        )
+        if response.status_code != 200:
+            self._log(f"Failed to sync {len(changes)} songs: {response.text}")
+            return
+
+        result = response.json()
+        for item in result["items"]:
+            song = changes[item["file_path"]]
+            self.state.record(song.path, song.mtime_ns, song.size, song.sha256, item["id"])
+            if item["action"] != "unchanged":
+                self._log(f"Song {item['action']}: {Path(song.path).name} (ID: {item['id']})")
 
-        # Final save on shutdown
-        if batch_save_count > 0:
-            self._save_processed_files()
+        self._log(
+            f"Synced {len(changes)} files: {result['created']} created, {result['updated']} updated, "
+            f"{result['queued']} queued for Suno upload"
+        )
 
     def stop(self) -> None:
         """Stop the worker thread."""
+        self.aggregator.stop()
         self.worker_running = False
         self.worker_thread.join(timeout=5)
+        self.session.close()
+        self.state.close()
 
-    def on_created(self, event: FileCreatedEvent) -> None:
-        """Handle new file creation - adds to queue for processing."""
-        if event.is_directory:
-            return
-
-        file_path = Path(event.src_path)
+    def _queue_song(self, song: Path, events: int) -> None:
+        self._log(f"Queued: {song.name} ({events} events, queue size: {self.file_queue.qsize() + 1})")
+        self.file_queue.put(song)
 
-        # Only process .md files
-        if file_path.suffix != ".md":
+    def on_any_event(self, event: FileSystemEvent) -> None:
+        """Pass song file events (including both ends of moves) to the aggregator."""
+        if event.is_directory or event.event_type not in SONG_EVENT_TYPES:
             return
 
-        # Quick check - skip if already processed locally
-        if str(file_path.absolute()) in self.processed_files:
-            return
-
-        self._log(f"Queued: {file_path.name} (queue size: {self.file_queue.qsize() + 1})")
-        self.file_queue.put(file_path)
-
-    def process_song_file(self, file_path: Path) -> None:
-        """Process new song file and create via API."""
-        # Read song file content
-        content = file_path.read_text(encoding="utf-8")
-
-        # Extract metadata from file content
-        metadata = self.parse_song_file(content)
-
-        # Check for accompanying .meta.json file
-        meta_file = file_path.with_suffix(".meta.json")
-        if meta_file.exists():
-            with open(meta_file, "r") as f:
-                extra_meta = json.load(f)
-                metadata.update(extra_meta)
-
-        # Create song via API
-        song_data = {
-            "title": metadata.get("title", file_path.stem),
-            "genre": metadata.get("genre", "Unknown"),
-            "style_prompt": metadata.get("style_prompt", ""),
-            "lyrics": metadata.get("lyrics", content),
-            "file_path": str(file_path.absolute()),
-        }
-
-        headers = {"Authorization": f"Bearer {self.token}"}
-
-        # Create song
-        response = requests.post(
-            f"{self.backend_url}/api/v1/songs",
-            json=song_data,
-            headers=headers,
-            timeout=30,
-        )
-
-        if response.status_code == 200:
-            song = response.json()
-            self._log(f"Song created: {song['title']} (ID: {song['id']})")
-
-            # Queue for Suno upload if auto_upload enabled
-            if self.auto_upload:
-                upload_resp = requests.post(
-                    f"{self.backend_url}/api/v1/songs/{song['id']}/upload-to-suno",
-                    headers=headers,
-                    timeout=30,
-                )
-                if upload_resp.status_code == 200:
-                    self._log(f"Queued for Suno upload: {song['title']}")
-                else:
-                    self._log(f"Failed to queue for Suno: {upload_resp.text}")
-        else:
-            self._log(f"Failed to create song: {response.text}")
-
-    def parse_song_file(self, content: str) -> dict:
-        """Parse song file content to extract metadata.
-
-        Handles both plain text and code block formats:
-        - ## Style Prompt followed by text or ```code block```
-        - ## Lyrics followed by text or ```code block```
-        """
-        lines = content.split("\n")
-        metadata = {
-            "title": "",
-            "genre": "",
-            "style_prompt": "",
-            "lyrics": content,
-        }
-
-        # Extract title (first # heading)
-        for line in lines:
-            if line.startswith("# ") and not line.startswith("## "):
-                metadata["title"] = line[2:].strip()
-                break
-
-        # Extract style prompt and lyrics sections
-        in_style = False
-        in_lyrics = False
-        in_code_block = False
-        style_lines = []
-        lyrics_lines = []
-
-        for line in lines:
-            # Check for code block markers
-            if line.strip().startswith("```"):
-                in_code_block = not in_code_block
-                continue
-
-            # Check for section headers (only outside code blocks)
-            if not in_code_block:
-                # Handle various style prompt header formats
-                if line.startswith("## Style Prompt") or line.startswith("## AI Style Prompt"):
-                    in_style = True
-                    in_lyrics = False
-                    continue
-                elif line.startswith("## Lyrics"):
-                    in_lyrics = True
-                    in_style = False
-                    continue
-                elif line.startswith("## "):
-                    in_style = False
-                    in_lyrics = False
-                    continue
-
-            # Collect content from active sections
-            if in_style and line.strip():
-                style_lines.append(line.strip())
-            elif in_lyrics:
-                lyrics_lines.append(line)
-
-        # Join collected lines
-        if style_lines:
-            metadata["style_prompt"] = " ".join(style_lines)
-
-        if lyrics_lines:
-            # Preserve line breaks in lyrics
-            metadata["lyrics"] = "\n".join(lyrics_lines).strip()
-
-        # Try to extract genre from style prompt (avoid "no <genre>" patterns)
-        import re
-        style_lower = metadata["style_prompt"].lower()
-
-        # Order by specificity (more specific genres first)
-        genres = [
-            "hip-hop", "r&b", "r-b", "edm", "electronic",
-            "country", "rock", "jazz", "pop", "rap", "folk", "blues"
-        ]
-
-        for genre in genres:
-            # Use word boundary to match genre, but not "no genre"
-            pattern = rf"(?<!no\s)(?<!no-)\b{re.escape(genre)}\b"
-            if re.search(pattern, style_lower):
-                # Normalize genre name
-                genre_name = genre.replace("-", " ").replace("&", " and ")
-                metadata["genre"] = genre_name.title().replace(" And ", " & ")
-                break
-
-        # Fallback: try to get from folder path if available
-        if not metadata["genre"]:
-            metadata["genre"] = "Unknown"
-
-        return metadata
+        self.aggregator.add(Path(event.src_path))
+        dest_path = getattr(event, "dest_path", "")
+        if dest_path:
+            self.aggregator.add(Path(dest_path))
 
 
 def login(backend_url: str, username: str, password: str) -> str | None:
@@ -317,25 +433,51 @@ def login(backend_url: str, username: str, password: str) -> str | None:
         return None
 
 
-def scan_existing_files(watch_folder: Path, handler: SongFileHandler) -> None:
-    """Scan and queue existing .md files that haven't been processed."""
+def scan_existing_files(
+    watch_folder: Path,
+    handler: SongFileHandler,
+    workers: Optional[int] = None,
+    processes: bool = False,
+) -> None:
+    """Queue .md files that are new or changed since they were last synced.
+
+    Files are stat-compared against the watcher state and the changed ones
+    are read, hashed and parsed on a worker pool before being queued.
+    Files that were deleted are dropped from the state.
+    """
     print(f"Scanning existing files in {watch_folder}...")
     queued_count = 0
     skipped_count = 0
+    known = handler.state.stats()
+    watch_prefix = str(watch_folder.absolute()) + os.sep
+
+    changed = []
 
     for md_file in watch_folder.rglob("*.md"):
         abs_path = str(md_file.absolute())
 
-        # Skip if already in local processed list
-        if abs_path in handler.processed_files:
+        # Skip if unchanged since last sync
+        if known.pop(abs_path, None) == song_stat(md_file):
             skipped_count += 1
             continue
+        changed.append(md_file)
+
+    records, errors = parse_song_files(changed, workers=workers, processes=processes)
+    for path, error in errors.items():
+        print(f"Cannot read {path}: {error}")
 
-        # Queue for processing (worker thread will check backend)
-        handler.file_queue.put(md_file)
+    # Queue for processing (worker thread will sync with backend)
+    for record in records:
+        handler.file_queue.put(record)
         queued_count += 1
 
-    print(f"Scan complete: {queued_count} queued, {skipped_count} already processed")
+    deleted = [path for path in known if path.startswith(watch_prefix)]
+    handler.state.remove(deleted)
+
+    print(
+        f"Scan complete: {queued_count} queued, {skipped_count} unchanged, "
+        f"{len(deleted)} deleted"
+    )
 
     if queued_count > 0:
         print(f"Processing {queued_count} files in background...")
@@ -368,6 +510,35 @@ def main():
         action="store_true",
         help="Don't automatically queue songs for Suno upload",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Maximum songs per bulk request (max {MAX_BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--batch-window",
+        type=float,
+        default=DEFAULT_BATCH_WINDOW,
+        help="Seconds to wait for more files before sending a batch",
+    )
+    parser.add_argument(
+        "--quiet-window",
+        type=float,
+        default=DEFAULT_QUIET_WINDOW,
+        help="Seconds a song must go without file events before it is synced",
+    )
+    parser.add_argument(
+        "--scan-workers",
+        type=int,
+        default=None,
+        help="Parallel parsers for --scan-existing (default: CPU count)",
+    )
+    parser.add_argument(
+        "--scan-processes",
+        action="store_true",
+        help="Parse with processes instead of threads during --scan-existing",
+    )
     parser.add_argument(
         "--scan-existing",
         action="store_true",
@@ -411,11 +582,14 @@ def main():
         backend_url=args.backend,
         token=token,
         auto_upload=not args.no_auto_upload,
+        batch_size=args.batch_size,
+        batch_window=args.batch_window,
+        quiet_window=args.quiet_window,
     )
 
     # Scan existing files if requested
     if args.scan_existing:
-        scan_existing_files(watch_folder, handler)
+        scan_existing_files(watch_folder, handler, args.scan_workers, args.scan_processes)
 
     # Start observer
     observer = Observer()
@@ -423,7 +597,7 @@ def main():
     observer.start()
 
     print(f"[{datetime.now().strftime('%H:%M:%S')}] Watching for new files...")
-    print(f"[{datetime.now().strftime('%H:%M:%S')}] Previously processed: {len(handler.processed_files)} files")
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] Previously synced: {len(handler.state)} files")
 
     try:
         while True:
@@ -437,6 +611,7 @@ def main():
 
     # Stop handler (waits for queue to drain)
     print("Waiting for queue to finish...")
+    handler.aggregator.flush()
     handler.file_queue.join()  # Wait for all queued items
     handler.stop()
 
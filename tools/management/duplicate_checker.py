@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""Duplicate checks for generated songs.
+
+Titles are compared locally across generated/songs. Lyric near-duplicates
+come from the backend's MinHash index via POST /api/v1/songs/similar-lyrics,
+and acoustic duplicates (songs whose Suno audio sounds the same) from its
+landmark fingerprint index via GET /api/v1/songs/{song_id}/duplicates.
+
+Usage:
+    python tools/management/duplicate_checker.py                 # scan all titles
+    python tools/management/duplicate_checker.py --title "Name"  # check one title
+    python tools/management/duplicate_checker.py --lyrics FILE   # lyric check
+    python tools/management/duplicate_checker.py --song-id ID    # acoustic check
+"""
+
+import argparse
+import os
+import re
+import sys
+from difflib import SequenceMatcher
+from pathlib import Path
+
+import requests
+
+DEFAULT_BACKEND_URL = "http://localhost:7000"
+DEFAULT_SONGS_FOLDER = "generated/songs"
+DEFAULT_USERNAME = "admin"
+DEFAULT_PASSWORD = "pass123"
+TITLE_SIMILARITY = 0.85
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase a title and drop track numbers and punctuation."""
+    title = re.sub(r"^\d+[-_. ]+", "", title.strip().lower())
+    return re.sub(r"[^a-z0-9]+", " ", title).strip()
+
+
+def read_title(md_file: Path) -> str:
+    """Get a song's title from its first heading, or its file name."""
+    try:
+        for line in md_file.read_text(encoding="utf-8").splitlines():
+            if line.startswith("# "):
+                return line[2:].strip()
+    except OSError:
+        pass
+    return md_file.stem.replace("-", " ")
+
+
+class DuplicateChecker:
+    """Finds duplicate songs by title and by audio fingerprint."""
+
+    def __init__(self, generated_dir: Path, backend_url: str = None, token: str = None):
+        songs_dir = Path(generated_dir) / "songs"
+        self.songs_dir = songs_dir if songs_dir.exists() else Path(generated_dir)
+        self.backend_url = backend_url
+        self.token = token
+
+    def _titles(self) -> list[tuple[Path, str]]:
+        if not self.songs_dir.exists():
+            return []
+        return [(md_file, read_title(md_file)) for md_file in sorted(self.songs_dir.rglob("*.md"))]
+
+    def check_title(self, title: str) -> list[dict]:
+        """Find songs whose title is the same as or close to a title.
+
+        Returns:
+            List of {"file", "title", "similarity"}, most similar first
+        """
+        wanted = normalize_title(title)
+        results = []
+        for md_file, other in self._titles():
+            similarity = SequenceMatcher(None, wanted, normalize_title(other)).ratio()
+            if similarity >= TITLE_SIMILARITY:
+                results.append({"file": str(md_file), "title": other, "similarity": similarity})
+        return sorted(results, key=lambda r: r["similarity"], reverse=True)
+
+    def scan_all(self) -> list[dict]:
+        """Group songs that share a normalized title.
+
+        Returns:
+            List of {"title", "files"} for every title used more than once
+        """
+        groups: dict[str, list[Path]] = {}
+        titles: dict[str, str] = {}
+        for md_file, title in self._titles():
+            key = normalize_title(title)
+            groups.setdefault(key, []).append(md_file)
+            titles.setdefault(key, title)
+
+        return [
+            {"title": titles[key], "files": [str(f) for f in files]}
+            for key, files in groups.items()
+            if len(files) > 1
+        ]
+
+    def _headers(self) -> dict:
+        if not self.backend_url or not self.token:
+            raise ValueError("Backend checks need a backend URL and token")
+        return {"Authorization": f"Bearer {self.token}"}
+
+    def check_lyrics(self, md_file: Path, limit: int = 5) -> list[dict]:
+        """Find songs with near-duplicate lyrics, using the backend lyric index.
+
+        Returns:
+            List of {"key", "title", "similarity", "same_title"}, best first
+        """
+        md_file = Path(md_file)
+        response = requests.post(
+            f"{self.backend_url}/api/v1/songs/similar-lyrics",
+            json={
+                "title": read_title(md_file),
+                "lyrics": md_file.read_text(encoding="utf-8"),
+                "limit": limit,
+                "exclude_file_path": str(md_file),
+            },
+            headers=self._headers(),
+            timeout=30,
+        )
+        response.raise_for_status()
+        return response.json()["matches"]
+
+    def check_audio(self, song_id: str, limit: int = 5) -> list[dict]:
+        """Find songs that sound like a song, using the backend fingerprint index.
+
+        Returns:
+            List of {"song_id", "title", "status", "score", ...}, best first
+        """
+        response = requests.get(
+            f"{self.backend_url}/api/v1/songs/{song_id}/duplicates",
+            params={"limit": limit},
+            headers=self._headers(),
+            timeout=30,
+        )
+        response.raise_for_status()
+        return response.json()["duplicates"]
+
+
+def login(backend_url: str, username: str, password: str) -> str | None:
+    """Login to backend and get access token."""
+    try:
+        response = requests.post(
+            f"{backend_url}/api/v1/auth/login",
+            json={"username": username, "password": password},
+            timeout=30,
+        )
+        if response.status_code == 200:
+            return response.json().get("access_token")
+        print(f"Login failed: {response.text}")
+    except Exception as e:
+        print(f"Login error: {e}")
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check songs for duplicates")
+    parser.add_argument("--title", help="Check one title against generated songs")
+    parser.add_argument("--lyrics", type=Path, help="Find songs with lyrics like this song file")
+    parser.add_argument("--song-id", help="Find songs whose audio sounds like this song")
+    parser.add_argument(
+        "--backend",
+        default=os.environ.get("BACKEND_URL", DEFAULT_BACKEND_URL),
+        help="Backend API URL",
+    )
+    parser.add_argument(
+        "--username",
+        default=os.environ.get("ADMIN_USERNAME", DEFAULT_USERNAME),
+        help="Admin username",
+    )
+    parser.add_argument(
+        "--password",
+        default=os.environ.get("ADMIN_PASSWORD", DEFAULT_PASSWORD),
+        help="Admin password",
+    )
+    args = parser.parse_args()
+
+    project_root = Path(__file__).parent.parent.parent
+    checker = DuplicateChecker(project_root / "generated", backend_url=args.backend)
+
+    if args.song_id or args.lyrics:
+        checker.token = login(args.backend, args.username, args.password)
+        if not checker.token:
+            sys.exit(1)
+
+    if args.lyrics:
+        matches = checker.check_lyrics(args.lyrics)
+        for match in matches:
+            marker = " (same title)" if match["same_title"] else ""
+            print(f"{match['key']}: {match['title']} - similarity {match['similarity']:.0%}{marker}")
+        if not matches:
+            print("No lyric duplicates found")
+    elif args.song_id:
+        duplicates = checker.check_audio(args.song_id)
+        for match in duplicates:
+            print(
+                f"{match['song_id'] or match['audio_path']}: {match.get('title') or '?'} "
+                f"- score {match['score']:.0%} ({match['matched']} landmarks)"
+            )
+        if not duplicates:
+            print("No acoustic duplicates found")
+    elif args.title:
+        for result in checker.check_title(args.title):
+            print(f"{result['file']} - Similarity: {result['similarity']:.1%}")
+    else:
+        for group in checker.scan_all():
+            print(f"\n{group['title']}:")
+            for file in group["files"]:
+                print(f"  - {file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Adaptive (AIMD) rate control for Suno submissions.
+
+``AdaptiveRate`` holds two knobs: how many songs may be in flight
+(submitted and not yet downloaded) and the minimum delay between two
+submissions. Like TCP congestion control it increases additively and
+decreases multiplicatively:
+
+- each clean submission grows the in-flight limit by ``1/limit`` (about
+  one slot per full window) and shortens the delay by ``delay_step``;
+- a throttling signal (a failed upload, an HTTP 429 from the site)
+  halves the limit and doubles the delay.
+
+Submission latency and generation time are tracked as moving averages;
+while either is well above its average the site is treated as loaded
+and the limits are held rather than grown.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+EWMA_ALPHA = 0.2
+SLOWDOWN_FACTOR = 2.0  # A sample this many times the average means "loaded"
+
+
+class Ewma:
+    """Exponentially weighted moving average."""
+
+    def __init__(self, alpha: float = EWMA_ALPHA):
+        self.alpha = alpha
+        self.value: Optional[float] = None
+
+    def update(self, sample: float) -> float:
+        if self.value is None:
+            self.value = sample
+        else:
+            self.value += self.alpha * (sample - self.value)
+        return self.value
+
+    def is_slow(self, sample: float) -> bool:
+        """Whether a sample is well above the average seen so far."""
+        return self.value is not None and sample > self.value * SLOWDOWN_FACTOR
+
+
+class AdaptiveRate:
+    """In-flight limit and submission delay adjusted from outcomes."""
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        min_delay: float = 2.0,
+        max_delay: float = 120.0,
+        delay_step: float = 0.5,
+    ):
+        self.max_in_flight = max(1, max_in_flight)
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.delay_step = delay_step
+
+        self.limit = 1.0  # Start with one song and grow
+        self.delay = min_delay
+        self.in_flight = 0
+        self.submit_latency = Ewma()
+        self.generation_time = Ewma()
+        self._last_submit = 0.0
+        self._last_throttle = 0.0
+        self._changed = asyncio.Condition()
+
+    @property
+    def slots(self) -> int:
+        """Current in-flight limit as a whole number of songs."""
+        return max(1, min(self.max_in_flight, int(self.limit)))
+
+    def free_slots(self) -> int:
+        return max(0, self.slots - self.in_flight)
+
+    async def wait_for_slot(self):
+        """Wait until fewer songs than the limit are in flight."""
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.free_slots() > 0)
+
+    async def acquire(self):
+        """Take an in-flight slot and wait out the submission delay."""
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.free_slots() > 0)
+            self.in_flight += 1
+        wait = self._last_submit + self.delay - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._last_submit = time.monotonic()
+
+    async def release(self):
+        """Return a slot once a song is done (or its submission failed)."""
+        async with self._changed:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._changed.notify_all()
+
+    async def _grow(self):
+        async with self._changed:
+            self.limit = min(self.max_in_flight, self.limit + 1 / self.limit)
+            self.delay = max(self.min_delay, self.delay - self.delay_step)
+            self._changed.notify_all()
+
+    async def on_submitted(self, latency: float):
+        """Record a successful submission and its latency in seconds."""
+        slow = self.submit_latency.is_slow(latency)
+        self.submit_latency.update(latency)
+        if slow:
+            logger.info(f'Slow submission ({latency:.1f}s), holding rate')
+            return
+        await self._grow()
+
+    def on_generated(self, duration: float):
+        """Record how long a song took from submission to download."""
+        if self.generation_time.is_slow(duration):
+            # Songs are queueing on the site's side: stop adding more
+            self.limit = min(self.limit, max(1.0, float(self.in_flight)))
+            logger.info(f'Slow generation ({duration:.0f}s), holding limit at {self.slots}')
+        self.generation_time.update(duration)
+
+    def on_throttled(self, reason: str):
+        """Back off after a failed submission or rate-limit response.
+
+        Signals within one delay of the last back-off count as the same event.
+        """
+        now = time.monotonic()
+        if now - self._last_throttle < self.delay:
+            return
+        self._last_throttle = now
+        self.limit = max(1.0, self.limit / 2)
+        self.delay = min(self.max_delay, self.delay * 2)
+        logger.warning(
+            f'Throttled ({reason}): limit {self.slots} in flight, '
+            f'{self.delay:.1f}s between submissions'
+        )
+
+    def status(self) -> str:
+        return f'{self.in_flight}/{self.slots} in flight, {self.delay:.1f}s delay'
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""Shared parser for generated song markdown files.
+
+A song file has a ``# Title`` heading, a ``## Style Prompt`` (or
+``## AI Style Prompt``) section and a ``## Lyrics`` section, each either
+plain text or wrapped in a code block. Files are parsed in one pass over
+their lines and read once for both parsing and hashing.
+
+``parse_song_files`` parses many files on a thread or process pool, for
+first-time scans of a large ``generated/songs`` tree.
+
+Usage:
+    python tools/song_parser.py generated/songs [--workers N] [--processes]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+# Ordered by specificity (more specific genres first)
+GENRES = {
+    "hip-hop": "Hip Hop",
+    "r&b": "R & B",
+    "r-b": "R B",
+    "edm": "Edm",
+    "electronic": "Electronic",
+    "country": "Country",
+    "rock": "Rock",
+    "jazz": "Jazz",
+    "pop": "Pop",
+    "rap": "Rap",
+    "folk": "Folk",
+    "blues": "Blues",
+}
+UNKNOWN_GENRE = "Unknown"
+
+# One pass over the style prompt; "no rock" / "no-rock" do not count
+_GENRE_RE = re.compile(
+    r"(?<!no\s)(?<!no-)\b(" + "|".join(re.escape(genre) for genre in GENRES) + r")\b"
+)
+_STYLE_HEADERS = ("## Style Prompt", "## AI Style Prompt")
+META_SUFFIX = ".meta.json"
+
+
+@dataclass
+class SongRecord:
+    """A parsed song file with the stat and hash it was read at.
+
+    The stat and hash cover the song file and its .meta.json companion.
+    """
+
+    path: str  # Absolute path
+    title: str
+    genre: str
+    style_prompt: str
+    lyrics: str
+    sha256: str
+    mtime_ns: int
+    size: int
+    meta: dict = field(default_factory=dict)  # From the .meta.json companion
+
+    def to_song_data(self) -> dict:
+        """Fields for the backend songs API."""
+        return {
+            "title": self.title,
+            "genre": self.genre,
+            "style_prompt": self.style_prompt,
+            "lyrics": self.lyrics,
+            "file_path": self.path,
+        }
+
+
+def meta_path(path: Path) -> Path:
+    """Path of a song file's .meta.json companion."""
+    return path.with_suffix(META_SUFFIX)
+
+
+def song_path(path: Path) -> Optional[Path]:
+    """Song file a path belongs to: itself for ``.md``, the song for ``.meta.json``.
+
+    Returns:
+        Path of the ``.md`` song file, or None for unrelated files
+    """
+    path = Path(path)
+    if path.name.endswith(META_SUFFIX):
+        return path.with_name(path.name[:-len(META_SUFFIX)] + ".md")
+    if path.suffix == ".md":
+        return path
+    return None
+
+
+def song_stat(path: Path) -> tuple[int, int]:
+    """Combined (mtime_ns, size) of a song file and its .meta.json companion.
+
+    Changes when either file changes, so stat comparisons cover both.
+
+    Raises:
+        FileNotFoundError: If the song file does not exist
+    """
+    stat = Path(path).stat()
+    try:
+        meta = meta_path(path).stat()
+    except FileNotFoundError:
+        return stat.st_mtime_ns, stat.st_size
+    return max(stat.st_mtime_ns, meta.st_mtime_ns), stat.st_size + meta.st_size
+
+
+def detect_genre(style_prompt: str) -> str:
+    """Get the most specific genre named in a style prompt."""
+    matches = {match.group(1) for match in _GENRE_RE.finditer(style_prompt.lower())}
+    for genre, name in GENRES.items():
+        if genre in matches:
+            return name
+    return UNKNOWN_GENRE
+
+
+def parse_song_text(content: str) -> dict:
+    """Parse song file content in a single pass over its lines.
+
+    Handles both plain text and code block formats:
+    - ## Style Prompt followed by text or ```code block```
+    - ## Lyrics followed by text or ```code block```
+
+    Returns:
+        Dict with title, genre, style_prompt and lyrics (empty strings for
+        missing sections)
+    """
+    title = ""
+    section = None
+    in_code_block = False
+    style_lines: list[str] = []
+    lyrics_lines: list[str] = []
+
+    for line in content.split("\n"):
+        # Check for code block markers
+        if line.lstrip().startswith("```"):
+            in_code_block = not in_code_block
+            continue
+
+        # Check for headers (only outside code blocks)
+        if not in_code_block and line.startswith("#"):
+            if line.startswith("## "):
+                if line.startswith(_STYLE_HEADERS):
+                    section = "style"
+                elif line.startswith("## Lyrics"):
+                    section = "lyrics"
+                else:
+                    section = None
+                continue
+            if line.startswith("# ") and not title:
+                title = line[2:].strip()
+                continue
+
+        # Collect content from active sections
+        if section == "style":
+            stripped = line.strip()
+            if stripped:
+                style_lines.append(stripped)
+        elif section == "lyrics":
+            lyrics_lines.append(line)
+
+    style_prompt = " ".join(style_lines)
+    return {
+        "title": title,
+        "genre": detect_genre(style_prompt),
+        "style_prompt": style_prompt,
+        "lyrics": "\n".join(lyrics_lines).strip(),
+    }
+
+
+def parse_song_file(path: Path) -> SongRecord:
+    """Read, hash and parse a song file and merge its .meta.json companion.
+
+    Without a lyrics section the whole file is used as lyrics. Other missing
+    fields fall back to the file name and genre, so every record passes the
+    backend's non-empty field validation.
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    path = Path(path)
+    mtime_ns, size = song_stat(path)
+    data = path.read_bytes()
+    content = data.decode("utf-8", errors="replace")
+    parsed = parse_song_text(content)
+    digest = hashlib.sha256(data)
+
+    meta = {}
+    try:
+        meta_data = meta_path(path).read_bytes()
+        digest.update(b"\0" + meta_data)
+        meta = json.loads(meta_data)
+    except (OSError, ValueError):
+        pass
+    if isinstance(meta, dict):
+        parsed.update({key: meta[key] for key in parsed if meta.get(key)})
+    else:
+        meta = {}
+
+    genre = parsed["genre"] or UNKNOWN_GENRE
+    return SongRecord(
+        path=str(path.absolute()),
+        title=parsed["title"] or path.stem,
+        genre=genre,
+        style_prompt=parsed["style_prompt"] or genre,
+        lyrics=parsed["lyrics"] or content.strip() or path.stem,
+        sha256=digest.hexdigest(),
+        mtime_ns=mtime_ns,
+        size=size,
+        meta=meta,
+    )
+
+
+def _parse_or_error(path: Path) -> SongRecord | str:
+    # Errors are returned as strings so they pickle across processes
+    try:
+        return parse_song_file(path)
+    except (OSError, UnicodeError) as e:
+        return f"{type(e).__name__}: {e}"
+
+
+def parse_song_files(
+    paths: Iterable[Path],
+    workers: Optional[int] = None,
+    processes: bool = False,
+) -> tuple[list[SongRecord], dict[str, str]]:
+    """Parse many song files in parallel.
+
+    Threads suit most trees since reading and hashing release the GIL;
+    processes also parallelize the line scanning for very large trees.
+
+    Args:
+        paths: Song files
+        workers: Pool size (default: CPU count)
+        processes: Use a process pool instead of threads
+
+    Returns:
+        Tuple of (records in input order, {path: error} for unreadable files)
+    """
+    paths = list(paths)
+    workers = workers or os.cpu_count() or 1
+    if len(paths) < 2 or workers == 1:
+        results = [_parse_or_error(path) for path in paths]
+    else:
+        pool: type[Executor] = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        with pool(max_workers=workers) as executor:
+            chunksize = max(1, len(paths) // (workers * 4)) if processes else 1
+            results = list(executor.map(_parse_or_error, paths, chunksize=chunksize))
+
+    records = []
+    errors = {}
+    for path, result in zip(paths, results, strict=True):
+        if isinstance(result, SongRecord):
+            records.append(result)
+        else:
+            errors[str(path)] = result
+    return records, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse generated song files")
+    parser.add_argument("folder", type=Path, help="Folder with .md song files")
+    parser.add_argument("--workers", type=int, default=None, help="Pool size (default: CPU count)")
+    parser.add_argument("--processes", action="store_true", help="Use processes instead of threads")
+    parser.add_argument("--json", action="store_true", help="Print records as JSON lines")
+    args = parser.parse_args()
+
+    if not args.folder.exists():
+        print(f"Error: Folder does not exist: {args.folder}")
+        sys.exit(1)
+
+    started = time.monotonic()
+    records, errors = parse_song_files(sorted(args.folder.rglob("*.md")), args.workers, args.processes)
+    elapsed = time.monotonic() - started
+
+    if args.json:
+        for record in records:
+            print(json.dumps(asdict(record)))
+    for path, error in errors.items():
+        print(f"Error: {path}: {error}", file=sys.stderr)
+    print(f"Parsed {len(records)} files in {elapsed:.2f}s ({len(errors)} errors)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
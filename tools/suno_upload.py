@@ -20,12 +20,16 @@ The script will:
 
 import argparse
 import asyncio
-import re
 import sys
 from pathlib import Path
 
 from playwright.async_api import async_playwright
 
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools import song_parser
+
 
 # Session file path
 SESSION_FILE = Path(__file__).parent.parent / "data" / "suno_session.json"
@@ -33,21 +37,8 @@ SESSION_FILE = Path(__file__).parent.parent / "data" / "suno_session.json"
 
 def parse_song_file(file_path: str) -> tuple[str, str, str]:
     """Parse a song markdown file to extract title, style, and lyrics."""
-    content = Path(file_path).read_text()
-
-    # Extract title from # heading
-    title_match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
-    title = title_match.group(1) if title_match else "Untitled"
-
-    # Extract style prompt
-    style_match = re.search(r'## Style Prompt\s*\n(.+?)(?=\n##|\Z)', content, re.DOTALL)
-    style = style_match.group(1).strip() if style_match else ""
-
-    # Extract lyrics
-    lyrics_match = re.search(r'## Lyrics\s*\n(.+?)(?=\n##|\Z)', content, re.DOTALL)
-    lyrics = lyrics_match.group(1).strip() if lyrics_match else ""
-
-    return title, style, lyrics
+    parsed = song_parser.parse_song_text(Path(file_path).read_text(encoding="utf-8"))
+    return parsed["title"] or "Untitled", parsed["style_prompt"], parsed["lyrics"]
 
 
 async def upload_to_suno(style_prompt: str, lyrics: str, title: str = None) -> dict:
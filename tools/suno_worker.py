@@ -10,7 +10,7 @@ Usage:
     python tools/suno_worker.py
 
 Requirements:
-    pip install playwright requests
+    pip install playwright requests aiohttp aiofiles
     playwright install chromium
 """
 
@@ -20,12 +20,20 @@ import logging
 import os
 import sys
 import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 import requests
-from playwright.async_api import async_playwright, Page, Browser, BrowserContext
+from playwright.async_api import async_playwright, Page, Browser, BrowserContext, Response
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.downloader import Downloader
+from tools.rate_control import AdaptiveRate
+from tools.worker_metrics import WorkerMetrics
 
 # Setup logging
 logging.basicConfig(
@@ -41,14 +49,204 @@ API_PASSWORD = os.getenv('API_PASSWORD', 'pass123')
 SESSION_FILE = Path(__file__).parent.parent / 'data' / 'suno_session.json'
 DOWNLOAD_FOLDER = Path(__file__).parent.parent / 'downloads'
 POLL_INTERVAL = 30  # seconds
+SUNO_CREATE_URL = 'https://suno.com/create'
+FEED_REFRESH_INTERVAL = 30  # seconds without clip updates before reloading a page
+CLIP_API_PATHS = ('/feed', '/clip', '/generate')
+CLIP_DONE_STATUSES = {'complete', 'error'}
+
+
+@dataclass
+class Clip:
+    """Last known state of a Suno clip."""
+    id: str
+    title: str
+    status: str
+    audio_url: Optional[str]
+    created_at: Optional[float]  # Unix time, if the site sent it
+    first_status: str
+    first_seen: float  # Unix time the worker first saw the clip
+
+
+@dataclass
+class ClipWaiter:
+    """A song waiting for its clips to finish."""
+    title: str
+    since: float
+    future: asyncio.Future = field(repr=False)
+
+
+def _parse_time(value) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
 
 
-class SunoWorker:
+def _clips_in(data) -> list[dict]:
+    """Clip objects in a feed/clip/generate JSON response."""
+    if isinstance(data, dict):
+        if isinstance(data.get('clips'), list):
+            data = data['clips']
+        elif 'id' in data and 'status' in data:
+            data = [data]
+    if not isinstance(data, list):
+        return []
+    return [item for item in data if isinstance(item, dict) and 'id' in item and 'status' in item]
+
+
+class ClipTracker:
+    """Clip states read from the JSON the Suno pages already load.
+
+    Listens to every response of the browser context, so the generate
+    response on the submission page and the feed polling done by the
+    site itself both update the same map. Waiters are resolved as soon as
+    their clips finish, however many songs are in flight.
+    """
+
     def __init__(self):
+        self.clips: dict[str, Clip] = {}
+        self.last_update = 0.0
+        self._waiters: list[ClipWaiter] = []
+
+    def attach(self, context: BrowserContext):
+        context.on('response', self._on_response)
+
+    async def _on_response(self, response: Response):
+        if 'suno' not in response.url or not any(path in response.url for path in CLIP_API_PATHS):
+            return
+        if 'json' not in response.headers.get('content-type', ''):
+            return
+        try:
+            data = await response.json()
+        except Exception:
+            return
+        self.update(_clips_in(data))
+
+    def update(self, items: list[dict]):
+        """Record clip objects and resolve waiters whose clips are done."""
+        if not items:
+            return
+        for item in items:
+            clip_id = str(item['id'])
+            status = str(item.get('status') or '')
+            known = self.clips.get(clip_id)
+            self.clips[clip_id] = Clip(
+                id=clip_id,
+                title=str(item.get('title') or ''),
+                status=status,
+                audio_url=item.get('audio_url') or None,
+                created_at=_parse_time(item['created_at']) if item.get('created_at') else None,
+                first_status=known.first_status if known else status,
+                first_seen=known.first_seen if known else time.time(),
+            )
+        self.last_update = time.time()
+        for waiter in list(self._waiters):
+            self._check(waiter)
+
+    def matching(self, title: str, since: float) -> list[Clip]:
+        """Clips of a song submitted at or after ``since``.
+
+        Without a creation time, only clips first seen unfinished count, so
+        older songs with the same title are not picked up.
+        """
+        title = title.strip().lower()
+        return [
+            clip for clip in self.clips.values()
+            if clip.title.strip().lower() == title and (
+                clip.created_at >= since - 60 if clip.created_at is not None
+                else clip.first_status not in CLIP_DONE_STATUSES
+            )
+        ]
+
+    def _check(self, waiter: ClipWaiter):
+        if waiter.future.done():
+            return
+        clips = self.matching(waiter.title, waiter.since)
+        if clips and all(clip.status in CLIP_DONE_STATUSES for clip in clips):
+            waiter.future.set_result(
+                [clip.audio_url for clip in clips if clip.status == 'complete' and clip.audio_url]
+            )
+
+    def watch(self, title: str, since: float) -> ClipWaiter:
+        """Register a waiter whose future resolves to the finished audio URLs."""
+        waiter = ClipWaiter(title, since, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        self._check(waiter)
+        return waiter
+
+    def unwatch(self, waiter: ClipWaiter):
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+
+
+class PagePool:
+    """Pages of one browser context, each lent to one task at a time.
+
+    Pages share the context's cookies and storage (the saved Suno session).
+    They are opened on first use, up to ``size``, and reused afterwards.
+    """
+
+    def __init__(self, context: BrowserContext, size: int, url: str = SUNO_CREATE_URL):
+        self.context = context
+        self.size = max(1, size)
+        self.url = url
+        self._idle: asyncio.Queue[Page] = asyncio.Queue()
+        self._opened = 0
+
+    async def _get(self) -> Page:
+        if self._idle.empty() and self._opened < self.size:
+            self._opened += 1
+            try:
+                page = await self.context.new_page()
+                await page.goto(self.url, wait_until='domcontentloaded')
+            except Exception:
+                self._opened -= 1
+                raise
+            return page
+        return await self._idle.get()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Page]:
+        """Borrow a page, waiting for one to be free if all are in use."""
+        page = await self._get()
+        try:
+            yield page
+        finally:
+            if page.is_closed():
+                self._opened -= 1
+            else:
+                self._idle.put_nowait(page)
+
+    async def close(self):
+        """Close all idle pages."""
+        while not self._idle.empty():
+            page = self._idle.get_nowait()
+            self._opened -= 1
+            await page.close()
+
+
+class SunoWorker:
+    def __init__(self, monitor_pages: int = 1, download_concurrency: int = 4, metrics_port: Optional[int] = None):
         self.token: Optional[str] = None
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
+        # Submissions use one page, status monitoring uses a pool of others
         self.page: Optional[Page] = None
+        self.monitor_page_count = monitor_pages
+        self.monitor_pages: Optional[PagePool] = None
+        self.clip_tracker = ClipTracker()
+        # Shared by all songs, so concurrency is bounded across the batch
+        self.downloader = Downloader(concurrency=download_concurrency)
+        self.rate: Optional[AdaptiveRate] = None
+        self._active: dict[int, asyncio.Task] = {}  # task id -> wait/download
+
+        self.metrics = WorkerMetrics('suno_worker')
+        self.metrics.gauge('in_flight', lambda: self.rate.in_flight if self.rate else 0)
+        self.metrics.gauge('in_flight_limit', lambda: self.rate.slots if self.rate else 0)
+        self.metrics.gauge('submit_delay_seconds', lambda: self.rate.delay if self.rate else 0)
+        if metrics_port:
+            self.metrics.serve(metrics_port)
+        self._refresh_lock = asyncio.Lock()
 
     def login_api(self) -> bool:
         """Login to the backend API and get JWT token."""
@@ -88,7 +286,7 @@ class SunoWorker:
         try:
             resp = requests.get(
                 f'{API_BASE}/queue/tasks',
-                params={'status_filter': 'pending', 'task_type': 'suno_upload', 'limit': limit},
+                params={'status_filter': 'pending', 'task_type': 'suno_upload', 'due_only': True, 'limit': limit},
                 headers=self.api_headers()
             )
             if resp.status_code == 200:
@@ -112,13 +310,34 @@ class SunoWorker:
             logger.error(f'Error getting song: {e}')
             return None
 
+    def claim_task(self, task_id: int) -> bool:
+        """Mark a pending task as running so it is not picked up again.
+
+        Returns:
+            True if this worker now owns the task
+        """
+        try:
+            resp = requests.post(
+                f'{API_BASE}/queue/tasks/{task_id}/start',
+                headers=self.api_headers()
+            )
+            return resp.status_code == 200
+        except Exception as e:
+            logger.error(f'Error claiming task: {e}')
+            return False
+
     def update_task(self, task_id: int, status: str, error_message: str = None):
-        """Update task status via API."""
+        """Report a finished task as completed or failed via API."""
         try:
-            # Use retry endpoint to reset or mark as failed
-            if status == 'failed':
-                # Just log for now - the worker in Docker handles retries
+            if status == 'completed':
+                requests.post(f'{API_BASE}/queue/tasks/{task_id}/complete', headers=self.api_headers())
+            elif status == 'failed':
                 logger.error(f'Task {task_id} failed: {error_message}')
+                requests.post(
+                    f'{API_BASE}/queue/tasks/{task_id}/fail',
+                    params={'error': error_message} if error_message else None,
+                    headers=self.api_headers()
+                )
         except Exception as e:
             logger.error(f'Error updating task: {e}')
 
@@ -133,6 +352,32 @@ class SunoWorker:
         except Exception as e:
             logger.error(f'Error updating song status: {e}')
 
+    def report_metrics(self, task_id: int, report: dict):
+        """Record a task's stage timings locally and on the backend.
+
+        Args:
+            task_id: Task ID
+            report: Dict with ``stages`` (seconds), ``counters`` and an
+                optional ``failure_reason``
+        """
+        for stage, seconds in report.get('stages', {}).items():
+            self.metrics.observe(stage, seconds)
+        for name, value in report.get('counters', {}).items():
+            self.metrics.inc(f'{name}_total', value)
+        reason = report.get('failure_reason')
+        self.metrics.inc('tasks_total', result='failed' if reason else 'completed')
+        if reason:
+            self.metrics.inc('failures_total', reason=reason)
+
+        try:
+            requests.post(
+                f'{API_BASE}/queue/tasks/{task_id}/metrics',
+                json=report,
+                headers=self.api_headers()
+            )
+        except Exception as e:
+            logger.error(f'Error reporting metrics: {e}')
+
     def create_suno_job(self, song_id: str, suno_job_id: str):
         """Record Suno job in database."""
         try:
@@ -173,14 +418,22 @@ class SunoWorker:
             context_options['storage_state'] = str(SESSION_FILE)
 
         self.context = await self.browser.new_context(**context_options)
-        self.page = await self.context.new_page()
 
-        # Hide webdriver
-        await self.page.add_init_script("""
+        # Hide webdriver (on every page of the context)
+        await self.context.add_init_script("""
             Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
         """)
 
-        logger.info('Browser initialized')
+        self.clip_tracker.attach(self.context)
+        self.context.on('response', self._on_site_response)
+        self.page = await self.context.new_page()
+        self.monitor_pages = PagePool(self.context, self.monitor_page_count)
+
+        logger.info(f'Browser initialized ({self.monitor_page_count} monitor pages)')
+
+    def _on_site_response(self, response: Response):
+        if response.status == 429 and 'suno' in response.url and self.rate:
+            self.rate.on_throttled('HTTP 429')
 
     async def upload_to_suno(self, style_prompt: str, lyrics: str, title: str) -> Optional[str]:
         """Upload song to Suno and return job ID."""
@@ -190,7 +443,7 @@ class SunoWorker:
 
         try:
             # Navigate to Suno create page
-            await self.page.goto('https://suno.com/create', wait_until='networkidle')
+            await self.page.goto(SUNO_CREATE_URL, wait_until='networkidle')
             await asyncio.sleep(2)
 
             # Take screenshot for debugging
@@ -309,15 +562,17 @@ class SunoWorker:
             await self.page.screenshot(path='/tmp/suno_error.png')
             return None
 
-    async def find_song_by_title(self, title: str) -> Optional[object]:
+    async def find_song_by_title(self, title: str, page: Optional[Page] = None) -> Optional[object]:
         """Find a song element on the page by its title.
 
         Args:
             title: Song title to search for
+            page: Page to search (default: the submission page)
 
         Returns:
             Locator for the song container element, or None
         """
+        page = page or self.page
         try:
             # Common selectors for song cards/items containing the title
             song_card_selectors = [
@@ -331,7 +586,7 @@ class SunoWorker:
 
             for selector in song_card_selectors:
                 try:
-                    element = self.page.locator(selector).first
+                    element = page.locator(selector).first
                     if await element.is_visible(timeout=2000):
                         logger.info(f'Found song card with title: {title}')
                         return element
@@ -339,7 +594,7 @@ class SunoWorker:
                     continue
 
             # Fallback: find by exact text match
-            title_element = self.page.get_by_text(title, exact=False).first
+            title_element = page.get_by_text(title, exact=False).first
             if await title_element.is_visible(timeout=2000):
                 # Try to get parent container
                 parent = title_element.locator('xpath=ancestor::article | ancestor::div[contains(@class, "song")] | ancestor::div[contains(@class, "track")]').first
@@ -445,73 +700,83 @@ class SunoWorker:
 
         return list(urls)
 
-    async def wait_for_generation(self, title: str, max_wait: int = 300) -> list[str]:
-        """Wait for song generation by searching for the song by title.
+    async def wait_for_generation(
+        self, title: str, max_wait: int = 300, since: Optional[float] = None
+    ) -> list[str]:
+        """Wait for song generation by tracking the song's clips.
 
-        Suno generates 2 variations per upload. This method searches for
-        the specific song by title and waits for it to complete.
+        Suno generates 2 variations per upload. Clip states come from the
+        feed responses the site loads (see ClipTracker), so waiting costs
+        nothing per song; a monitor page is only reloaded when no clip
+        updates have arrived for a while. If the clips never show up in
+        the responses, the song is looked up on the page as a fallback.
 
         Args:
             title: Song title to search for
             max_wait: Maximum seconds to wait for generation
+            since: When the song was submitted (default: now)
 
         Returns:
             List of audio URLs (typically 2 variations)
         """
+        await self.initialize_browser()
         logger.info(f'Waiting for song "{title}" to generate (max {max_wait}s)...')
         start_time = time.time()
-        last_status = None
-
-        while time.time() - start_time < max_wait:
-            try:
-                # Find the song by title
-                song_element = await self.find_song_by_title(title)
-
-                if song_element:
-                    # Check status
-                    status = await self.get_song_status(song_element)
-
-                    if status != last_status:
-                        logger.info(f'Song status: {status}')
-                        last_status = status
+        waiter = self.clip_tracker.watch(title, since or start_time)
 
-                    if status == 'complete':
-                        # Try to get audio URLs
-                        audio_urls = await self.get_audio_urls_from_song(song_element)
-
-                        if len(audio_urls) >= 2:
-                            logger.info(f'Found {len(audio_urls)} audio URLs for "{title}"')
-                            return audio_urls
-                        elif audio_urls:
-                            # Wait a bit more for second variation
-                            logger.info(f'Found {len(audio_urls)} URL(s), waiting for more...')
-                            await asyncio.sleep(5)
-                            continue
-
-                    elif status == 'generating':
-                        elapsed = int(time.time() - start_time)
-                        if elapsed % 30 == 0:  # Log every 30s
-                            logger.info(f'Still generating... ({elapsed}s elapsed)')
-
-                else:
-                    logger.debug(f'Song "{title}" not found on page yet')
+        try:
+            while not waiter.future.done():
+                remaining = max_wait - (time.time() - start_time)
+                if remaining <= 0:
+                    break
+                done, _ = await asyncio.wait({waiter.future}, timeout=min(remaining, FEED_REFRESH_INTERVAL))
+                if not done and time.time() - self.clip_tracker.last_update >= FEED_REFRESH_INTERVAL:
+                    await self.refresh_feed()
+        finally:
+            self.clip_tracker.unwatch(waiter)
+
+        if waiter.future.done():
+            audio_urls = waiter.future.result()
+            logger.info(f'Found {len(audio_urls)} audio URLs for "{title}"')
+            return audio_urls
+
+        clips = self.clip_tracker.matching(title, waiter.since)
+        logger.warning(
+            f'Timed out waiting for "{title}" '
+            f'({", ".join(clip.status for clip in clips) or "no clips seen"})'
+        )
+        audio_urls = [clip.audio_url for clip in clips if clip.status == 'complete' and clip.audio_url]
+        if audio_urls:
+            return audio_urls
+        return await self.find_audio_on_page(title)
 
-                await asyncio.sleep(10)
-                await self.page.screenshot(path='/tmp/suno_waiting.png')
+    async def refresh_feed(self):
+        """Reload a monitor page so the site fetches the clip feed again.
 
+        Concurrent waiters share one reload.
+        """
+        if self._refresh_lock.locked():
+            return
+        async with self._refresh_lock:
+            try:
+                async with self.monitor_pages.acquire() as page:
+                    await page.reload(wait_until='domcontentloaded')
             except Exception as e:
-                logger.error(f'Error waiting for generation: {e}')
-                await asyncio.sleep(5)
-
-        # Timeout - try one more time to get whatever we can
-        logger.warning(f'Timed out waiting for "{title}"')
-        song_element = await self.find_song_by_title(title)
-        if song_element:
-            audio_urls = await self.get_audio_urls_from_song(song_element)
-            if audio_urls:
-                logger.info(f'Found {len(audio_urls)} URLs after timeout')
-                return audio_urls
+                logger.error(f'Error refreshing feed: {e}')
 
+    async def find_audio_on_page(self, title: str) -> list[str]:
+        """Look up a song's audio URLs on a monitor page."""
+        try:
+            async with self.monitor_pages.acquire() as page:
+                await page.reload(wait_until='domcontentloaded')
+                song_element = await self.find_song_by_title(title, page)
+                if song_element:
+                    audio_urls = await self.get_audio_urls_from_song(song_element)
+                    if audio_urls:
+                        logger.info(f'Found {len(audio_urls)} URLs on the page')
+                    return audio_urls
+        except Exception as e:
+            logger.error(f'Error reading song from page: {e}')
         return []
 
     async def download_audio(self, audio_url: str, song_id: str, variation: int = 0) -> Optional[Path]:
@@ -525,41 +790,14 @@ class SunoWorker:
         Returns:
             Path to downloaded file, None on failure
         """
-        try:
-            import aiohttp
-            import aiofiles
-
-            DOWNLOAD_FOLDER.mkdir(parents=True, exist_ok=True)
-
-            # Include variation in filename
-            if variation > 0:
-                file_path = DOWNLOAD_FOLDER / f"{song_id}_v{variation}.mp3"
-            else:
-                file_path = DOWNLOAD_FOLDER / f"{song_id}.mp3"
-
-            if file_path.exists():
-                logger.info(f'Audio already downloaded: {file_path}')
-                return file_path
-
-            logger.info(f'Downloading variation {variation} to {file_path}')
+        # Include variation in filename
+        if variation > 0:
+            file_path = DOWNLOAD_FOLDER / f"{song_id}_v{variation}.mp3"
+        else:
+            file_path = DOWNLOAD_FOLDER / f"{song_id}.mp3"
 
-            async with aiohttp.ClientSession() as session:
-                async with session.get(audio_url, timeout=aiohttp.ClientTimeout(total=120)) as resp:
-                    resp.raise_for_status()
-                    async with aiofiles.open(file_path, 'wb') as f:
-                        async for chunk in resp.content.iter_chunked(8192):
-                            await f.write(chunk)
-
-            if file_path.exists() and file_path.stat().st_size > 0:
-                logger.info(f'Downloaded: {file_path} ({file_path.stat().st_size} bytes)')
-                return file_path
-            else:
-                logger.error('Downloaded file is empty')
-                return None
-
-        except Exception as e:
-            logger.error(f'Download failed: {e}')
-            return None
+        logger.info(f'Downloading variation {variation} to {file_path}')
+        return await self.downloader.download(audio_url, file_path)
 
     async def download_all_variations(self, audio_urls: list[str], song_id: str) -> list[Path]:
         """Download all audio variations.
@@ -571,12 +809,11 @@ class SunoWorker:
         Returns:
             List of downloaded file paths
         """
-        downloaded = []
-        for i, url in enumerate(audio_urls):
-            file_path = await self.download_audio(url, song_id, variation=i)
-            if file_path:
-                downloaded.append(file_path)
-        return downloaded
+        results = await asyncio.gather(*(
+            self.download_audio(url, song_id, variation=i)
+            for i, url in enumerate(audio_urls)
+        ))
+        return [file_path for file_path in results if file_path]
 
     async def upload_single_song(self, song: dict) -> Optional[str]:
         """Upload a single song to Suno (without waiting).
@@ -607,28 +844,47 @@ class SunoWorker:
             self.update_song_status(song_id, 'failed')
             return None
 
-    async def wait_and_download_song(self, song: dict) -> bool:
+    async def wait_and_download_song(
+        self, song: dict, since: Optional[float] = None, report: Optional[dict] = None
+    ) -> bool:
         """Wait for a song to generate and download it.
 
         Args:
             song: Song data dict
+            since: When the song was submitted
+            report: Metrics report to add stage timings and failures to
 
         Returns:
             True if successful, False otherwise
         """
         song_id = song['id']
         title = song['title']
+        since = since or time.time()
+        report = report if report is not None else {}
+        stages = report.setdefault('stages', {})
 
-        audio_urls = await self.wait_for_generation(title=title)
+        audio_urls = await self.wait_for_generation(title=title, since=since)
+
+        # Timings relative to submission: clip first seen, generation done
+        clips = self.clip_tracker.matching(title, since)
+        if clips:
+            stages['first_seen'] = max(0.0, min(clip.first_seen for clip in clips) - since)
+        stages['complete'] = time.time() - since
 
         if not audio_urls:
             logger.error(f'Failed to get audio for: {title}')
+            report['failure_reason'] = 'generation_timeout'
             self.update_song_status(song_id, 'failed')
             return False
 
         logger.info(f'Found {len(audio_urls)} variations for: {title}')
 
+        download_started = time.time()
         downloaded_files = await self.download_all_variations(audio_urls, song_id)
+        stages['download'] = time.time() - download_started
+        report.setdefault('counters', {})['download_bytes'] = sum(
+            path.stat().st_size for path in downloaded_files
+        )
 
         if downloaded_files:
             logger.info(f'Completed: {title} ({len(downloaded_files)} variations)')
@@ -636,122 +892,121 @@ class SunoWorker:
             return True
         else:
             logger.error(f'Download failed: {title}')
+            report['failure_reason'] = 'download_failed'
             self.update_song_status(song_id, 'failed')
             return False
 
-    async def process_tasks_batch(self, tasks: list[dict], batch_size: int = 3):
-        """Process multiple tasks in parallel batches.
+    async def submit_task(self, task: dict) -> bool:
+        """Claim a task, submit its song and start waiting for it.
 
-        Uploads up to batch_size songs at once, then waits for all to complete.
+        Submissions are paced by the adaptive rate: this waits for a free
+        in-flight slot and the current inter-submission delay. The slot is
+        held until the song is downloaded (see ``_finish_task``).
 
         Args:
-            tasks: List of task dicts
-            batch_size: Number of songs to upload concurrently (default 3)
+            task: Task dict from the queue
+
+        Returns:
+            True if the song was submitted
         """
-        logger.info(f'Processing batch of {len(tasks)} tasks (batch_size={batch_size})')
+        task_id = task['id']
+        if task_id in self._active or not self.claim_task(task_id):
+            return False
 
-        # Get song details for all tasks
-        songs = []
-        for task in tasks:
-            song = self.get_song(task['song_id'])
-            if song:
-                songs.append(song)
-            else:
-                logger.error(f'Song not found: {task["song_id"]}')
+        song = self.get_song(task['song_id'])
+        if not song:
+            logger.error(f'Song not found: {task["song_id"]}')
+            self.update_task(task_id, 'failed', f'Song {task["song_id"]} not found')
+            self.report_metrics(task_id, {'failure_reason': 'song_not_found'})
+            return False
 
-        if not songs:
-            return
+        await self.rate.acquire()
+        submitted_at = time.time()
+        title = await self.upload_single_song(song)
+        report = {'stages': {'submit': time.time() - submitted_at}}
+        if not title:
+            self.rate.on_throttled('upload failed')
+            await self.rate.release()
+            self.update_task(task_id, 'failed', 'Upload to Suno failed')
+            self.report_metrics(task_id, {**report, 'failure_reason': 'upload_failed'})
+            return False
 
-        # Process in batches
-        for i in range(0, len(songs), batch_size):
-            batch = songs[i:i + batch_size]
-            logger.info(f'=== Batch {i // batch_size + 1}: {len(batch)} songs ===')
-
-            # Phase 1: Upload all songs in batch (quick, one after another)
-            uploaded_songs = []
-            for song in batch:
-                title = await self.upload_single_song(song)
-                if title:
-                    uploaded_songs.append(song)
-                # Small delay between uploads
-                await asyncio.sleep(2)
-
-            if not uploaded_songs:
-                logger.error('No songs uploaded in this batch')
-                continue
-
-            logger.info(f'Uploaded {len(uploaded_songs)} songs, waiting for generation...')
-
-            # Phase 2: Wait for all songs to complete (in parallel)
-            wait_tasks = [
-                self.wait_and_download_song(song)
-                for song in uploaded_songs
-            ]
+        await self.rate.on_submitted(report['stages']['submit'])
+        logger.info(f'Submitted "{title}" ({self.rate.status()})')
+        self._active[task_id] = asyncio.create_task(
+            self._finish_task(task_id, song, submitted_at, report)
+        )
+        return True
 
-            results = await asyncio.gather(*wait_tasks, return_exceptions=True)
+    async def _finish_task(self, task_id: int, song: dict, submitted_at: float, report: dict):
+        try:
+            if await self.wait_and_download_song(song, submitted_at, report):
+                self.rate.on_generated(time.time() - submitted_at)
+                self.update_task(task_id, 'completed')
+            else:
+                self.update_task(task_id, 'failed', 'Generation or download failed')
+        except Exception as e:
+            logger.error(f'Error finishing task {task_id}: {e}')
+            report['failure_reason'] = 'error'
+            self.update_task(task_id, 'failed', str(e))
+        finally:
+            self.report_metrics(task_id, report)
+            self._active.pop(task_id, None)
+            await self.rate.release()
 
-            success_count = sum(1 for r in results if r is True)
-            logger.info(f'Batch complete: {success_count}/{len(uploaded_songs)} successful')
+    async def process_tasks_batch(self, tasks: list[dict], batch_size: int = 3):
+        """Submit tasks through the pipeline and wait for all of them.
 
-            # Wait before next batch
-            if i + batch_size < len(songs):
-                logger.info('Waiting 10s before next batch...')
-                await asyncio.sleep(10)
+        Args:
+            tasks: List of task dicts
+            batch_size: Maximum songs in flight (default 3)
+        """
+        logger.info(f'Processing batch of {len(tasks)} tasks (batch_size={batch_size})')
+        self.rate = self.rate or AdaptiveRate(max_in_flight=batch_size)
+
+        for task in tasks:
+            await self.submit_task(task)
+        if self._active:
+            await asyncio.gather(*self._active.values(), return_exceptions=True)
 
     async def process_task(self, task: dict):
         """Process a single Suno upload task."""
-        task_id = task['id']
-        song_id = task['song_id']
-
-        logger.info(f'Processing task {task_id} for song {song_id}')
-
-        # Get song details
-        song = self.get_song(song_id)
-        if not song:
-            logger.error(f'Song not found: {song_id}')
-            return
-
-        # Upload to Suno
-        title = await self.upload_single_song(song)
-        if not title:
-            return
-
-        # Wait for generation and download
-        await self.wait_and_download_song(song)
+        await self.process_tasks_batch([task], batch_size=1)
 
     async def run(self, batch_size: int = 3):
-        """Main worker loop with batch processing.
+        """Main worker loop with adaptive, pipelined submissions.
 
         Args:
-            batch_size: Number of songs to process concurrently (default 3)
+            batch_size: Maximum number of songs in flight (default 3)
         """
         logger.info('Starting Suno Worker (outside Docker)')
         logger.info(f'API: {API_BASE}')
         logger.info(f'Session file: {SESSION_FILE}')
-        logger.info(f'Batch size: {batch_size} songs')
+        logger.info(f'Max in flight: {batch_size} songs')
 
         if not self.login_api():
             logger.error('Failed to login to API. Exiting.')
             return
 
+        self.rate = AdaptiveRate(max_in_flight=batch_size)
+
+        # Pipelined: a new song is submitted as soon as a slot frees up,
+        # and the queue is polled again right away while it has a backlog
         while True:
             try:
-                # Check for pending tasks (get multiple)
-                tasks = self.get_pending_tasks(limit=batch_size)
-
-                if tasks:
-                    if len(tasks) > 1:
-                        # Process multiple songs in parallel
-                        logger.info(f'Found {len(tasks)} pending tasks, processing in batch')
-                        await self.process_tasks_batch(tasks, batch_size=batch_size)
-                    else:
-                        # Single task - process normally
-                        await self.process_task(tasks[0])
-                else:
-                    logger.debug('No pending tasks')
-
-                # Wait before next poll
-                await asyncio.sleep(POLL_INTERVAL)
+                await self.rate.wait_for_slot()
+                tasks = [
+                    task for task in self.get_pending_tasks(limit=self.rate.free_slots())
+                    if task['id'] not in self._active
+                ]
+
+                submitted = 0
+                for task in tasks:
+                    submitted += await self.submit_task(task)
+
+                if not submitted:
+                    logger.debug(f'No pending tasks ({self.rate.status()})')
+                    await asyncio.sleep(POLL_INTERVAL)
 
             except KeyboardInterrupt:
                 logger.info('Shutting down...')
@@ -761,6 +1016,9 @@ class SunoWorker:
                 await asyncio.sleep(POLL_INTERVAL)
 
         # Cleanup
+        await self.downloader.close()
+        if self.monitor_pages:
+            await self.monitor_pages.close()
         if self.browser:
             await self.browser.close()
 
@@ -770,14 +1028,24 @@ if __name__ == '__main__':
 
     parser = argparse.ArgumentParser(description='Suno Worker - Upload songs to Suno AI')
     parser.add_argument('--batch-size', '-b', type=int, default=3,
-                        help='Number of songs to upload concurrently (default: 3)')
+                        help='Maximum songs in flight; the actual number adapts (default: 3)')
     parser.add_argument('--interval', '-i', type=int, default=POLL_INTERVAL,
                         help=f'Seconds between task checks (default: {POLL_INTERVAL})')
+    parser.add_argument('--monitor-pages', '-m', type=int, default=1,
+                        help='Browser pages for feed refreshes and page lookups (default: 1)')
+    parser.add_argument('--download-concurrency', '-d', type=int, default=4,
+                        help='Parallel audio downloads across songs (default: 4)')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='Serve Prometheus metrics on this port (default: off)')
     args = parser.parse_args()
 
     # Update poll interval if specified
     if args.interval != POLL_INTERVAL:
         POLL_INTERVAL = args.interval
 
-    worker = SunoWorker()
+    worker = SunoWorker(
+        monitor_pages=args.monitor_pages,
+        download_concurrency=args.download_concurrency,
+        metrics_port=args.metrics_port,
+    )
     asyncio.run(worker.run(batch_size=args.batch_size))
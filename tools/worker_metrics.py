@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Prometheus-format metrics for the standalone workers.
+
+``WorkerMetrics`` keeps stage-duration histograms, labelled counters and
+gauges in memory and renders them in the Prometheus text exposition
+format. ``serve`` exposes them on ``/metrics`` from a background thread,
+so no client library is needed:
+
+    metrics = WorkerMetrics('suno_worker')
+    metrics.serve(9464)
+    metrics.observe('submit', 4.2)
+    metrics.inc('tasks_total', result='completed')
+
+    curl localhost:9464/metrics
+"""
+
+import logging
+import math
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# Seconds; Suno stages range from a few seconds (submit) to minutes (generation)
+STAGE_BUCKETS = (1, 2.5, 5, 10, 30, 60, 120, 180, 300, 600, math.inf)
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ''
+    body = ','.join(
+        f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for key, value in sorted(labels.items())
+    )
+    return '{' + body + '}'
+
+
+def _bound(value: float) -> str:
+    return '+Inf' if value == math.inf else f'{value:g}'
+
+
+class WorkerMetrics:
+    """In-memory metrics rendered in Prometheus text format."""
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._stage_counts: dict[str, list[int]] = {}
+        self._stage_sums: dict[str, float] = defaultdict(float)
+        self._counters: dict[str, dict[tuple, float]] = defaultdict(lambda: defaultdict(float))
+        self._gauges: dict[str, Callable[[], float]] = {}
+
+    def observe(self, stage: str, seconds: float):
+        """Record the duration of one stage of one task."""
+        with self._lock:
+            counts = self._stage_counts.setdefault(stage, [0] * len(STAGE_BUCKETS))
+            for i, bound in enumerate(STAGE_BUCKETS):
+                if seconds <= bound:
+                    counts[i] += 1
+            self._stage_sums[stage] += seconds
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Add to a counter (``<prefix>_<name>``)."""
+        with self._lock:
+            self._counters[name][tuple(sorted(labels.items()))] += value
+
+    def gauge(self, name: str, read: Callable[[], float]):
+        """Register a gauge whose value is read at scrape time."""
+        self._gauges[name] = read
+
+    def render(self) -> str:
+        """Current metrics in Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            if self._stage_counts:
+                name = f'{self.prefix}_stage_seconds'
+                lines.append(f'# HELP {name} Duration of each task stage.')
+                lines.append(f'# TYPE {name} histogram')
+                for stage, counts in sorted(self._stage_counts.items()):
+                    for bound, count in zip(STAGE_BUCKETS, counts):
+                        lines.append(f'{name}_bucket{_labels({"stage": stage, "le": _bound(bound)})} {count}')
+                    lines.append(f'{name}_sum{_labels({"stage": stage})} {self._stage_sums[stage]:g}')
+                    lines.append(f'{name}_count{_labels({"stage": stage})} {counts[-1]}')
+
+            for counter, series in sorted(self._counters.items()):
+                name = f'{self.prefix}_{counter}'
+                lines.append(f'# TYPE {name} counter')
+                for labels, value in sorted(series.items()):
+                    lines.append(f'{name}{_labels(dict(labels))} {value:g}')
+
+        for gauge, read in sorted(self._gauges.items()):
+            name = f'{self.prefix}_{gauge}'
+            try:
+                value = float(read())
+            except Exception:
+                continue
+            lines.append(f'# TYPE {name} gauge')
+            lines.append(f'{name} {value:g}')
+
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port: int, host: str = '0.0.0.0') -> ThreadingHTTPServer:
+        """Serve ``/metrics`` on a daemon thread."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+        logger.info(f'Serving metrics on http://{host}:{port}/metrics')
+        return server